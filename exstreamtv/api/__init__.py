@@ -53,6 +53,13 @@ except ImportError as e:
     import logging
     logging.getLogger(__name__).warning(f"Schedule history router not available: {e}")
 
+try:
+    from .guide import router as guide_router
+    api_router.include_router(guide_router, tags=["Guide"])
+except ImportError as e:
+    import logging
+    logging.getLogger(__name__).warning(f"Guide router not available: {e}")
+
 try:
     from .schedule_items import router as schedule_items_router
     api_router.include_router(schedule_items_router, tags=["Schedule Items"])
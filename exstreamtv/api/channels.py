@@ -29,6 +29,7 @@ from ..database.models import (
 )
 from ..patterns.repository.channel_repository import ChannelRepository
 from ..streaming.plex_api_client import request_plex_guide_reload
+from ..streaming.position_store import get_position_store
 
 logger = logging.getLogger(__name__)
 
@@ -283,6 +284,7 @@ async def delete_channel(channel_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(channel)
     await db.commit()
+    get_position_store().forget(channel_id)
     
     cache = await get_cache()
     await cache.invalidate_epg()
@@ -403,6 +405,9 @@ async def reset_playback_position(channel_id: int, db: AsyncSession = Depends(ge
     result = await db.execute(stmt)
     playback_pos = result.scalar_one_or_none()
 
+    # Drop the live position too, or the next flush would write it back
+    get_position_store().forget(channel_id)
+
     if playback_pos:
         await db.delete(playback_pos)
         await db.commit()
@@ -891,10 +896,11 @@ async def get_channel_schedule(
     if not channel:
         raise HTTPException(status_code=404, detail="Channel not found")
 
-    playback_pos = None
-    stmt = select(ChannelPlaybackPosition).where(ChannelPlaybackPosition.channel_id == channel.id)
-    result = await db.execute(stmt)
-    playback_pos = result.scalar_one_or_none()
+    playback_pos = get_position_store().get(channel.id)
+    if playback_pos is None:
+        stmt = select(ChannelPlaybackPosition).where(ChannelPlaybackPosition.channel_id == channel.id)
+        result = await db.execute(stmt)
+        playback_pos = result.scalar_one_or_none()
 
     playout_items: list[dict[str, Any]] = []
     schedule_file = ScheduleParser.find_schedule_file(channel_number)
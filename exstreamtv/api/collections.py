@@ -8,8 +8,10 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from ..api.pagination import Keyset, estimated_total, fetch_page
 from ..api.schemas import CollectionCreate, CollectionResponse
 from ..database import Collection, CollectionItem, MediaItem, Schedule, get_db
+from ..database.media_search import apply_search
 
 logger = logging.getLogger(__name__)
 
@@ -242,6 +244,71 @@ async def get_collection(collection_id: int, db: AsyncSession = Depends(get_db))
     return collection
 
 
+@router.get("/{collection_id}/items")
+async def get_collection_items(
+    collection_id: int,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, Any]:
+    """Get a collection's items in order, one page at a time.
+
+    Args:
+        collection_id: Collection ID
+        limit: Maximum items to return (max 1000)
+        offset: Offset for pagination
+        cursor: next_cursor of the previous page (takes precedence over offset)
+        db: Database session
+
+    Returns:
+        Collection items with pagination info
+    """
+    limit = min(limit, 1000)
+    result = await db.execute(select(Collection.id).where(Collection.id == collection_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+
+    items, next_cursor = await fetch_page(
+        db,
+        select(CollectionItem).where(CollectionItem.playlist_id == collection_id),
+        scope=f"collection-items:{collection_id}",
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        keyset=Keyset(CollectionItem.position, CollectionItem.id),
+    )
+    total, total_estimated = await estimated_total(
+        db,
+        select(func.count(CollectionItem.id)).where(CollectionItem.playlist_id == collection_id),
+        refresh=cursor is None and offset == 0,
+    )
+
+    return {
+        "collection_id": collection_id,
+        "items": [
+            {
+                "id": item.id,
+                "media_item_id": item.media_item_id,
+                "source_url": item.source_url,
+                "title": item.title,
+                "duration_seconds": item.duration_seconds,
+                "thumbnail_url": item.thumbnail_url,
+                "position": item.position,
+                "is_enabled": item.is_enabled,
+            }
+            for item in items
+        ],
+        "offset": offset,
+        "limit": limit,
+        "count": len(items),
+        "total": total,
+        "total_estimated": total_estimated,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+    }
+
+
 @router.post("", response_model=CollectionResponse, status_code=status.HTTP_201_CREATED)
 async def create_collection(
     collection: CollectionCreate, db: AsyncSession = Depends(get_db)
@@ -515,7 +582,6 @@ async def create_smart_collection(
         Created smart collection
     """
     from ..database.models import CollectionTypeEnum
-    from sqlalchemy import or_
     
     # Check if name already exists
     stmt = select(Collection).where(Collection.name == name)
@@ -535,22 +601,15 @@ async def create_smart_collection(
     await db.commit()
     await db.refresh(db_collection)
     
-    # Populate the collection based on search query
-    # Search in media items by title
-    stmt = select(MediaItem).where(
-        or_(
-            MediaItem.title.ilike(f"%{search_query}%"),
-            MediaItem.show_title.ilike(f"%{search_query}%"),
-            MediaItem.description.ilike(f"%{search_query}%")
-        )
-    )
-    result = await db.execute(stmt)
+    # Populate the collection based on search query, best matches first
+    stmt = apply_search(select(MediaItem.id), search_query, db.get_bind())
+    result = await db.execute(stmt.order_by(MediaItem.id))
     matching_items = result.scalars().all()
     
-    for idx, item in enumerate(matching_items):
+    for idx, media_item_id in enumerate(matching_items):
         collection_item = CollectionItem(
             collection_id=db_collection.id,
-            media_item_id=item.id,
+            media_item_id=media_item_id,
             order=idx,
         )
         db.add(collection_item)
@@ -579,7 +638,7 @@ async def refresh_smart_collection(collection_id: int, db: AsyncSession = Depend
         Refresh result with item counts
     """
     from ..database.models import CollectionTypeEnum
-    from sqlalchemy import or_, delete
+    from sqlalchemy import delete
     
     stmt = select(Collection).where(Collection.id == collection_id)
     result = await db.execute(stmt)
@@ -609,21 +668,15 @@ async def refresh_smart_collection(collection_id: int, db: AsyncSession = Depend
     
     # Re-run search
     search_query = collection.search_query
-    search_stmt = select(MediaItem).where(
-        or_(
-            MediaItem.title.ilike(f"%{search_query}%"),
-            MediaItem.show_title.ilike(f"%{search_query}%"),
-            MediaItem.description.ilike(f"%{search_query}%")
-        )
-    )
-    search_result = await db.execute(search_stmt)
+    search_stmt = apply_search(select(MediaItem.id), search_query, db.get_bind())
+    search_result = await db.execute(search_stmt.order_by(MediaItem.id))
     matching_items = search_result.scalars().all()
     
     # Add matching items
-    for idx, item in enumerate(matching_items):
+    for idx, media_item_id in enumerate(matching_items):
         collection_item = CollectionItem(
             collection_id=collection_id,
-            media_item_id=item.id,
+            media_item_id=media_item_id,
             order=idx,
         )
         db.add(collection_item)
@@ -0,0 +1,273 @@
+"""
+Multi-core EPG build.
+
+Per channel, turning schedule items into guide XML is pure CPU work:
+TimelineBuilder.build, TitleResolver.resolve_title for every programme, and
+rendering/validating the XMLTV fragment. EpgBuildPool runs that work for a
+batch of channels off the event loop, either in a worker thread (small
+batches, or ``scheduling.epg.build_workers: 0``) or fanned out over a
+ProcessPoolExecutor.
+
+Workers only ever see plain DTOs (EpgChannelJob and friends), never ORM
+objects, so jobs pickle cheaply and no session state crosses processes.
+Schedule expansion that needs the database (ScheduleEngine) stays in the
+main process, in worker threads for up to ``expansion_concurrency`` channels
+at once; its output is converted to DTOs like playout items are.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import inspect as sa_inspect
+
+from ..patterns.cache.programme_index import EMPTY_INDEX, ProgrammeIndex
+from .timeline_builder import PlaybackAnchor, TimelineBuilder, TimelineProgramme
+from .title_resolver import TitleResolver
+from .xmltv_generator import XMLTVGenerator, XMLTVValidationError
+
+logger = logging.getLogger(__name__)
+
+# Channels per process-pool task; amortizes pickling and IPC per call
+POOL_BATCH_SIZE = 8
+
+
+@dataclass(frozen=True, slots=True)
+class EpgChannelDTO:
+    """What the XMLTV writer needs from a Channel."""
+
+    id: int
+    number: str | None
+    name: str
+    logo_path: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class EpgFileDTO:
+    path: str
+
+
+@dataclass(frozen=True, slots=True)
+class EpgMediaDTO:
+    """What TimelineBuilder and TitleResolver need from a MediaItem."""
+
+    id: int | None
+    title: str | None
+    duration: int | None
+    url: str | None = None
+    # First MediaFile only, and only when it was already loaded
+    files: tuple[EpgFileDTO, ...] = ()
+
+
+@dataclass(slots=True)
+class EpgChannelJob:
+    """Inputs for building one channel's guide fragment."""
+
+    channel: EpgChannelDTO
+    items: list[dict[str, Any]]  # {"media_item": EpgMediaDTO, "custom_title": str | None}
+    anchor: PlaybackAnchor
+    now: datetime
+    end_time: datetime
+    base_url: str
+    max_programmes: int
+    validate: bool = True
+
+
+@dataclass(slots=True)
+class EpgChannelResult:
+    """Rendered fragment plus the programmes it was built from."""
+
+    channel_id: int
+    channel_xml: str = ""
+    programmes_xml: str = ""
+    # (start, stop, title) per programme, in order
+    programmes: list[tuple[datetime, datetime, str]] = field(default_factory=list)
+    # The same programmes, indexed for window queries (JSON guide API)
+    index: ProgrammeIndex = EMPTY_INDEX
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def first_stop(self) -> datetime | None:
+        return self.programmes[0][1] if self.programmes else None
+
+
+def _loaded(obj: Any, name: str) -> Any:
+    """Attribute value if already loaded; never triggers an ORM lazy load."""
+    try:
+        state = sa_inspect(obj, raiseerr=False)
+    except Exception:
+        state = None
+    if state is not None and name in state.unloaded:
+        return None
+    return getattr(obj, name, None)
+
+
+def channel_dto(channel: Any) -> EpgChannelDTO:
+    number = getattr(channel, "number", None)
+    return EpgChannelDTO(
+        id=channel.id,
+        number=str(number) if number is not None else None,
+        name=str(getattr(channel, "name", "") or ""),
+        logo_path=getattr(channel, "logo_path", None) or getattr(channel, "logo_url", None),
+    )
+
+
+def media_dto(media_item: Any) -> EpgMediaDTO | None:
+    if media_item is None:
+        return None
+    files = _loaded(media_item, "files")
+    first_path = getattr(files[0], "path", None) if files else None
+    return EpgMediaDTO(
+        id=getattr(media_item, "id", None),
+        title=getattr(media_item, "title", None),
+        duration=getattr(media_item, "duration", None),
+        url=getattr(media_item, "url", None),
+        files=(EpgFileDTO(first_path),) if first_path else (),
+    )
+
+
+def item_dtos(schedule_items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Schedule item dicts with ORM media items replaced by EpgMediaDTO."""
+    return [
+        {
+            "media_item": media_dto(item.get("media_item")),
+            "custom_title": item.get("custom_title"),
+        }
+        for item in schedule_items
+    ]
+
+
+def build_channel_epg(job: EpgChannelJob) -> EpgChannelResult:
+    """Build one channel's programmes and XMLTV fragment. Runs in any process."""
+    channel = job.channel
+    result = EpgChannelResult(channel_id=channel.id)
+    programmes: list[TimelineProgramme] = []
+    if job.items:
+        raw = TimelineBuilder().build(
+            job.items, job.anchor, now=job.now, max_programmes=job.max_programmes
+        )
+        resolver = TitleResolver()
+        for p in raw:
+            if p.stop_time < job.now or p.start_time > job.end_time:
+                continue
+            try:
+                title = resolver.resolve_title(p.playout_item, p.media_item, channel)
+            except Exception:
+                title = p.title or "Unknown"
+            programmes.append(
+                TimelineProgramme(
+                    start_time=p.start_time,
+                    stop_time=p.stop_time,
+                    media_item=p.media_item,
+                    playout_item=p.playout_item,
+                    title=title,
+                    index=p.index,
+                )
+            )
+
+    gen = XMLTVGenerator()
+    try:
+        result.programmes_xml = gen.programme_fragment(channel, programmes, validate=job.validate)
+    except XMLTVValidationError as e:
+        result.errors = e.details or [str(e)]
+        return result
+    result.channel_xml = gen.channel_fragment(channel, job.base_url)
+    result.programmes = [(p.start_time, p.stop_time, p.title) for p in programmes]
+    result.index = ProgrammeIndex.from_programmes(result.programmes)
+    return result
+
+
+def _build_batch(jobs: list[EpgChannelJob]) -> list[EpgChannelResult]:
+    return [build_channel_epg(job) for job in jobs]
+
+
+class EpgBuildPool:
+    """Runs EPG channel builds in a worker thread or a process pool."""
+
+    def __init__(self, workers: int = 0, min_channels: int = 16):
+        self.workers = max(0, workers)
+        self.min_channels = max(1, min_channels)
+        self._executor: ProcessPoolExecutor | None = None
+        self._builds = 0
+        self._pooled_builds = 0
+
+    @property
+    def expansion_concurrency(self) -> int:
+        """Channels whose schedule files are expanded at once (pool size, else CPUs)."""
+        return max(1, self.workers or os.cpu_count() or 1)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"EPG build process pool started ({self.workers} workers)")
+        return self._executor
+
+    async def build(self, jobs: list[EpgChannelJob]) -> list[EpgChannelResult]:
+        """Build all jobs; results are returned in job order."""
+        if not jobs:
+            return []
+        self._builds += 1
+        if self.workers == 0 or len(jobs) < self.min_channels:
+            return await asyncio.to_thread(_build_batch, jobs)
+
+        self._pooled_builds += 1
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        batches = [jobs[i : i + POOL_BATCH_SIZE] for i in range(0, len(jobs), POOL_BATCH_SIZE)]
+        try:
+            parts = await asyncio.gather(
+                *(loop.run_in_executor(executor, _build_batch, batch) for batch in batches)
+            )
+        except Exception as e:
+            # A dead worker breaks the pool; start a fresh one next time
+            logger.warning(f"EPG process pool build failed, rebuilding in-process: {e}")
+            self.shutdown()
+            return await asyncio.to_thread(_build_batch, jobs)
+        return [result for part in parts for result in part]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "min_channels": self.min_channels,
+            "expansion_concurrency": self.expansion_concurrency,
+            "pool_running": self._executor is not None,
+            "builds": self._builds,
+            "pooled_builds": self._pooled_builds,
+        }
+
+
+_build_pool: EpgBuildPool | None = None
+
+
+def get_epg_build_pool() -> EpgBuildPool:
+    """Get the process-wide EPG build pool, sized from config."""
+    global _build_pool
+    if _build_pool is None:
+        from ..config import get_config
+
+        epg = get_config().scheduling.epg
+        workers = epg.build_workers
+        if workers < 0:
+            workers = os.cpu_count() or 1
+        _build_pool = EpgBuildPool(workers=workers, min_channels=epg.build_pool_min_channels)
+    return _build_pool
+
+
+def shutdown_epg_build_pool() -> None:
+    global _build_pool
+    if _build_pool is not None:
+        _build_pool.shutdown()
+        _build_pool = None
@@ -0,0 +1,148 @@
+"""
+Bulk data loader for EPG generation.
+
+Building the guide used to cost several queries per channel (playback
+position, active playout, playout items joined with media items) plus a
+schedule-file lookup per channel. EpgDataLoader fetches the same data for
+any number of channels in a fixed number of queries and groups it per
+channel in memory:
+
+1. ChannelPlaybackPosition rows for all channels
+2. Active Playout rows for all channels
+3. PlayoutItem ⋈ MediaItem rows for all of those playouts
+
+Live positions from the write-behind position store take precedence over
+the persisted rows, as they do everywhere else. Schedule files are found
+with one listing of the schedules directory.
+"""
+
+import logging
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import ChannelPlaybackPosition, MediaItem, Playout, PlayoutItem
+from ..scheduling import ScheduleParser
+from ..streaming.position_store import get_position_store
+
+logger = logging.getLogger(__name__)
+
+# Bound on bind parameters per IN (...) clause; SQLite builds before 3.32
+# allow at most 999 per statement.
+IN_CLAUSE_CHUNK = 900
+
+
+def _chunks(values: Sequence[int], size: int = IN_CLAUSE_CHUNK) -> Iterable[Sequence[int]]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+@dataclass
+class EpgBulkData:
+    """Per-channel EPG inputs, keyed by channel id."""
+
+    positions: dict[int, Any] = field(default_factory=dict)
+    playouts: dict[int, Any] = field(default_factory=dict)
+    items: dict[int, list[tuple[Any, Any]]] = field(default_factory=dict)
+    schedule_files: dict[str, Path] = field(default_factory=dict)
+    # False when the position query failed (e.g. an older schema); callers
+    # then fall back to their own per-channel lookup.
+    positions_loaded: bool = True
+    query_count: int = 0
+
+    def position(self, channel_id: int) -> Any | None:
+        return self.positions.get(channel_id)
+
+    def schedule_file(self, channel_number: Any) -> Path | None:
+        return self.schedule_files.get(str(channel_number))
+
+    def schedule_items(self, channel_id: int) -> list[dict[str, Any]]:
+        """Active playout items as TimelineBuilder schedule item dicts (fresh list)."""
+        return [
+            {
+                "media_item": mi,
+                "custom_title": getattr(pi, "title", None) or getattr(pi, "custom_title", None),
+            }
+            for pi, mi in self.items.get(channel_id, [])
+            if mi
+        ]
+
+
+class EpgDataLoader:
+    """Loads EPG inputs for a batch of channels in a constant number of queries."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load(self, channels: Sequence[Any], include_items: bool = True) -> EpgBulkData:
+        data = EpgBulkData()
+        if not channels:
+            return data
+        channel_ids = [channel.id for channel in channels]
+
+        data.schedule_files = ScheduleParser.find_schedule_files(
+            str(channel.number) for channel in channels
+        )
+
+        await self._load_positions(channel_ids, data)
+        if include_items:
+            await self._load_playouts(channel_ids, data)
+        return data
+
+    async def _load_positions(self, channel_ids: list[int], data: EpgBulkData) -> None:
+        store = get_position_store()
+        missing = []
+        for channel_id in channel_ids:
+            live = store.get(channel_id)
+            if live is not None:
+                data.positions[channel_id] = live
+            else:
+                missing.append(channel_id)
+        try:
+            for chunk in _chunks(missing):
+                result = await self.db.execute(
+                    select(ChannelPlaybackPosition).where(
+                        ChannelPlaybackPosition.channel_id.in_(chunk)
+                    )
+                )
+                data.query_count += 1
+                for pos in result.scalars().all():
+                    data.positions.setdefault(pos.channel_id, pos)
+        except Exception as e:
+            logger.warning(f"Bulk playback position load failed, using per-channel lookups: {e}")
+            data.positions_loaded = False
+
+    async def _load_playouts(self, channel_ids: list[int], data: EpgBulkData) -> None:
+        for chunk in _chunks(channel_ids):
+            result = await self.db.execute(
+                select(Playout)
+                .where(Playout.channel_id.in_(chunk), Playout.is_active.is_(True))
+                .order_by(Playout.id)
+            )
+            data.query_count += 1
+            # One active playout per channel is expected; the newest wins otherwise
+            for playout in result.scalars().all():
+                data.playouts[playout.channel_id] = playout
+
+        channel_by_playout = {p.id: cid for cid, p in data.playouts.items()}
+        for chunk in _chunks(list(channel_by_playout)):
+            result = await self.db.execute(
+                select(PlayoutItem, MediaItem)
+                .outerjoin(MediaItem, PlayoutItem.media_item_id == MediaItem.id)
+                .where(PlayoutItem.playout_id.in_(chunk))
+                .order_by(PlayoutItem.playout_id, PlayoutItem.id)
+            )
+            data.query_count += 1
+            for pi, mi in result.all():
+                data.items.setdefault(channel_by_playout[pi.playout_id], []).append((pi, mi))
+
+
+async def load_epg_data(
+    db: AsyncSession, channels: Sequence[Any], include_items: bool = True
+) -> EpgBulkData:
+    """Convenience wrapper around EpgDataLoader.load()."""
+    return await EpgDataLoader(db).load(channels, include_items=include_items)
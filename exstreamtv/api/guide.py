@@ -0,0 +1,97 @@
+"""
+JSON guide queries served from the programme interval index.
+
+``GET /api/guide?channels=1,2&start=...&hours=3`` answers a grid window
+from the ProgrammeIndex kept on each channel's XMLTV fragment, the data
+the XMLTV writer renders, without generating XML. Channels whose fragment
+is stale are rebuilt through the regular guide pipeline first.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from exstreamtv.config import get_config
+from exstreamtv.database import get_db
+from exstreamtv.database.models import Channel
+from exstreamtv.patterns.cache.xmltv_fragments import get_xmltv_fragment_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/guide", tags=["Guide"])
+
+MAX_GUIDE_HOURS = 14 * 24
+
+
+def _parse_channel_ids(channels: str | None) -> list[int] | None:
+    if channels is None or not channels.strip():
+        return None
+    try:
+        return list(dict.fromkeys(int(part) for part in channels.split(",") if part.strip()))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail="channels must be comma-separated channel ids"
+        ) from e
+
+
+@router.get("")
+async def get_guide(
+    request: Request,
+    channels: str | None = Query(None, description="Comma-separated channel ids (default: all)"),
+    start: datetime | None = Query(None, description="Window start, ISO 8601 (default: now)"),
+    hours: float = Query(3.0, gt=0, le=MAX_GUIDE_HOURS, description="Window length in hours"),
+    db: AsyncSession = Depends(get_db),
+) -> JSONResponse:
+    """Programmes overlapping [start, start + hours) for each requested channel."""
+    now = datetime.now(tz=timezone.utc)
+    window_start = start or now
+    if window_start.tzinfo is None:
+        window_start = window_start.replace(tzinfo=timezone.utc)
+    window_end = window_start + timedelta(hours=hours)
+
+    channel_ids = _parse_channel_ids(channels)
+    if channel_ids is None:
+        result = await db.execute(select(Channel.id).where(Channel.enabled.is_(True)))
+        channel_ids = list(result.scalars().all())
+
+    fragments = get_xmltv_fragment_cache()
+    found = {cid: fragments.get(cid, None, now) for cid in channel_ids}
+    stale_ids = [cid for cid, fragment in found.items() if fragment is None]
+    if stale_ids:
+        from .iptv import _xmltv_base_url, rebuild_channel_fragments
+
+        result = await db.execute(
+            select(Channel).where(Channel.id.in_(stale_ids), Channel.enabled.is_(True))
+        )
+        stale_channels = list(result.scalars().all())
+        end_time = now + timedelta(days=get_config().playout.build_days)
+        rebuilt = await rebuild_channel_fragments(
+            stale_channels, db, now, end_time, _xmltv_base_url(request), validate=True
+        )
+        if rebuilt is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Guide data unavailable",
+                headers={"Retry-After": "60"},
+            )
+        found.update(rebuilt)
+
+    lo, hi = window_start.timestamp(), window_end.timestamp()
+    return JSONResponse(
+        {
+            "start": window_start.isoformat(),
+            "end": window_end.isoformat(),
+            # Unknown and disabled channels are left out
+            "channels": [
+                {"id": cid, "programmes": fragment.programmes.window(lo, hi)}
+                for cid, fragment in found.items()
+                if fragment is not None
+            ],
+        }
+    )
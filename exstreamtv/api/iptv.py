@@ -2,19 +2,26 @@
 
 import asyncio
 import logging
+import time
 import urllib.parse
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from datetime import time as dt_time
 from xml.sax.saxutils import escape as xml_escape
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse, RedirectResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import get_config
+from ..patterns.cache.encoded_body import EncodedBody
+from .epg_build_pool import EpgChannelJob, channel_dto, get_epg_build_pool, item_dtos
+from .epg_loader import EpgBulkData, load_epg_data
+from .timeline_builder import PlaybackAnchor
+from .xmltv_stream import iter_text_chunks, xmltv_streaming_response
 config = get_config()
 from ..constants import (
     EPG_ASSIGNMENT_LOG_COUNT,
@@ -25,7 +32,15 @@ from ..constants import (
     EXSTREAM_CHANNEL_ID_PREFIX,
     MAX_EPG_ITEMS_PER_CHANNEL,
 )
-from ..database import Channel, MediaItem, Playout, PlayoutItem, get_db, get_sync_session
+from ..database import (
+    Channel,
+    MediaItem,
+    Playout,
+    PlayoutItem,
+    get_db,
+    get_session,
+    get_sync_session,
+)
 from ..scheduling import ScheduleEngine, ScheduleParser
 from ..streaming import StreamManager, StreamSource
 from ..streaming.plex_api_client import PlexAPIClient
@@ -41,6 +56,15 @@ stream_manager = StreamManager()
 _xmltv_cache: str | None = None
 _xmltv_cache_time: float = 0.0
 _XMLTV_CACHE_TTL: int = 120  # seconds — refresh every 2 minutes
+# Fragment cache generation the whole-document caches were built at; an
+# event-driven fragment invalidation makes them stale before the TTL.
+_xmltv_cache_generation: int = -1
+
+# M3U playlists per (mode, access_token, base_url), precompressed with an ETag
+_M3U_MEDIA_TYPE = "application/vnd.apple.mpegurl"
+_M3U_CACHE_TTL: int = 60  # seconds
+_M3U_CACHE_MAX_ENTRIES = 32
+_m3u_cache: dict[tuple[str, str | None, str], tuple[EncodedBody, float, int]] = {}
 
 def _xml(value) -> str:
     """Safely escape XML text/attribute values."""
@@ -68,113 +92,160 @@ def _run_schedule_engine_sync(channel_id: int, schedule_file_path: Path) -> list
     finally:
         session.close()
 
-async def _build_epg_via_timeline_builder(
+
+async def _build_channel_job(
+    channel,
+    epg_data: EpgBulkData,
+    now: datetime,
+    end_time: datetime,
+    base_url: str,
+    validate: bool,
+) -> EpgChannelJob:
+    """Collect one channel's schedule items and anchor as a picklable build job."""
+    schedule_items = []
+    playback_pos = epg_data.position(channel.id)
+
+    schedule_file = epg_data.schedule_file(channel.number)
+    if schedule_file:
+        try:
+            schedule_items = await asyncio.to_thread(
+                _run_schedule_engine_sync, channel.id, schedule_file
+            )
+        except Exception:
+            schedule_items = []
+
+    if not schedule_items:
+        schedule_items = epg_data.schedule_items(channel.id)
+
+    anchor = PlaybackAnchor(
+        playout_start_time=getattr(playback_pos, "playout_start_time", None) or now if playback_pos else now,
+        last_item_index=getattr(playback_pos, "last_item_index", 0) or 0 if playback_pos else 0,
+        current_item_start_time=getattr(playback_pos, "current_item_start_time", None) if playback_pos else None,
+        elapsed_seconds_in_item=getattr(playback_pos, "elapsed_seconds_in_item", 0) or 0 if playback_pos else 0,
+    )
+    return EpgChannelJob(
+        channel=channel_dto(channel),
+        items=item_dtos(schedule_items),
+        anchor=anchor,
+        now=now,
+        end_time=end_time,
+        base_url=base_url,
+        max_programmes=EPG_MAX_PROGRAMMES_PER_CHANNEL,
+        validate=validate,
+    )
+
+
+async def rebuild_channel_fragments(
     channels: list,
     db: AsyncSession,
     now: datetime,
     end_time: datetime,
     base_url: str,
-) -> str | None:
+    validate: bool,
+) -> dict | None:
     """
-    Build EPG XML using TimelineBuilder + TitleResolver + XMLTVGenerator.
+    Rebuild and cache the XMLTV fragments (and programme indexes) of channels.
 
-    Returns XML string if successful, None to fall back to legacy path.
+    Schedule files are expanded concurrently, then timelines, titles and
+    fragments are built off the event loop as DTO jobs (worker thread or
+    process pool, see epg_build_pool). Returns
+    channel id -> XmltvFragment, or None when a channel fails validation.
     """
-    from ..api.timeline_builder import TimelineBuilder, PlaybackAnchor
-    from ..api.title_resolver import TitleResolver
-    from ..api.xmltv_generator import XMLTVGenerator
-
-    programmes_by_channel: dict[int, list] = {}
-
-    for channel in channels:
-        schedule_items = []
-        playback_pos = None
-
-        try:
-            from ..database.models import ChannelPlaybackPosition
-            stmt = select(ChannelPlaybackPosition).where(
-                ChannelPlaybackPosition.channel_id == channel.id
+    from ..patterns.cache.xmltv_fragments import get_xmltv_fragment_cache
+    from ..streaming.playout_timeline import timeline_version
+
+    fragments = get_xmltv_fragment_cache()
+    # Versions are read before loading so a concurrent playout write leaves
+    # the new fragment stale rather than silently current
+    versions = {channel.id: timeline_version(channel.id) for channel in channels}
+    epg_data = await load_epg_data(db, channels)
+
+    pool = get_epg_build_pool()
+    # ScheduleEngine expansion runs in threads, several channels at once
+    expansion_slots = asyncio.Semaphore(pool.expansion_concurrency)
+
+    async def build_job(channel) -> EpgChannelJob:
+        async with expansion_slots:
+            return await _build_channel_job(
+                channel, epg_data, now, end_time, base_url, validate=validate
             )
-            result = await db.execute(stmt)
-            playback_pos = result.scalar_one_or_none()
-        except Exception:
-            pass
 
-        schedule_file = ScheduleParser.find_schedule_file(channel.number)
-        if schedule_file:
-            try:
-                schedule_items = await asyncio.to_thread(
-                    _run_schedule_engine_sync, channel.id, schedule_file
-                )
-            except Exception:
-                schedule_items = []
-
-        if not schedule_items:
-            stmt = select(Playout).where(
-                Playout.channel_id == channel.id,
-                Playout.is_active == True,
+    jobs = await asyncio.gather(*(build_job(ch) for ch in channels))
+    rebuilt = {}
+    for result in await pool.build(list(jobs)):
+        if result.errors:
+            logger.warning(
+                f"TimelineBuilder EPG generation failed: channel {result.channel_id}: "
+                f"{result.errors[:5]}"
             )
-            result = await db.execute(stmt)
-            playout = result.scalar_one_or_none()
-            if playout:
-                items_stmt = (
-                    select(PlayoutItem, MediaItem)
-                    .outerjoin(MediaItem, PlayoutItem.media_item_id == MediaItem.id)
-                    .where(PlayoutItem.playout_id == playout.id)
-                    .order_by(PlayoutItem.id)
-                )
-                items_result = await db.execute(items_stmt)
-                for pi, mi in items_result.all():
-                    if mi:
-                        schedule_items.append({
-                            "media_item": mi,
-                            "custom_title": getattr(pi, "title", None) or getattr(pi, "custom_title", None),
-                        })
-
-        if not schedule_items:
-            programmes_by_channel[channel.id] = []
-            continue
-
-        anchor = PlaybackAnchor(
-            playout_start_time=getattr(playback_pos, "playout_start_time", None) or now if playback_pos else now,
-            last_item_index=getattr(playback_pos, "last_item_index", 0) or 0 if playback_pos else 0,
-            current_item_start_time=getattr(playback_pos, "current_item_start_time", None) if playback_pos else None,
-            elapsed_seconds_in_item=getattr(playback_pos, "elapsed_seconds_in_item", 0) or 0 if playback_pos else 0,
+            return None
+        rebuilt[result.channel_id] = fragments.put(
+            result.channel_id,
+            result.channel_xml,
+            result.programmes_xml,
+            base_url,
+            result.first_stop,
+            now=now,
+            version=versions[result.channel_id],
+            programmes=result.index,
         )
-        builder = TimelineBuilder()
-        programmes_raw = builder.build(
-            schedule_items, anchor, now=now, max_programmes=EPG_MAX_PROGRAMMES_PER_CHANNEL
+    if channels:
+        logger.debug(
+            f"Rebuilt {len(rebuilt)} XMLTV fragments ({epg_data.query_count} bulk queries)"
         )
+    return rebuilt
 
-        resolver = TitleResolver()
-        programmes_filtered = []
-        for p in programmes_raw:
-            if p.stop_time < now or p.start_time > end_time:
-                continue
-            try:
-                title = resolver.resolve_title(p.playout_item, p.media_item, channel)
-            except Exception:
-                title = p.title or "Unknown"
-            from ..api.timeline_builder import TimelineProgramme
-            programmes_filtered.append(
-                TimelineProgramme(
-                    start_time=p.start_time,
-                    stop_time=p.stop_time,
-                    media_item=p.media_item,
-                    playout_item=p.playout_item,
-                    title=title,
-                    index=p.index,
-                )
-            )
-        programmes_by_channel[channel.id] = programmes_filtered
 
-    try:
-        _total_prog = sum(len(v) for v in programmes_by_channel.values())
-        gen = XMLTVGenerator()
-        return gen.generate(channels, programmes_by_channel, base_url=base_url, validate=True)
-    except Exception as e:
-        logger.warning(f"TimelineBuilder EPG generation failed: {e}")
+async def _build_epg_via_timeline_builder(
+    channels: list,
+    db: AsyncSession,
+    now: datetime,
+    end_time: datetime,
+    base_url: str,
+) -> Iterator[str] | None:
+    """
+    Build EPG XML using TimelineBuilder + TitleResolver + XMLTVGenerator.
+
+    Each channel is rendered into a cached fragment; only channels whose
+    fragment was invalidated (events, playout writes, window roll) are
+    rebuilt, and the document is the concatenation of all fragments.
+    Rebuilds run through the EPG build pool as DTO jobs, so the CPU work
+    never runs on the event loop.
+
+    Returns the XML as an iterator of blocks if successful, None to fall
+    back to legacy path.
+    """
+    from ..api.xmltv_generator import (
+        XMLTVGenerator,
+        XMLTVValidationError,
+        validate_xmltv_structure,
+    )
+    from ..patterns.cache.xmltv_fragments import get_xmltv_fragment_cache
+
+    fragments = get_xmltv_fragment_cache()
+    fragments.retain(channel.id for channel in channels)
+    gen = XMLTVGenerator()
+
+    cached = {channel.id: fragments.get(channel.id, base_url, now) for channel in channels}
+    stale = [channel for channel in channels if cached[channel.id] is None]
+    rebuilt = await rebuild_channel_fragments(stale, db, now, end_time, base_url, validate=True)
+    if rebuilt is None:
         return None
+    cached.update(rebuilt)
+
+    channel_parts = [cached[channel.id].channel_xml for channel in channels]
+    programme_parts = [cached[channel.id].programmes_xml for channel in channels]
+    logger.debug(f"XMLTV assembled from {len(channels)} fragments ({len(stale)} rebuilt)")
+    if config.scheduling.epg.strict_xmltv_validation:
+        valid, errors = await asyncio.to_thread(
+            validate_xmltv_structure,
+            gen.assemble(channel_parts, programme_parts),
+            {_channel_xmltv_id(channel) for channel in channels},
+        )
+        if not valid:
+            logger.error(f"Strict XMLTV validation failed: {errors[:10]}")
+            raise XMLTVValidationError("Strict XMLTV validation failed", details=errors)
+    return gen.iter_assemble(channel_parts, programme_parts)
 
 
 def _resolve_logo_url(channel, base_url: str) -> str | None:
@@ -224,6 +295,53 @@ async def get_channel_playlist(
             if access_token != config.security.access_token:
                 raise HTTPException(status_code=401, detail="Invalid access token")
 
+        # Always derive base_url from the incoming request so tvg-logo/icon URLs match
+        # the address Plex/clients use (avoids 127.0.0.1 vs LAN IP issues).
+        # Never use localhost - Plex accesses from different machine
+        base_url = config.server.base_url
+        if request:
+            scheme = request.url.scheme
+            host = request.url.hostname
+            port = request.url.port
+            # Replace localhost/127.0.0.1 with actual hostname for Plex compatibility
+            if host in ["localhost", "127.0.0.1"]:
+                # Try to get the actual server IP from request headers
+                forwarded_host = request.headers.get("X-Forwarded-Host") or request.headers.get(
+                    "Host"
+                )
+                if forwarded_host:
+                    host = forwarded_host.split(":")[0]
+                else:
+                    # Fallback: get local IP address
+                    import socket
+
+                    try:
+                        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                        try:
+                            s.connect(("8.8.8.8", 80))
+                            host = s.getsockname()[0]
+                        finally:
+                            s.close()
+                    except OSError:
+                        host = request.url.hostname
+            if port and port not in [80, 443]:
+                base_url = f"{scheme}://{host}:{port}"
+            else:
+                base_url = f"{scheme}://{host}"
+
+        # Channel events bump the fragment generation, which drops cached playlists
+        from ..patterns.cache.xmltv_fragments import get_xmltv_fragment_cache
+
+        generation = get_xmltv_fragment_cache().generation
+        cache_key = (mode, access_token, base_url)
+        cached = _m3u_cache.get(cache_key)
+        if (
+            cached is not None
+            and cached[2] == generation
+            and time.monotonic() - cached[1] < _M3U_CACHE_TTL
+        ):
+            return cached[0].response(request, _M3U_MEDIA_TYPE)
+
         stmt = select(Channel).where(Channel.enabled == True)
         result = await db.execute(stmt)
         channels = result.scalars().all()
@@ -259,40 +377,6 @@ async def get_channel_playlist(
                     )
                     channel.playout_mode = PlayoutMode.CONTINUOUS
 
-        # Always derive base_url from the incoming request so tvg-logo/icon URLs match
-        # the address Plex/clients use (avoids 127.0.0.1 vs LAN IP issues).
-        # Never use localhost - Plex accesses from different machine
-        base_url = config.server.base_url
-        if request:
-            scheme = request.url.scheme
-            host = request.url.hostname
-            port = request.url.port
-            # Replace localhost/127.0.0.1 with actual hostname for Plex compatibility
-            if host in ["localhost", "127.0.0.1"]:
-                # Try to get the actual server IP from request headers
-                forwarded_host = request.headers.get("X-Forwarded-Host") or request.headers.get(
-                    "Host"
-                )
-                if forwarded_host:
-                    host = forwarded_host.split(":")[0]
-                else:
-                    # Fallback: get local IP address
-                    import socket
-
-                    try:
-                        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                        try:
-                            s.connect(("8.8.8.8", 80))
-                            host = s.getsockname()[0]
-                        finally:
-                            s.close()
-                    except OSError:
-                        host = request.url.hostname
-            if port and port not in [80, 443]:
-                base_url = f"{scheme}://{host}:{port}"
-            else:
-                base_url = f"{scheme}://{host}"
-
         epg_url = f"{base_url.rstrip('/')}/iptv/xmltv.xml"
         m3u_content = f'#EXTM3U x-tvg-url="{epg_url}" url-tvg="{epg_url}"\n'
 
@@ -320,7 +404,12 @@ async def get_channel_playlist(
                 )
                 # Continue with next channel instead of failing entire request
 
-        return Response(content=m3u_content, media_type="application/vnd.apple.mpegurl")
+        # Encoded and hashed once; repeat polls are a lookup or a 304
+        encoded = EncodedBody.build(m3u_content)
+        if len(_m3u_cache) >= _M3U_CACHE_MAX_ENTRIES:
+            _m3u_cache.pop(next(iter(_m3u_cache)))
+        _m3u_cache[cache_key] = (encoded, time.monotonic(), generation)
+        return encoded.response(request, _M3U_MEDIA_TYPE)
     except HTTPException:
         raise
     except Exception as e:
@@ -332,320 +421,363 @@ async def get_channel_playlist(
             content=error_m3u, media_type="application/vnd.apple.mpegurl", status_code=500
         )
 
-@router.get("/iptv/xmltv.xml")
-async def get_epg(
-    request: Request,
-    access_token: str | None = None,
-    plain: bool = True,
-    db: AsyncSession = Depends(get_db),
-):
-    """Get Electronic Program Guide (XMLTV format)"""
-    import time as _time
 
-    global _xmltv_cache, _xmltv_cache_time
+def _xmltv_base_url(request: Request | None) -> str:
+    """Base URL for guide icon links, as the requesting client sees this server."""
+    # Always derive base_url from the incoming request so icon URLs work for Plex
+    # Never use localhost - Plex accesses from different machine
+    base_url = config.server.base_url
+    if request:
+        scheme = request.url.scheme
+        host = request.url.hostname
+        port = request.url.port
+        # Replace localhost/127.0.0.1 with actual hostname for Plex compatibility
+        if host in ["localhost", "127.0.0.1"]:
+            # Try to get the actual server IP from request headers first
+            forwarded_host = request.headers.get("X-Forwarded-Host") or request.headers.get(
+                "Host"
+            )
+            if forwarded_host:
+                host = forwarded_host.split(":")[0]
+            else:
+                # Fallback: get local IP address
+                import socket
 
-    perf_start_time = _time.time()  # Performance timing (float)
+                try:
+                    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    try:
+                        s.connect(("8.8.8.8", 80))
+                        host = s.getsockname()[0]
+                    finally:
+                        s.close()
+                except OSError:
+                    # Last resort: use config base_url but replace localhost
+                    if "localhost" in base_url or "127.0.0.1" in base_url:
+                        import socket
 
-    try:
-        # Allow anonymous access for Plex DVR compatibility (Plex does not support auth on XMLTV URLs)
-        # Only validate token when one is provided
-        if access_token is not None and config.security.api_key_required and config.security.access_token:
-            if access_token != config.security.access_token:
-                raise HTTPException(status_code=401, detail="Invalid access token")
+                        try:
+                            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                            try:
+                                s.connect(("8.8.8.8", 80))
+                                host = s.getsockname()[0]
+                            finally:
+                                s.close()
+                        except OSError:
+                            host = request.url.hostname
+        if port and port not in [80, 443]:
+            base_url = f"{scheme}://{host}:{port}"
+        else:
+            base_url = f"{scheme}://{host}"
+    return base_url
 
-        lazy_xmltv = getattr(request.app.state, "xmltv_cache", None)
-        if lazy_xmltv is not None:
-            lazy_hit = await lazy_xmltv.peek_fresh()
-            if lazy_hit is not None:
-                logger.debug(
-                    "Returning app.state XMLTV cache (%ss TTL)",
-                    int(lazy_xmltv.ttl_seconds),
-                )
-                return Response(
-                    content=lazy_hit,
-                    media_type="text/xml; charset=utf-8",
-                    headers={"Cache-Control": f"max-age={int(lazy_xmltv.ttl_seconds)}"},
-                )
 
-        # Return cached XMLTV if fresh
-        cache_age = _time.time() - _xmltv_cache_time
-        if _xmltv_cache and cache_age < _XMLTV_CACHE_TTL:
-            logger.debug(
-                f"Returning cached XMLTV ({cache_age:.0f}s old, TTL={_XMLTV_CACHE_TTL}s)"
+async def _generate_xmltv(
+    db: AsyncSession,
+    base_url: str,
+    plain: bool = True,
+) -> tuple[Iterable[str] | AsyncIterator[str], str, dict[str, str]]:
+    """
+    Build the guide for all enabled channels: the TimelineBuilder pipeline,
+    else the legacy per-item path. Needs no request, so background refreshes
+    run exactly the same pipeline.
+
+    Returns (document pieces, media type, response headers); the legacy
+    path's pieces are an async iterator generated while they stream.
+    """
+    from ..patterns.cache.xmltv_fragments import get_xmltv_fragment_cache
+
+    fragment_generation = get_xmltv_fragment_cache().generation
+
+    # Query channels - handle enum validation errors with fallback to raw SQL
+    try:
+        stmt = select(Channel).where(Channel.enabled == True)
+        result = await db.execute(stmt)
+        channels = result.scalars().all()
+    except (LookupError, ValueError) as query_error:
+        # Handle SQLAlchemy enum validation errors by querying raw values and converting
+        error_str = str(query_error)
+        if (
+            "is not among the defined enum values" in error_str
+            or "streamingmode" in error_str.lower()
+            or "playoutmode" in error_str.lower()
+        ):
+            logger.warning(
+                f"SQLAlchemy enum validation error when querying channels for XMLTV: {query_error}"
             )
-            return Response(
-                content=_xmltv_cache,
-                media_type="text/xml; charset=utf-8",
-                headers={"Cache-Control": f"max-age={_XMLTV_CACHE_TTL}"},
+            logger.info(
+                "Attempting to query channels using raw SQL to work around enum validation issue..."
             )
+            # Query using raw SQL to avoid enum validation, then construct Channel objects
+            from sqlalchemy import text
+
+            raw_result = db.execute(
+                text("""
+                SELECT id, number, name, playout_mode, enabled, "group", logo_path,
+                       streaming_mode, is_yaml_source, transcode_profile, created_at, updated_at
+                FROM channels WHERE enabled = 1
+            """)
+            ).fetchall()
+            channels = []
+            from ..database.models import PlayoutMode, StreamingMode
+
+            for row in raw_result:
+                channel = Channel()
+                channel.id = row[0]
+                channel.number = row[1]
+                channel.name = row[2]
+                # Convert playout_mode string to enum
+                playout_mode_str = row[3] if row[3] else "continuous"
+                normalized = playout_mode_str.lower()
+                playout_mode_enum = PlayoutMode.CONTINUOUS
+                for mode in PlayoutMode:
+                    if mode.value.lower() == normalized:
+                        playout_mode_enum = mode
+                        break
+                else:
+                    try:
+                        playout_mode_enum = PlayoutMode[playout_mode_str.upper()]
+                    except KeyError:
+                        playout_mode_enum = PlayoutMode.CONTINUOUS
+                channel.playout_mode = playout_mode_enum
+                # Convert streaming_mode string to enum
+                streaming_mode_str = row[7] if row[7] else "transport_stream_hybrid"
+                normalized = streaming_mode_str.lower()
+                streaming_mode_enum = StreamingMode.TRANSPORT_STREAM_HYBRID
+                for mode in StreamingMode:
+                    if mode.value.lower() == normalized:
+                        streaming_mode_enum = mode
+                        break
+                else:
+                    try:
+                        streaming_mode_enum = StreamingMode[streaming_mode_str.upper()]
+                    except KeyError:
+                        streaming_mode_enum = StreamingMode.TRANSPORT_STREAM_HYBRID
+                channel.streaming_mode = streaming_mode_enum
+                channel.enabled = bool(row[4])
+                channel.group = row[5]
+                channel.logo_path = row[6]
+                channel.is_yaml_source = bool(row[8])
+                channel.transcode_profile = row[9]
+                channels.append(channel)
+            logger.info(f"Loaded {len(channels)} channels using raw SQL query for XMLTV")
+        else:
+            # Re-raise if it's a different error
+            raise
 
-        # Query channels - handle enum validation errors with fallback to raw SQL
-        try:
-            stmt = select(Channel).where(Channel.enabled == True)
-            result = await db.execute(stmt)
-            channels = result.scalars().all()
-        except (LookupError, ValueError) as query_error:
-            # Handle SQLAlchemy enum validation errors by querying raw values and converting
-            error_str = str(query_error)
-            if (
-                "is not among the defined enum values" in error_str
-                or "streamingmode" in error_str.lower()
-                or "playoutmode" in error_str.lower()
-            ):
+    # Fix: Ensure playout_mode is properly converted from string to enum if needed
+    from ..database.models import PlayoutMode
+
+    for channel in channels:
+        if isinstance(channel.playout_mode, str):
+            # Convert string to enum instance
+            try:
+                # Normalize the string (lowercase, handle dashes)
+                normalized = channel.playout_mode.lower().replace("-", "_")
+                # Try to match by value first (enum values are lowercase: "continuous", "on_demand")
+                matched = False
+                for mode in PlayoutMode:
+                    if mode.value.lower() == normalized:
+                        channel.playout_mode = mode
+                        matched = True
+                        break
+                if not matched:
+                    # Try to match by name (enum names are uppercase: CONTINUOUS, ON_DEMAND)
+                    name_upper = channel.playout_mode.upper().replace("-", "_")
+                    if name_upper in ["CONTINUOUS", "ON_DEMAND"]:
+                        channel.playout_mode = PlayoutMode[name_upper]
+                else:
+                    # Try direct lookup
+                    channel.playout_mode = PlayoutMode[channel.playout_mode.upper()]
+            except (KeyError, AttributeError) as e:
+                # If conversion fails, default to CONTINUOUS
                 logger.warning(
-                    f"SQLAlchemy enum validation error when querying channels for XMLTV: {query_error}"
-                )
-                logger.info(
-                    "Attempting to query channels using raw SQL to work around enum validation issue..."
+                    f"Invalid playout_mode '{channel.playout_mode}' for channel {channel.number}, defaulting to CONTINUOUS: {e}"
                 )
-                # Query using raw SQL to avoid enum validation, then construct Channel objects
-                from sqlalchemy import text
-
-                raw_result = db.execute(
-                    text("""
-                    SELECT id, number, name, playout_mode, enabled, "group", logo_path,
-                           streaming_mode, is_yaml_source, transcode_profile, created_at, updated_at
-                    FROM channels WHERE enabled = 1
-                """)
-                ).fetchall()
-                channels = []
-                from ..database.models import PlayoutMode, StreamingMode
-
-                for row in raw_result:
-                    channel = Channel()
-                    channel.id = row[0]
-                    channel.number = row[1]
-                    channel.name = row[2]
-                    # Convert playout_mode string to enum
-                    playout_mode_str = row[3] if row[3] else "continuous"
-                    normalized = playout_mode_str.lower()
-                    playout_mode_enum = PlayoutMode.CONTINUOUS
-                    for mode in PlayoutMode:
-                        if mode.value.lower() == normalized:
-                            playout_mode_enum = mode
-                            break
-                    else:
-                        try:
-                            playout_mode_enum = PlayoutMode[playout_mode_str.upper()]
-                        except KeyError:
-                            playout_mode_enum = PlayoutMode.CONTINUOUS
-                    channel.playout_mode = playout_mode_enum
-                    # Convert streaming_mode string to enum
-                    streaming_mode_str = row[7] if row[7] else "transport_stream_hybrid"
-                    normalized = streaming_mode_str.lower()
-                    streaming_mode_enum = StreamingMode.TRANSPORT_STREAM_HYBRID
-                    for mode in StreamingMode:
-                        if mode.value.lower() == normalized:
-                            streaming_mode_enum = mode
-                            break
-                    else:
-                        try:
-                            streaming_mode_enum = StreamingMode[streaming_mode_str.upper()]
-                        except KeyError:
-                            streaming_mode_enum = StreamingMode.TRANSPORT_STREAM_HYBRID
-                    channel.streaming_mode = streaming_mode_enum
-                    channel.enabled = bool(row[4])
-                    channel.group = row[5]
-                    channel.logo_path = row[6]
-                    channel.is_yaml_source = bool(row[8])
-                    channel.transcode_profile = row[9]
-                    channels.append(channel)
-                logger.info(f"Loaded {len(channels)} channels using raw SQL query for XMLTV")
-            else:
-                # Re-raise if it's a different error
-                raise
+                channel.playout_mode = PlayoutMode.CONTINUOUS
 
-        # Fix: Ensure playout_mode is properly converted from string to enum if needed
-        from ..database.models import PlayoutMode
+    from ..monitoring.metadata_metrics import validate_xmltv_lineup
 
-        for channel in channels:
-            if isinstance(channel.playout_mode, str):
-                # Convert string to enum instance
-                try:
-                    # Normalize the string (lowercase, handle dashes)
-                    normalized = channel.playout_mode.lower().replace("-", "_")
-                    # Try to match by value first (enum values are lowercase: "continuous", "on_demand")
-                    matched = False
-                    for mode in PlayoutMode:
-                        if mode.value.lower() == normalized:
-                            channel.playout_mode = mode
-                            matched = True
-                            break
-                    if not matched:
-                        # Try to match by name (enum names are uppercase: CONTINUOUS, ON_DEMAND)
-                        name_upper = channel.playout_mode.upper().replace("-", "_")
-                        if name_upper in ["CONTINUOUS", "ON_DEMAND"]:
-                            channel.playout_mode = PlayoutMode[name_upper]
-                    else:
-                        # Try direct lookup
-                        channel.playout_mode = PlayoutMode[channel.playout_mode.upper()]
-                except (KeyError, AttributeError) as e:
-                    # If conversion fails, default to CONTINUOUS
-                    logger.warning(
-                        f"Invalid playout_mode '{channel.playout_mode}' for channel {channel.number}, defaulting to CONTINUOUS: {e}"
-                    )
-                    channel.playout_mode = PlayoutMode.CONTINUOUS
+    if not channels:
+        raise HTTPException(
+            status_code=503,
+            detail="Empty channel mapping; cannot build XMLTV",
+            headers={"Retry-After": "60"},
+        )
 
-        from ..monitoring.metadata_metrics import validate_xmltv_lineup
+    if not validate_xmltv_lineup(channels):
+        raise HTTPException(
+            status_code=503,
+            detail="XMLTV lineup validation failed (duplicate GuideNumber or empty display name).",
+            headers={"Retry-After": "60"},
+        )
 
-        if not channels:
-            raise HTTPException(
-                status_code=503,
-                detail="Empty channel mapping; cannot build XMLTV",
-                headers={"Retry-After": "60"},
-            )
+    logger.info(f"Generating XMLTV EPG for {len(channels)} channels")
 
-        if not validate_xmltv_lineup(channels):
-            raise HTTPException(
-                status_code=503,
-                detail="XMLTV lineup validation failed (duplicate GuideNumber or empty display name).",
-                headers={"Retry-After": "60"},
-            )
+    # Generate EPG based on configured build days
+    now = datetime.now(tz=timezone.utc)
+    build_days = config.playout.build_days
+    end_time = now + timedelta(days=build_days)
 
-        logger.info(f"Generating XMLTV EPG for {len(channels)} channels")
+    # Try TimelineBuilder pipeline (remediation: monotonic EPG, no drift)
+    from .xmltv_generator import XMLTVValidationError
 
-        # Always derive base_url from the incoming request so icon URLs work for Plex
-        # Never use localhost - Plex accesses from different machine
-        base_url = config.server.base_url
-        if request:
-            scheme = request.url.scheme
-            host = request.url.hostname
-            port = request.url.port
-            # Replace localhost/127.0.0.1 with actual hostname for Plex compatibility
-            if host in ["localhost", "127.0.0.1"]:
-                # Try to get the actual server IP from request headers first
-                forwarded_host = request.headers.get("X-Forwarded-Host") or request.headers.get(
-                    "Host"
-                )
-                if forwarded_host:
-                    host = forwarded_host.split(":")[0]
-                else:
-                    # Fallback: get local IP address
-                    import socket
+    try:
+        timeline_xml = await _build_epg_via_timeline_builder(
+            channels, db, now, end_time, base_url
+        )
+    except XMLTVValidationError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e) or "XMLTV validation failed",
+            headers={"Retry-After": "60"},
+        ) from e
+    if timeline_xml:
+        # The fragment cache is the cache for this path: the document is
+        # streamed straight from the fragments, never joined in memory.
+        return (
+            timeline_xml,
+            "application/xml",
+            {"Content-Disposition": "inline; filename=xmltv.xml"},
+        )
 
-                    try:
-                        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                        try:
-                            s.connect(("8.8.8.8", 80))
-                            host = s.getsockname()[0]
-                        finally:
-                            s.close()
-                    except OSError:
-                        # Last resort: use config base_url but replace localhost
-                        if "localhost" in base_url or "127.0.0.1" in base_url:
-                            import socket
+    return (
+        _stream_legacy_xmltv(channels, now, end_time, base_url, plain, fragment_generation),
+        "application/xml; charset=utf-8",
+        {
+            "Content-Disposition": "inline; filename=xmltv.xml",
+            "Cache-Control": "public, max-age=300",  # Cache for 5 minutes
+            "X-Generated-At": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        },
+    )
 
-                            try:
-                                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                                try:
-                                    s.connect(("8.8.8.8", 80))
-                                    host = s.getsockname()[0]
-                                finally:
-                                    s.close()
-                            except OSError:
-                                host = request.url.hostname
-            if port and port not in [80, 443]:
-                base_url = f"{scheme}://{host}:{port}"
-            else:
-                base_url = f"{scheme}://{host}"
 
-        # Generate EPG based on configured build days
-        now = datetime.now(tz=timezone.utc)
-        build_days = config.playout.build_days
-        end_time = now + timedelta(days=build_days)
+async def _stream_legacy_xmltv(
+    channels: list,
+    now: datetime,
+    end_time: datetime,
+    base_url: str,
+    plain: bool,
+    fragment_generation: int,
+) -> AsyncIterator[str]:
+    """
+    Stream the legacy guide as it is generated, then keep it as the
+    module-level cached document.
 
-        # Try TimelineBuilder pipeline (remediation: monotonic EPG, no drift)
-        from .xmltv_generator import XMLTVValidationError
+    Uses a session of its own: the request's session is closed before a
+    streamed response body is sent.
+    """
+    global _xmltv_cache, _xmltv_cache_time, _xmltv_cache_generation
+
+    perf_start_time = time.time()
+    parts: list[str] = []
+    async with get_session() as db:
+        async for piece in _iter_legacy_xmltv(db, channels, now, end_time, base_url, plain):
+            parts.append(piece)
+            yield piece
+    xml_content = "".join(parts)
+
+    generation_time = time.time() - perf_start_time
+    logger.info(f"XMLTV EPG generated in {generation_time:.2f}s ({len(xml_content)} bytes)")
+
+    # Store result in cache
+    _xmltv_cache = xml_content
+    _xmltv_cache_time = time.time()
+    _xmltv_cache_generation = fragment_generation
+    logger.debug(f"XMLTV cache updated ({len(xml_content)} bytes)")
+
+    # Optional: request Plex DVR to reload guide after EPG is generated (throttled 60s)
+    plex_cfg = getattr(config, "plex", None)
+    if plex_cfg and getattr(plex_cfg, "reload_guide_after_epg", False):
+        try:
+            from ..streaming.plex_api_client import request_plex_guide_reload
 
+            asyncio.create_task(request_plex_guide_reload(force=False))
+        except Exception as e:
+            logger.debug(f"Plex reload-after-EPG skipped: {e}")
+
+
+async def _iter_legacy_xmltv(
+    db: AsyncSession,
+    channels: list,
+    now: datetime,
+    end_time: datetime,
+    base_url: str,
+    plain: bool,
+) -> AsyncIterator[str]:
+    """Legacy per-item guide, yielded line by line as channels and programmes are built."""
+
+    # Build XML header; optionally include XSL stylesheet for browsers
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    if not plain:
+        yield '<?xml-stylesheet type="text/xsl" href="https://raw.githubusercontent.com/XMLTV/xmltv/master/xmltv.xsl"?>\n'
+    yield '<tv generator-info-name="StreamTV" generator-info-url="https://github.com/streamtv" source-info-name="StreamTV">\n'
+
+    # Initialize Plex API client if configured for schedule/EPG integration
+    plex_client = None
+    plex_channel_map = {}
+    use_for_epg = getattr(config.plex, "use_for_epg", True)
+    plex_base_url = config.plex.base_url or getattr(config.plex, "url", None) or ""
+    if (
+        config.plex.enabled
+        and plex_base_url
+        and use_for_epg
+        and config.plex.token
+    ):
         try:
-            timeline_xml = await _build_epg_via_timeline_builder(
-                channels, db, now, end_time, base_url
-            )
-        except XMLTVValidationError as e:
-            raise HTTPException(
-                status_code=503,
-                detail=str(e) or "XMLTV validation failed",
-                headers={"Retry-After": "60"},
-            ) from e
-        if timeline_xml:
-            if lazy_xmltv is not None:
-                await lazy_xmltv.prime(timeline_xml)
-            _xmltv_cache = timeline_xml
-            _xmltv_cache_time = _time.time()
-            return Response(
-                content=timeline_xml,
-                media_type="application/xml",
-                headers={"Content-Disposition": "inline; filename=xmltv.xml"},
+            plex_client = PlexAPIClient(base_url=plex_base_url, token=config.plex.token)
+            logger.info(
+                f"Plex API client initialized for EPG/schedule integration (server: {plex_base_url})"
             )
 
-        # Build XML header; optionally include XSL stylesheet for browsers
-        xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        if not plain:
-            xml_content += '<?xml-stylesheet type="text/xsl" href="https://raw.githubusercontent.com/XMLTV/xmltv/master/xmltv.xsl"?>\n'
-        xml_content += '<tv generator-info-name="StreamTV" generator-info-url="https://github.com/streamtv" source-info-name="StreamTV">\n'
-
-        # Initialize Plex API client if configured for schedule/EPG integration
-        plex_client = None
-        plex_channel_map = {}
-        use_for_epg = getattr(config.plex, "use_for_epg", True)
-        plex_base_url = config.plex.base_url or getattr(config.plex, "url", None) or ""
-        if (
-            config.plex.enabled
-            and plex_base_url
-            and use_for_epg
-            and config.plex.token
-        ):
+            # Try to get channel mappings from Plex if DVR is configured
             try:
-                plex_client = PlexAPIClient(base_url=plex_base_url, token=config.plex.token)
-                logger.info(
-                    f"Plex API client initialized for EPG/schedule integration (server: {plex_base_url})"
-                )
-
-                # Try to get channel mappings from Plex if DVR is configured
-                try:
-                    dvrs = await plex_client.get_dvrs()
-                    if dvrs:
-                        logger.info(f"Found {len(dvrs)} Plex DVR(s) for channel mapping")
-                        # Store channel mappings for later use
-                        for dvr in dvrs:
-                            if dvr.get("enabled"):
-                                # Get channels for this DVR's lineup if available
-                                pass  # Channel mapping will be enhanced in future
-                except Exception as e:
-                    logger.debug(f"Plex DVR channel mapping: {e}")
-
+                dvrs = await plex_client.get_dvrs()
+                if dvrs:
+                    logger.info(f"Found {len(dvrs)} Plex DVR(s) for channel mapping")
+                    # Store channel mappings for later use
+                    for dvr in dvrs:
+                        if dvr.get("enabled"):
+                            # Get channels for this DVR's lineup if available
+                            pass  # Channel mapping will be enhanced in future
             except Exception as e:
-                logger.warning(
-                    f"Plex API client initialization failed: {e}. EPG will use standard format."
-                )
-                plex_client = None
+                logger.debug(f"Plex DVR channel mapping: {e}")
+
+        except Exception as e:
+            logger.warning(
+                f"Plex API client initialization failed: {e}. EPG will use standard format."
+            )
+            plex_client = None
 
+    try:
         # Channel definitions - ID must match GuideNumber in lineup.json (numeric string)
         for channel in channels:
             try:
                 channel_id = str(int(float(str(channel.number).strip()))).strip()
             except (ValueError, TypeError):
                 channel_id = str(channel.number).strip() if channel.number is not None else ""
-            xml_content += f'  <channel id="{_xml(channel_id)}">\n'
+            yield f'  <channel id="{_xml(channel_id)}">\n'
 
             # Primary display name (required)
-            xml_content += f"    <display-name>{_xml(channel.name)}</display-name>\n"
+            yield f"    <display-name>{_xml(channel.name)}</display-name>\n"
 
             # Additional display names for grouping
             if channel.group:
-                xml_content += f"    <display-name>{_xml(channel.group)}</display-name>\n"
+                yield f"    <display-name>{_xml(channel.group)}</display-name>\n"
 
             # Channel number as display name (Plex compatibility)
-            xml_content += f"    <display-name>{_xml(str(channel.number).strip())}</display-name>\n"
+            yield f"    <display-name>{_xml(str(channel.number).strip())}</display-name>\n"
 
             # Logo/icon (Plex expects absolute URLs). Fall back to default icon by number.
             logo_url = _resolve_logo_url(channel, base_url)
             if logo_url:
-                xml_content += f'    <icon src="{_xml(logo_url)}"/>\n'
+                yield f'    <icon src="{_xml(logo_url)}"/>\n'
 
-            xml_content += "  </channel>\n"
+            yield "  </channel>\n"
 
         # Program listings - optimized with early exit
+        # Positions and schedule files for every channel in one pass
+        legacy_epg_data = await load_epg_data(db, channels, include_items=False)
+
         # Canonical channel_id (must match <channel id=""> and lineup.json GuideNumber)
         for channel in channels:
             try:
@@ -653,21 +785,24 @@ async def get_epg(
             except (ValueError, TypeError):
                 channel_id = str(channel.number).strip() if channel.number is not None else ""
             # Try to load schedule file first
-            schedule_file = ScheduleParser.find_schedule_file(channel.number)
+            schedule_file = legacy_epg_data.schedule_file(channel.number)
             schedule_items = []
 
             # Get playout_start_time from database to match actual stream timing
             # This ensures EPG metadata matches what's actually being streamed
             from exstreamtv.database.models import ChannelPlaybackPosition
 
-            playback_pos = None
+            # Live (possibly unflushed) position from the write-behind store,
+            # else the bulk-loaded row
+            playback_pos = legacy_epg_data.position(channel.id)
             try:
-                # Use async query for AsyncSession
-                stmt = select(ChannelPlaybackPosition).where(
-                    ChannelPlaybackPosition.channel_id == channel.id
-                )
-                result = await db.execute(stmt)
-                playback_pos = result.scalar_one_or_none()
+                if playback_pos is None and not legacy_epg_data.positions_loaded:
+                    # Use async query for AsyncSession
+                    stmt = select(ChannelPlaybackPosition).where(
+                        ChannelPlaybackPosition.channel_id == channel.id
+                    )
+                    result = await db.execute(stmt)
+                    playback_pos = result.scalar_one_or_none()
             except Exception as e:
                 # Handle missing columns in database schema
                 if (
@@ -734,7 +869,7 @@ async def get_epg(
                     logger.debug(
                         f"Channel {channel.number}: Using enhanced position tracking - item started at {current_item_start_time}, elapsed {elapsed_seconds_in_item}s"
                     )
-            
+        
             if not playout_start_time:
                 # No saved playout_start_time - use now (first time or ON_DEMAND channel)
                 playout_start_time = now
@@ -802,7 +937,7 @@ async def get_epg(
 
                         if current_item_index >= len(schedule_items):
                             current_item_index = 0
-                        
+                    
                         logger.debug(
                             f"Channel {channel.number}: EPG calculated current item index {current_item_index} from elapsed time (fallback - no saved last_item_index)"
                         )
@@ -934,17 +1069,17 @@ async def get_epg(
                             # CRITICAL FIX: All items have start times in the past
                             # Start assigning from NOW to ensure EPG has visible programmes
                             # This is the root cause of "Unknown Airing" - all programmes were in the past!
-                            
+                        
                             logger.info(
                                 f"Channel {channel.number}: All items in past (item_0={item_0_start_time}, now={now}). "
                                 f"Resetting to start EPG from NOW."
                             )
-                            
+                        
                             # Start from NOW and assign times sequentially for ALL items
                             # This ensures Plex sees a continuous schedule starting from the current time
                             current_item_time = now
                             current_item_index = 0  # Start from beginning of schedule
-                            
+                        
                             # Assign times to all items starting from now
                             for idx in range(len(schedule_items)):
                                 item = schedule_items[idx]
@@ -956,10 +1091,10 @@ async def get_epg(
                                     logger.warning(
                                         f"Schedule item missing media_item for channel {channel.number}"
                                     )
-                                
+                            
                                 # ALWAYS assign/update start_time to ensure sequential times
                                 item["start_time"] = current_item_time
-                                
+                            
                                 # Increment time for next item
                                 current_item_time = current_item_time + timedelta(seconds=duration)
                         else:
@@ -994,7 +1129,7 @@ async def get_epg(
                     items_in_future = 0
                     items_currently_playing = 0
                     items_in_next_cycle = 0
-                    
+                
                     # For continuous channels, calculate the cycle duration to determine
                     # which items are part of the current/next cycle
                     cycle_duration = sum(
@@ -1002,7 +1137,7 @@ async def get_epg(
                         for item in schedule_items
                         if item.get("media_item")
                     ) if schedule_items else 0
-                    
+                
                     for item in schedule_items:
                         if not item.get("start_time"):
                             # Skip items without start_time - they should have been assigned above
@@ -1015,7 +1150,7 @@ async def get_epg(
                         if media_item:
                             duration = media_item.duration or 1800
                             end = start + timedelta(seconds=duration)
-                            
+                        
                             # CRITICAL FIX: Check if item is currently playing FIRST
                             # If it's currently playing, include it regardless of cycle
                             if start < now and end > now:
@@ -1023,13 +1158,13 @@ async def get_epg(
                                 filtered_items.append(item)
                                 items_currently_playing += 1
                                 continue
-                            
+                        
                             # Include if it starts in the future (within time range)
                             if start >= now and start <= end_time:
                                 filtered_items.append(item)
                                 items_in_future += 1
                                 continue
-                            
+                        
                             # For continuous channels, also include items from the next cycle
                             # if they would be playing between now and end_time
                             # Only check for next cycle if item is NOT currently playing
@@ -1046,7 +1181,7 @@ async def get_epg(
                                     })
                                     items_in_next_cycle += 1
                                     continue
-                            
+                        
                             # Item doesn't match any criteria - it's in the past
                             items_in_past += 1
                         elif start >= now and start <= end_time:
@@ -1054,7 +1189,7 @@ async def get_epg(
                             items_in_future += 1
                         else:
                             items_in_past += 1
-                    
+                
                     schedule_items = filtered_items
                     logger.info(
                         f"After filtering: {len(schedule_items)} items within time range ({now} to {end_time}) for channel {channel.number}"
@@ -1092,15 +1227,17 @@ async def get_epg(
                 # Get playout items if we have playouts
                 if playouts:
                     playout = playouts[0]
-                    
+                
                     # Get playback position to know where we are in the playout
-                    from ..database.models import ChannelPlaybackPosition
-                    anchor_stmt = select(ChannelPlaybackPosition).where(
-                        ChannelPlaybackPosition.channel_id == channel.id
-                    )
-                    anchor_result = await db.execute(anchor_stmt)
-                    playback_position = anchor_result.scalar_one_or_none()
-                    
+                    playback_position = legacy_epg_data.position(channel.id)
+                    if playback_position is None and not legacy_epg_data.positions_loaded:
+                        from ..database.models import ChannelPlaybackPosition
+                        anchor_stmt = select(ChannelPlaybackPosition).where(
+                            ChannelPlaybackPosition.channel_id == channel.id
+                        )
+                        anchor_result = await db.execute(anchor_stmt)
+                        playback_position = anchor_result.scalar_one_or_none()
+                
                     # Get current item index (where the channel is actually playing)
                     start_offset = 0
                     if playback_position and playback_position.last_item_index is not None:
@@ -1117,10 +1254,10 @@ async def get_epg(
                     )
                     result = await db.execute(stmt)
                     playout_items = result.scalars().all()
-                    
+                
                     if playout_items:
                         # Note: playback_position was already queried above when we got the offset
-                        
+                    
                         # Get media items for these playout items
                         media_ids = [item.media_item_id for item in playout_items if item.media_item_id]
                         media_items_dict = {}
@@ -1128,7 +1265,7 @@ async def get_epg(
                             stmt = select(MediaItem).where(MediaItem.id.in_(media_ids))
                             result = await db.execute(stmt)
                             media_items_dict = {mi.id: mi for mi in result.scalars().all()}
-                        
+                    
                         # CRITICAL FIX: For continuous channels, recalculate EPG times based on
                         # current playback position rather than using old playout_item times
                         # This ensures EPG shows what's playing NOW and in the future
@@ -1144,11 +1281,11 @@ async def get_epg(
                                 duration = (mi.duration if mi and mi.duration else 1800)
                             item_durations.append(duration)
                             total_cycle_duration += duration
-                        
+                    
                         # Get the current item index - since we queried with offset,
                         # the first item in playout_items IS the current item (index 0 in this subset)
                         current_item_index = 0
-                        
+                    
                         # Calculate when the current item started playing
                         # Use persisted current_item_start_time / elapsed so EPG matches stream
                         time_into_item = 0
@@ -1200,16 +1337,16 @@ async def get_epg(
                         schedule_time = current_item_start
                         items_added = 0
                         max_items_to_add = min(len(playout_items) * 2, EPG_MAX_PROGRAMMES_PER_CHANNEL)  # Allow cycling
-                        
+                    
                         # Start from current item and go forward
                         idx = current_item_index
                         while items_added < max_items_to_add and schedule_time <= end_time:
                             item = playout_items[idx]
                             media_item = media_items_dict.get(item.media_item_id) if item.media_item_id else None
                             duration = item_durations[idx]
-                            
+                        
                             item_end_time = schedule_time + timedelta(seconds=duration)
-                            
+                        
                             # Only add items that end after now (currently playing or future)
                             if item_end_time > now:
                                 schedule_items.append({
@@ -1221,14 +1358,14 @@ async def get_epg(
                                     "finish_time": item_end_time,
                                 })
                                 items_added += 1
-                            
+                        
                             schedule_time = item_end_time
                             idx = (idx + 1) % len(playout_items)  # Wrap around for continuous channels
-                            
+                        
                             # Safety: prevent infinite loop
                             if items_added >= max_items_to_add:
                                 break
-                        
+                    
                         logger.debug(
                             f"Channel {channel.number} ({channel.name}): Generated {len(schedule_items)} EPG items from playout (current_idx={current_item_index})"
                         )
@@ -1244,15 +1381,15 @@ async def get_epg(
                 # Use the full end_time instead of just 24 hours to cover the entire EPG period
                 start_str = now.strftime("%Y%m%d%H%M%S +0000")
                 end_str = end_time.strftime("%Y%m%d%H%M%S +0000")
-                xml_content += f'  <programme start="{_xml(start_str)}" stop="{_xml(end_str)}" channel="{_xml(channel_id)}">\n'
-                xml_content += f'    <title lang="en">{_xml(channel.name)} - Live Stream</title>\n'
-                xml_content += f'    <desc lang="en">Live programming on {_xml(channel.name)}. Content streams 24/7.</desc>\n'
-                xml_content += '    <category lang="en">General</category>\n'
-                xml_content += '    <category lang="en">Live</category>\n'
+                yield f'  <programme start="{_xml(start_str)}" stop="{_xml(end_str)}" channel="{_xml(channel_id)}">\n'
+                yield f'    <title lang="en">{_xml(channel.name)} - Live Stream</title>\n'
+                yield f'    <desc lang="en">Live programming on {_xml(channel.name)}. Content streams 24/7.</desc>\n'
+                yield '    <category lang="en">General</category>\n'
+                yield '    <category lang="en">Live</category>\n'
                 logo_url = _resolve_logo_url(channel, base_url)
                 if logo_url:
-                    xml_content += f'    <icon src="{_xml(logo_url)}" />\n'
-                xml_content += "  </programme>\n"
+                    yield f'    <icon src="{_xml(logo_url)}" />\n'
+                yield "  </programme>\n"
             # Log first and last programme times for debugging
             elif schedule_items:
                 first_start = schedule_items[0].get("start_time")
@@ -1298,7 +1435,7 @@ async def get_epg(
                         title = raw_t
                     else:
                         title = None
-                
+            
                 # Final fallback: construct a meaningful title rather than showing filename
                 if not title or str(title).strip() in ("", "None", "null"):
                     if media_item:
@@ -1477,7 +1614,7 @@ async def get_epg(
                 # Also include items that end in the future (even if they started in the past)
                 # This ensures items that are part of the current cycle are included
                 ends_in_future = end_time_prog > now and end_time_prog <= end_time
-                
+            
                 # CRITICAL FIX: Items were already filtered, so they should ALL be included
                 # The filtering logic at line 984 already includes items that:
                 # 1. Start in the future (start >= now and start <= end_time)
@@ -1487,7 +1624,7 @@ async def get_epg(
                 # The double-check was causing items to be excluded incorrectly
                 # Only exclude if the item is completely outside the EPG window (both start and end are in the past or too far in the future)
                 should_include = True  # Include all filtered items
-                
+            
                 # Safety check: only exclude if item is completely outside EPG window
                 # This should rarely happen since items were already filtered
                 if end_time_prog < now or start_time > end_time:
@@ -1508,7 +1645,7 @@ async def get_epg(
                     end_str = end_time_prog.strftime("%Y%m%d%H%M%S +0000")
 
                     # Channel ID must match <channel id=""> and lineup.json GuideNumber
-                    xml_content += f'  <programme start="{_xml(start_str)}" stop="{_xml(end_str)}" channel="{_xml(channel_id)}">\n'
+                    yield f'  <programme start="{_xml(start_str)}" stop="{_xml(end_str)}" channel="{_xml(channel_id)}">\n'
 
                     # Parse metadata JSON early to extract language and other metadata
                     meta = None
@@ -1552,12 +1689,12 @@ async def get_epg(
                     final_title = str(title).strip() if title else None
                     if not final_title or final_title == "":
                         final_title = channel.name
-                    
+                
                     # Final safety check - must never be empty
                     if not final_title or final_title.strip() == "":
                         final_title = f"Channel {channel.number}"
-                    
-                    xml_content += (
+                
+                    yield (
                         f'    <title lang="{language_code}">{_xml(final_title)}</title>\n'
                     )
 
@@ -1571,7 +1708,7 @@ async def get_epg(
                             and "Original air date" not in episode_title
                         ):
                             sub_title = f"{sub_title} - {episode_title}"
-                        xml_content += (
+                        yield (
                             f'    <sub-title lang="{language_code}">{_xml(sub_title)}</sub-title>\n'
                         )
                     elif episode_num is not None:
@@ -1582,12 +1719,12 @@ async def get_epg(
                             and "Original air date" not in episode_title
                         ):
                             sub_title = f"{sub_title} - {episode_title}"
-                        xml_content += (
+                        yield (
                             f'    <sub-title lang="{language_code}">{_xml(sub_title)}</sub-title>\n'
                         )
                     elif episode_title and air_date:
                         # For Sesame Street with air dates, use air date as sub-title
-                        xml_content += (
+                        yield (
                             f'    <sub-title lang="{language_code}">{_xml(air_date)}</sub-title>\n'
                         )
                     elif (
@@ -1595,7 +1732,7 @@ async def get_epg(
                         and episode_title != title
                         and "Original air date" not in episode_title
                     ):
-                        xml_content += f'    <sub-title lang="{language_code}">{_xml(episode_title)}</sub-title>\n'
+                        yield f'    <sub-title lang="{language_code}">{_xml(episode_title)}</sub-title>\n'
 
                     # Description - always include for Plex compatibility
                     # Plex requires desc tag even if empty
@@ -1607,10 +1744,10 @@ async def get_epg(
                         # Provide a non-empty description to avoid "Unknown Airing" in Plex
                         desc = title
                     if desc:
-                        xml_content += f'    <desc lang="{language_code}">{_xml(desc)}</desc>\n'
+                        yield f'    <desc lang="{language_code}">{_xml(desc)}</desc>\n'
                     else:
                         # Include empty desc to ensure Plex compatibility
-                        xml_content += f'    <desc lang="{language_code}"></desc>\n'
+                        yield f'    <desc lang="{language_code}"></desc>\n'
 
                     # Thumbnail/icon - ensure absolute URL for Plex
                     if media_item.thumbnail:
@@ -1625,7 +1762,7 @@ async def get_epg(
                                 if media_item.thumbnail.startswith("/")
                                 else f"{base_url}/{media_item.thumbnail}"
                             )
-                        xml_content += f'    <icon src="{_xml(thumb_url)}"/>\n'
+                        yield f'    <icon src="{_xml(thumb_url)}"/>\n'
 
                     # Enhanced EPG metadata - use standard XMLTV fields only
                     # Plex expects at least one category
@@ -1645,17 +1782,17 @@ async def get_epg(
                         if isinstance(subjects, list) and subjects:
                             for cat in subjects[:EPG_CATEGORIES_LIMIT]:  # Limit categories for performance
                                 if cat and str(cat).strip():
-                                    xml_content += f'    <category lang="en">{_xml(str(cat).strip())}</category>\n'
+                                    yield f'    <category lang="en">{_xml(str(cat).strip())}</category>\n'
                                     categories_added = True
 
                     # Use filler_kind if no categories from metadata
                     if not categories_added and filler_kind:
-                        xml_content += f'    <category lang="en">{_xml(filler_kind)}</category>\n'
+                        yield f'    <category lang="en">{_xml(filler_kind)}</category>\n'
                         categories_added = True
 
                     # Default category if none found
                     if not categories_added:
-                        xml_content += '    <category lang="en">General</category>\n'
+                        yield '    <category lang="en">General</category>\n'
 
                     # Credits (creators, contributors, publishers) - ErsatzTV-style
                     credits_items = []
@@ -1723,15 +1860,15 @@ async def get_epg(
                                     credits_items.append((role, str(contrib).strip()))
 
                     if credits_items:
-                        xml_content += "    <credits>\n"
+                        yield "    <credits>\n"
                         for role, name in credits_items:
-                            xml_content += f"      <{role}>{_xml(name)}</{role}>\n"
-                        xml_content += "    </credits>\n"
+                            yield f"      <{role}>{_xml(name)}</{role}>\n"
+                        yield "    </credits>\n"
                     elif media_item.uploader:
                         # Fallback to old format if no enhanced metadata
-                        xml_content += "    <credits>\n"
-                        xml_content += f"      <director>{_xml(media_item.uploader)}</director>\n"
-                        xml_content += "    </credits>\n"
+                        yield "    <credits>\n"
+                        yield f"      <director>{_xml(media_item.uploader)}</director>\n"
+                        yield "    </credits>\n"
 
                     # Date/Year (standard XMLTV date field)
                     # Priority: air_date (episode_air_date) > release_date > upload_date > meta.year
@@ -1753,7 +1890,7 @@ async def get_epg(
                     if not date_to_use and meta and meta.get("year"):
                         date_to_use = str(meta.get("year"))
                     if date_to_use:
-                        xml_content += f"    <date>{_xml(date_to_use)}</date>\n"
+                        yield f"    <date>{_xml(date_to_use)}</date>\n"
 
                     # Language (add lang attribute to title/desc if available)
                     language_code = None
@@ -1786,14 +1923,14 @@ async def get_epg(
                     # PRIORITY: Use structured fields (season_num, episode_num) first, then fallback to meta_data JSON
                     final_season = season_num
                     final_episode = episode_num
-                    
+                
                     # Fallback to meta_data JSON if structured fields are not available
                     if meta and final_episode is None:
                         if meta.get("episode"):
                             final_episode = meta.get("episode")
                         if meta.get("season") and final_season is None:
                             final_season = meta.get("season")
-                    
+                
                     # Add episode numbering if we have episode info
                     if final_episode is not None:
                         # Onscreen episode number (e.g., "5" or "S03E05")
@@ -1801,8 +1938,8 @@ async def get_epg(
                             onscreen_ep = f"S{int(final_season):02d}E{int(final_episode):02d}"
                         else:
                             onscreen_ep = str(final_episode)
-                        xml_content += f'    <episode-num system="onscreen">{_xml(onscreen_ep)}</episode-num>\n'
-                        
+                        yield f'    <episode-num system="onscreen">{_xml(onscreen_ep)}</episode-num>\n'
+                    
                         # XMLTV_NS format: season-1.episode-1. (zero-indexed)
                         if final_season is not None:
                             try:
@@ -1810,7 +1947,7 @@ async def get_epg(
                                 episode_idx = int(final_episode) - 1
                                 # XMLTV_NS format is "season.episode.part" (all zero-indexed)
                                 season_ep = f"{season_idx}.{episode_idx}."
-                                xml_content += f'    <episode-num system="xmltv_ns">{_xml(season_ep)}</episode-num>\n'
+                                yield f'    <episode-num system="xmltv_ns">{_xml(season_ep)}</episode-num>\n'
                             except (ValueError, TypeError):
                                 pass
 
@@ -1818,15 +1955,15 @@ async def get_epg(
                     # URL field is optional in XMLTV and can cause issues if it's not accessible
                     # We'll skip it to avoid Plex metadata grab failures
 
-                    xml_content += "  </programme>\n"
+                    yield "  </programme>\n"
 
                 current_time = end_time_prog
 
                 if current_time > end_time:
                     break
 
-        xml_content += "</tv>\n"
-
+        yield "</tv>\n"
+    finally:
         # Clean up Plex API client if used
         if plex_client:
             try:
@@ -1834,37 +1971,82 @@ async def get_epg(
             except Exception as e:
                 logger.debug(f"Plex client cleanup: {e}")
 
-        generation_time = _time.time() - perf_start_time
-        programme_count_epg = xml_content.count('<programme start=')
-        logger.info(f"XMLTV EPG generated in {generation_time:.2f}s ({len(xml_content)} bytes)")
 
-        # Store result in cache
-        _xmltv_cache = xml_content
-        _xmltv_cache_time = _time.time()
+@router.get("/iptv/xmltv.xml")
+async def get_epg(
+    request: Request,
+    access_token: str | None = None,
+    plain: bool = True,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get Electronic Program Guide (XMLTV format)
+
+    With the app-state LazyXmltvCache, a request never waits on a rebuild
+    once any guide exists: a stale document is served immediately while one
+    background task rebuilds it.
+    """
+    import time as _time
+
+    try:
+        # Allow anonymous access for Plex DVR compatibility (Plex does not support auth on XMLTV URLs)
+        # Only validate token when one is provided
+        if access_token is not None and config.security.api_key_required and config.security.access_token:
+            if access_token != config.security.access_token:
+                raise HTTPException(status_code=401, detail="Invalid access token")
+
+        from ..patterns.cache.xmltv_fragments import get_xmltv_fragment_cache
+
+        fragment_generation = get_xmltv_fragment_cache().generation
+        document_current = _xmltv_cache_generation == fragment_generation
+        base_url = _xmltv_base_url(request)
+
+        lazy_xmltv = getattr(request.app.state, "xmltv_cache", None) if request else None
         if lazy_xmltv is not None:
-            await lazy_xmltv.prime(xml_content)
-        logger.debug(f"XMLTV cache updated ({len(xml_content)} bytes)")
+            hit = lazy_xmltv.lookup(base_url)
+            if hit is not None:
+                body, fresh = hit
+                if not fresh:
+                    # Stale-while-revalidate: serve the last good guide now
+                    lazy_xmltv.refresh(base_url)
+                logger.debug(
+                    "Returning app.state XMLTV cache (%s, %ss TTL)",
+                    "fresh" if fresh else "stale, refreshing",
+                    int(lazy_xmltv.ttl_seconds),
+                )
+                max_age = int(lazy_xmltv.ttl_seconds) if fresh else 0
+                headers = {"Cache-Control": f"max-age={max_age}"}
+                encoded = lazy_xmltv.encoded(base_url)
+                if encoded is not None:
+                    # Stored variant or 304; nothing is compressed or hashed here
+                    return encoded.response(request, "text/xml; charset=utf-8", headers)
+                return xmltv_streaming_response(
+                    iter_text_chunks(body),
+                    request,
+                    media_type="text/xml; charset=utf-8",
+                    headers=headers,
+                )
 
-        # Optional: request Plex DVR to reload guide after EPG is generated (throttled 60s)
-        plex_cfg = getattr(config, "plex", None)
-        if plex_cfg and getattr(plex_cfg, "reload_guide_after_epg", False):
-            try:
-                from ..streaming.plex_api_client import request_plex_guide_reload
-                import asyncio
-                asyncio.create_task(request_plex_guide_reload(force=False))
-            except Exception as e:
-                logger.debug(f"Plex reload-after-EPG skipped: {e}")
+        # Return cached XMLTV if fresh
+        cache_age = _time.time() - _xmltv_cache_time
+        if _xmltv_cache and cache_age < _XMLTV_CACHE_TTL and document_current:
+            logger.debug(
+                f"Returning cached XMLTV ({cache_age:.0f}s old, TTL={_XMLTV_CACHE_TTL}s)"
+            )
+            return xmltv_streaming_response(
+                iter_text_chunks(_xmltv_cache),
+                request,
+                media_type="text/xml; charset=utf-8",
+                headers={"Cache-Control": f"max-age={_XMLTV_CACHE_TTL}"},
+            )
+
+        # Read before building, so changes made meanwhile leave the copy stale
+        version = lazy_xmltv.current_version() if lazy_xmltv is not None else None
+        pieces, media_type, headers = await _generate_xmltv(db, base_url, plain)
+        if lazy_xmltv is not None:
+            pieces = lazy_xmltv.capture(pieces, base_url, version=version)
+        return xmltv_streaming_response(pieces, request, media_type=media_type, headers=headers)
 
-        return Response(
-            content=xml_content,
-            media_type="application/xml; charset=utf-8",
-            headers={
-                "Content-Disposition": "inline; filename=xmltv.xml",
-                "Cache-Control": "public, max-age=300",  # Cache for 5 minutes
-                "X-Generated-At": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "X-Generation-Time": f"{generation_time:.2f}s",
-            },
-        )
     except HTTPException as he:
         raise
     except Exception as e:
@@ -1885,6 +2067,15 @@ async def get_epg(
         )
 
 
+async def build_xmltv_document(base_url: str) -> str:
+    """Build the whole guide in its own session (LazyXmltvCache background refresh)."""
+    async with get_session() as db:
+        pieces, _, _ = await _generate_xmltv(db, base_url)
+        if isinstance(pieces, AsyncIterable):
+            return "".join([piece async for piece in pieces])
+        return "".join(pieces)
+
+
 @router.post("/iptv/xmltv/refresh")
 async def refresh_epg_cache(request: Request):
     """
@@ -1894,21 +2085,133 @@ async def refresh_epg_cache(request: Request):
     global _xmltv_cache, _xmltv_cache_time
     _xmltv_cache = None
     _xmltv_cache_time = 0.0
+    _m3u_cache.clear()
     lazy = getattr(request.app.state, "xmltv_cache", None)
     if lazy is not None:
         lazy.invalidate()
+    from ..patterns.cache.xmltv_fragments import get_xmltv_fragment_cache
+
+    get_xmltv_fragment_cache().invalidate()
+    if lazy is not None:
+        # Rebuild now so the next guide request finds a fresh document
+        lazy.refresh()
     logger.info("XMLTV cache manually invalidated")
     return {"status": "ok", "message": "XMLTV cache cleared. Next EPG request will regenerate."}
 
 
+# Seconds a first HLS playlist request waits for the channel's first segment
+HLS_READY_TIMEOUT = 30.0
+
+_HLS_PLAYLIST_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+}
+
+
+async def _live_hls_playlist(
+    channel_manager,
+    channel: Channel,
+    channel_number: str,
+    access_token: str | None,
+    hls_msn: int | None,
+    hls_part: int | None,
+) -> Response:
+    """
+    Live media playlist from the channel's shared HLS segmenter.
+
+    Segments are cut from the same broadcast as the TS endpoint, so any
+    number of HLS clients share one FFmpeg. _HLS_msn/_HLS_part block until
+    the requested (partial) segment exists (LL-HLS blocking reload).
+    """
+    channel_stream = await channel_manager.get_channel_stream(
+        channel_id=channel.id,
+        channel_number=channel.number,
+        channel_name=channel.name,
+    )
+    segmenter = channel_stream.get_hls_segmenter()
+    if not channel_stream.is_running:
+        await channel_stream.start()
+
+    if hls_msn is not None:
+        await segmenter.wait_for(hls_msn, hls_part, timeout=3 * segmenter.target_duration)
+    elif not await segmenter.wait_ready(timeout=HLS_READY_TIMEOUT):
+        raise HTTPException(
+            status_code=503,
+            detail="HLS stream is starting",
+            headers={"Retry-After": "2"},
+        )
+
+    token_param = f"?access_token={urllib.parse.quote(access_token)}" if access_token else ""
+    playlist = segmenter.render_playlist(
+        f"{urllib.parse.quote(str(channel_number))}/hls/", token_param
+    )
+    return Response(
+        content=playlist,
+        media_type="application/vnd.apple.mpegurl",
+        headers=_HLS_PLAYLIST_HEADERS,
+    )
+
+
+@router.get("/iptv/channel/{channel_number}/hls/{segment_name}")
+async def get_hls_segment(
+    channel_number: str,
+    segment_name: str,
+    access_token: str | None = None,
+    request: Request = None,
+):
+    """Serve a live HLS segment ({seq}.ts) or LL-HLS partial segment ({seq}.{part}.ts)."""
+    if config.security.api_key_required and config.security.access_token:
+        if access_token != config.security.access_token:
+            raise HTTPException(status_code=401, detail="Invalid access token")
+
+    stem, _, ext = segment_name.rpartition(".")
+    seq_str, _, part_str = stem.partition(".")
+    try:
+        if ext != "ts":
+            raise ValueError(segment_name)
+        sequence = int(seq_str)
+        part = int(part_str) if part_str else None
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Segment not found") from None
+
+    channel_manager = getattr(request.app.state, "channel_manager", None) if request else None
+    channel_stream = (
+        channel_manager.get_running_stream_by_number(channel_number) if channel_manager else None
+    )
+    if channel_stream is None:
+        raise HTTPException(status_code=404, detail="Channel not streaming")
+    segmenter = channel_stream.get_hls_segmenter()
+
+    if part is None:
+        data = segmenter.get_segment(sequence)
+    else:
+        # Preload-hinted parts are requested before they exist
+        await segmenter.wait_for(sequence, part, timeout=3 * (segmenter.part_duration or 1.0))
+        data = segmenter.get_part(sequence, part)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Segment not found")
+    return Response(
+        content=data,
+        media_type="video/mp2t",
+        headers={"Access-Control-Allow-Origin": "*", "Cache-Control": "max-age=60"},
+    )
+
+
 @router.get("/iptv/channel/{channel_number}.m3u8")
 async def get_hls_stream(
     channel_number: str,
     access_token: str | None = None,
     request: Request = None,
     db: AsyncSession = Depends(get_db),
+    hls_msn: int | None = Query(None, alias="_HLS_msn"),
+    hls_part: int | None = Query(None, alias="_HLS_part"),
 ):
-    """Get HLS stream for a channel"""
+    """
+    Get HLS stream for a channel.
+
+    Serves the live playlist of the channel broadcast when
+    streaming.hls.enabled (default); otherwise the legacy per-item playlist.
+    """
 
     try:
         # Validate access token if required
@@ -1959,6 +2262,17 @@ async def get_hls_stream(
         if not channel:
             raise HTTPException(status_code=404, detail="Channel not found")
 
+        channel_manager = getattr(request.app.state, "channel_manager", None) if request else None
+        # Sharded channels run in worker processes; no local segmenter to read
+        if (
+            channel_manager is not None
+            and config.streaming.hls.enabled
+            and not getattr(channel_manager, "is_sharded", False)
+        ):
+            return await _live_hls_playlist(
+                channel_manager, channel, channel_number, access_token, hls_msn, hls_part
+            )
+
         # Try to load schedule file first
         schedule_file = ScheduleParser.find_schedule_file(channel_number)
         schedule_items = []
@@ -2338,6 +2652,121 @@ async def get_transport_stream(
         logger.error(f"Error streaming channel {channel_number} via IPTV TS: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error streaming channel: {e!s}")
 
+
+def _is_loopback_client(request: Request) -> bool:
+    import ipaddress
+
+    host = request.client.host if request.client else None
+    try:
+        return host is not None and ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _get_concat_channel_stream(
+    request: Request, channel_id: int, access_token: str | None, feed_token: str | None
+):
+    """
+    Resolve the running ChannelStream behind a persistent-encoder concat feed.
+
+    Only the channel's own FFmpeg may use the feed: the request must come
+    from a loopback address and carry the encoder's feed token.
+    """
+    if not _is_loopback_client(request):
+        raise HTTPException(status_code=403, detail="Concat feed is loopback only")
+    if config.security.api_key_required and config.security.access_token:
+        if access_token != config.security.access_token:
+            raise HTTPException(status_code=401, detail="Invalid access token")
+    channel_manager = getattr(request.app.state, "channel_manager", None)
+    channel_stream = channel_manager.get_running_stream(channel_id) if channel_manager else None
+    if channel_stream is None:
+        raise HTTPException(status_code=404, detail="Channel not streaming")
+    if not channel_stream.concat_feed_token_valid(feed_token):
+        raise HTTPException(status_code=403, detail="Invalid feed token")
+    return channel_stream
+
+
+@router.get("/iptv/concat/{channel_id}/next")
+async def get_concat_next_entry(
+    channel_id: int,
+    request: Request,
+    access_token: str | None = None,
+    feed_token: str | None = None,
+):
+    """
+    ffconcat entry for a channel's persistent encoder (loopback use only).
+
+    Each request advances the channel to its next playout item and redirects
+    FFmpeg to the item's media, so one long-lived FFmpeg plays the schedule.
+    """
+    from urllib.parse import urlencode
+
+    channel_stream = _get_concat_channel_stream(request, channel_id, access_token, feed_token)
+    entry = await channel_stream.next_concat_entry()
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No playable item")
+    seq, item = entry
+    media_url = item["media_url"]
+    if media_url.startswith(("http://", "https://")):
+        return RedirectResponse(url=media_url, status_code=302)
+    params = {"feed_token": feed_token}
+    if access_token:
+        params["access_token"] = access_token
+    query = f"?{urlencode(params)}"
+    return RedirectResponse(
+        url=f"/iptv/concat/{channel_id}/item/{seq}{query}", status_code=302
+    )
+
+
+@router.get("/iptv/concat/{channel_id}/item/{seq}")
+async def get_concat_item(
+    channel_id: int,
+    seq: int,
+    request: Request,
+    access_token: str | None = None,
+    feed_token: str | None = None,
+):
+    """Serve a concat entry's media: local files with Range support, scripts via yt-dlp."""
+    from fastapi.responses import FileResponse
+    from ..streaming.mpegts_streamer import _is_script_field
+
+    channel_stream = _get_concat_channel_stream(request, channel_id, access_token, feed_token)
+    item = channel_stream.get_concat_item(seq)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Concat entry expired")
+    media_url = item["media_url"]
+
+    if _is_script_field(media_url):
+        import shlex
+        from ..streaming.ffmpeg_process_manager import get_ffmpeg_process_manager
+
+        process = await get_ffmpeg_process_manager().spawn(
+            *shlex.split(media_url.strip()),
+            tag=f"ytdlp:{media_url[:60]}",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        async def pipe_script():
+            try:
+                while True:
+                    block = await process.stdout.read(65536)
+                    if not block:
+                        break
+                    yield block
+            finally:
+                if process.returncode is None:
+                    process.terminate()
+                    await process.wait()
+
+        return StreamingResponse(pipe_script(), media_type="application/octet-stream")
+
+    path = Path(media_url.removeprefix("file://"))
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Media file not found")
+    return FileResponse(path)
+
+
 @router.options("/iptv/stream/{media_id}")
 async def stream_media_options(media_id: int):
     """Handle CORS preflight for stream endpoint"""
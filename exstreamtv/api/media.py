@@ -8,9 +8,11 @@ from pydantic import BaseModel
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..api.pagination import Keyset, estimated_total, fetch_page
 from ..api.schemas import MediaItemCreate, MediaItemResponse
 from ..config import get_config
 from ..database import get_db
+from ..database.media_search import apply_search
 from ..database.models import MediaItem, StreamSource
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,8 @@ class PaginatedMediaResponse(BaseModel):
     skip: int
     limit: int
     has_more: bool
+    next_cursor: str | None = None
+    total_estimated: bool = False
 
 router = APIRouter(prefix="/media", tags=["Media"])
 
@@ -112,11 +116,12 @@ async def get_all_media(
     content_rating: str | None = None,
     genre: str | None = None,
     search: str | None = None,
-    sort_by: str = "title",
+    sort_by: str | None = None,
     sort_order: str = "asc",
     skip: int = 0,
     limit: int = 100,
     paginated: bool = False,
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ) -> list[dict[str, Any]] | PaginatedMediaResponse:
     """Get all media items with filtering.
@@ -135,19 +140,21 @@ async def get_all_media(
         duration_max: Maximum duration in seconds
         content_rating: Content rating filter (TV-MA, PG-13, etc.)
         genre: Genre filter (partial match)
-        search: Search term for title/description
-        sort_by: Sort field (title, year, duration, created_at)
+        search: Search terms matched as word prefixes in title, show title,
+            description and genres
+        sort_by: Sort field (relevance, title, year, duration, created_at);
+            relevance (best match first) is the default with search, title otherwise
         sort_order: Sort order (asc, desc)
         skip: Number of items to skip
         limit: Maximum number of items to return (max 1000)
         paginated: If true, return paginated response with total count
+        cursor: next_cursor of the previous page; resumes after it in
+            constant time regardless of depth (implies paginated, skip ignored)
         db: Database session
 
     Returns:
         list or PaginatedMediaResponse: List of media items
     """
-    from sqlalchemy import desc, asc, or_
-    
     # Cap limit at 1000 for performance
     limit = min(limit, 1000)
     
@@ -189,21 +196,18 @@ async def get_all_media(
     if genre:
         conditions.append(MediaItem.genres.ilike(f"%{genre}%"))
     
-    # Search filter
-    if search:
-        search_term = f"%{search}%"
-        conditions.append(or_(
-            MediaItem.title.ilike(search_term),
-            MediaItem.description.ilike(search_term),
-            MediaItem.show_title.ilike(search_term),
-        ))
-    
     # Apply all conditions
     if conditions:
         base_stmt = base_stmt.where(*conditions)
     
-    # Sorting with proper NULL handling
-    from sqlalchemy import nullslast, nullsfirst
+    if sort_by is None:
+        sort_by = "relevance" if search else "title"
+    
+    # Full-text search, ranked when sorting by relevance
+    if search:
+        base_stmt = apply_search(
+            base_stmt, search, db.get_bind(), ranked=sort_by == "relevance"
+        )
     
     sort_column = {
         "title": MediaItem.title,
@@ -213,25 +217,35 @@ async def get_all_media(
         "added_date": MediaItem.added_date,
     }.get(sort_by, MediaItem.title)
     
-    # Put NULLs at the end regardless of sort direction
-    if sort_order == "desc":
-        base_stmt = base_stmt.order_by(nullslast(desc(sort_column)))
+    # Relevance pages by offset; column sorts resume from (sort value, id),
+    # NULLs last regardless of sort direction
+    if search and sort_by == "relevance":
+        base_stmt = base_stmt.order_by(MediaItem.id)
+        keyset = None
     else:
-        base_stmt = base_stmt.order_by(nullslast(asc(sort_column)))
+        keyset = Keyset(sort_column, MediaItem.id, descending=sort_order == "desc")
+    scope = f"media:{sort_by}:{sort_order}"
+    paginated = paginated or cursor is not None
     
-    # Get total count if paginated
+    # Get total count if paginated (exact on the first page)
     total = 0
+    total_estimated = False
     if paginated:
         count_stmt = select(func.count(MediaItem.id))
         if conditions:
             count_stmt = count_stmt.where(*conditions)
-        count_result = await db.execute(count_stmt)
-        total = count_result.scalar() or 0
+        if search:
+            count_stmt = apply_search(
+                count_stmt.select_from(MediaItem), search, db.get_bind(), ranked=False
+            )
+        total, total_estimated = await estimated_total(
+            db, count_stmt, refresh=cursor is None and skip == 0
+        )
     
     # Get items
-    stmt = base_stmt.offset(skip).limit(limit)
-    result = await db.execute(stmt)
-    media_items = result.scalars().all()
+    media_items, next_cursor = await fetch_page(
+        db, base_stmt, scope=scope, limit=limit, cursor=cursor, offset=skip, keyset=keyset
+    )
     
     items = [media_to_response(m) for m in media_items]
     
@@ -241,7 +255,9 @@ async def get_all_media(
             total=total,
             skip=skip,
             limit=limit,
-            has_more=(skip + len(items)) < total,
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor,
+            total_estimated=total_estimated,
         )
     
     return items
@@ -497,10 +513,10 @@ async def search_media(
     limit: int = 50,
     db: AsyncSession = Depends(get_db)
 ) -> list[dict[str, Any]]:
-    """Search media items by title.
+    """Search media items, best matches first.
     
     Args:
-        q: Search query
+        q: Search query (word prefixes in title, show title, description, genres)
         source: Optional source filter
         limit: Maximum results
         db: Database session
@@ -508,14 +524,12 @@ async def search_media(
     Returns:
         List of matching media items
     """
-    stmt = select(MediaItem).where(
-        MediaItem.title.ilike(f"%{q}%")
-    )
+    stmt = select(MediaItem)
     
     if source:
         stmt = stmt.where(MediaItem.source == source)
     
-    stmt = stmt.limit(limit)
+    stmt = apply_search(stmt, q, db.get_bind()).order_by(MediaItem.id).limit(limit)
     result = await db.execute(stmt)
     media_items = result.scalars().all()
     
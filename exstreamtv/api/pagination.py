@@ -0,0 +1,180 @@
+"""
+Keyset (cursor) pagination for listing endpoints.
+
+OFFSET makes the database walk and discard every row before the page,
+so page 2000 costs 2000 pages of work. A keyset page instead starts
+right after the last row of the previous one: ``WHERE (sort_key, id) >
+(last_sort_key, last_id) ORDER BY sort_key, id LIMIT n``, which an index
+on the sort key answers in constant time at any depth. The position is
+handed to clients as an opaque cursor (``next_cursor``), which they pass
+back unchanged.
+
+Totals are counted exactly on the first page and reused from a short
+cache for later pages of the same listing (``total_estimated``), so
+scrolling a grid does not re-count the table on every page.
+
+Orders that have no stable key (search relevance) get offset cursors;
+plain ``skip``/``offset`` parameters keep working everywhere.
+"""
+
+import base64
+import binascii
+import json
+import time
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, Select, and_, asc, desc, nullslast, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CURSOR_VERSION = 1
+COUNT_CACHE_SECONDS = 60.0
+COUNT_CACHE_SIZE = 256
+
+# statement key -> (counted at, total)
+_count_cache: dict[str, tuple[float, int]] = {}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot put {type(value).__name__} in a cursor")
+
+
+def encode_cursor(scope: str, **position: Any) -> str:
+    """An opaque cursor for position within the listing named by scope."""
+    payload = {"v": CURSOR_VERSION, "s": scope, **position}
+    raw = json.dumps(payload, separators=(",", ":"), default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, scope: str) -> dict[str, Any]:
+    """The position in cursor; HTTP 400 if it is malformed or from another listing."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+    if (
+        not isinstance(payload, dict)
+        or payload.get("v") != CURSOR_VERSION
+        or payload.get("s") != scope
+    ):
+        raise HTTPException(status_code=400, detail="Cursor does not match this listing")
+    return payload
+
+
+class Keyset:
+    """
+    A stable order, (sort column, id), that pages can resume from.
+
+    NULL sort values come last in either direction, as the offset
+    listings always did.
+    """
+
+    def __init__(self, sort_column: Any, id_column: Any, descending: bool = False):
+        self.sort_column = sort_column
+        self.id_column = id_column
+        self.descending = descending
+        self.nullable = bool(getattr(sort_column.expression, "nullable", True))
+
+    def order(self, stmt: Select) -> Select:
+        direction = desc if self.descending else asc
+        sort = direction(self.sort_column)
+        return stmt.order_by(nullslast(sort) if self.nullable else sort, direction(self.id_column))
+
+    def key(self, row: Any) -> list[Any]:
+        return [getattr(row, self.sort_column.key), getattr(row, self.id_column.key)]
+
+    def after(self, key: list[Any]) -> Any:
+        """Rows ordered after key."""
+        try:
+            value, last_id = key
+            last_id = int(last_id)
+            if value is not None and isinstance(self.sort_column.type, DateTime):
+                value = datetime.fromisoformat(value)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+        def later(left: Any, right: Any) -> Any:
+            return left < right if self.descending else left > right
+
+        if value is None:
+            # Already among the trailing NULLs
+            return and_(self.sort_column.is_(None), later(self.id_column, last_id))
+        condition = later(tuple_(self.sort_column, self.id_column), tuple_(value, last_id))
+        if self.nullable:
+            condition = or_(condition, self.sort_column.is_(None))
+        return condition
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: Select,
+    *,
+    scope: str,
+    limit: int,
+    cursor: str | None = None,
+    offset: int = 0,
+    keyset: Keyset | None = None,
+) -> tuple[list[Any], str | None]:
+    """
+    One page of stmt (filtered, not yet ordered unless keyset is None).
+
+    cursor takes precedence over offset. Returns the rows and the cursor
+    of the next page, None on the last page. A limit below 1 reads
+    nothing (callers still report the total).
+    """
+    position = decode_cursor(cursor, scope) if cursor else None
+    if limit <= 0:
+        return [], None
+    if keyset is not None:
+        stmt = keyset.order(stmt)
+        if position is not None:
+            if "k" not in position:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            stmt = stmt.where(keyset.after(position["k"]))
+        elif offset:
+            stmt = stmt.offset(offset)
+    else:
+        if position is not None:
+            offset = position.get("o", 0)
+            if not isinstance(offset, int) or offset < 0:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.offset(offset)
+
+    # One extra row tells whether another page exists
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = list(result.scalars().all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    if keyset is not None:
+        return rows, encode_cursor(scope, k=keyset.key(rows[-1]))
+    return rows, encode_cursor(scope, o=offset + limit)
+
+
+def _statement_key(stmt: Select) -> str:
+    compiled = stmt.compile()
+    return f"{compiled}|{sorted((k, repr(v)) for k, v in compiled.params.items())}"
+
+
+async def estimated_total(db: AsyncSession, count_stmt: Select, refresh: bool) -> tuple[int, bool]:
+    """
+    (total, estimated) for a count statement.
+
+    refresh (the first page of a listing) always counts; later pages reuse
+    a count up to COUNT_CACHE_SECONDS old and report it as estimated.
+    """
+    key = _statement_key(count_stmt)
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    if not refresh and cached is not None and now - cached[0] < COUNT_CACHE_SECONDS:
+        return cached[1], True
+
+    total = (await db.execute(count_stmt)).scalar() or 0
+    if len(_count_cache) >= COUNT_CACHE_SIZE:
+        _count_cache.pop(min(_count_cache, key=lambda k: _count_cache[k][0]))
+    _count_cache[key] = (now, total)
+    return total, False
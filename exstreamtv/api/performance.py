@@ -43,6 +43,8 @@ class PoolStatsResponse(BaseModel):
     checked_in: Optional[int] = None
     checked_out: Optional[int] = None
     overflow: Optional[int] = None
+    read_pool: Optional[Dict[str, int]] = None
+    write_queue: Optional[Dict[str, Any]] = None
 
 
 class FFmpegPoolStatsResponse(BaseModel):
@@ -212,6 +214,24 @@ async def get_database_stats() -> PoolStatsResponse:
     return PoolStatsResponse(**stats)
 
 
+@router.get("/index-advisor")
+async def get_index_advisor_report(reset: bool = False) -> Dict[str, Any]:
+    """
+    Slow SELECTs and full table scans per endpoint (database.index_advisor).
+
+    Pass reset=true to clear the report after reading it.
+    """
+    from exstreamtv.database.index_advisor import get_index_advisor
+
+    advisor = get_index_advisor()
+    if advisor is None:
+        return {"enabled": False}
+    report = advisor.get_report()
+    if reset:
+        advisor.reset()
+    return report
+
+
 @router.get("/ffmpeg", response_model=FFmpegPoolStatsResponse)
 async def get_ffmpeg_stats() -> FFmpegPoolStatsResponse:
     """Get FFmpeg process pool statistics."""
@@ -197,25 +197,18 @@ async def get_channel_metadata(
             "playout_start_time": None,
         }
         
-        # Try to get position from ChannelStream if available
-        if hasattr(request.app.state, "channel_manager") and request.app.state.channel_manager:
-            channel_manager = request.app.state.channel_manager
-            # ChannelManager uses channel.id (integer) as key in _channels dict
-            channel_key = channel.id
-            if channel_key in channel_manager._channels:
-                channel_stream = channel_manager._channels[channel_key]
-                try:
-                    position = await channel_stream._get_current_position()
-                except Exception as e:
-                    logger.warning(f"Could not get current position from ChannelStream: {e}")
-                    # Fall back to playback position from database
-                    if playback_pos:
-                        position["item_index"] = playback_pos.last_item_index or 0
-                        position["elapsed_seconds_in_item"] = playback_pos.elapsed_seconds_in_item or 0
-                        position["current_item_start_time"] = playback_pos.current_item_start_time
-                        position["playout_start_time"] = playback_pos.playout_start_time
+        # Live position from the channel manager (proxied to the owning shard when sharded)
+        live_position = None
+        channel_manager = getattr(request.app.state, "channel_manager", None)
+        if channel_manager:
+            try:
+                live_position = await channel_manager.get_current_position(channel.id)
+            except Exception as e:
+                logger.warning(f"Could not get current position from channel manager: {e}")
+        if live_position is not None:
+            position = live_position
         elif playback_pos:
-            # Fall back to playback position from database if ChannelManager not available
+            # Fall back to playback position from database if the channel is not running
             position["item_index"] = playback_pos.last_item_index or 0
             position["elapsed_seconds_in_item"] = playback_pos.elapsed_seconds_in_item or 0
             position["current_item_start_time"] = playback_pos.current_item_start_time
@@ -234,20 +227,13 @@ async def get_channel_metadata(
         # Try to get media item metadata from current position
         current_item_index = position.get("item_index", 0)
         
-        # First, try to get media item from ChannelStream's schedule items if available
+        # First, use the media item the running channel is playing
         media_item = None
-        if hasattr(request.app.state, "channel_manager") and request.app.state.channel_manager:
-            channel_manager = request.app.state.channel_manager
-            # ChannelManager uses channel.id (integer) as key
-            channel_key = channel.id
-            if channel_key in channel_manager._channels:
-                channel_stream = channel_manager._channels[channel_key]
-                # Note: ChannelStream doesn't expose _schedule_items, so skip this for now
-                # schedule_items = channel_stream._schedule_items
-                # if schedule_items and current_item_index < len(schedule_items):
-                #     schedule_item = schedule_items[current_item_index]
-                #     media_item = schedule_item.get("media_item")
-        
+        if position.get("media_item_id"):
+            stmt = select(MediaItem).where(MediaItem.id == position["media_item_id"])
+            result = await db.execute(stmt)
+            media_item = result.scalar_one_or_none()
+
         # Fall back to playback position's last_item_media_id if we don't have schedule items
         if not media_item and playback_pos and playback_pos.last_item_media_id:
             stmt = select(MediaItem).where(MediaItem.id == playback_pos.last_item_media_id)
@@ -5,10 +5,11 @@ from datetime import datetime, timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from ..api.pagination import Keyset, estimated_total, fetch_page
 from ..config import get_config
 from ..database import get_db
 from ..database.models import (
@@ -235,6 +236,7 @@ async def get_playout_items(
     playout_id: int,
     limit: int = 100,
     offset: int = 0,
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db)
 ) -> dict[str, Any]:
     """Get items in a playout's timeline.
@@ -243,6 +245,7 @@ async def get_playout_items(
         playout_id: Playout ID
         limit: Maximum items to return
         offset: Offset for pagination
+        cursor: next_cursor of the previous page (takes precedence over offset)
         db: Database session
         
     Returns:
@@ -255,12 +258,21 @@ async def get_playout_items(
     if not playout:
         raise HTTPException(status_code=404, detail="Playout not found")
     
-    stmt = select(PlayoutItem).where(
-        PlayoutItem.playout_id == playout_id
-    ).order_by(PlayoutItem.start_time).offset(offset).limit(limit)
-    
-    result = await db.execute(stmt)
-    items = result.scalars().all()
+    stmt = select(PlayoutItem).where(PlayoutItem.playout_id == playout_id)
+    items, next_cursor = await fetch_page(
+        db,
+        stmt,
+        scope=f"playout-items:{playout_id}",
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        keyset=Keyset(PlayoutItem.start_time, PlayoutItem.id),
+    )
+    total, total_estimated = await estimated_total(
+        db,
+        select(func.count(PlayoutItem.id)).where(PlayoutItem.playout_id == playout_id),
+        refresh=cursor is None and offset == 0,
+    )
     
     return {
         "playout_id": playout_id,
@@ -281,6 +293,10 @@ async def get_playout_items(
         "offset": offset,
         "limit": limit,
         "count": len(items),
+        "total": total,
+        "total_estimated": total_estimated,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
     }
 
 @router.get("/{playout_id}/now-playing")
@@ -28,7 +28,7 @@ class TimelineProgramme:
 
 @dataclass
 class PlaybackAnchor:
-    """Anchor for timeline calculation from ChannelPlaybackPosition."""
+    """Anchor for timeline calculation from ChannelPlaybackPosition (or a live PositionSnapshot)."""
     playout_start_time: datetime
     last_item_index: int
     current_item_start_time: Optional[datetime] = None
@@ -2,13 +2,15 @@
 XMLTVGenerator with validation for EPG output.
 
 Validates programmes (monotonic, no overlaps, start < stop, required fields)
-before serving. Hard structural validation. Robust datetime parsing.
+in the same pass that emits them, on the TimelineProgramme objects, so the
+generated document is never parsed back. validate_xmltv_structure() is the
+strict standalone validator over a finished document (debug mode).
 """
 
 import logging
 import re
 from datetime import datetime, timezone
-from typing import Any, List, Tuple
+from typing import Any, Iterable, Iterator, List, Tuple
 from xml.etree import ElementTree as ET
 from xml.sax.saxutils import escape as xml_escape
 
@@ -21,6 +23,11 @@ logger = logging.getLogger(__name__)
 BULK_FAILURE_THRESHOLD = 0.05  # >5% parse failures -> abort ingestion
 _PLACEHOLDER_RE = re.compile(r"^Item \d+$")
 
+_UTC_LO = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_UTC_HI = datetime(2100, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+_NAIVE_LO = datetime(1970, 1, 1)
+_NAIVE_HI = datetime(2100, 12, 31, 23, 59, 59)
+
 
 class XMLTVValidationError(Exception):
     """Raised when XMLTV validation fails."""
@@ -130,7 +137,7 @@ class XMLTVGenerator:
             channels: List of Channel objects.
             programmes_by_channel: Channel id -> list of TimelineProgramme.
             base_url: Base URL for logo/links.
-            validate: If True, validate before emit.
+            validate: If True, validate each programme as it is emitted.
 
         Returns:
             XMLTV XML string.
@@ -138,94 +145,117 @@ class XMLTVGenerator:
         Raises:
             XMLTVValidationError: If validation fails.
         """
-        if validate:
-            self._validate(channels, programmes_by_channel)
-
-        lines: List[str] = []
-        lines.append('<?xml version="1.0" encoding="UTF-8"?>')
-        lines.append('<tv generator-info-name="EXStreamTV">')
-
+        channel_fragments = [self.channel_fragment(ch, base_url) for ch in channels]
+        programme_fragments: List[str] = []
+        errors: List[str] = []
         for ch in channels:
-            ch_id = _channel_xmltv_id(ch)
-            name = _xml(ch.name if hasattr(ch, "name") else str(ch))
-            lines.append(f'  <channel id="{ch_id}">')
-            guide = getattr(ch, "number", None)
-            if guide is not None and str(guide).strip() != "":
-                lines.append(f'    <display-name>{_xml(str(guide).strip())}</display-name>')
-            lines.append(f'    <display-name>{name}</display-name>')
-            logo = getattr(ch, "logo_path", None) or getattr(ch, "logo_url", None)
-            if logo:
-                if not str(logo).startswith("http"):
-                    logo = f"{base_url.rstrip('/')}/{logo.lstrip('/')}"
-                lines.append(f'    <icon src="{_xml(logo)}"/>')
-            lines.append("  </channel>")
+            progs = programmes_by_channel.get(ch.id if hasattr(ch, "id") else ch, [])
+            try:
+                programme_fragments.append(self.programme_fragment(ch, progs, validate=validate))
+            except XMLTVValidationError as e:
+                errors.extend(e.details)
+        if errors:
+            raise XMLTVValidationError("XMLTV validation failed", details=errors)
+        return self.assemble(channel_fragments, programme_fragments)
 
-        for ch in channels:
-            ch_id = ch.id if hasattr(ch, "id") else ch
-            progs = programmes_by_channel.get(ch_id, [])
-            seen_starts: set[tuple[str, str]] = set()
-            ch_xmltv_id = _channel_xmltv_id(ch)
-            for p in progs:
-                title_raw = (p.title or "").strip()
-                if not title_raw or _PLACEHOLDER_RE.match(title_raw):
-                    mi = getattr(p, "media_item", None)
-                    logger.critical(
-                        "XMLTV invariant violation: channel=%s item_index=%s title=%r media_id=%s — skipped",
-                        ch_id, getattr(p, "index", "?"), title_raw,
-                        getattr(mi, "id", "?") if mi else "?",
-                    )
-                    continue
-                start_str = _format_xmltv_datetime(p.start_time)
-                dedup_key = (ch_xmltv_id, start_str)
-                if dedup_key in seen_starts:
-                    continue
-                seen_starts.add(dedup_key)
-                stop_str = _format_xmltv_datetime(p.stop_time)
-                title = _xml(title_raw)
-                lines.append(f'  <programme start="{start_str}" stop="{stop_str}" channel="{ch_xmltv_id}">')
-                lines.append(f"    <title>{title}</title>")
-                lines.append("  </programme>")
-
-        lines.append("</tv>")
-        return "\n".join(lines)
+    @staticmethod
+    def iter_assemble(
+        channel_fragments: Iterable[str], programme_fragments: Iterable[str]
+    ) -> Iterator[str]:
+        """
+        Yield a complete XMLTV document block by block from per-channel fragments.
 
-    def _validate(
+        ``"".join()`` of the output equals :meth:`assemble`.
+        """
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="EXStreamTV">'
+        for fragment in channel_fragments:
+            if fragment:
+                yield "\n" + fragment
+        for fragment in programme_fragments:
+            if fragment:
+                yield "\n" + fragment
+        yield "\n</tv>"
+
+    @classmethod
+    def assemble(cls, channel_fragments: List[str], programme_fragments: List[str]) -> str:
+        """Join pre-rendered per-channel fragments into a complete XMLTV document."""
+        return "".join(cls.iter_assemble(channel_fragments, programme_fragments))
+
+    def iter_generate(
         self,
         channels: List[Any],
         programmes_by_channel: dict[int | str, List[TimelineProgramme]],
-    ) -> None:
-        """Validate programmes before emit. Raises XMLTVValidationError if invalid."""
-        errors: List[str] = []
+        base_url: str = "http://localhost:8411",
+        validate: bool = True,
+    ) -> Iterator[str]:
+        """
+        Streaming form of :meth:`generate`: renders one channel at a time.
 
-        for ch in channels:
-            ch_id = ch.id if hasattr(ch, "id") else ch
-            progs = programmes_by_channel.get(ch_id, [])
-
-            for i, p in enumerate(progs):
-                utc_lo = datetime(1970, 1, 1, tzinfo=timezone.utc)
-                utc_hi = datetime(2100, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
-                naive_lo = datetime(1970, 1, 1)
-                naive_hi = datetime(2100, 12, 31, 23, 59, 59)
-
-                def _out_of_range(dt: datetime, label: str) -> bool:
-                    if dt.tzinfo is not None:
-                        u = dt.astimezone(timezone.utc)
-                        if u < utc_lo or u > utc_hi:
-                            errors.append(
-                                f"Channel {ch_id} programme {i}: {label} time out of range "
-                                f"(must be within 1970-01-01 .. 2100-12-31 UTC)"
-                            )
-                            return True
-                    else:
-                        if dt < naive_lo or dt > naive_hi:
-                            errors.append(
-                                f"Channel {ch_id} programme {i}: {label} time out of range "
-                                f"(must be within 1970-01-01 .. 2100-12-31)"
-                            )
-                            return True
-                    return False
-
-                if _out_of_range(p.start_time, "start") or _out_of_range(p.stop_time, "stop"):
+        Validation (when enabled) happens as each channel is rendered, so an
+        XMLTVValidationError can surface part-way through iteration.
+        """
+        return self.iter_assemble(
+            (self.channel_fragment(ch, base_url) for ch in channels),
+            (
+                self.programme_fragment(
+                    ch,
+                    programmes_by_channel.get(ch.id if hasattr(ch, "id") else ch, []),
+                    validate=validate,
+                )
+                for ch in channels
+            ),
+        )
+
+    def channel_fragment(self, ch: Any, base_url: str = "http://localhost:8411") -> str:
+        """Render one channel's ``<channel>`` element."""
+        ch_id = _channel_xmltv_id(ch)
+        name = _xml(ch.name if hasattr(ch, "name") else str(ch))
+        lines: List[str] = [f'  <channel id="{ch_id}">']
+        guide = getattr(ch, "number", None)
+        if guide is not None and str(guide).strip() != "":
+            lines.append(f'    <display-name>{_xml(str(guide).strip())}</display-name>')
+        lines.append(f'    <display-name>{name}</display-name>')
+        logo = getattr(ch, "logo_path", None) or getattr(ch, "logo_url", None)
+        if logo:
+            if not str(logo).startswith("http"):
+                logo = f"{base_url.rstrip('/')}/{logo.lstrip('/')}"
+            lines.append(f'    <icon src="{_xml(logo)}"/>')
+        lines.append("  </channel>")
+        return "\n".join(lines)
+
+    def programme_fragment(
+        self, ch: Any, progs: List[TimelineProgramme], validate: bool = False
+    ) -> str:
+        """
+        Render one channel's ``<programme>`` elements ("" when there are none).
+
+        With validate, each programme is checked as it is emitted: times
+        within 1970..2100, start < stop, a real title, and no overlap with
+        the previous programme. Channel id coverage holds by construction:
+        every programme is written under its own channel's id.
+
+        Raises:
+            XMLTVValidationError: If validate is set and the programmes are invalid.
+        """
+        ch_id = ch.id if hasattr(ch, "id") else ch
+        seen_starts: set[tuple[str, str]] = set()
+        ch_xmltv_id = _channel_xmltv_id(ch)
+        lines: List[str] = []
+        errors: List[str] = []
+        parse_failures = 0
+        prev: TimelineProgramme | None = None
+        prev_index = 0
+        for i, p in enumerate(progs):
+            if validate:
+                if not isinstance(p.start_time, datetime) or not isinstance(p.stop_time, datetime):
+                    errors.append(f"Channel {ch_id} programme {i}: invalid start/stop")
+                    parse_failures += 1
+                    prev = None
+                    continue
+                if _out_of_range(p.start_time, "start", ch_id, i, errors) or _out_of_range(
+                    p.stop_time, "stop", ch_id, i, errors
+                ):
+                    prev = None
                     continue
                 if p.start_time >= p.stop_time:
                     errors.append(
@@ -236,18 +266,62 @@ class XMLTVGenerator:
                 if not t or _PLACEHOLDER_RE.match(t):
                     label = "empty title" if not t else f"invalid title {t!r}"
                     errors.append(f"Channel {ch_id} programme {i}: {label}")
-                if i + 1 < len(progs):
-                    next_p = progs[i + 1]
-                    if p.stop_time != next_p.start_time:
-                        # Allow small gap but not overlap
-                        if p.stop_time > next_p.start_time:
-                            errors.append(
-                                f"Channel {ch_id} overlap: programme {i} stop {p.stop_time} > "
-                                f"next start {next_p.start_time}"
-                            )
+                # Allow small gap but not overlap
+                if prev is not None and prev.stop_time > p.start_time:
+                    errors.append(
+                        f"Channel {ch_id} overlap: programme {prev_index} stop {prev.stop_time} > "
+                        f"next start {p.start_time}"
+                    )
+                prev, prev_index = p, i
+                if errors:
+                    # Invalid output is discarded; keep collecting errors only
+                    continue
+
+            title_raw = (p.title or "").strip()
+            if not title_raw or _PLACEHOLDER_RE.match(title_raw):
+                mi = getattr(p, "media_item", None)
+                logger.critical(
+                    "XMLTV invariant violation: channel=%s item_index=%s title=%r media_id=%s — skipped",
+                    ch_id, getattr(p, "index", "?"), title_raw,
+                    getattr(mi, "id", "?") if mi else "?",
+                )
+                continue
+            start_str = _format_xmltv_datetime(p.start_time)
+            dedup_key = (ch_xmltv_id, start_str)
+            if dedup_key in seen_starts:
+                continue
+            seen_starts.add(dedup_key)
+            stop_str = _format_xmltv_datetime(p.stop_time)
+            title = _xml(title_raw)
+            lines.append(f'  <programme start="{start_str}" stop="{stop_str}" channel="{ch_xmltv_id}">')
+            lines.append(f"    <title>{title}</title>")
+            lines.append("  </programme>")
 
         if errors:
+            if progs and parse_failures / len(progs) > BULK_FAILURE_THRESHOLD:
+                errors.insert(
+                    0, f"BULK_FAILURE: {parse_failures}/{len(progs)} programmes failed parse"
+                )
             raise XMLTVValidationError("XMLTV validation failed", details=errors)
+        return "\n".join(lines)
+
+
+def _out_of_range(dt: datetime, label: str, ch_id: Any, i: int, errors: List[str]) -> bool:
+    if dt.tzinfo is not None:
+        u = dt.astimezone(timezone.utc)
+        if u < _UTC_LO or u > _UTC_HI:
+            errors.append(
+                f"Channel {ch_id} programme {i}: {label} time out of range "
+                f"(must be within 1970-01-01 .. 2100-12-31 UTC)"
+            )
+            return True
+    elif dt < _NAIVE_LO or dt > _NAIVE_HI:
+        errors.append(
+            f"Channel {ch_id} programme {i}: {label} time out of range "
+            f"(must be within 1970-01-01 .. 2100-12-31)"
+        )
+        return True
+    return False
 
 
 def _channel_xmltv_id(ch: Any) -> str:
@@ -0,0 +1,129 @@
+"""
+Streaming XMLTV responses with incremental gzip.
+
+The guide is sent as it is written: the XMLTV writer yields channel and
+programme blocks, they are batched into ~64 KB chunks and, when the client
+accepts gzip, fed through one zlib compressobj. Neither the whole document
+nor its compressed copy is ever held in memory, so peak memory per guide
+request stays flat regardless of lineup size. Each chunk is produced and
+compressed in a worker thread so the event loop keeps serving streams
+meanwhile.
+"""
+
+import asyncio
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+# Raw bytes collected before a chunk is compressed / sent
+STREAM_CHUNK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+
+
+def accepts_gzip(request: Request | None) -> bool:
+    """True when the request's Accept-Encoding allows gzip (q > 0)."""
+    if request is None:
+        return False
+    header = request.headers.get("accept-encoding", "")
+    for token in header.split(","):
+        coding, _, params = token.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+async def iter_encoded(
+    pieces: Iterable[str] | AsyncIterable[str],
+    gzip: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    level: int = GZIP_LEVEL,
+) -> AsyncIterator[bytes]:
+    """
+    Encode text pieces to UTF-8 chunks of about chunk_size, optionally gzipped.
+
+    A plain iterable is advanced in the worker thread together with the
+    compression, so the serialization its generator does stays off the
+    event loop. An async iterable is pulled on the loop; only compression
+    runs in the thread.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) if gzip else None
+    if not isinstance(pieces, AsyncIterable):
+        it = iter(pieces)
+        last = False
+        while not last:
+            out, last = await asyncio.to_thread(_encode_next, it, compressor, chunk_size)
+            if out:
+                yield out
+        return
+    batch: list[bytes] = []
+    pending = 0
+    async for piece in pieces:
+        data = piece.encode("utf-8")
+        batch.append(data)
+        pending += len(data)
+        if pending < chunk_size:
+            continue
+        raw = b"".join(batch)
+        batch.clear()
+        pending = 0
+        out = await asyncio.to_thread(_compress, compressor, raw, False) if compressor else raw
+        if out:
+            yield out
+    raw = b"".join(batch)
+    out = await asyncio.to_thread(_compress, compressor, raw, True) if compressor else raw
+    if out:
+        yield out
+
+
+def _encode_next(
+    it: Iterator[str], compressor: "zlib._Compress | None", chunk_size: int
+) -> tuple[bytes, bool]:
+    """Pull and encode the next chunk; True once the iterator is exhausted."""
+    batch: list[bytes] = []
+    pending = 0
+    for piece in it:
+        data = piece.encode("utf-8")
+        batch.append(data)
+        pending += len(data)
+        if pending >= chunk_size:
+            return _compress(compressor, b"".join(batch), False), False
+    return _compress(compressor, b"".join(batch), True), True
+
+
+def _compress(compressor: "zlib._Compress | None", raw: bytes, last: bool) -> bytes:
+    if compressor is None:
+        return raw
+    out = compressor.compress(raw)
+    return out + compressor.flush() if last else out
+
+
+def xmltv_streaming_response(
+    pieces: Iterable[str] | AsyncIterable[str],
+    request: Request | None,
+    media_type: str = "application/xml",
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    """Stream an XMLTV document, gzip-encoded when the client accepts it."""
+    gzip = accepts_gzip(request)
+    out_headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    if gzip:
+        out_headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        iter_encoded(pieces, gzip=gzip),
+        media_type=media_type,
+        headers=out_headers,
+    )
+
+
+def iter_text_chunks(text: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterable[str]:
+    """Slice an already-built document so it streams in chunk_size pieces."""
+    return (text[i : i + chunk_size] for i in range(0, len(text), chunk_size))
@@ -186,21 +186,25 @@ class CacheManager:
         return await self.get(f"metadata:{provider}:{item_id}")
     
     async def cache_ffprobe(self, file_path: str, data: Dict, ttl: Optional[int] = None) -> bool:
-        """Cache FFprobe analysis result."""
-        import hashlib
-        path_hash = hashlib.sha256(file_path.encode()).hexdigest()[:16]
-        return await self.set(
-            f"ffprobe:{path_hash}",
-            data,
-            ttl=ttl,
-            cache_type=CacheType.FFPROBE,
-        )
+        """
+        Cache FFprobe analysis result.
+
+        Stored in the shared persistent probe cache (keyed by path, size and
+        mtime, or normalized URL) rather than this backend, so every probe
+        call site sees it. ``ttl`` (seconds) expires this entry; without it
+        the probe cache's own expiry applies.
+        """
+        from exstreamtv.ffmpeg.probe_service import get_probe_service
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, get_probe_service().put, file_path, data, ttl)
     
     async def get_ffprobe(self, file_path: str) -> Optional[Dict]:
-        """Get cached FFprobe result."""
-        import hashlib
-        path_hash = hashlib.sha256(file_path.encode()).hexdigest()[:16]
-        return await self.get(f"ffprobe:{path_hash}")
+        """Get cached FFprobe result from the shared probe cache."""
+        from exstreamtv.ffmpeg.probe_service import get_probe_service
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, get_probe_service().get_cached, file_path)
     
     # Invalidation methods
     
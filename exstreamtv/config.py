@@ -30,6 +30,25 @@ class DatabaseConfig(BaseModel):
     """Database configuration."""
     url: str = "sqlite:///./exstreamtv.db"
     echo: bool = False
+    # SQLite pooling: "static" shares one connection across the app;
+    # "read_write" opens query_only reader connections plus one serialized writer
+    sqlite_pool: str = "static"
+    sqlite_read_connections: int = Field(4, ge=1)
+    sqlite_writer_timeout: float = Field(30.0, gt=0)  # seconds to wait for the writer
+    # Batched single-writer queue for small background writes
+    write_queue_enabled: bool = True
+    write_batch_max_size: int = Field(100, ge=1)  # intents per transaction
+    write_batch_max_delay_ms: float = Field(50.0, ge=0)  # max wait before committing
+    # Development: EXPLAIN slow SELECTs and report full table scans per endpoint
+    index_advisor: bool = False
+    index_advisor_slow_ms: float = Field(50.0, ge=0)
+
+    @field_validator("sqlite_pool")
+    @classmethod
+    def validate_sqlite_pool(cls, v: str) -> str:
+        if v not in ("static", "read_write"):
+            raise ValueError("sqlite_pool must be 'static' or 'read_write'")
+        return v
 
 
 class HardwareAccelerationConfig(BaseModel):
@@ -88,6 +107,12 @@ class FFmpegConfig(BaseModel):
     long_run_hours: float = 24.0  # Kill processes running longer (zombie prevention)
     memory_guard_threshold: float = 0.85  # Reject spawn if memory > 85%
     fd_guard_reserve: int = 100  # Reserve FDs from ulimit for other uses
+
+    # Persistent ffprobe cache shared by every probe call site: local files
+    # keyed by (path, size, mtime), remote inputs by normalized URL
+    probe_cache_file: str = "data/ffprobe_cache.db"  # "" = memory only
+    probe_cache_memory_entries: int = Field(default=4096, ge=16)
+    probe_cache_remote_ttl_seconds: int = Field(default=86400, ge=0)
     
     @property
     def ffmpeg_path(self) -> str:
@@ -95,10 +120,42 @@ class FFmpegConfig(BaseModel):
         return self.path
 
 
+class HLSConfig(BaseModel):
+    """Live HLS packaging of the channel broadcast (/iptv/channel/{n}.m3u8)."""
+    # false: serve the legacy per-item playlist instead of live segments
+    enabled: bool = True
+    segment_duration: float = Field(default=6.0, ge=1.0, le=30.0)
+    playlist_size: int = Field(default=5, ge=2, le=30)
+    # LL-HLS partial segments (EXT-X-PART) with blocking playlist reload
+    low_latency: bool = False
+    part_duration: float = Field(default=1.0, ge=0.2, le=5.0)
+
+
+class ShardingConfig(BaseModel):
+    """Spread ChannelStream ownership over worker processes (channel_id % workers)."""
+    # 0: every channel runs on the main event loop
+    workers: int = Field(default=0, ge=0, le=64)
+    # Directory for the workers' Unix sockets (empty: private temp directory)
+    socket_dir: str = ""
+
+
 class StreamingConfig(BaseModel):
     """Streaming configuration."""
     buffer_size: int = 2097152  # 2MB
     read_size: int = 65536  # 64KB
+    # Start the next item's FFmpeg this many seconds before the current one
+    # ends and splice CC/timestamps so programme boundaries play gaplessly.
+    gapless_transitions: bool = True
+    transition_lookahead_seconds: float = Field(default=8.0, ge=1.0, le=60.0)
+    # "per_item": one FFmpeg per playout item (stream copy where possible).
+    # "persistent": one long-lived FFmpeg per channel fed by an ffconcat loop.
+    encoder_mode: str = "per_item"
+    # Playback positions are kept in memory and written to the database in
+    # one batched transaction this often (the crash durability window).
+    # 0 flushes as soon as a position changes.
+    position_flush_interval_seconds: float = Field(default=5.0, ge=0.0, le=300.0)
+    hls: HLSConfig = Field(default_factory=HLSConfig)
+    sharding: ShardingConfig = Field(default_factory=ShardingConfig)
 
 
 # Plex / HDHomeRun expect DeviceID as exactly 8 hexadecimal characters.
@@ -130,6 +187,13 @@ class ChannelsConfig(BaseModel):
     default_guide_hours: int = 24
     auto_refresh_interval: int = 3600
     max_concurrent_streams: int = 10
+    # Startup pre-warm: most-watched channels first, bounded concurrency
+    # (0 = derive from ProcessPoolManager capacity), stop once the share of
+    # the FFmpeg process pool or the CPU budget is used
+    prewarm_concurrency: int = Field(default=0, ge=0)
+    prewarm_process_budget: float = Field(default=0.5, gt=0.0, le=1.0)
+    prewarm_cpu_budget_percent: float = Field(default=85.0, gt=0.0, le=100.0)
+    prewarm_ready_timeout_seconds: float = Field(default=30.0, gt=0.0)
 
 
 class PlexConfig(BaseModel):
@@ -265,6 +329,9 @@ class SessionManagerConfig(BaseModel):
     max_sessions_per_channel: int = 50
     idle_timeout_seconds: int = 300
     cleanup_interval_seconds: int = 60
+    # Per-channel watch-time history used to order channel pre-warming
+    viewership_history_file: str = "data/viewership.json"
+    viewership_half_life_hours: float = Field(default=168.0, gt=0.0)
 
 
 class StreamThrottlerConfig(BaseModel):
@@ -339,6 +406,19 @@ class EPGConfig(BaseModel):
     days_ahead: int = 7
     episode_num_required: bool = False
     plex_xmltv_mismatch_ratio_threshold: float = 0.15
+    # Debug: also re-parse each generated XMLTV document with the strict
+    # standalone validator (programmes are always validated while emitted)
+    strict_xmltv_validation: bool = False
+    # Guide build workers: 0 = one worker thread, N > 0 = process pool of N,
+    # -1 = one process per CPU. Batches smaller than build_pool_min_channels
+    # always use the thread.
+    build_workers: int = 0
+    build_pool_min_channels: int = Field(default=16, ge=1)
+    # Whole-guide cache: stale documents are served while one background
+    # rebuild runs; refresh starts this many seconds before the TTL ends.
+    xmltv_cache_ttl_seconds: int = Field(default=120, ge=1)
+    xmltv_refresh_ahead_seconds: int = Field(default=30, ge=0)
+    xmltv_snapshot_file: str = "data/xmltv_last_good.xml"  # "" = no disk copy
 
 
 class SchedulingConfig(BaseModel):
@@ -21,7 +21,15 @@ from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import QueuePool, NullPool
 
 from exstreamtv.config import get_config
+from exstreamtv.database.index_advisor import get_index_advisor
+from exstreamtv.database.media_search import install_media_search
 from exstreamtv.database.models.base import Base
+from exstreamtv.database.sqlite_pool import (
+    create_read_write_engines,
+    pool_stats,
+    read_write_session_kwargs,
+    use_read_write_split,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +41,11 @@ _async_session_factory = None
 _sync_engine = None
 _sync_session_factory = None
 
+# Query-only reader engines when SQLite runs with sqlite_pool: read_write
+# (_async_engine / _sync_engine are then the single-connection writers)
+_async_read_engine = None
+_sync_read_engine = None
+
 # Global connection manager instance
 _connection_manager: Optional["DatabaseConnectionManager"] = None
 
@@ -103,6 +116,7 @@ class DatabaseConnectionManager:
     def __init__(self):
         """Initialize the connection manager."""
         self._engine = None
+        self._read_engine = None
         self._session_factory = None
         self._sync_engine = None
         self._sync_session_factory = None
@@ -164,20 +178,32 @@ class DatabaseConnectionManager:
             
             config = get_config()
             async_url = _get_async_url(config.database.url)
+            session_kwargs: dict[str, Any] = {}
             
-            # Build pool configuration
-            pool_kwargs = self._build_pool_config(async_url, is_production)
-            
-            # Create async engine
-            self._engine = create_async_engine(
-                async_url,
-                echo=config.database.echo,
-                future=True,
-                **pool_kwargs,
-            )
+            if use_read_write_split(async_url, config.database.sqlite_pool):
+                # Pool size by channel count does not apply to the split pools
+                self._engine, self._read_engine = create_read_write_engines(
+                    async_url,
+                    echo=config.database.echo,
+                    read_connections=config.database.sqlite_read_connections,
+                    writer_timeout=config.database.sqlite_writer_timeout,
+                )
+                session_kwargs = read_write_session_kwargs(self._engine, self._read_engine)
+            else:
+                # Build pool configuration
+                pool_kwargs = self._build_pool_config(async_url, is_production)
+                
+                # Create async engine
+                self._engine = create_async_engine(
+                    async_url,
+                    echo=config.database.echo,
+                    future=True,
+                    **pool_kwargs,
+                )
             
             # Register event listeners for monitoring
             self._register_pool_events()
+            _install_index_advisor(self._engine, self._read_engine)
             
             # Create session factory
             self._session_factory = async_sessionmaker(
@@ -185,11 +211,13 @@ class DatabaseConnectionManager:
                 class_=AsyncSession,
                 expire_on_commit=False,
                 autoflush=False,
+                **session_kwargs,
             )
             
             # Create tables
             async with self._engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(install_media_search, self._read_engine)
             
             self._initialized = True
             
@@ -248,8 +276,8 @@ class DatabaseConnectionManager:
         def on_checkout(dbapi_conn, connection_record, connection_proxy):
             _pool_stats["connections_checked_out"] += 1
             
-            # Enable WAL mode for SQLite
-            if "sqlite" in str(self._engine.url):
+            # Enable WAL mode for SQLite (split pools set pragmas on connect)
+            if "sqlite" in str(self._engine.url) and self._read_engine is None:
                 cursor = dbapi_conn.cursor()
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.execute("PRAGMA synchronous=NORMAL")
@@ -285,6 +313,8 @@ class DatabaseConnectionManager:
             True if resize was performed, False if not needed
         """
         async with self._lock:
+            if self._read_engine is not None:
+                return False
             new_size = self.calculate_optimal_pool_size(new_channel_count)
             
             if new_size == self._current_pool_size:
@@ -317,6 +347,9 @@ class DatabaseConnectionManager:
                 )
                 
                 self._register_pool_events()
+                _install_index_advisor(self._engine)
+                async with self._engine.begin() as conn:
+                    await conn.run_sync(install_media_search)
                 
                 self._session_factory = async_sessionmaker(
                     self._engine,
@@ -407,6 +440,11 @@ class DatabaseConnectionManager:
                 metrics.checked_out = pool.checkedout()
             if hasattr(pool, "overflow"):
                 metrics.overflow = pool.overflow()
+        if self._read_engine:
+            reader = pool_stats(self._read_engine)
+            metrics.pool_size += reader.get("pool_size", 0)
+            metrics.checked_in += reader.get("checked_in", 0)
+            metrics.checked_out += reader.get("checked_out", 0)
         
         return metrics
     
@@ -456,6 +494,9 @@ class DatabaseConnectionManager:
                 await self._engine.dispose()
                 self._engine = None
                 self._session_factory = None
+            if self._read_engine:
+                await self._read_engine.dispose()
+                self._read_engine = None
             
             self._initialized = False
             logger.info("DatabaseConnectionManager closed")
@@ -528,6 +569,20 @@ def _get_pool_kwargs(url: str, is_production: bool = False) -> dict:
         }
 
 
+def _count_connection(dbapi_conn, connection_record) -> None:
+    _pool_stats["connections_created"] += 1
+
+
+def _install_index_advisor(*engines: Any) -> None:
+    """Attach the development-mode index advisor when database.index_advisor is on."""
+    advisor = get_index_advisor()
+    if advisor is None:
+        return
+    for engine in engines:
+        if engine is not None:
+            advisor.install(engine)
+
+
 async def init_db(is_production: bool = False) -> None:
     """
     Initialize the database connection and create tables.
@@ -535,67 +590,98 @@ async def init_db(is_production: bool = False) -> None:
     Args:
         is_production: Use production-optimized pool settings
     """
-    global _async_engine, _async_session_factory
+    global _async_engine, _async_session_factory, _async_read_engine
     
     config = get_config()
     async_url = _get_async_url(config.database.url)
-    pool_kwargs = _get_pool_kwargs(async_url, is_production)
-    
-    _async_engine = create_async_engine(
-        async_url,
-        echo=config.database.echo,
-        future=True,
-        **pool_kwargs,
-    )
+    split = use_read_write_split(async_url, config.database.sqlite_pool)
+    session_kwargs: dict[str, Any] = {}
+    
+    if split:
+        _async_engine, _async_read_engine = create_read_write_engines(
+            async_url,
+            echo=config.database.echo,
+            read_connections=config.database.sqlite_read_connections,
+            writer_timeout=config.database.sqlite_writer_timeout,
+        )
+        session_kwargs = read_write_session_kwargs(_async_engine, _async_read_engine)
+    else:
+        _async_read_engine = None
+        pool_kwargs = _get_pool_kwargs(async_url, is_production)
+        _async_engine = create_async_engine(
+            async_url,
+            echo=config.database.echo,
+            future=True,
+            **pool_kwargs,
+        )
     
     # Register pool event listeners for monitoring
-    @event.listens_for(_async_engine.sync_engine, "connect")
-    def on_connect(dbapi_conn, connection_record):
-        _pool_stats["connections_created"] += 1
-    
-    @event.listens_for(_async_engine.sync_engine, "checkout")
-    def on_checkout(dbapi_conn, connection_record, connection_proxy):
-        # Enable WAL mode for SQLite for better concurrency
-        if "sqlite" in async_url:
-            cursor = dbapi_conn.cursor()
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute("PRAGMA synchronous=NORMAL")
-            cursor.execute("PRAGMA cache_size=-64000")  # 64MB cache
-            cursor.close()
+    for engine in (_async_engine, _async_read_engine):
+        if engine is not None:
+            event.listen(engine.sync_engine, "connect", _count_connection)
+    _install_index_advisor(_async_engine, _async_read_engine)
+    
+    if not split:
+        @event.listens_for(_async_engine.sync_engine, "checkout")
+        def on_checkout(dbapi_conn, connection_record, connection_proxy):
+            # Enable WAL mode for SQLite for better concurrency
+            if "sqlite" in async_url:
+                cursor = dbapi_conn.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA cache_size=-64000")  # 64MB cache
+                cursor.close()
     
     _async_session_factory = async_sessionmaker(
         _async_engine,
         class_=AsyncSession,
         expire_on_commit=False,
         autoflush=False,  # Manual flush for better performance
+        **session_kwargs,
     )
     
     # Create all tables
     async with _async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(install_media_search, _async_read_engine)
 
 
 def init_sync_db() -> None:
     """Initialize synchronous database connection (for scripts/migrations)."""
-    global _sync_engine, _sync_session_factory
+    global _sync_engine, _sync_session_factory, _sync_read_engine
     
     config = get_config()
-    pool_kwargs = _get_pool_kwargs(config.database.url)
-    
-    _sync_engine = create_engine(
-        config.database.url,
-        echo=config.database.echo,
-        future=True,
-        **pool_kwargs,
-    )
+    session_kwargs: dict[str, Any] = {"class_": Session}
+    
+    if use_read_write_split(config.database.url, config.database.sqlite_pool):
+        _sync_engine, _sync_read_engine = create_read_write_engines(
+            config.database.url,
+            echo=config.database.echo,
+            read_connections=config.database.sqlite_read_connections,
+            writer_timeout=config.database.sqlite_writer_timeout,
+            is_async=False,
+        )
+        session_kwargs.update(read_write_session_kwargs(_sync_engine, _sync_read_engine))
+    else:
+        _sync_read_engine = None
+        pool_kwargs = _get_pool_kwargs(config.database.url)
+        _sync_engine = create_engine(
+            config.database.url,
+            echo=config.database.echo,
+            future=True,
+            **pool_kwargs,
+        )
     
+    _install_index_advisor(_sync_engine, _sync_read_engine)
     _sync_session_factory = sessionmaker(
         _sync_engine,
-        class_=Session,
         expire_on_commit=False,
+        **session_kwargs,
     )
     
     Base.metadata.create_all(_sync_engine)
+    with _sync_engine.begin() as conn:
+        install_media_search(conn, _sync_read_engine)
 
 
 @asynccontextmanager
@@ -647,18 +733,27 @@ def get_pool_stats() -> dict:
             stats["checked_out"] = pool.checkedout()
         if hasattr(pool, "overflow"):
             stats["overflow"] = pool.overflow()
+    if _async_read_engine is not None:
+        stats["read_pool"] = pool_stats(_async_read_engine)
+
+    from exstreamtv.database.write_queue import get_write_queue
+
+    stats["write_queue"] = get_write_queue().get_stats()
     
     return stats
 
 
 async def close_db() -> None:
     """Close database connections and cleanup."""
-    global _async_engine, _async_session_factory
+    global _async_engine, _async_session_factory, _async_read_engine
     
     if _async_engine is not None:
         await _async_engine.dispose()
         _async_engine = None
         _async_session_factory = None
+    if _async_read_engine is not None:
+        await _async_read_engine.dispose()
+        _async_read_engine = None
 
 
 # Alias for backward compatibility with migration scripts
@@ -0,0 +1,229 @@
+"""
+Development-mode index advisor.
+
+With ``database.index_advisor: true`` every SELECT that takes longer than
+``database.index_advisor_slow_ms`` is run again through
+``EXPLAIN QUERY PLAN`` on the same connection. Plans that scan a whole
+table (``SCAN <table>`` without an index) or sort through a temporary
+B-tree are recorded against the endpoint that issued the statement, which
+IndexAdvisorMiddleware tracks per request. GET
+/api/performance/index-advisor returns the report.
+
+Only SQLite plans are understood. Explaining a statement costs one extra
+round trip per distinct (endpoint, statement) pair, so keep this off in
+production.
+"""
+
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_MS = 50.0
+MAX_STATEMENTS = 500
+
+# "SCAN media_items" / "SCAN TABLE media_items AS m" (SQLite < 3.36); an
+# index scan reads "SCAN media_items USING INDEX ..."
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?"?(\w+)"?(?: AS \w+)?$')
+_TEMP_BTREE = "USE TEMP B-TREE"
+
+# ASGI scope of the request being served (None outside requests)
+_current_scope: ContextVar[dict | None] = ContextVar("index_advisor_scope", default=None)
+
+
+def _endpoint_label(scope: dict | None) -> str:
+    """'GET /api/channels/{channel_id}' for the route serving scope."""
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "?")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+@dataclass
+class SlowStatement:
+    """A slow SELECT and its query plan, aggregated per endpoint."""
+
+    endpoint: str
+    statement: str
+    plan: list[str]
+    full_scans: list[str]
+    temp_btree: bool
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "statement": self.statement,
+            "plan": self.plan,
+            "full_scans": self.full_scans,
+            "temp_btree": self.temp_btree,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+def parse_plan(details: list[str]) -> tuple[list[str], bool]:
+    """(fully scanned tables, uses a temp B-tree) from EXPLAIN QUERY PLAN details."""
+    scans: list[str] = []
+    for detail in details:
+        match = _FULL_SCAN.match(detail.strip())
+        if match and match.group(1) not in scans:
+            scans.append(match.group(1))
+    return scans, any(_TEMP_BTREE in d for d in details)
+
+
+class IndexAdvisor:
+    """Records slow statements with their query plans; see module docstring."""
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS, max_statements: int = MAX_STATEMENTS):
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self._statements: dict[tuple[str, str], SlowStatement] = {}
+        self._lock = threading.Lock()
+        self._engines: list[Engine] = []
+        self.slow_total = 0
+        self.dropped = 0
+
+    def install(self, engine: Any) -> None:
+        """Time every statement on engine (sync or async)."""
+        sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        if sync_engine in self._engines:
+            return
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        self._engines.append(sync_engine)
+        logger.info(f"Index advisor timing statements slower than {self.slow_ms:g}ms")
+
+    def uninstall(self) -> None:
+        for sync_engine in self._engines:
+            event.remove(sync_engine, "before_cursor_execute", self._before)
+            event.remove(sync_engine, "after_cursor_execute", self._after)
+        self._engines.clear()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("index_advisor_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.get("index_advisor_started")
+        if not started:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        if (
+            elapsed_ms < self.slow_ms
+            or executemany
+            or conn.dialect.name != "sqlite"
+            or not statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        ):
+            return
+        self.record(conn, statement, parameters, elapsed_ms)
+
+    def record(self, conn: Any, statement: str, parameters: Any, elapsed_ms: float) -> None:
+        """Aggregate one slow statement, explaining it the first time it is seen."""
+        endpoint = _endpoint_label(_current_scope.get())
+        key = (endpoint, statement)
+        self.slow_total += 1
+        entry = self._statements.get(key)
+        if entry is None:
+            if len(self._statements) >= self.max_statements:
+                self.dropped += 1
+                return
+            plan = self._explain(conn, statement, parameters)
+            scans, temp_btree = parse_plan(plan)
+            entry = SlowStatement(endpoint, statement, plan, scans, temp_btree)
+            with self._lock:
+                entry = self._statements.setdefault(key, entry)
+            if scans:
+                logger.warning(
+                    f"Index advisor: {endpoint} scans {', '.join(scans)} "
+                    f"({elapsed_ms:.1f}ms): {statement[:200]}"
+                )
+        entry.count += 1
+        entry.total_ms += elapsed_ms
+        entry.max_ms = max(entry.max_ms, elapsed_ms)
+
+    @staticmethod
+    def _explain(conn: Any, statement: str, parameters: Any) -> list[str]:
+        # Raw DBAPI cursor: going through conn would re-enter these events
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            return [str(row[-1]) for row in cursor.fetchall()]
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            cursor.close()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+        self.slow_total = 0
+        self.dropped = 0
+
+    def get_report(self) -> dict[str, Any]:
+        """Slow statements and full table scans grouped by endpoint, slowest first."""
+        endpoints: dict[str, dict[str, Any]] = {}
+        for entry in sorted(self._statements.values(), key=lambda s: s.total_ms, reverse=True):
+            report = endpoints.setdefault(
+                entry.endpoint,
+                {"full_scans": {}, "total_ms": 0.0, "statements": []},
+            )
+            for table in entry.full_scans:
+                report["full_scans"][table] = report["full_scans"].get(table, 0) + entry.count
+            report["total_ms"] = round(report["total_ms"] + entry.total_ms, 2)
+            report["statements"].append(entry.to_dict())
+        return {
+            "enabled": bool(self._engines),
+            "slow_ms": self.slow_ms,
+            "slow_statements": self.slow_total,
+            "distinct_statements": len(self._statements),
+            "dropped": self.dropped,
+            "endpoints": endpoints,
+        }
+
+
+class IndexAdvisorMiddleware:
+    """ASGI middleware making the current request's route visible to the advisor."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Routing fills in scope["route"] later; the label is read lazily
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+_index_advisor: IndexAdvisor | None = None
+
+
+def get_index_advisor() -> IndexAdvisor | None:
+    """The process-wide advisor, or None unless database.index_advisor is on."""
+    global _index_advisor
+    if _index_advisor is None:
+        try:
+            from exstreamtv.config import get_config
+
+            db_config = get_config().database
+            if db_config.index_advisor:
+                _index_advisor = IndexAdvisor(slow_ms=db_config.index_advisor_slow_ms)
+        except Exception as e:
+            logger.debug(f"Database config unavailable, index advisor off: {e}")
+    return _index_advisor
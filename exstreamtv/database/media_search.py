@@ -0,0 +1,185 @@
+"""
+Ranked full-text search over media items.
+
+SQLite databases get an FTS5 index, ``media_items_fts``, over title,
+show_title, description and genres. It is an external-content table
+(the text stays in media_items only) kept current by AFTER INSERT /
+UPDATE / DELETE triggers, so imports, metadata refreshes and deletes
+never have to know about it. PostgreSQL matches the same columns through
+``to_tsvector`` (migration 008 adds the GIN expression index). Any other
+backend, or an SQLite build without FTS5, falls back to the previous
+``ILIKE '%term%'`` filter without ranking.
+
+User input is reduced to word tokens and each token is matched as a
+prefix, so "star wa" finds "Star Wars" while typing; whole-word hits rank
+higher. Unlike the ILIKE filter, a token only matches at the start of a
+word.
+"""
+
+import logging
+import re
+import weakref
+from typing import Any
+
+from sqlalchemy import Select, column, desc, func, literal_column, or_, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from exstreamtv.database.models.media import MediaItem
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "media_items_fts"
+FTS_COLUMNS = ("title", "show_title", "description", "genres")
+
+# bm25() column weights, in FTS_COLUMNS order: a title hit outranks the same
+# word in a description
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+MAX_TOKENS = 8
+
+_COLS = ", ".join(FTS_COLUMNS)
+_NEW = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_OLD = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_COLS}, content='media_items', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON media_items BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_COLS}) VALUES (new.id, {_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON media_items BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLS}) "
+    f"VALUES ('delete', old.id, {_OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_COLS} ON media_items "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLS}) "
+    f"VALUES ('delete', old.id, {_OLD}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_COLS}) VALUES (new.id, {_NEW}); END",
+]
+
+FTS_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# The PostgreSQL document; the GIN index in migration 008 is built on this
+# exact expression so the planner can use it
+PG_DOCUMENT_SQL = "to_tsvector('simple', " + " || ' ' || ".join(
+    f"coalesce(media_items.{c}, '')" for c in FTS_COLUMNS
+) + ")"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_ref = literal_column(FTS_TABLE)
+
+# Engines whose database has the FTS5 table (reader engines of a
+# read/write split share the writer's database)
+_fts_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+def _sync_engine(engine: Any) -> Engine:
+    return engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+
+
+def install_media_search(connection: Connection, *readers: Any) -> bool:
+    """
+    Create the FTS5 table and triggers on an SQLite connection.
+
+    Safe to run on every start: existing objects are kept, and the index
+    is only rebuilt from media_items when the table is new. Engines in
+    readers are marked as searchable too. Returns False when the backend
+    is not SQLite or the SQLite build lacks FTS5.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    try:
+        for statement in FTS_DDL:
+            connection.exec_driver_sql(statement)
+    except Exception as e:
+        logger.warning(f"SQLite FTS5 unavailable, media search falls back to LIKE: {e}")
+        return False
+    if not exists:
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        logger.info("Built media search index")
+    for engine in (connection.engine, *readers):
+        if engine is not None:
+            _fts_engines.add(_sync_engine(engine))
+    return True
+
+
+def search_backend(bind: Any) -> str:
+    """'fts5', 'tsvector' or 'like' for an engine (or session bind)."""
+    engine = _sync_engine(bind)
+    if engine.dialect.name == "postgresql":
+        return "tsvector"
+    if engine.dialect.name == "sqlite" and engine in _fts_engines:
+        return "fts5"
+    return "like"
+
+
+def search_tokens(query: str) -> list[str]:
+    """The word tokens of a user query (at most MAX_TOKENS)."""
+    return _TOKEN.findall(query.lower())[:MAX_TOKENS]
+
+
+def fts5_query(tokens: list[str]) -> str:
+    """
+    An FTS5 MATCH expression requiring every token as a word prefix.
+
+    Each token is also matched as a whole word, which bm25 counts again, so
+    "space" ranks "Space Patrol" above "Spacey Business".
+    """
+    return " AND ".join(f'("{token}" OR "{token}"*)' for token in tokens)
+
+
+def tsquery(tokens: list[str]) -> str:
+    """The to_tsquery() equivalent of fts5_query()."""
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def like_condition(query: str) -> Any:
+    """The unranked fallback filter."""
+    pattern = f"%{query}%"
+    return or_(
+        MediaItem.title.ilike(pattern),
+        MediaItem.description.ilike(pattern),
+        MediaItem.show_title.ilike(pattern),
+    )
+
+
+def apply_search(stmt: Select, query: str, bind: Any, ranked: bool = True) -> Select:
+    """
+    Filter a select over media_items to items matching query.
+
+    With ranked, best matches come first (bm25 on SQLite, ts_rank on
+    PostgreSQL); callers wanting another order add it afterwards, and
+    count statements pass ranked=False. Must be applied before the
+    statement's own order_by so relevance is the primary sort.
+    """
+    backend = search_backend(bind)
+    tokens = search_tokens(query)
+    if backend == "like" or not tokens:
+        return stmt.where(like_condition(query))
+
+    if backend == "fts5":
+        stmt = stmt.join(_fts, _fts.c.rowid == MediaItem.id).where(
+            _fts_ref.op("MATCH")(fts5_query(tokens))
+        )
+        if ranked:
+            stmt = stmt.order_by(func.bm25(_fts_ref, *BM25_WEIGHTS))
+        return stmt
+
+    document = literal_column(PG_DOCUMENT_SQL)
+    ts_query = func.to_tsquery("simple", tsquery(tokens))
+    stmt = stmt.where(document.op("@@")(ts_query))
+    if ranked:
+        stmt = stmt.order_by(desc(func.ts_rank(document, ts_query)))
+    return stmt
+
@@ -0,0 +1,75 @@
+"""Add composite indexes for the hot query shapes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+Indexes for the filters the streaming, EPG and media-browsing paths run
+constantly: playout items by (playout_id, start_time), the active playout
+of a channel, media items by library / source and title, import
+de-duplication lookups, and the playback position of a channel.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "007"
+down_revision: str | None = "006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# (index name, table, columns); mirrored by __table_args__ on the models
+INDEXES = [
+    ("ix_playout_items_playout_id_start_time", "playout_items", ["playout_id", "start_time"]),
+    ("ix_playouts_channel_id_is_active", "playouts", ["channel_id", "is_active"]),
+    ("ix_media_items_library_id_title", "media_items", ["library_id", "title"]),
+    ("ix_media_items_source_title", "media_items", ["source", "title"]),
+    ("ix_media_items_source_source_id", "media_items", ["source", "source_id"]),
+    ("ix_media_items_source_external_id", "media_items", ["source", "external_id"]),
+    ("ix_media_items_url", "media_items", ["url"]),
+    ("ix_media_items_media_type_show_title", "media_items", ["media_type", "show_title"]),
+]
+
+# channel_id is declared unique, which already indexes it; only databases
+# created without that constraint need this one
+POSITION_INDEX = (
+    "ix_channel_playback_positions_channel_id",
+    "channel_playback_positions",
+    ["channel_id"],
+)
+
+
+def _indexed_column_sets(inspector, table: str) -> list[list[str]]:
+    sets = [ix["column_names"] for ix in inspector.get_indexes(table)]
+    sets += [uc["column_names"] for uc in inspector.get_unique_constraints(table)]
+    return sets
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+
+    inspector = inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            continue
+        if name in {ix["name"] for ix in inspector.get_indexes(table)}:
+            continue
+        op.create_index(name, table, columns)
+
+    name, table, columns = POSITION_INDEX
+    if table in tables and columns not in _indexed_column_sets(inspector, table):
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    from sqlalchemy import inspect
+
+    inspector = inspect(op.get_bind())
+    for name, table, _ in [*INDEXES, POSITION_INDEX]:
+        if table in inspector.get_table_names() and name in {
+            ix["name"] for ix in inspector.get_indexes(table)
+        }:
+            op.drop_index(name, table_name=table)
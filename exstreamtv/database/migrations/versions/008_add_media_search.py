@@ -0,0 +1,87 @@
+"""Add full-text media search
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+SQLite: the media_items_fts FTS5 table over title, show_title,
+description and genres, its sync triggers, and an initial build from
+media_items. PostgreSQL: a GIN index on the to_tsvector() document the
+search queries match against. The SQL is spelled out here (not imported
+from exstreamtv/database/media_search.py) so later edits to that module
+never change this revision.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "008"
+down_revision: str | None = "007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS media_items_fts USING fts5("
+    "title, show_title, description, genres, content='media_items', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS media_items_fts_ai AFTER INSERT ON media_items BEGIN "
+    "INSERT INTO media_items_fts(rowid, title, show_title, description, genres) "
+    "VALUES (new.id, new.title, new.show_title, new.description, new.genres); END",
+    "CREATE TRIGGER IF NOT EXISTS media_items_fts_ad AFTER DELETE ON media_items BEGIN "
+    "INSERT INTO media_items_fts(media_items_fts, rowid, title, show_title, description, genres) "
+    "VALUES ('delete', old.id, old.title, old.show_title, old.description, old.genres); END",
+    "CREATE TRIGGER IF NOT EXISTS media_items_fts_au AFTER UPDATE OF "
+    "title, show_title, description, genres ON media_items BEGIN "
+    "INSERT INTO media_items_fts(media_items_fts, rowid, title, show_title, description, genres) "
+    "VALUES ('delete', old.id, old.title, old.show_title, old.description, old.genres); "
+    "INSERT INTO media_items_fts(rowid, title, show_title, description, genres) "
+    "VALUES (new.id, new.title, new.show_title, new.description, new.genres); END",
+]
+
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS media_items_fts_ai",
+    "DROP TRIGGER IF EXISTS media_items_fts_ad",
+    "DROP TRIGGER IF EXISTS media_items_fts_au",
+    "DROP TABLE IF EXISTS media_items_fts",
+]
+
+PG_INDEX = "ix_media_items_search_document"
+PG_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(media_items.title, '') || ' ' || "
+    "coalesce(media_items.show_title, '') || ' ' || "
+    "coalesce(media_items.description, '') || ' ' || "
+    "coalesce(media_items.genres, ''))"
+)
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        tables = set(inspect(bind).get_table_names())
+        if "media_items" not in tables:
+            return
+        try:
+            for statement in FTS_DDL:
+                bind.exec_driver_sql(statement)
+        except Exception:
+            # SQLite built without FTS5: search keeps using the LIKE fallback
+            return
+        if "media_items_fts" not in tables:
+            bind.exec_driver_sql("INSERT INTO media_items_fts(media_items_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == "postgresql":
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON media_items USING GIN ({PG_DOCUMENT_SQL})"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for statement in FTS_DROP:
+            op.execute(statement)
+    elif bind.dialect.name == "postgresql":
+        op.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
@@ -0,0 +1,48 @@
+"""Add indexes for keyset-paginated listings
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+Cursor pages resume from (sort key, id). These indexes let the
+unfiltered media listing (sorted by title) and collection item listings
+(sorted by position) start each page with an index seek; playout items
+already have ix_playout_items_playout_id_start_time from 007.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "009"
+down_revision: str | None = "008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# (index name, table, columns); mirrored by __table_args__ on the models
+INDEXES = [
+    ("ix_media_items_title", "media_items", ["title"]),
+    ("ix_playlist_items_playlist_id_position", "playlist_items", ["playlist_id", "position"]),
+]
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+
+    inspector = inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table in tables and name not in {ix["name"] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    from sqlalchemy import inspect
+
+    inspector = inspect(op.get_bind())
+    for name, table, _ in INDEXES:
+        if table in inspector.get_table_names() and name in {
+            ix["name"] for ix in inspector.get_indexes(table)
+        }:
+            op.drop_index(name, table_name=table)
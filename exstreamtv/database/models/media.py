@@ -9,7 +9,7 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from exstreamtv.database.models.base import Base, TimestampMixin
@@ -41,6 +41,19 @@ class MediaItem(Base, TimestampMixin):
     """
     
     __tablename__ = "media_items"
+    __table_args__ = (
+        # Library / source browsing, sorted by title
+        Index("ix_media_items_library_id_title", "library_id", "title"),
+        Index("ix_media_items_source_title", "source", "title"),
+        # Unfiltered listing sorted by title (keyset pagination)
+        Index("ix_media_items_title", "title"),
+        # Import de-duplication
+        Index("ix_media_items_source_source_id", "source", "source_id"),
+        Index("ix_media_items_source_external_id", "source", "external_id"),
+        Index("ix_media_items_url", "url"),
+        # Show listing (episodes grouped by show)
+        Index("ix_media_items_media_type_show_title", "media_type", "show_title"),
+    )
     
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -7,7 +7,7 @@ Compatible with ErsatzTV playlist structure.
 
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from exstreamtv.database.models.base import Base, TimestampMixin
@@ -117,6 +117,10 @@ class PlaylistItem(Base, TimestampMixin):
     """
     
     __tablename__ = "playlist_items"
+    __table_args__ = (
+        # Items of a playlist / collection in order (keyset pagination)
+        Index("ix_playlist_items_playlist_id_position", "playlist_id", "position"),
+    )
     
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -8,7 +8,7 @@ Core ErsatzTV feature: manages the continuous timeline for channels.
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Interval, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Interval, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from exstreamtv.database.models.base import Base, TimestampMixin
@@ -29,6 +29,10 @@ class Playout(Base, TimestampMixin):
     """
     
     __tablename__ = "playouts"
+    __table_args__ = (
+        # Active playout lookup per channel (ChannelStream, EPG loader)
+        Index("ix_playouts_channel_id_is_active", "channel_id", "is_active"),
+    )
     
     # Primary key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -165,6 +169,10 @@ class PlayoutItem(Base, TimestampMixin):
     """
     
     __tablename__ = "playout_items"
+    __table_args__ = (
+        # Items of a playout in time order / within a guide window
+        Index("ix_playout_items_playout_id_start_time", "playout_id", "start_time"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     playout_id: Mapped[int] = mapped_column(
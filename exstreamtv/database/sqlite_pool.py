@@ -0,0 +1,170 @@
+"""
+SQLite read/write split pooling.
+
+With ``database.sqlite_pool: read_write`` a SQLite database gets two
+engines instead of one StaticPool connection shared by the whole app:
+
+- a reader engine with ``database.sqlite_read_connections`` connections,
+  each opened with ``PRAGMA query_only`` (WAL lets them read while a write
+  is in progress)
+- a writer engine with exactly one connection, so mutating sessions are
+  serialized in the pool instead of colliding on SQLite's file lock
+
+ReadWriteSession routes each statement: SELECTs go to a reader until the
+session writes (flush, DML or a non-SELECT text statement); from then on,
+to the end of that transaction, everything uses the writer so the session
+reads its own uncommitted changes.
+
+In-memory databases cannot be shared between connections and always keep
+StaticPool.
+"""
+
+import logging
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+logger = logging.getLogger(__name__)
+
+SQLITE_POOL_STATIC = "static"
+SQLITE_POOL_READ_WRITE = "read_write"
+
+# Statements a query_only connection can run
+_READ_KEYWORDS = ("SELECT", "WITH", "EXPLAIN")
+
+# Per-connection settings; journal_mode=WAL is persistent, set by the writer
+_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def is_memory_url(url: str) -> bool:
+    """True for SQLite URLs that name a private in-memory database."""
+    return url.rstrip("/").endswith(":memory:") or url.rstrip("/").endswith("sqlite:")
+
+
+def use_read_write_split(url: str, mode: str) -> bool:
+    """Whether url should get a reader pool plus a single writer."""
+    return mode == SQLITE_POOL_READ_WRITE and "sqlite" in url and not is_memory_url(url)
+
+
+def _install_pragmas(engine: Engine, query_only: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        if not query_only:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        for pragma in _PRAGMAS:
+            cursor.execute(pragma)
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def _engine_kwargs(url: str, pool_size: int, timeout: float) -> dict[str, Any]:
+    # check_same_thread only applies to the sync pysqlite driver
+    connect_args = {} if "aiosqlite" in url else {"check_same_thread": False}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": 0,
+        "pool_timeout": timeout,
+        "connect_args": connect_args,
+    }
+
+
+def create_read_write_engines(
+    url: str,
+    *,
+    echo: bool = False,
+    read_connections: int = 4,
+    writer_timeout: float = 30.0,
+    is_async: bool = True,
+) -> tuple[Any, Any]:
+    """
+    Create (writer, reader) engines for one SQLite database file.
+
+    Returns AsyncEngines when is_async, else sync Engines.
+    """
+    factory = create_async_engine if is_async else create_engine
+    writer = factory(url, echo=echo, future=True, **_engine_kwargs(url, 1, writer_timeout))
+    reader = factory(
+        url,
+        echo=echo,
+        future=True,
+        **_engine_kwargs(url, read_connections, writer_timeout),
+    )
+    _install_pragmas(writer.sync_engine if is_async else writer, query_only=False)
+    _install_pragmas(reader.sync_engine if is_async else reader, query_only=True)
+    logger.info(
+        f"SQLite read/write split: {read_connections} query_only reader(s) + 1 writer"
+    )
+    return writer, reader
+
+
+def _is_write(clause: Any) -> bool:
+    if clause is None:
+        return False
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(_READ_KEYWORDS)
+    return bool(getattr(clause, "is_dml", False))
+
+
+class ReadWriteSession(Session):
+    """
+    Session bound to a reader and a writer engine.
+
+    Created through sessionmaker / async_sessionmaker(sync_session_class=...)
+    with ``reader=`` and ``writer=`` sync engines.
+    """
+
+    def __init__(self, *args: Any, reader: Engine, writer: Engine, **kw: Any):
+        kw.setdefault("bind", writer)
+        super().__init__(*args, **kw)
+        self._reader = reader
+        self._writer = writer
+        # Set by the first write; cleared when the transaction ends
+        self._writing = False
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:
+        if self._writing or self._flushing or _is_write(clause):
+            self._writing = True
+            return self._writer
+        return self._reader
+
+
+@event.listens_for(ReadWriteSession, "after_transaction_end")
+def _end_write(session: ReadWriteSession, transaction: Any) -> None:
+    if transaction.parent is None:
+        session._writing = False
+
+
+def read_write_session_kwargs(writer: Any, reader: Any) -> dict[str, Any]:
+    """sessionmaker / async_sessionmaker keyword arguments for a split pair."""
+    if isinstance(writer, AsyncEngine):
+        return {
+            "sync_session_class": ReadWriteSession,
+            "reader": reader.sync_engine,
+            "writer": writer.sync_engine,
+        }
+    return {"class_": ReadWriteSession, "reader": reader, "writer": writer}
+
+
+def pool_stats(engine: Any) -> dict[str, int]:
+    """size / checked_in / checked_out / overflow of an engine's pool."""
+    pool = (engine.sync_engine if isinstance(engine, AsyncEngine) else engine).pool
+    stats: dict[str, int] = {}
+    for key, attr in (
+        ("pool_size", "size"),
+        ("checked_in", "checkedin"),
+        ("checked_out", "checkedout"),
+        ("overflow", "overflow"),
+    ):
+        if hasattr(pool, attr):
+            stats[key] = getattr(pool, attr)()
+    return stats
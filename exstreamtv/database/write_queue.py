@@ -0,0 +1,290 @@
+"""
+Batched single-writer queue for small write transactions.
+
+Background paths (playout journal rows, playback position flushes) used to
+commit tiny transactions independently. On SQLite every commit is an fsync
+and concurrent commits collide on the file lock ("database is locked").
+
+WriteQueue funnels those writes through one writer thread. Callers submit a
+write intent, a callable taking a sync Session, from any coroutine or
+thread and get a future back. The writer collects intents for at most
+``database.write_batch_max_delay_ms`` after the oldest one arrived (or until
+``database.write_batch_max_size`` are waiting) and applies them in a single
+transaction with one commit.
+
+Each intent runs inside its own SAVEPOINT, so an intent that raises is
+rolled back alone and only its future gets the error; the rest of the batch
+still commits. If the commit itself fails, every intent of the batch fails.
+
+Intents must only touch the session they are given: they run on the
+writer thread, after submit() has returned.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_BATCH = 100
+DEFAULT_MAX_DELAY = 0.05  # seconds
+
+# Window for the commits/sec and intents/sec rates in get_stats()
+RATE_WINDOW_SECONDS = 60.0
+
+
+class WriteQueueClosed(RuntimeError):
+    """Raised by submit() when the write queue is not running."""
+
+
+@dataclass(slots=True)
+class _Intent:
+    fn: Callable[[Session], Any]
+    future: Future
+    enqueued: float
+    label: str
+
+
+def _begin_batch(session: Session) -> None:
+    """
+    Open the batch transaction explicitly on SQLite.
+
+    pysqlite only emits BEGIN before DML, so the first SAVEPOINT would start
+    the transaction itself and its RELEASE would commit the batch so far.
+    """
+    begin = text("BEGIN")
+    if session.get_bind(clause=begin).dialect.name == "sqlite":
+        session.execute(begin)
+
+
+class WriteQueue:
+    """
+    Single writer thread applying queued write intents in grouped transactions.
+
+    ``submit()`` is thread-safe and returns a concurrent.futures.Future;
+    ``submit_async()`` awaits the same from a coroutine.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ):
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay)
+        self._pending: deque[_Intent] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._session_factory: Callable[[], Session] | None = None
+
+        self._commits = 0
+        self._commit_errors = 0
+        self._intents = 0
+        self._intent_errors = 0
+        self._max_batch_seen = 0
+        self._last_batch_size = 0
+        self._last_commit_seconds: float | None = None
+        self._max_wait_seconds = 0.0
+        # (monotonic time, batch size) of recent commits, for the rates
+        self._recent: deque[tuple[float, int]] = deque()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopping
+
+    @property
+    def depth(self) -> int:
+        """Intents waiting for the writer."""
+        return len(self._pending)
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Start the writer thread."""
+        self._session_factory = session_factory
+        if self.is_running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="db-write-queue", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"DB write queue started (batches of up to {self.max_batch}, "
+            f"max delay {self.max_delay * 1000:g}ms)"
+        )
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Apply every queued intent, then stop the writer thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"DB write queue did not drain within {timeout:g}s")
+            return
+        self._thread = None
+        logger.info("DB write queue stopped")
+
+    def submit(self, fn: Callable[[Session], T], label: str = "") -> "Future[T]":
+        """
+        Queue a write intent; the future resolves to fn's return value.
+
+        Raises WriteQueueClosed if the queue is not running.
+        """
+        future: Future = Future()
+        with self._cond:
+            if not self.is_running:
+                raise WriteQueueClosed("DB write queue is not running")
+            self._pending.append(_Intent(fn, future, time.monotonic(), label))
+            self._cond.notify()
+        return future
+
+    async def submit_async(self, fn: Callable[[Session], T], label: str = "") -> T:
+        """Queue a write intent and wait for its transaction to commit."""
+        return await asyncio.wrap_future(self.submit(fn, label))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+                # Bounded latency: never hold the oldest intent past max_delay
+                deadline = self._pending[0].enqueued + self.max_delay
+                while len(self._pending) < self.max_batch and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                count = min(len(self._pending), self.max_batch)
+                batch = [self._pending.popleft() for _ in range(count)]
+            try:
+                self._apply(batch)
+            except Exception as e:  # keep the writer alive whatever happens
+                logger.error(f"DB write queue batch failed: {e}", exc_info=True)
+                for intent in batch:
+                    if not intent.future.done():
+                        intent.future.set_exception(e)
+
+    def _apply(self, batch: list[_Intent]) -> None:
+        intents = [i for i in batch if i.future.set_running_or_notify_cancel()]
+        if not intents:
+            return
+        started = time.monotonic()
+        self._max_wait_seconds = max(self._max_wait_seconds, started - intents[0].enqueued)
+
+        results: list[tuple[_Intent, Any]] = []
+        failed: list[tuple[_Intent, BaseException]] = []
+        session = self._session_factory()
+        try:
+            _begin_batch(session)
+            for intent in intents:
+                try:
+                    with session.begin_nested():
+                        value = intent.fn(session)
+                    results.append((intent, value))
+                except Exception as e:
+                    logger.warning(f"DB write intent {intent.label or intent.fn!r} failed: {e}")
+                    failed.append((intent, e))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self._commit_errors += 1
+            logger.error(f"DB write batch of {len(intents)} failed to commit: {e}")
+            failed.extend((intent, e) for intent, _ in results)
+            results = []
+        finally:
+            session.close()
+
+        now = time.monotonic()
+        if results:
+            self._commits += 1
+            self._recent.append((now, len(intents)))
+            while self._recent[0][0] < now - RATE_WINDOW_SECONDS:
+                self._recent.popleft()
+        self._intents += len(intents)
+        self._intent_errors += len(failed)
+        self._last_batch_size = len(intents)
+        self._max_batch_seen = max(self._max_batch_seen, len(intents))
+        self._last_commit_seconds = now - started
+        _record_batch_metrics(len(intents), len(failed), bool(results), self.depth)
+
+        for intent, value in results:
+            intent.future.set_result(value)
+        for intent, error in failed:
+            intent.future.set_exception(error)
+
+    def _rates(self) -> tuple[float, float]:
+        """(commits/sec, intents/sec) over the last RATE_WINDOW_SECONDS."""
+        cutoff = time.monotonic() - RATE_WINDOW_SECONDS
+        recent = [(t, n) for t, n in list(self._recent) if t >= cutoff]
+        return (
+            len(recent) / RATE_WINDOW_SECONDS,
+            sum(n for _, n in recent) / RATE_WINDOW_SECONDS,
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get queue statistics."""
+        commits_per_second, intents_per_second = self._rates()
+        return {
+            "running": self.is_running,
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+            "queue_depth": self.depth,
+            "commits": self._commits,
+            "commit_errors": self._commit_errors,
+            "intents": self._intents,
+            "intent_errors": self._intent_errors,
+            "commits_per_second": round(commits_per_second, 3),
+            "intents_per_second": round(intents_per_second, 3),
+            "avg_batch_size": round(self._intents / self._commits, 2) if self._commits else 0.0,
+            "last_batch_size": self._last_batch_size,
+            "max_batch_size": self._max_batch_seen,
+            "last_commit_seconds": self._last_commit_seconds,
+            "max_wait_seconds": self._max_wait_seconds,
+        }
+
+
+def _record_batch_metrics(size: int, errors: int, committed: bool, depth: int) -> None:
+    try:
+        from exstreamtv.monitoring.metrics import get_metrics_collector
+
+        get_metrics_collector().observe_db_write_batch(size, errors, committed, depth)
+    except Exception as e:
+        logger.debug(f"DB write queue metrics unavailable: {e}")
+
+
+_write_queue: WriteQueue | None = None
+
+
+def get_write_queue() -> WriteQueue:
+    """Get the process-wide DB write queue."""
+    global _write_queue
+    if _write_queue is None:
+        max_batch, max_delay = DEFAULT_MAX_BATCH, DEFAULT_MAX_DELAY
+        try:
+            from exstreamtv.config import get_config
+
+            db_config = get_config().database
+            max_batch = db_config.write_batch_max_size
+            max_delay = db_config.write_batch_max_delay_ms / 1000
+        except Exception as e:
+            logger.debug(f"Database config unavailable, using default write batching: {e}")
+        _write_queue = WriteQueue(max_batch=max_batch, max_delay=max_delay)
+    return _write_queue
+
@@ -73,6 +73,9 @@ from exstreamtv.ffmpeg.encoders import (
 # Pipeline
 from exstreamtv.ffmpeg.pipeline import FFmpegPipeline
 
+# Probe cache
+from exstreamtv.ffmpeg.probe_service import ProbeError, ProbeService, get_probe_service
+
 # Capabilities
 from exstreamtv.ffmpeg.capabilities import HardwareCapabilityDetector
 
@@ -145,6 +148,10 @@ __all__ = [
     "EncoderPcmS16Le",
     # Pipeline
     "FFmpegPipeline",
+    # Probe cache
+    "ProbeError",
+    "ProbeService",
+    "get_probe_service",
     # Capabilities
     "HardwareCapabilityDetector",
     # Stream pickers (Tunarr)
@@ -6,7 +6,6 @@ Ported from ErsatzTV with StreamTV bug fixes preserved.
 """
 
 import logging
-import subprocess
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -14,6 +13,7 @@ from typing import Optional
 from exstreamtv.config import get_config
 from exstreamtv.ffmpeg.capabilities import HardwareCapabilities, detect_hardware_acceleration
 from exstreamtv.ffmpeg.constants import FFLAGS_STREAMING, LOUDNORM_FILTER, PIX_FMT
+from exstreamtv.ffmpeg.probe_service import ProbeError, get_probe_service
 
 logger = logging.getLogger(__name__)
 
@@ -263,29 +263,11 @@ class FFmpegPipeline:
         config = get_config()
         
         try:
-            cmd = [
-                config.ffmpeg.ffprobe_path,
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                "-show_streams",
-                input_path,
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30,
+            # Shared persistent probe cache (see probe_service)
+            data = get_probe_service().probe_sync(
+                input_path, timeout=30, ffprobe_path=config.ffmpeg.ffprobe_path
             )
             
-            if result.returncode != 0:
-                logger.warning(f"ffprobe failed for {input_path}")
-                return None
-            
-            import json
-            data = json.loads(result.stdout)
-            
             info = StreamInfo(
                 path=input_path,
                 is_online=self._is_online_source(input_path),
@@ -311,6 +293,9 @@ class FFmpegPipeline:
             
             return info
             
+        except ProbeError as e:
+            logger.warning(f"ffprobe failed for {input_path}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Failed to probe {input_path}: {e}")
             return None
@@ -0,0 +1,507 @@
+"""
+Shared, persistent ffprobe result cache.
+
+Every probe call site (MPEGTSStreamer.probe_stream, FFprobeAnalyzer,
+FFmpegPipeline.probe, the duration validator and CacheManager's ffprobe
+helpers) goes through one ProbeService, which stores the raw ffprobe JSON
+(``-show_format -show_streams``); callers keep parsing it into their own
+types.
+
+Entries are content-addressed:
+
+- local files by (resolved path, size, mtime_ns), so a replaced or edited
+  file is re-probed and an unchanged one never is
+- remote inputs by normalized URL (lower-case scheme/host, default port and
+  fragment dropped, query sorted, credential parameters removed), expiring
+  after ``ffmpeg.probe_cache_remote_ttl_seconds``
+
+Results stored with ``put(..., ttl=...)`` expire after their own TTL.
+Keying a local file stats it, so ``probe()`` does that (and the disk
+lookup) in a worker thread rather than on the event loop.
+
+Results live in a bounded in-memory LRU in front of a SQLite file
+(``ffmpeg.probe_cache_file``), so channels restart without re-probing every
+item. Concurrent probes of the same key share one ffprobe run
+(single-flight); failed probes are not cached.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 4096
+DEFAULT_REMOTE_TTL = 86400
+
+# Query parameters that authenticate a request without changing the media
+CREDENTIAL_QUERY_PARAMS = frozenset(
+    {"x-plex-token", "access_token", "api_key", "apikey", "token"}
+)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class ProbeError(RuntimeError):
+    """ffprobe failed, timed out or produced unparseable output."""
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a remote input URL for cache keying."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in CREDENTIAL_QUERY_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def is_remote_source(source: str | Path) -> bool:
+    """Whether a probe input is a URL rather than a local file."""
+    text = str(source)
+    return "://" in text and not text.startswith("file://")
+
+
+def probe_cache_key(source: str | Path) -> tuple[str, bool] | None:
+    """
+    Cache key for a probe input and whether it is remote.
+
+    Returns None for local paths that cannot be stat'ed (nothing to key on).
+    Keying a local path touches the filesystem.
+    """
+    text = str(source)
+    if is_remote_source(text):
+        digest_of = "url:" + normalize_url(text)
+        remote = True
+    else:
+        path = Path(text[len("file://"):] if text.startswith("file://") else text)
+        try:
+            resolved = path.resolve()
+            st = resolved.stat()
+        except OSError:
+            return None
+        digest_of = f"file:{resolved}:{st.st_size}:{st.st_mtime_ns}"
+        remote = False
+    return hashlib.sha256(digest_of.encode()).hexdigest(), remote
+
+
+def _ffprobe_cmd(ffprobe_path: str, source: str) -> list[str]:
+    return [
+        ffprobe_path,
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        source,
+    ]
+
+
+def _parse_output(source: str, stdout: bytes | str) -> dict[str, Any]:
+    if isinstance(stdout, bytes):
+        stdout = stdout.decode("utf-8", errors="replace")
+    try:
+        data = json.loads(stdout)
+    except json.JSONDecodeError as e:
+        raise ProbeError(f"FFprobe output parse error for {source[:80]}: {e}") from e
+    if not isinstance(data, dict) or not (data.get("format") or data.get("streams")):
+        raise ProbeError(f"FFprobe returned no format or streams for {source[:80]}")
+    return data
+
+
+class _ProbeStore:
+    """SQLite table of probe results (thread-safe, one connection)."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS probes ("
+                " key TEXT PRIMARY KEY,"
+                " source TEXT NOT NULL,"
+                " remote INTEGER NOT NULL,"
+                " probed_at REAL NOT NULL,"
+                " data TEXT NOT NULL,"
+                " expires_at REAL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(probes)")}
+            if "expires_at" not in columns:
+                # Files written before per-entry TTLs
+                self._conn.execute("ALTER TABLE probes ADD COLUMN expires_at REAL")
+            self._conn.commit()
+
+    def get(self, key: str) -> tuple[float, dict[str, Any], float | None] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT probed_at, data, expires_at FROM probes WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+
+    def put(
+        self,
+        key: str,
+        source: str,
+        remote: bool,
+        probed_at: float,
+        data: dict,
+        expires_at: float | None = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO probes"
+                " (key, source, remote, probed_at, data, expires_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    source,
+                    int(remote),
+                    probed_at,
+                    json.dumps(data, separators=(",", ":")),
+                    expires_at,
+                ),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM probes WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ProbeService:
+    """
+    Content-addressed ffprobe cache with single-flight probing.
+
+    ``probe()`` / ``probe_sync()`` return the raw ffprobe JSON for a file
+    path or URL, running ffprobe only on a cache miss. Both raise ProbeError
+    when ffprobe fails.
+    """
+
+    def __init__(
+        self,
+        store_path: Path | None = None,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        remote_ttl: float = DEFAULT_REMOTE_TTL,
+        ffprobe_path: str = "ffprobe",
+    ):
+        self.ffprobe_path = ffprobe_path
+        self.remote_ttl = remote_ttl
+        self._memory_entries = memory_entries
+        # key -> (probed_at, remote, data, expires_at)
+        self._memory: OrderedDict[
+            str, tuple[float, bool, dict[str, Any], float | None]
+        ] = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._store: _ProbeStore | None = None
+        if store_path is not None:
+            try:
+                self._store = _ProbeStore(store_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"ffprobe cache {store_path} unavailable, memory only: {e}")
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._sync_inflight: dict[str, threading.Lock] = {}
+        self._sync_lock = threading.Lock()
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._probes_run = 0
+        self._errors = 0
+
+    # Cache
+
+    def _fresh(self, probed_at: float, remote: bool, expires_at: float | None = None) -> bool:
+        if expires_at is not None:
+            return time.time() < expires_at
+        return not remote or time.time() - probed_at < self.remote_ttl
+
+    def _remember(
+        self,
+        key: str,
+        probed_at: float,
+        remote: bool,
+        data: dict,
+        expires_at: float | None = None,
+    ) -> None:
+        with self._memory_lock:
+            self._memory[key] = (probed_at, remote, data, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, remote: bool) -> dict[str, Any] | None:
+        """Memory, then disk; stale remote entries count as misses."""
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is not None and self._fresh(entry[0], entry[1], entry[3]):
+            self._memory_hits += 1
+            return entry[2]
+        if self._store is not None:
+            try:
+                row = self._store.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"ffprobe cache read failed: {e}")
+                row = None
+            if row is not None and self._fresh(row[0], remote, row[2]):
+                self._disk_hits += 1
+                self._remember(key, row[0], remote, row[1], row[2])
+                return row[1]
+        return None
+
+    def _keyed_lookup(
+        self, source: str
+    ) -> tuple[tuple[str, bool] | None, dict[str, Any] | None]:
+        """Key an input and look it up (blocking: stats local files)."""
+        keyed = probe_cache_key(source)
+        return keyed, self._lookup(*keyed) if keyed else None
+
+    def _save(
+        self, key: str, source: str, remote: bool, data: dict, ttl: float | None = None
+    ) -> None:
+        probed_at = time.time()
+        expires_at = probed_at + ttl if ttl is not None else None
+        self._remember(key, probed_at, remote, data, expires_at)
+        if self._store is not None:
+            try:
+                self._store.put(key, source, remote, probed_at, data, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"ffprobe cache write failed: {e}")
+
+    def get_cached(self, source: str | Path) -> dict[str, Any] | None:
+        """Cached probe result for an input, without running ffprobe."""
+        keyed = probe_cache_key(source)
+        return self._lookup(*keyed) if keyed else None
+
+    def put(
+        self, source: str | Path, data: dict[str, Any], ttl: float | None = None
+    ) -> bool:
+        """
+        Store an externally obtained probe result for an input.
+
+        ttl (seconds) overrides the default expiry for this entry.
+        """
+        keyed = probe_cache_key(source)
+        if keyed is None:
+            return False
+        self._save(keyed[0], str(source), keyed[1], data, ttl)
+        return True
+
+    def invalidate(self, source: str | Path) -> None:
+        """Forget the cached result for an input."""
+        keyed = probe_cache_key(source)
+        if keyed is None:
+            return
+        with self._memory_lock:
+            self._memory.pop(keyed[0], None)
+        if self._store is not None:
+            self._store.delete(keyed[0])
+
+    # Probing
+
+    async def probe(
+        self,
+        source: str | Path,
+        timeout: float = 30.0,
+        ffprobe_path: str | None = None,
+    ) -> dict[str, Any]:
+        """Probe an input (file path or URL), using the cache when possible."""
+        source = str(source)
+        loop = asyncio.get_running_loop()
+        if is_remote_source(source):
+            # URL keys need no I/O; only a disk lookup leaves the loop
+            keyed = probe_cache_key(source)
+            with self._memory_lock:
+                in_memory = keyed[0] in self._memory
+            if in_memory or self._store is None:
+                cached = self._lookup(*keyed)
+            else:
+                cached = await loop.run_in_executor(None, self._lookup, *keyed)
+        else:
+            # resolve()/stat() can block for seconds on network mounts
+            keyed, cached = await loop.run_in_executor(None, self._keyed_lookup, source)
+        if keyed is None:
+            return await self._run(source, timeout, ffprobe_path)
+        if cached is not None:
+            return cached
+        key, remote = keyed
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            return await asyncio.shield(future)
+
+        self._misses += 1
+        future = asyncio.ensure_future(
+            self._probe_and_save(key, source, remote, timeout, ffprobe_path)
+        )
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _probe_and_save(
+        self, key: str, source: str, remote: bool, timeout: float, ffprobe_path: str | None
+    ) -> dict[str, Any]:
+        data = await self._run(source, timeout, ffprobe_path)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._save, key, source, remote, data
+        )
+        return data
+
+    async def _run(self, source: str, timeout: float, ffprobe_path: str | None) -> dict[str, Any]:
+        """Run ffprobe through the FFmpeg process manager."""
+        from exstreamtv.core.subprocess_safe import SafeAsyncSubprocess
+
+        self._probes_run += 1
+        try:
+            stdout, stderr, returncode = await SafeAsyncSubprocess.run(
+                *_ffprobe_cmd(ffprobe_path or self.ffprobe_path, source),
+                timeout=timeout,
+                name=f"ffprobe:{source[:60]}",
+            )
+        except TimeoutError as e:
+            self._errors += 1
+            raise ProbeError(f"FFprobe timeout for {source[:80]}") from e
+        except OSError as e:
+            self._errors += 1
+            raise ProbeError(f"FFprobe could not run: {e}") from e
+        if returncode != 0:
+            self._errors += 1
+            error = stderr.decode("utf-8", errors="replace").strip() or "Unknown error"
+            raise ProbeError(f"FFprobe failed: {error}")
+        try:
+            return _parse_output(source, stdout)
+        except ProbeError:
+            self._errors += 1
+            raise
+
+    def probe_sync(
+        self,
+        source: str | Path,
+        timeout: float = 30.0,
+        ffprobe_path: str | None = None,
+    ) -> dict[str, Any]:
+        """Blocking probe for synchronous callers (threads share one run per key)."""
+        source = str(source)
+        keyed = probe_cache_key(source)
+        if keyed is None:
+            return self._run_sync(source, timeout, ffprobe_path)
+        key, remote = keyed
+
+        cached = self._lookup(key, remote)
+        if cached is not None:
+            return cached
+        with self._sync_lock:
+            key_lock = self._sync_inflight.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                cached = self._lookup(key, remote)
+                if cached is not None:
+                    self._coalesced += 1
+                    return cached
+                self._misses += 1
+                data = self._run_sync(source, timeout, ffprobe_path)
+                self._save(key, source, remote, data)
+                return data
+        finally:
+            with self._sync_lock:
+                self._sync_inflight.pop(key, None)
+
+    def _run_sync(self, source: str, timeout: float, ffprobe_path: str | None) -> dict[str, Any]:
+        self._probes_run += 1
+        try:
+            result = subprocess.run(
+                _ffprobe_cmd(ffprobe_path or self.ffprobe_path, source),
+                capture_output=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired as e:
+            self._errors += 1
+            raise ProbeError(f"FFprobe timeout for {source[:80]}") from e
+        except OSError as e:
+            self._errors += 1
+            raise ProbeError(f"FFprobe could not run: {e}") from e
+        if result.returncode != 0:
+            self._errors += 1
+            raise ProbeError(f"FFprobe failed for {source[:80]}")
+        try:
+            return _parse_output(source, result.stdout)
+        except ProbeError:
+            self._errors += 1
+            raise
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get probe cache statistics."""
+        stats: dict[str, Any] = {
+            "memory_entries": len(self._memory),
+            "memory_hits": self._memory_hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "probes_run": self._probes_run,
+            "errors": self._errors,
+            "persistent": self._store is not None,
+        }
+        if self._store is not None:
+            try:
+                stats["disk_entries"] = self._store.count()
+            except sqlite3.Error:
+                pass
+        return stats
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+
+_probe_service: ProbeService | None = None
+
+
+def get_probe_service() -> ProbeService:
+    """Get the process-wide probe service."""
+    global _probe_service
+    if _probe_service is None:
+        kwargs: dict[str, Any] = {}
+        try:
+            from exstreamtv.config import get_config
+
+            ffmpeg = get_config().ffmpeg
+            kwargs = {
+                "store_path": Path(ffmpeg.probe_cache_file) if ffmpeg.probe_cache_file else None,
+                "memory_entries": ffmpeg.probe_cache_memory_entries,
+                "remote_ttl": ffmpeg.probe_cache_remote_ttl_seconds,
+                "ffprobe_path": ffmpeg.ffprobe_path,
+            }
+        except Exception as e:
+            logger.debug(f"FFmpeg config unavailable, probe cache is memory only: {e}")
+        _probe_service = ProbeService(**kwargs)
+    return _probe_service
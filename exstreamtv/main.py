@@ -43,6 +43,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Initialize database
     await init_db()
     logger.info("Database initialized")
+
+    # Start the batched DB write queue (single writer for small background writes)
+    if config.database.write_queue_enabled:
+        try:
+            from exstreamtv.database import get_sync_session_factory
+            from exstreamtv.database.write_queue import get_write_queue
+
+            get_write_queue().start(get_sync_session_factory())
+        except Exception as e:
+            logger.warning(f"DB write queue initialization failed (non-critical): {e}")
     
     # Initialize cache manager
     try:
@@ -100,15 +110,42 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning(f"ProcessPoolManager initialization failed (non-critical): {e}")
 
+    # Initialize session manager (Tunarr-style); before the channel manager
+    # so pre-warming can order channels by viewership history
+    try:
+        from exstreamtv.streaming.session_manager import init_session_manager
+        config = get_config()
+        session_manager = await init_session_manager(
+            max_sessions_per_channel=config.session_manager.max_sessions_per_channel,
+            idle_timeout=config.session_manager.idle_timeout_seconds,
+            history_file=Path(config.session_manager.viewership_history_file),
+            viewership_half_life=config.session_manager.viewership_half_life_hours * 3600,
+        )
+        app.state.session_manager = session_manager
+        logger.info("Session manager started")
+    except Exception as e:
+        logger.warning(f"Session manager initialization failed (non-critical): {e}")
+    
     # Initialize channel manager
     try:
         from exstreamtv.streaming.channel_manager import ChannelManager
         from exstreamtv.database import get_sync_session_factory
         db_session_factory = get_sync_session_factory()
-        app.state.channel_manager = ChannelManager(
-            db_session_factory=db_session_factory,
-            process_pool_manager=process_pool_manager,
-        )
+        sharding = get_config().streaming.sharding
+        if sharding.workers > 0:
+            from exstreamtv.streaming.channel_sharding import ShardedChannelManager
+
+            # Channels run in worker processes, each with its own process pool share
+            app.state.channel_manager = ShardedChannelManager(
+                db_session_factory=db_session_factory,
+                workers=sharding.workers,
+                socket_dir=sharding.socket_dir or None,
+            )
+        else:
+            app.state.channel_manager = ChannelManager(
+                db_session_factory=db_session_factory,
+                process_pool_manager=process_pool_manager,
+            )
         await app.state.channel_manager.start()
         logger.info("Channel manager started")
 
@@ -161,6 +198,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             except Exception as sl_e:
                 logger.debug("Streamlink session not available: %s", sl_e)
             app.state.event_bus = StreamEventBus()
+            from exstreamtv.streaming.playout_timeline import (
+                subscribe_timeline_invalidation,
+                watch_schedule_files,
+            )
+
+            subscribe_timeline_invalidation(app.state.event_bus)
+            app.state.schedule_watcher = watch_schedule_files()
+            from exstreamtv.patterns.cache.xmltv_fragments import (
+                get_xmltv_fragment_cache,
+                subscribe_xmltv_invalidation,
+            )
+
+            subscribe_xmltv_invalidation(app.state.event_bus, get_xmltv_fragment_cache())
             app.state.streamlink_session = streamlink_session
             app.state.url_resolver_chain = build_default_url_resolver_chain(
                 streamlink_session
@@ -170,10 +220,29 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             app.state.mediator = mediator
             logger.info("StreamEventBus, URL resolver chain, and StreamMediator ready")
 
+            from exstreamtv.api.iptv import build_xmltv_document
             from exstreamtv.patterns.cache.xmltv_cache import LazyXmltvCache
+            from exstreamtv.streaming.playout_timeline import timeline_generation
 
-            app.state.xmltv_cache = LazyXmltvCache(ttl_seconds=120.0)
-            logger.info("LazyXmltvCache registered on app.state (TTL=120s)")
+            epg_config = config.scheduling.epg
+            fragment_cache = get_xmltv_fragment_cache()
+            app.state.xmltv_cache = LazyXmltvCache(
+                ttl_seconds=epg_config.xmltv_cache_ttl_seconds,
+                refresh_ahead_seconds=epg_config.xmltv_refresh_ahead_seconds,
+                snapshot_path=(
+                    Path(epg_config.xmltv_snapshot_file) if epg_config.xmltv_snapshot_file else None
+                ),
+                builder=build_xmltv_document,
+                # Fragment invalidations and playout/schedule writes
+                version=lambda: (fragment_cache.generation, timeline_generation()),
+            )
+            await asyncio.to_thread(app.state.xmltv_cache.load_snapshot)
+            app.state.xmltv_cache.start()
+            logger.info(
+                "LazyXmltvCache registered on app.state (TTL=%ss, refresh ahead %ss)",
+                epg_config.xmltv_cache_ttl_seconds,
+                epg_config.xmltv_refresh_ahead_seconds,
+            )
         except Exception as e:
             logger.warning(f"Stream command queue initialization failed (non-critical): {e}")
 
@@ -203,19 +272,6 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning(f"Log lifecycle management initialization failed (non-critical): {e}")
     
-    # Initialize session manager (Tunarr-style)
-    try:
-        from exstreamtv.streaming.session_manager import init_session_manager
-        config = get_config()
-        session_manager = await init_session_manager(
-            max_sessions_per_channel=config.session_manager.max_sessions_per_channel,
-            idle_timeout=config.session_manager.idle_timeout_seconds,
-        )
-        app.state.session_manager = session_manager
-        logger.info("Session manager started")
-    except Exception as e:
-        logger.warning(f"Session manager initialization failed (non-critical): {e}")
-    
     # Initialize database backup manager
     try:
         from exstreamtv.database.backup import init_backup_manager, BackupConfig
@@ -370,7 +426,28 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.info("FFmpeg process pool stopped")
     except Exception as e:
         logger.warning(f"Error stopping FFmpeg pool: {e}")
-    
+
+    # Stop schedule file watcher
+    if getattr(app.state, "schedule_watcher", None) is not None:
+        try:
+            app.state.schedule_watcher.stop()
+        except Exception as e:
+            logger.warning(f"Error stopping schedule file watcher: {e}")
+
+    # Stop XMLTV background refresh
+    if getattr(app.state, "xmltv_cache", None) is not None:
+        try:
+            await app.state.xmltv_cache.stop()
+        except Exception as e:
+            logger.warning(f"Error stopping XMLTV cache refresh: {e}")
+
+    # Stop EPG build workers
+    try:
+        from exstreamtv.api.epg_build_pool import shutdown_epg_build_pool
+        shutdown_epg_build_pool()
+    except Exception as e:
+        logger.warning(f"Error stopping EPG build pool: {e}")
+
     # Stop task queue
     try:
         from exstreamtv.tasks import task_queue
@@ -387,6 +464,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning(f"Error stopping cache: {e}")
     
+    # Drain the DB write queue (after everything that submits to it has stopped)
+    try:
+        from exstreamtv.database.write_queue import get_write_queue
+        await asyncio.to_thread(get_write_queue().stop)
+    except Exception as e:
+        logger.warning(f"Error stopping DB write queue: {e}")
+
     # Close database connections
     try:
         from exstreamtv.database.connection import close_db
@@ -413,6 +497,13 @@ def create_app() -> FastAPI:
         redoc_url="/api/redoc",
     )
     
+    # Development-mode index advisor: attribute slow statements to routes
+    from exstreamtv.database.index_advisor import IndexAdvisorMiddleware, get_index_advisor
+
+    if get_index_advisor() is not None:
+        app.add_middleware(IndexAdvisorMiddleware)
+        logger.info("Index advisor enabled (GET /api/performance/index-advisor)")
+    
     # Get paths
     base_path = Path(__file__).parent
     templates_path = base_path / "templates"
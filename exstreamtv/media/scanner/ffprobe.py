@@ -4,8 +4,6 @@ FFprobe media analysis.
 Extracts detailed media information using FFprobe.
 """
 
-import asyncio
-import json
 import logging
 import shutil
 from dataclasses import dataclass, field
@@ -13,6 +11,8 @@ from datetime import timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from exstreamtv.ffmpeg.probe_service import get_probe_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -155,38 +155,12 @@ class FFprobeAnalyzer:
         Returns:
             MediaInfo with complete file analysis.
         """
-        cmd = [
-            self.ffprobe_path,
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            str(path),
-        ]
-
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout,
-            )
-
-            if process.returncode != 0:
-                error = stderr.decode("utf-8", errors="replace") if stderr else "Unknown error"
-                raise RuntimeError(f"FFprobe failed: {error}")
-
-            data = json.loads(stdout.decode("utf-8", errors="replace"))
-            return self._parse_result(path, data)
-
-        except asyncio.TimeoutError:
-            raise RuntimeError(f"FFprobe timeout for {path}")
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"FFprobe output parse error: {e}")
+        # Shared persistent probe cache: unchanged files are never re-probed.
+        # ProbeError is a RuntimeError (failure, timeout or parse error).
+        data = await get_probe_service().probe(
+            path, timeout=timeout, ffprobe_path=self.ffprobe_path
+        )
+        return self._parse_result(path, data)
 
     def _parse_result(self, path: Path, data: Dict[str, Any]) -> MediaInfo:
         """Parse FFprobe JSON output."""
@@ -13,6 +13,10 @@ def inc_timeline_rebuild() -> None:
     get_metrics_collector().inc_timeline_rebuild()
 
 
+def inc_timeline_validation_skipped() -> None:
+    get_metrics_collector().inc_timeline_validation_skipped()
+
+
 def inc_watchdog_interventions() -> None:
     get_metrics_collector().inc_watchdog_interventions()
 
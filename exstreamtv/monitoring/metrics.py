@@ -15,6 +15,9 @@ from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Histogram buckets for programme-boundary (item transition) latency
+TRANSITION_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
 
 @dataclass
 class MetricsCollector:
@@ -30,6 +33,7 @@ class MetricsCollector:
     ffmpeg_spawn_rejected_memory_total: int = 0
     ffmpeg_spawn_rejected_fd_total: int = 0
     ffmpeg_spawn_rejected_capacity_total: int = 0
+    ffmpeg_spawn_total: Dict[str, int] = field(default_factory=dict)
 
     # Per-channel
     channel_memory_bytes: Dict[str | int, int] = field(default_factory=dict)
@@ -37,6 +41,24 @@ class MetricsCollector:
     stream_success_total: Dict[str | int, int] = field(default_factory=dict)
     stream_failure_total: Dict[str | int, int] = field(default_factory=dict)
     circuit_breaker_state: Dict[str | int, str] = field(default_factory=dict)
+    channel_time_to_first_frame_seconds: Dict[str | int, float] = field(default_factory=dict)
+
+    # Client joins (time-to-first-frame summary)
+    time_to_first_frame_seconds_sum: float = 0.0
+    time_to_first_frame_count: int = 0
+    keyframe_join_total: int = 0
+    live_edge_join_total: int = 0
+
+    # Item transitions (per-channel latency histogram)
+    channel_transition_latency_buckets: Dict[str, list] = field(default_factory=dict)
+    channel_transition_latency_sum: Dict[str, float] = field(default_factory=dict)
+    channel_transition_latency_count: Dict[str, int] = field(default_factory=dict)
+    prerolled_transition_total: int = 0
+    cold_transition_total: int = 0
+
+    # Startup pre-warm
+    channel_prewarm_ready_seconds: Dict[str, float] = field(default_factory=dict)
+    prewarm_total: Dict[str, int] = field(default_factory=dict)
 
     # Stability
     pool_acquisition_latency_seconds: float = 0.0
@@ -48,6 +70,7 @@ class MetricsCollector:
     drift_delta_seconds: float = 0.0
     active_mismatch_total: int = 0
     timeline_rebuild_total: int = 0
+    timeline_validation_skipped_total: int = 0
     watchdog_interventions_total: int = 0
     xmltv_fallback_total: int = 0
     predictive_risk_score: int = 0
@@ -68,6 +91,15 @@ class MetricsCollector:
     db_pool_checked_out: int = 0
     db_pool_size: int = 0
 
+    # DB write queue
+    db_write_commits_total: int = 0
+    db_write_intents_total: int = 0
+    db_write_intent_errors_total: int = 0
+    db_write_batch_size_sum: int = 0
+    db_write_batch_count: int = 0
+    db_write_queue_depth: int = 0
+    db_write_commits_per_second: float = 0.0
+
     _lock: Optional[Any] = field(default=None, repr=False)
 
     def __post_init__(self) -> None:
@@ -112,6 +144,52 @@ class MetricsCollector:
         """Set circuit breaker state for channel."""
         self.circuit_breaker_state[str(channel_id)] = state
 
+    def inc_ffmpeg_spawn(self, kind: str) -> None:
+        """Count a subprocess spawn by kind (stream, ffprobe, ytdlp, concat, ...)."""
+        self.ffmpeg_spawn_total[kind] = self.ffmpeg_spawn_total.get(kind, 0) + 1
+
+    def observe_time_to_first_frame(
+        self, channel_id: str | int, seconds: float, keyframe_aligned: bool
+    ) -> None:
+        """Record a client's time-to-first-frame and how it joined."""
+        self.channel_time_to_first_frame_seconds[str(channel_id)] = seconds
+        self.time_to_first_frame_seconds_sum += seconds
+        self.time_to_first_frame_count += 1
+        if keyframe_aligned:
+            self.keyframe_join_total += 1
+        else:
+            self.live_edge_join_total += 1
+
+    def observe_transition_latency(
+        self, channel_id: str | int, seconds: float, prerolled: bool
+    ) -> None:
+        """Record the output gap between two playout items on a channel."""
+        key = str(channel_id)
+        buckets = self.channel_transition_latency_buckets.setdefault(
+            key, [0] * len(TRANSITION_LATENCY_BUCKETS)
+        )
+        for i, bound in enumerate(TRANSITION_LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        self.channel_transition_latency_sum[key] = (
+            self.channel_transition_latency_sum.get(key, 0.0) + seconds
+        )
+        self.channel_transition_latency_count[key] = (
+            self.channel_transition_latency_count.get(key, 0) + 1
+        )
+        if prerolled:
+            self.prerolled_transition_total += 1
+        else:
+            self.cold_transition_total += 1
+
+    def observe_prewarm(
+        self, channel_id: str | int, seconds: Optional[float], result: str
+    ) -> None:
+        """Record a pre-warm outcome (ready, timeout, failed, skipped) and time-to-ready."""
+        if seconds is not None:
+            self.channel_prewarm_ready_seconds[str(channel_id)] = seconds
+        self.prewarm_total[result] = self.prewarm_total.get(result, 0) + 1
+
     def set_pool_acquisition_latency(self, seconds: float) -> None:
         self.pool_acquisition_latency_seconds = seconds
 
@@ -133,6 +211,9 @@ class MetricsCollector:
     def inc_timeline_rebuild(self) -> None:
         self.timeline_rebuild_total += 1
 
+    def inc_timeline_validation_skipped(self) -> None:
+        self.timeline_validation_skipped_total += 1
+
     def inc_watchdog_interventions(self) -> None:
         self.watchdog_interventions_total += 1
 
@@ -169,6 +250,23 @@ class MetricsCollector:
         self.db_pool_checked_out = checked_out
         self.db_pool_size = size
 
+    def observe_db_write_batch(
+        self, size: int, errors: int, committed: bool, depth: int
+    ) -> None:
+        """Record one batch applied by the DB write queue."""
+        if committed:
+            self.db_write_commits_total += 1
+        self.db_write_intents_total += size
+        self.db_write_intent_errors_total += errors
+        self.db_write_batch_size_sum += size
+        self.db_write_batch_count += 1
+        self.db_write_queue_depth = depth
+
+    def set_db_write_queue(self, depth: int, commits_per_second: float) -> None:
+        """Set DB write queue depth and commit rate."""
+        self.db_write_queue_depth = depth
+        self.db_write_commits_per_second = commits_per_second
+
     def update_system_metrics(self) -> None:
         """Update system metrics (RSS, FD, event loop lag)."""
         try:
@@ -217,11 +315,21 @@ class MetricsCollector:
         counter("exstreamtv_ffmpeg_spawn_rejected_total", self.ffmpeg_spawn_rejected_memory_total, {"reason": "memory"})
         counter("exstreamtv_ffmpeg_spawn_rejected_total", self.ffmpeg_spawn_rejected_fd_total, {"reason": "fd"})
         counter("exstreamtv_ffmpeg_spawn_rejected_total", self.ffmpeg_spawn_rejected_capacity_total, {"reason": "capacity"})
+        for kind, val in self.ffmpeg_spawn_total.items():
+            counter("exstreamtv_ffmpeg_spawn_total", val, {"kind": kind})
         gauge("exstreamtv_system_rss_bytes", self.system_rss_bytes)
         gauge("exstreamtv_fd_usage", self.fd_usage)
         gauge("exstreamtv_event_loop_lag_seconds", self.event_loop_lag_seconds)
         gauge("exstreamtv_db_pool_checked_out", self.db_pool_checked_out)
         gauge("exstreamtv_db_pool_size", self.db_pool_size)
+        counter("exstreamtv_db_write_commits_total", self.db_write_commits_total)
+        counter("exstreamtv_db_write_intents_total", self.db_write_intents_total)
+        counter("exstreamtv_db_write_intent_errors_total", self.db_write_intent_errors_total)
+        gauge("exstreamtv_db_write_queue_depth", self.db_write_queue_depth)
+        gauge("exstreamtv_db_write_commits_per_second", self.db_write_commits_per_second)
+        lines.append("# TYPE exstreamtv_db_write_batch_size summary")
+        lines.append(f"exstreamtv_db_write_batch_size_sum {self.db_write_batch_size_sum}")
+        lines.append(f"exstreamtv_db_write_batch_size_count {self.db_write_batch_count}")
         gauge("exstreamtv_pool_acquisition_latency_seconds", self.pool_acquisition_latency_seconds)
         gauge("exstreamtv_restart_rate_per_minute", self.restart_rate_per_minute)
         counter("exstreamtv_health_timeouts_total", self.health_timeouts_total)
@@ -229,6 +337,10 @@ class MetricsCollector:
         gauge("exstreamtv_drift_delta_seconds", self.drift_delta_seconds)
         counter("exstreamtv_active_mismatch_total", self.active_mismatch_total)
         counter("exstreamtv_timeline_rebuild_total", self.timeline_rebuild_total)
+        counter(
+            "exstreamtv_timeline_validation_skipped_total",
+            self.timeline_validation_skipped_total,
+        )
         counter("exstreamtv_watchdog_interventions_total", self.watchdog_interventions_total)
         counter("exstreamtv_xmltv_fallback_total", self.xmltv_fallback_total)
         gauge("exstreamtv_predictive_risk_score", self.predictive_risk_score)
@@ -239,6 +351,31 @@ class MetricsCollector:
         counter("exstreamtv_smt_verified_total", self.smt_verified_total)
         counter("exstreamtv_smt_failed_total", self.smt_failed_total)
         counter("exstreamtv_smt_timeout_total", self.smt_timeout_total)
+        lines.append("# TYPE exstreamtv_time_to_first_frame_seconds summary")
+        lines.append(f"exstreamtv_time_to_first_frame_seconds_sum {self.time_to_first_frame_seconds_sum}")
+        lines.append(f"exstreamtv_time_to_first_frame_seconds_count {self.time_to_first_frame_count}")
+        counter("exstreamtv_client_join_total", self.keyframe_join_total, {"mode": "keyframe"})
+        counter("exstreamtv_client_join_total", self.live_edge_join_total, {"mode": "live_edge"})
+        counter("exstreamtv_item_transition_total", self.prerolled_transition_total, {"mode": "prerolled"})
+        counter("exstreamtv_item_transition_total", self.cold_transition_total, {"mode": "cold"})
+        if self.channel_transition_latency_buckets:
+            lines.append("# TYPE exstreamtv_channel_transition_latency_seconds histogram")
+        for ch_id, buckets in self.channel_transition_latency_buckets.items():
+            for bound, val in zip(TRANSITION_LATENCY_BUCKETS, buckets, strict=True):
+                lines.append(
+                    f'exstreamtv_channel_transition_latency_seconds_bucket{{channel_id="{ch_id}",le="{bound}"}} {val}'
+                )
+            count = self.channel_transition_latency_count.get(ch_id, 0)
+            lines.append(
+                f'exstreamtv_channel_transition_latency_seconds_bucket{{channel_id="{ch_id}",le="+Inf"}} {count}'
+            )
+            lines.append(
+                f'exstreamtv_channel_transition_latency_seconds_sum{{channel_id="{ch_id}"}} '
+                f"{self.channel_transition_latency_sum.get(ch_id, 0.0)}"
+            )
+            lines.append(
+                f'exstreamtv_channel_transition_latency_seconds_count{{channel_id="{ch_id}"}} {count}'
+            )
         _state_val = {"closed": 0, "half_open": 1, "open": 2}
         for ch_id, state in self.circuit_breaker_state.items():
             gauge("exstreamtv_circuit_breaker_state", _state_val.get(state, -1), {"channel_id": str(ch_id)})
@@ -251,6 +388,12 @@ class MetricsCollector:
             counter("exstreamtv_stream_failure_total", val, {"channel_id": str(ch_id)})
         for ch_id, val in self.channel_memory_bytes.items():
             gauge("exstreamtv_channel_memory_bytes", val, {"channel_id": str(ch_id)})
+        for ch_id, val in self.channel_time_to_first_frame_seconds.items():
+            gauge("exstreamtv_channel_time_to_first_frame_seconds", val, {"channel_id": str(ch_id)})
+        for ch_id, val in self.channel_prewarm_ready_seconds.items():
+            gauge("exstreamtv_channel_prewarm_ready_seconds", val, {"channel_id": ch_id})
+        for result, val in self.prewarm_total.items():
+            counter("exstreamtv_prewarm_total", val, {"result": result})
 
         return "\n".join(lines) + "\n"
 
@@ -2,7 +2,7 @@
 Prometheus metrics exporter for EXStreamTV.
 
 Exposes GET /metrics endpoint in Prometheus text exposition format.
-Integrates ProcessPoolManager, MetricsCollector, and DB connection pool.
+Integrates ProcessPoolManager, MetricsCollector, DB connection pool and write queue.
 """
 
 import asyncio
@@ -77,6 +77,16 @@ def create_prometheus_router(
             except Exception as e:
                 logger.debug(f"DB metrics error: {e}")
 
+        # DB write queue depth and commit rate
+        if mc:
+            try:
+                from exstreamtv.database.write_queue import get_write_queue
+
+                wq = get_write_queue().get_stats()
+                mc.set_db_write_queue(wq["queue_depth"], wq["commits_per_second"])
+            except Exception as e:
+                logger.debug(f"DB write queue metrics error: {e}")
+
         # Event loop lag (simple measurement)
         if mc:
             t0 = time.monotonic()
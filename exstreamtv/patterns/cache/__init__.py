@@ -1,3 +1,18 @@
+from exstreamtv.patterns.cache.encoded_body import EncodedBody, negotiate_encoding
+from exstreamtv.patterns.cache.programme_index import ProgrammeIndex
 from exstreamtv.patterns.cache.xmltv_cache import LazyXmltvCache
+from exstreamtv.patterns.cache.xmltv_fragments import (
+    XmltvFragmentCache,
+    get_xmltv_fragment_cache,
+    subscribe_xmltv_invalidation,
+)
 
-__all__ = ["LazyXmltvCache"]
+__all__ = [
+    "EncodedBody",
+    "LazyXmltvCache",
+    "ProgrammeIndex",
+    "XmltvFragmentCache",
+    "get_xmltv_fragment_cache",
+    "negotiate_encoding",
+    "subscribe_xmltv_invalidation",
+]
@@ -0,0 +1,152 @@
+"""
+Precompressed response bodies with strong ETags.
+
+Documents that are polled far more often than they change (the XMLTV
+guide, the M3U lineup) are encoded once when they are built: the raw
+bytes, gzip, and brotli / zstd when those optional packages are installed,
+plus a SHA-256 content hash. Serving is then a lookup: If-None-Match is
+answered with 304 from the hash alone and Accept-Encoding picks one of the
+stored variants, so no request compresses or hashes the body again.
+"""
+
+import gzip
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from fastapi import Request, Response
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # optional: pip install zstandard
+except ImportError:
+    zstandard = None
+
+# Spent once per build, not per request, so these lean towards ratio
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 7
+ZSTD_LEVEL = 12
+
+# Server preference among encodings the client accepts with equal q
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Content codings this process can produce, in preference order."""
+    return tuple(
+        coding
+        for coding in ENCODING_PREFERENCE
+        if coding == "gzip"
+        or (coding == "br" and brotli is not None)
+        or (coding == "zstd" and zstandard is not None)
+    )
+
+
+def _encode(raw: bytes, coding: str) -> bytes:
+    if coding == "gzip":
+        # mtime=0 keeps the output, and so its ETag, stable across rebuilds
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    if coding == "br":
+        return brotli.compress(raw, quality=BROTLI_QUALITY)
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    raise ValueError(f"Unsupported content coding: {coding}")
+
+
+def negotiate_encoding(accept_encoding: str | None, available: Iterable[str]) -> str | None:
+    """
+    Pick a stored coding for an Accept-Encoding header; None means identity.
+
+    The highest q-value wins; ties go to ENCODING_PREFERENCE order. ``*``
+    covers codings the header does not name; q=0 excludes a coding.
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for token in accept_encoding.split(","):
+        coding, _, params = token.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in ENCODING_PREFERENCE:
+        if coding not in available:
+            continue
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedBody:
+    """A document's raw bytes, its precompressed variants and content hash."""
+
+    raw: bytes
+    digest: str
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: str | bytes, encodings: Iterable[str] | None = None) -> "EncodedBody":
+        """Encode and hash once; CPU-bound, so run large bodies in a thread."""
+        raw = body.encode("utf-8") if isinstance(body, str) else body
+        codings = available_encodings() if encodings is None else tuple(encodings)
+        return cls(
+            raw=raw,
+            digest=hashlib.sha256(raw).hexdigest()[:32],
+            variants={coding: _encode(raw, coding) for coding in codings},
+        )
+
+    def etag(self, coding: str | None = None) -> str:
+        """Strong ETag; each content coding is its own representation."""
+        return f'"{self.digest}"' if coding is None else f'"{self.digest}-{coding}"'
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """True when If-None-Match names this document in any coding (or ``*``)."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').partition("-")[0] == self.digest:
+                return True
+        return False
+
+    def response(
+        self,
+        request: Request | None,
+        media_type: str,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """304 or the stored variant the client accepts, without re-encoding."""
+        headers_in = request.headers if request is not None else {}
+        coding = negotiate_encoding(headers_in.get("accept-encoding"), self.variants)
+        out_headers = {**(headers or {}), "ETag": self.etag(coding), "Vary": "Accept-Encoding"}
+        if self.matches(headers_in.get("if-none-match")):
+            return Response(status_code=304, headers=out_headers)
+        if coding is not None:
+            out_headers["Content-Encoding"] = coding
+        return Response(
+            content=self.raw if coding is None else self.variants[coding],
+            media_type=media_type,
+            headers=out_headers,
+        )
+
+    def sizes(self) -> dict[str, int]:
+        return {"identity": len(self.raw), **{c: len(v) for c, v in self.variants.items()}}
@@ -0,0 +1,59 @@
+"""
+Per-channel programme interval index.
+
+A channel's programmes never overlap (TimelineBuilder guarantees
+``stop[i] == start[i + 1]``), so the programmes airing in a window are one
+contiguous run of the sorted arrays: two bisects find it. Entries are
+rendered to JSON-ready dicts when the index is built, in the EPG build
+worker, so a window query only slices.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class ProgrammeIndex:
+    """Sorted start/stop epoch arrays plus one read-only entry dict per programme."""
+
+    starts: tuple[float, ...] = ()
+    stops: tuple[float, ...] = ()
+    entries: tuple[dict[str, Any], ...] = ()
+
+    @classmethod
+    def from_programmes(
+        cls, programmes: Iterable[tuple[datetime, datetime, str]]
+    ) -> ProgrammeIndex:
+        rows = sorted(programmes, key=lambda p: p[0])
+        return cls(
+            starts=tuple(start.timestamp() for start, _, _ in rows),
+            stops=tuple(stop.timestamp() for _, stop, _ in rows),
+            entries=tuple(
+                {"start": start.isoformat(), "stop": stop.isoformat(), "title": title}
+                for start, stop, title in rows
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def window(self, start: float, end: float) -> list[dict[str, Any]]:
+        """Programmes overlapping [start, end), as epoch seconds."""
+        lo = bisect_right(self.stops, start)
+        hi = bisect_left(self.starts, end, lo)
+        return list(self.entries[lo:hi])
+
+    def at(self, when: float) -> dict[str, Any] | None:
+        """The programme airing at ``when``, if any."""
+        i = bisect_right(self.starts, when) - 1
+        if i >= 0 and when < self.stops[i]:
+            return self.entries[i]
+        return None
+
+
+EMPTY_INDEX = ProgrammeIndex()
@@ -1,57 +1,466 @@
+"""
+Whole-document XMLTV cache with stale-while-revalidate.
+
+Once any guide exists, a request never waits on a rebuild: a fresh
+document is served as is, a stale one (past the TTL, or built before the
+guide's version moved on) is served immediately while a single
+background task rebuilds it. A refresh-ahead loop rebuilds shortly before
+the TTL runs out, so steady-state requests always find a fresh document.
+
+Documents are kept per base_url (icon and stream URLs embed it), up to
+MAX_DOCUMENTS, so clients reaching the server under different addresses
+each keep their own guide instead of evicting each other's.
+
+The last good document of the primary base_url (the first one built, or
+the one restored from disk) is also written to disk; on a cold start it
+is loaded and served (as stale) until the first rebuild finishes. Each
+document is precompressed and hashed once, off the event loop
+(EncodedBody), so serving it never re-encodes the body.
+"""
+
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
-from collections.abc import Awaitable, Callable
+import os
+import tempfile
+from collections import OrderedDict
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+)
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from exstreamtv.patterns.cache.encoded_body import EncodedBody
 
 logger = logging.getLogger(__name__)
 
+# Floor for the refresh-ahead loop's sleep, and wait after a failed rebuild
+_MIN_REFRESH_DELAY = 1.0
+_RETRY_DELAY = 60.0
+
+# Documents kept at once (distinct base URLs)
+MAX_DOCUMENTS = 4
+
+# Background builder: base_url -> whole XMLTV document
+XmltvBuilder = Callable[[str], Awaitable[str]]
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+@dataclass
+class _Document:
+    body: str
+    loaded_at: datetime
+    version: Hashable | None = None
+    encoded: EncodedBody | None = None
+
 
 class LazyXmltvCache:
-    """TTL XMLTV body cache with optional per-request async builder."""
+    """TTL XMLTV body cache with background refresh and an on-disk last-known-good copy."""
 
-    def __init__(self, ttl_seconds: float = 300.0) -> None:
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        refresh_ahead_seconds: float = 0.0,
+        snapshot_path: Path | None = None,
+        builder: XmltvBuilder | None = None,
+        version: Callable[[], Hashable] | None = None,
+        max_documents: int = MAX_DOCUMENTS,
+    ) -> None:
         self._ttl = timedelta(seconds=ttl_seconds)
         self.ttl_seconds = float(ttl_seconds)
-        self._cached: str | None = None
-        self._loaded_at: datetime | None = None
+        self.refresh_ahead_seconds = min(float(refresh_ahead_seconds), self.ttl_seconds)
+        self.snapshot_path = snapshot_path
+        self._builder = builder
+        self._version_fn = version
+        self._max_documents = max(1, max_documents)
+        # base_url -> document, least recently stored first
+        self._documents: OrderedDict[str | None, _Document] = OrderedDict()
+        # Default base_url for refresh() and the one snapshotted to disk
+        self._base_url: str | None = None
+        # Bumped by invalidate(); builds started before it are discarded
+        self._epoch = 0
         self._lock = asyncio.Lock()
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
+        self._ahead_task: asyncio.Task | None = None
+        self._snapshot_task: asyncio.Task | None = None
+        self._encode_tasks: set[asyncio.Task] = set()
+        self._snapshot_lock = asyncio.Lock()
+        self._retry_at: datetime | None = None
+        self._refreshes = 0
+        self._refresh_failures = 0
+        self._stale_served = 0
 
     def invalidate(self) -> None:
-        self._loaded_at = None
-        self._cached = None
+        self._documents.clear()
+        self._epoch += 1
+        for task in self._refresh_tasks.values():
+            task.cancel()
+        self._refresh_tasks.clear()
         logger.debug("XMLTV cache invalidated")
 
-    def _is_stale(self) -> bool:
-        if self._cached is None or self._loaded_at is None:
+    def current_version(self) -> Hashable | None:
+        """The version a document built now should be stored with."""
+        return self._version_fn() if self._version_fn is not None else None
+
+    def _document(self, base_url: str | None = None) -> _Document | None:
+        if base_url is None:
+            base_url = self._base_url
+        return self._documents.get(base_url)
+
+    def _is_stale(self, document: _Document | None) -> bool:
+        if document is None:
+            return True
+        if self._version_fn is not None and document.version != self._version_fn():
             return True
-        return datetime.now(tz=timezone.utc) - self._loaded_at > self._ttl
+        return datetime.now(tz=timezone.utc) - document.loaded_at > self._ttl
 
-    async def peek_fresh(self) -> str | None:
+    def age_seconds(self, base_url: str | None = None) -> float | None:
+        document = self._document(base_url)
+        if document is None:
+            return None
+        return (datetime.now(tz=timezone.utc) - document.loaded_at).total_seconds()
+
+    async def peek_fresh(self, base_url: str | None = None) -> str | None:
         async with self._lock:
-            if not self._is_stale() and self._cached is not None:
-                return self._cached
+            document = self._document(base_url)
+            if not self._is_stale(document):
+                return document.body
+            return None
+
+    def lookup(self, base_url: str | None = None) -> tuple[str, bool] | None:
+        """
+        Servable document and whether it is fresh.
+
+        A stale document is still returned (stale-while-revalidate); None
+        means there is nothing to serve for this base_url.
+        """
+        document = self._document(base_url)
+        if document is None:
             return None
+        fresh = not self._is_stale(document)
+        if not fresh:
+            self._stale_served += 1
+        return document.body, fresh
+
+    def store(
+        self,
+        xml_body: str,
+        base_url: str | None = None,
+        version: Hashable | None = None,
+        epoch: int | None = None,
+        encoded: EncodedBody | None = None,
+    ) -> bool:
+        """
+        Keep a newly built document; False if an invalidate() happened meanwhile.
+
+        Without ``encoded`` the variants are built in a background thread;
+        until then responses fall back to streaming compression.
+        """
+        if epoch is not None and epoch != self._epoch:
+            return False
+        if base_url is None:
+            base_url = self._base_url
+        if self._base_url is None:
+            self._base_url = base_url
+        document = _Document(
+            body=xml_body,
+            loaded_at=datetime.now(tz=timezone.utc),
+            version=version,
+            encoded=encoded,
+        )
+        self._documents.pop(base_url, None)
+        self._documents[base_url] = document
+        while len(self._documents) > self._max_documents:
+            oldest = next(k for k in self._documents if k != self._base_url)
+            del self._documents[oldest]
+        self._retry_at = None
+        if encoded is None:
+            self._start_encode(document)
+        if base_url == self._base_url:
+            self._save_snapshot()
+        return True
+
+    def encoded(self, base_url: str | None = None) -> EncodedBody | None:
+        """Precompressed variants of a base_url's document, once built."""
+        document = self._document(base_url)
+        return document.encoded if document is not None else None
+
+    def _start_encode(self, document: _Document) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            document.encoded = EncodedBody.build(document.body)
+            return
+        task = asyncio.create_task(self._encode(document))
+        self._encode_tasks.add(task)
+        task.add_done_callback(self._encode_tasks.discard)
 
-    async def prime(self, xml_body: str) -> None:
+    async def _encode(self, document: _Document) -> None:
+        document.encoded = await asyncio.to_thread(EncodedBody.build, document.body)
+
+    async def prime(
+        self, xml_body: str, base_url: str | None = None, version: Hashable | None = None
+    ) -> None:
         async with self._lock:
-            self._cached = xml_body
-            self._loaded_at = datetime.now(tz=timezone.utc)
+            self.store(xml_body, base_url=base_url, version=version)
+
+    def capture(
+        self,
+        pieces: Iterable[str] | AsyncIterable[str],
+        base_url: str,
+        version: Hashable | None = None,
+    ) -> Iterator[str] | AsyncIterator[str]:
+        """
+        Pass a streamed document through, storing it once it was fully produced.
+
+        A plain iterable may be drained in a worker thread; the store is then
+        handed back to the event loop capture() was called on.
+        """
+        if isinstance(pieces, AsyncIterable):
+            return self._capture_async(pieces, base_url, version)
+        return self._capture(pieces, base_url, version, _running_loop())
+
+    def _capture(
+        self,
+        pieces: Iterable[str],
+        base_url: str,
+        version: Hashable | None,
+        loop: asyncio.AbstractEventLoop | None,
+    ) -> Iterator[str]:
+        epoch = self._epoch
+        parts: list[str] = []
+        for piece in pieces:
+            parts.append(piece)
+            yield piece
+        store = partial(self.store, "".join(parts), base_url=base_url, version=version, epoch=epoch)
+        if loop is None or loop is _running_loop():
+            store()
+        else:
+            loop.call_soon_threadsafe(store)
+
+    async def _capture_async(
+        self, pieces: AsyncIterable[str], base_url: str, version: Hashable | None
+    ) -> AsyncIterator[str]:
+        epoch = self._epoch
+        parts: list[str] = []
+        async for piece in pieces:
+            parts.append(piece)
+            yield piece
+        self.store("".join(parts), base_url=base_url, version=version, epoch=epoch)
 
     async def get_xml(self, builder: Callable[[], Awaitable[str]]) -> str:
-        if not self._is_stale() and self._cached is not None:
-            return self._cached
+        document = self._document()
+        if not self._is_stale(document):
+            return document.body
         async with self._lock:
-            if not self._is_stale() and self._cached is not None:
-                return self._cached
+            document = self._document()
+            if not self._is_stale(document):
+                return document.body
             logger.debug("XMLTV cache miss — rebuilding via builder")
             try:
-                self._cached = await builder()
-                self._loaded_at = datetime.now(tz=timezone.utc)
+                xml_body = await builder()
             except Exception as e:
                 logger.error("LazyXmltvCache builder failed: %s", e, exc_info=True)
-                if self._cached is not None:
-                    return self._cached
+                if document is not None:
+                    return document.body
                 raise
-            return self._cached
+            self.store(xml_body, version=self.current_version())
+            return xml_body
+
+    # ---------------------------------------------------------------- refresh
+
+    def refresh(self, base_url: str | None = None) -> asyncio.Task | None:
+        """
+        Start a background rebuild of a base_url's guide unless one is running.
+
+        Returns the running task, or None without a builder or a known base_url,
+        or while backing off after a failed rebuild.
+        """
+        base_url = base_url or self._base_url
+        if self._builder is None or base_url is None:
+            return None
+        task = self._refresh_tasks.get(base_url)
+        if task is not None and not task.done():
+            return task
+        if self._retry_at is not None and datetime.now(tz=timezone.utc) < self._retry_at:
+            return None
+        task = asyncio.create_task(self._run_refresh(base_url))
+        self._refresh_tasks[base_url] = task
+        return task
+
+    async def _run_refresh(self, base_url: str) -> None:
+        epoch = self._epoch
+        # Read before building, so changes made during the build leave it stale
+        version = self.current_version()
+        try:
+            xml_body = await self._builder(base_url)
+            encoded = await asyncio.to_thread(EncodedBody.build, xml_body)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._refresh_failures += 1
+            self._retry_at = datetime.now(tz=timezone.utc) + timedelta(seconds=_RETRY_DELAY)
+            logger.error(
+                "XMLTV background refresh failed; serving last good guide: %s", e, exc_info=True
+            )
+            return
+        if self.store(xml_body, base_url=base_url, version=version, epoch=epoch, encoded=encoded):
+            self._refreshes += 1
+            logger.debug("XMLTV guide refreshed in background (%d bytes)", len(xml_body))
+
+    def _seconds_until_refresh(self, document: _Document) -> float:
+        if self._is_stale(document):
+            return 0.0
+        due = document.loaded_at + self._ttl - timedelta(seconds=self.refresh_ahead_seconds)
+        return (due - datetime.now(tz=timezone.utc)).total_seconds()
+
+    def _next_refresh_delay(self) -> float:
+        now = datetime.now(tz=timezone.utc)
+        if self._retry_at is not None and now < self._retry_at:
+            return (self._retry_at - now).total_seconds()
+        if not self._documents:
+            # Nothing to refresh yet; the first request builds it
+            return self.ttl_seconds
+        return min(self._seconds_until_refresh(d) for d in self._documents.values())
+
+    async def _refresh_ahead_loop(self) -> None:
+        while True:
+            await asyncio.sleep(max(_MIN_REFRESH_DELAY, self._next_refresh_delay()))
+            if self._next_refresh_delay() > 0:
+                continue
+            due = [
+                base_url
+                for base_url, document in list(self._documents.items())
+                if base_url is not None and self._seconds_until_refresh(document) <= 0
+            ]
+            tasks = [task for task in map(self.refresh, due) if task is not None]
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def start(self) -> None:
+        """Start the refresh-ahead loop (needs a builder and refresh_ahead_seconds > 0)."""
+        if self._ahead_task is None and self._builder is not None and self.refresh_ahead_seconds > 0:
+            self._ahead_task = asyncio.create_task(self._refresh_ahead_loop())
+
+    async def stop(self) -> None:
+        tasks = [
+            t
+            for t in (self._ahead_task, *self._refresh_tasks.values(), *self._encode_tasks)
+            if t is not None
+        ]
+        self._ahead_task = None
+        self._refresh_tasks.clear()
+        self._encode_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._snapshot_task is not None:
+            # Let the last snapshot finish writing
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+
+    # --------------------------------------------------------------- snapshot
+
+    def _meta_path(self) -> Path:
+        return self.snapshot_path.with_name(self.snapshot_path.name + ".json")
+
+    def _save_snapshot(self) -> None:
+        document = self._document()
+        if self.snapshot_path is None or document is None:
+            return
+        xml_body = document.body
+        meta = {
+            "base_url": self._base_url,
+            "built_at": document.loaded_at.isoformat(),
+            "bytes": len(xml_body.encode("utf-8")),
+        }
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_snapshot(xml_body, meta)
+            return
+        self._snapshot_task = asyncio.create_task(self._write_snapshot_async(xml_body, meta))
+
+    async def _write_snapshot_async(self, xml_body: str, meta: dict[str, Any]) -> None:
+        # The lock is FIFO, so snapshots land on disk in build order
+        async with self._snapshot_lock:
+            await asyncio.to_thread(self._write_snapshot, xml_body, meta)
+
+    def _write_snapshot(self, xml_body: str, meta: dict[str, Any]) -> None:
+        path = self.snapshot_path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for target, data in ((path, xml_body), (self._meta_path(), json.dumps(meta))):
+                fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{target.name}.")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(data)
+                    os.replace(tmp, target)
+                except BaseException:
+                    Path(tmp).unlink(missing_ok=True)
+                    raise
+        except OSError as e:
+            logger.warning("Could not write XMLTV snapshot %s: %s", path, e)
+
+    def load_snapshot(self) -> bool:
+        """Load the last good guide from disk (served as stale until rebuilt)."""
+        if self.snapshot_path is None or self._documents:
+            return False
+        try:
+            meta = json.loads(self._meta_path().read_text(encoding="utf-8"))
+            xml_body = self.snapshot_path.read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            return False
+        if len(xml_body.encode("utf-8")) != meta.get("bytes"):
+            logger.warning("XMLTV snapshot %s is incomplete; ignoring it", self.snapshot_path)
+            return False
+        try:
+            loaded_at = datetime.fromisoformat(meta["built_at"])
+        except (KeyError, TypeError, ValueError):
+            loaded_at = datetime.fromtimestamp(0, tz=timezone.utc)
+        self._base_url = meta.get("base_url")
+        # Unknown version: with a version source the document is stale
+        # until the first rebuild
+        self._documents[self._base_url] = _Document(
+            body=xml_body,
+            loaded_at=loaded_at,
+            encoded=EncodedBody.build(xml_body),
+        )
+        logger.info(
+            "Loaded last-known-good XMLTV guide from %s (%d bytes)",
+            self.snapshot_path,
+            len(xml_body),
+        )
+        return True
+
+    def get_stats(self) -> dict[str, Any]:
+        document = self._document()
+        return {
+            "has_document": document is not None,
+            "fresh": not self._is_stale(document),
+            "age_seconds": self.age_seconds(),
+            "base_url": self._base_url,
+            "documents": len(self._documents),
+            "refreshing": any(not task.done() for task in self._refresh_tasks.values()),
+            "refreshes": self._refreshes,
+            "refresh_failures": self._refresh_failures,
+            "stale_served": self._stale_served,
+            "encoded_sizes": document.encoded.sizes() if document and document.encoded else None,
+            "snapshot_path": str(self.snapshot_path) if self.snapshot_path else None,
+        }
@@ -0,0 +1,178 @@
+"""
+Per-channel XMLTV fragment cache.
+
+The guide is assembled from one rendered ``<channel>`` and one rendered
+``<programme>`` block per channel, so a refresh only re-renders channels
+whose fragment is no longer valid. A fragment goes stale when:
+
+- A StreamEventBus event names its channel (``channel.updated``), or any
+  guide-wide event fires (``schedule.applied``, ``epg.updated`` and friends
+  without a ``channel_id``)
+- Its playout timeline version moved on (Playout/PlayoutItem writes, see
+  ``streaming.playout_timeline``)
+- Its programme window rolled forward: the first listed programme ended
+- It is older than ``max_age_seconds`` (schedule files change on disk
+  without an event)
+
+Each fragment also carries the channel's ProgrammeIndex, so the JSON guide
+API answers window queries from the same data without rendering XML.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from exstreamtv.patterns.cache.programme_index import EMPTY_INDEX, ProgrammeIndex
+from exstreamtv.streaming.playout_timeline import timeline_version
+
+logger = logging.getLogger(__name__)
+
+XMLTV_INVALIDATING_EVENTS = (
+    "channel.created",
+    "channel.updated",
+    "channel.deleted",
+    "schedule.applied",
+    "source.updated",
+    "epg.updated",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class XmltvFragment:
+    """Rendered XMLTV for one channel."""
+
+    channel_xml: str
+    programmes_xml: str
+    base_url: str
+    version: tuple[int, int]
+    built_at: datetime
+    valid_until: datetime
+    programmes: ProgrammeIndex = EMPTY_INDEX
+
+
+class XmltvFragmentCache:
+    """Channel id -> rendered XMLTV fragment, with event-driven invalidation."""
+
+    def __init__(self, max_age_seconds: float = 3600.0) -> None:
+        self.max_age_seconds = float(max_age_seconds)
+        self._fragments: dict[int, XmltvFragment] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; whole-document caches built from
+        # the fragments compare against it to know they are out of date.
+        self.generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(
+        self, channel_id: int, base_url: str | None, now: datetime | None = None
+    ) -> XmltvFragment | None:
+        """
+        Return the channel's fragment if it is still valid for ``now``.
+
+        ``base_url=None`` accepts a fragment rendered for any base URL, for
+        callers that only use its programme index.
+        """
+        now = now or datetime.now(tz=timezone.utc)
+        fragment = self._fragments.get(channel_id)
+        if (
+            fragment is None
+            or (base_url is not None and fragment.base_url != base_url)
+            or fragment.version != timeline_version(channel_id)
+            or now >= fragment.valid_until
+        ):
+            self._misses += 1
+            return None
+        self._hits += 1
+        return fragment
+
+    def put(
+        self,
+        channel_id: int,
+        channel_xml: str,
+        programmes_xml: str,
+        base_url: str,
+        first_programme_stop: datetime | None,
+        now: datetime | None = None,
+        version: tuple[int, int] | None = None,
+        programmes: ProgrammeIndex = EMPTY_INDEX,
+    ) -> XmltvFragment:
+        """
+        Store a rendered fragment.
+
+        ``version`` should be read with ``timeline_version()`` before the
+        programmes were loaded, so a playout write during the build leaves
+        the fragment stale rather than silently current.
+        """
+        now = now or datetime.now(tz=timezone.utc)
+        valid_until = now + timedelta(seconds=self.max_age_seconds)
+        if first_programme_stop is not None:
+            valid_until = min(valid_until, first_programme_stop)
+        fragment = XmltvFragment(
+            channel_xml=channel_xml,
+            programmes_xml=programmes_xml,
+            base_url=base_url,
+            version=version if version is not None else timeline_version(channel_id),
+            built_at=now,
+            valid_until=valid_until,
+            programmes=programmes,
+        )
+        with self._lock:
+            self._fragments[channel_id] = fragment
+        return fragment
+
+    def invalidate(self, channel_id: int | None = None) -> None:
+        """Drop one channel's fragment, or every fragment when None."""
+        with self._lock:
+            if channel_id is None:
+                self._fragments.clear()
+            else:
+                self._fragments.pop(channel_id, None)
+            self.generation += 1
+            self._invalidations += 1
+        logger.debug("XMLTV fragments invalidated (channel=%s)", channel_id)
+
+    def retain(self, channel_ids: Iterable[int]) -> None:
+        """Forget fragments of channels no longer in the lineup."""
+        keep = set(channel_ids)
+        with self._lock:
+            for channel_id in [cid for cid in self._fragments if cid not in keep]:
+                del self._fragments[channel_id]
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "fragments": len(self._fragments),
+            "generation": self.generation,
+            "hits": self._hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+        }
+
+
+def subscribe_xmltv_invalidation(event_bus: Any, cache: XmltvFragmentCache) -> None:
+    """Invalidate fragments on StreamEventBus channel/schedule/EPG events."""
+
+    async def _on_change(channel_id: Any = None, **_: Any) -> None:
+        try:
+            cache.invalidate(int(channel_id) if channel_id is not None else None)
+        except (TypeError, ValueError):
+            cache.invalidate()
+
+    for name in XMLTV_INVALIDATING_EVENTS:
+        event_bus.subscribe(name, _on_change)
+
+
+_fragment_cache: XmltvFragmentCache | None = None
+
+
+def get_xmltv_fragment_cache() -> XmltvFragmentCache:
+    """Get the process-wide XMLTV fragment cache."""
+    global _fragment_cache
+    if _fragment_cache is None:
+        _fragment_cache = XmltvFragmentCache()
+    return _fragment_cache
@@ -2,12 +2,27 @@
 BroadcastScheduleAuthority — Orchestrator for clock-based scheduling.
 
 Clock is sole schedule authority. Versioned cache, overlap prevention, active assertion.
+Each cached timeline keeps a TimelineIndex (prefix sums) so clocks resolve by bisect.
+
+Cache validity is event driven: a timeline is current while its
+timeline_version() (bumped by playout/schedule writes, StreamEventBus events
+and the schedule-file watcher, see streaming.playout_timeline) is unchanged,
+so a hit is a dict lookup. Without the watcher, the schedule YAML a timeline
+was built from is also checked with one stat().
+
+Versions only move for writes made in this process. Playout/schedule edits
+from elsewhere (channel shard workers, scripts using get_sync_session, a
+second server) and schedule files that appear for a channel built from the
+database are caught by re-checking a source hash (Playout and
+ProgramSchedule updated_at plus the schedule file's mtime) at most every
+``source_check_seconds`` per channel.
 """
 
 import asyncio
 import hashlib
 import logging
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Optional
@@ -17,18 +32,24 @@ from sqlalchemy.orm import Session
 from exstreamtv.core.async_guard import AsyncCancellationGuard
 from exstreamtv.core.shutdown_state import is_shutting_down
 
+from exstreamtv.metrics.metrics_exporter import inc_timeline_validation_skipped
 from exstreamtv.scheduling.canonical_timeline import (
     CanonicalTimelineItem,
     build_from_playout,
     build_from_yaml,
 )
 from exstreamtv.scheduling.authoritative_time import now_epoch, now_datetime_utc
-from exstreamtv.scheduling.clock import ChannelClock, _utc_epoch
+from exstreamtv.scheduling.clock import ChannelClock, TimelineIndex, _utc_epoch
 from exstreamtv.scheduling.parser import ScheduleParser
+from exstreamtv.streaming.playout_timeline import schedule_files_watched, timeline_version
 
 logger = logging.getLogger(__name__)
 
 
+# Seconds between cross-process source checks of a cached timeline
+SOURCE_CHECK_SECONDS = 30.0
+
+
 def _authoritative_now() -> datetime:
     """Scheduling now. Monotonic-derived. No wall-clock."""
     return now_datetime_utc()
@@ -61,46 +82,128 @@ class BroadcastScheduleAuthority:
     Central scheduling authority. Versioned timeline cache. Overlap prevention.
     """
 
-    def __init__(self, db_session_factory: Callable[[], Session]):
+    def __init__(
+        self,
+        db_session_factory: Callable[[], Session],
+        source_check_seconds: float = SOURCE_CHECK_SECONDS,
+    ):
         self._db_session_factory = db_session_factory
+        self.source_check_seconds = source_check_seconds
         self._clocks: dict[int, ChannelClock] = {}
         self._timelines: dict[int, list[CanonicalTimelineItem]] = {}
-        self._timeline_versions: dict[int, str] = {}
+        self._timeline_indexes: dict[int, TimelineIndex] = {}
+        self._timeline_versions: dict[int, tuple[int, int]] = {}
+        self._schedule_files: dict[int, tuple[Path, float]] = {}
+        # channel_id -> (source hash or None if not yet taken, monotonic check time)
+        self._source_hashes: dict[int, tuple[Optional[str], float]] = {}
         self._anchor_times: dict[int, datetime] = {}
         self._timeline_locks: dict[int, asyncio.Lock] = {}
         self._epg_failure_logged: set[int] = set()
+        self._validations_skipped = 0
+        self._version_invalidations = 0
+        self._source_checks = 0
 
     def get_timeline(self, channel_id: int) -> list[CanonicalTimelineItem]:
         """Get cached canonical timeline. Auto-invalidate if version mismatch."""
         cached = self._timelines.get(channel_id, [])
         if not cached:
             return []
+        source_check_due = self._source_check_due(channel_id)
+        if (
+            self._timeline_versions.get(channel_id) != timeline_version(channel_id)
+            or self._schedule_file_changed(channel_id)
+            or (source_check_due and self._source_changed(channel_id))
+        ):
+            self.invalidate_timeline(channel_id)
+            self._version_invalidations += 1
+            logger.info(f"Timeline version mismatch ch={channel_id}, invalidated")
+            return []
+        if not source_check_due:
+            # Hits that ran the source query are counted in source_checks
+            self._validations_skipped += 1
+            inc_timeline_validation_skipped()
+        return cached
+
+    def _schedule_file_changed(self, channel_id: int) -> bool:
+        """Fallback when no watcher bumps versions: has the source YAML changed?"""
+        source = self._schedule_files.get(channel_id)
+        if source is None or schedule_files_watched():
+            return False
+        path, mtime = source
+        try:
+            return path.stat().st_mtime != mtime
+        except OSError:
+            return True
+
+    def _source_hash(self, channel_id: int) -> Optional[str]:
         session = self._db_session_factory()
         try:
-            ch_num = self._get_channel_number(channel_id)
-            current_ver = _timeline_version_hash(session, channel_id, ch_num)
-            stored_ver = self._timeline_versions.get(channel_id)
-            if stored_ver != current_ver:
-                self.invalidate_timeline(channel_id)
-                logger.info(f"Timeline version mismatch ch={channel_id}, invalidated")
-                return []
+            channel_number = self._get_channel_number(channel_id)
+            return _timeline_version_hash(session, channel_id, channel_number)
+        except Exception as e:
+            logger.debug(f"Timeline source check failed for ch={channel_id}: {e}")
+            return None
         finally:
             session.close()
-        return cached
+
+    def _source_check_due(self, channel_id: int) -> bool:
+        """True once source_check_seconds have passed since the channel's last source hash."""
+        entry = self._source_hashes.get(channel_id)
+        return entry is None or time.monotonic() - entry[1] >= self.source_check_seconds
+
+    def _source_changed(self, channel_id: int) -> bool:
+        """Cross-process check: has the source hash moved since it was last taken?"""
+        entry = self._source_hashes.get(channel_id)
+        now = time.monotonic()
+        stored = entry[0] if entry is not None else None
+        self._source_checks += 1
+        current = self._source_hash(channel_id)
+        if current is None:
+            self._source_hashes[channel_id] = (stored, now)
+            return False
+        self._source_hashes[channel_id] = (current, now)
+        return stored is not None and current != stored
+
+    def get_timeline_index(self, channel_id: int) -> Optional[TimelineIndex]:
+        """Prefix-sum index of the cached timeline (version-checked like get_timeline)."""
+        if not self.get_timeline(channel_id):
+            return None
+        return self._timeline_indexes.get(channel_id)
+
+    def _store_timeline(
+        self,
+        channel_id: int,
+        timeline: list[CanonicalTimelineItem],
+        version: Optional[tuple[int, int]] = None,
+        source_hash: Optional[str] = None,
+    ) -> None:
+        """Cache a timeline with its prefix-sum index and the version it was built at."""
+        self._timelines[channel_id] = timeline
+        self._timeline_indexes[channel_id] = TimelineIndex(timeline)
+        if version is not None:
+            self._timeline_versions[channel_id] = version
+        if source_hash is not None or channel_id not in self._source_hashes:
+            self._source_hashes[channel_id] = (source_hash, time.monotonic())
 
     def invalidate_timeline(self, channel_id: int) -> None:
         """Clear cached timeline and clock for channel."""
         self._timelines.pop(channel_id, None)
+        self._timeline_indexes.pop(channel_id, None)
         self._clocks.pop(channel_id, None)
         self._timeline_versions.pop(channel_id, None)
+        self._schedule_files.pop(channel_id, None)
+        self._source_hashes.pop(channel_id, None)
         self._anchor_times.pop(channel_id, None)
         logger.debug(f"Invalidated timeline cache for channel {channel_id}")
 
     def invalidate_all_timelines(self) -> None:
         """Clear all cached timelines and clocks."""
         self._timelines.clear()
+        self._timeline_indexes.clear()
         self._clocks.clear()
         self._timeline_versions.clear()
+        self._schedule_files.clear()
+        self._source_hashes.clear()
         self._anchor_times.clear()
         logger.debug("Invalidated all timeline caches")
 
@@ -139,16 +242,11 @@ class BroadcastScheduleAuthority:
                 timeline = await self.load_timeline_async(channel_id)
                 if not timeline:
                     return None
-                self._timelines[channel_id] = timeline
-                session = self._db_session_factory()
-                try:
-                    ch_num = self._get_channel_number(channel_id)
-                    self._timeline_versions[channel_id] = _timeline_version_hash(
-                        session, channel_id, ch_num
-                    )
-                finally:
-                    session.close()
-            total = sum(t.canonical_duration or 1800 for t in timeline)
+            index = self._timeline_indexes.get(channel_id)
+            if index is None or index.items is not timeline:
+                self._store_timeline(channel_id, timeline)
+                index = self._timeline_indexes[channel_id]
+            total = index.total
             if total <= 0:
                 total = 1800 * len(timeline) or 1800
             if os.environ.get("EXSTREAMTV_VALIDATE_DURATIONS") == "1":
@@ -161,6 +259,7 @@ class BroadcastScheduleAuthority:
                 channel_id=channel_id,
                 anchor_time=anchor,
                 total_cycle_duration=total,
+                timeline_index=index,
             )
             self._clocks[channel_id] = clock
             # Invariant: exactly one active item
@@ -197,10 +296,14 @@ class BroadcastScheduleAuthority:
 
     async def load_timeline_async(self, channel_id: int) -> list[CanonicalTimelineItem]:
         """Load timeline asynchronously. Call before ensure_clock."""
+        # Read before loading: a write during the build leaves the timeline stale
+        version = timeline_version(channel_id)
+        source_hash = await asyncio.to_thread(self._source_hash, channel_id)
         channel_number = self._get_channel_number(channel_id)
         schedule_file = ScheduleParser.find_schedule_file(channel_number)
         if schedule_file and schedule_file.exists():
             try:
+                mtime = schedule_file.stat().st_mtime
                 timeline = await build_from_yaml(
                     channel_id,
                     schedule_file,
@@ -208,7 +311,8 @@ class BroadcastScheduleAuthority:
                     max_items=2000,
                 )
                 if timeline:
-                    self._timelines[channel_id] = timeline
+                    self._store_timeline(channel_id, timeline, version, source_hash)
+                    self._schedule_files[channel_id] = (schedule_file, mtime)
                     return timeline
             except Exception as e:
                 logger.warning(f"YAML timeline failed for ch={channel_id}: {e}")
@@ -219,7 +323,7 @@ class BroadcastScheduleAuthority:
             skip_resolution=True,
         )
         if timeline:
-            self._timelines[channel_id] = timeline
+            self._store_timeline(channel_id, timeline, version, source_hash)
         return timeline
 
     def persist_anchor(self, channel_id: int, anchor_time: datetime) -> None:
@@ -253,6 +357,17 @@ class BroadcastScheduleAuthority:
             session.close()
 
 
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "timelines": len(self._timelines),
+            "clocks": len(self._clocks),
+            "validations_skipped": self._validations_skipped,
+            "version_invalidations": self._version_invalidations,
+            "source_checks": self._source_checks,
+            "schedule_files_watched": schedule_files_watched(),
+        }
+
+
 # Singleton access
 _authority: Optional[BroadcastScheduleAuthority] = None
 
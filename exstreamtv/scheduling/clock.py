@@ -4,10 +4,14 @@ ChannelClock — Sole schedule authority.
 Zero-drift mode: uses time.monotonic() to derive now_epoch.
 Position: current_offset = (now_epoch - anchor_epoch) % total_cycle_duration
 Strict comparator: start_epoch <= now_epoch < stop_epoch
+Item lookup: bisect over cached prefix sums of canonical durations (TimelineIndex).
 """
 
 import logging
 import time
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Optional
@@ -17,6 +21,7 @@ from exstreamtv.scheduling.canonical_timeline import CanonicalTimelineItem
 logger = logging.getLogger(__name__)
 
 DRIFT_THRESHOLD_SECONDS = 2.0
+DEFAULT_ITEM_DURATION = 1800.0
 
 
 @dataclass
@@ -29,6 +34,56 @@ class ResolvedPosition:
     item_index: int  # For logging only; not authoritative
 
 
+@dataclass
+class TimelineSlot:
+    """One airing of a timeline item: absolute UTC epoch bounds."""
+
+    item: CanonicalTimelineItem
+    start_epoch: float
+    stop_epoch: float
+    item_index: int
+
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromtimestamp(self.start_epoch, tz=timezone.utc)
+
+    @property
+    def stop_time(self) -> datetime:
+        return datetime.fromtimestamp(self.stop_epoch, tz=timezone.utc)
+
+
+class TimelineIndex:
+    """
+    Prefix sums of canonical durations for one timeline.
+
+    ends[i] is the cycle offset at which item i stops, so the item playing
+    at an offset is bisect_right(ends, offset). Built once per cached
+    timeline by BroadcastScheduleAuthority.
+    """
+
+    __slots__ = ("items", "ends", "total")
+
+    def __init__(self, items: Sequence[CanonicalTimelineItem]):
+        self.items = items
+        self.ends = array("d")
+        cumulative = 0.0
+        for item in items:
+            cumulative += item.canonical_duration or DEFAULT_ITEM_DURATION
+            self.ends.append(cumulative)
+        self.total = cumulative
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def start_of(self, idx: int) -> float:
+        """Cycle offset at which item idx starts."""
+        return self.ends[idx - 1] if idx > 0 else 0.0
+
+    def locate(self, offset: float) -> int:
+        """Index of the item playing at a cycle offset; the last item past the end."""
+        return min(bisect_right(self.ends, offset), len(self.items) - 1)
+
+
 def _utc_epoch(dt: datetime) -> float:
     """Convert datetime to UTC epoch seconds."""
     if dt.tzinfo:
@@ -50,12 +105,14 @@ class ChannelClock:
         channel_id: int,
         anchor_time: datetime,
         total_cycle_duration: float,
+        timeline_index: Optional[TimelineIndex] = None,
     ):
         self.channel_id = channel_id
         self._anchor_time = anchor_time
         self._anchor_wall_epoch = _utc_epoch(anchor_time)
         self._anchor_monotonic = time.monotonic()
         self._total_cycle_duration = max(0.001, total_cycle_duration)
+        self._timeline_index = timeline_index
 
     @property
     def anchor_time(self) -> datetime:
@@ -95,6 +152,13 @@ class ChannelClock:
         elapsed = now_epoch - self._anchor_wall_epoch
         return elapsed % self._total_cycle_duration
 
+    def timeline_index(self, timeline: Sequence[CanonicalTimelineItem]) -> TimelineIndex:
+        """Prefix-sum index for timeline; rebuilt only when a different list is passed."""
+        index = self._timeline_index
+        if index is None or index.items is not timeline:
+            index = self._timeline_index = TimelineIndex(timeline)
+        return index
+
     def resolve_item_and_seek(
         self,
         timeline: list[CanonicalTimelineItem],
@@ -106,26 +170,63 @@ class ChannelClock:
         """
         if not timeline:
             return None
+        index = self.timeline_index(timeline)
         offset = self.current_offset(now)
-        cumulative = 0.0
-        for idx, item in enumerate(timeline):
-            duration = item.canonical_duration or 1800.0
-            if cumulative + duration > offset:
-                seek = offset - cumulative
-                seek = max(0.0, min(seek, max(0, duration - 10)))  # Leave 10s buffer
-                return ResolvedPosition(
-                    item=item,
-                    seek_seconds=seek,
-                    offset_into_cycle=offset,
-                    item_index=idx,
-                )
-            cumulative += duration
-        item = timeline[-1]
-        duration = item.canonical_duration or 1800.0
-        seek = max(0.0, duration - 10)
+        idx = index.locate(offset)
+        item = timeline[idx]
+        duration = item.canonical_duration or DEFAULT_ITEM_DURATION
+        seek = offset - index.start_of(idx)
+        seek = max(0.0, min(seek, max(0, duration - 10)))  # Leave 10s buffer
         return ResolvedPosition(
             item=item,
             seek_seconds=seek,
             offset_into_cycle=offset,
-            item_index=len(timeline) - 1,
+            item_index=idx,
         )
+
+    def _slots_from(
+        self, timeline: Sequence[CanonicalTimelineItem], when_epoch: float
+    ) -> Iterator[TimelineSlot]:
+        """Endless run of slots, starting with the one airing at when_epoch."""
+        index = self.timeline_index(timeline)
+        total = self._total_cycle_duration
+        elapsed = when_epoch - self._anchor_wall_epoch
+        cycle_start = self._anchor_wall_epoch + (elapsed // total) * total
+        idx = index.locate(elapsed % total)
+        while True:
+            yield TimelineSlot(
+                item=timeline[idx],
+                start_epoch=cycle_start + index.start_of(idx),
+                stop_epoch=cycle_start + index.ends[idx],
+                item_index=idx,
+            )
+            idx += 1
+            if idx >= len(index):
+                idx = 0
+                cycle_start += total
+
+    def item_at(
+        self, timeline: Sequence[CanonicalTimelineItem], when: datetime
+    ) -> Optional[TimelineSlot]:
+        """What plays at time when."""
+        if not timeline:
+            return None
+        return next(self._slots_from(timeline, _utc_epoch(when)))
+
+    def items_between(
+        self,
+        timeline: Sequence[CanonicalTimelineItem],
+        start: datetime,
+        end: datetime,
+        max_items: Optional[int] = None,
+    ) -> list[TimelineSlot]:
+        """Slots overlapping [start, end), in air order. For guide generation."""
+        if not timeline:
+            return []
+        end_epoch = _utc_epoch(end)
+        slots: list[TimelineSlot] = []
+        for slot in self._slots_from(timeline, _utc_epoch(start)):
+            if slot.start_epoch >= end_epoch or (max_items is not None and len(slots) >= max_items):
+                break
+            slots.append(slot)
+        return slots
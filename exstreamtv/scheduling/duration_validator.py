@@ -59,13 +59,11 @@ async def get_duration_from_url(url: str, timeout: float = 30.0) -> Optional[flo
     if not url or not str(url).strip():
         return None
     try:
-        from exstreamtv.streaming.mpegts_streamer import MPEGTSStreamer
+        from exstreamtv.ffmpeg.probe_service import get_probe_service
 
-        streamer = MPEGTSStreamer()
-        codec_info = await streamer.probe_stream(url)
-        if codec_info and codec_info.duration and codec_info.duration > 0:
-            return float(codec_info.duration)
-        return None
+        data = await get_probe_service().probe(url, timeout=timeout)
+        duration = float((data.get("format") or {}).get("duration") or 0)
+        return duration if duration > 0 else None
     except Exception as e:
         logger.debug(f"FFprobe URL failed for {url[:80]}...: {e}")
         return None
@@ -9,6 +9,8 @@ import yaml
 
 logger = logging.getLogger(__name__)
 
+SCHEDULES_DIR = Path(__file__).parent.parent.parent / "schedules"
+
 
 class ParsedSchedule:
     """Parsed schedule data structure (ErsatzTV-compatible)"""
@@ -221,21 +223,44 @@ class ScheduleParser:
         return schedule
 
     @staticmethod
-    def find_schedule_file(channel_number: str) -> Path | None:
-        """Find schedule file for a channel number"""
-        schedules_dir = Path(__file__).parent.parent.parent / "schedules"
-
-        # Try to find matching schedule file
-        possible_names = [
+    def _schedule_file_names(channel_number: str) -> list[str]:
+        return [
             f"{channel_number}.yml",
             f"{channel_number}.yaml",
             f"channel-{channel_number}.yml",
             f"channel-{channel_number}.yaml",
         ]
 
-        for name in possible_names:
+    @staticmethod
+    def find_schedule_file(channel_number: str) -> Path | None:
+        """Find schedule file for a channel number"""
+        schedules_dir = SCHEDULES_DIR
+
+        # Try to find matching schedule file
+        for name in ScheduleParser._schedule_file_names(channel_number):
             file_path = schedules_dir / name
             if file_path.exists():
                 return file_path
 
         return None
+
+    @staticmethod
+    def find_schedule_files(channel_numbers) -> dict[str, Path]:
+        """
+        Find schedule files for many channels with a single directory listing.
+
+        Returns channel number (as str) -> schedule file, for channels that have one.
+        """
+        schedules_dir = SCHEDULES_DIR
+        try:
+            present = {p.name for p in schedules_dir.iterdir() if p.is_file()}
+        except OSError:
+            return {}
+
+        found: dict[str, Path] = {}
+        for number in channel_numbers:
+            for name in ScheduleParser._schedule_file_names(number):
+                if name in present:
+                    found[str(number)] = schedules_dir / name
+                    break
+        return found
@@ -55,14 +55,9 @@ def build_programmes_from_clock(
     cycle_index = int(elapsed // total) if total > 0 else 0
     cycle_start = anchor + timedelta(seconds=cycle_index * total)
 
-    cumulative = 0.0
-    start_item_idx = 0
-    for idx, item in enumerate(timeline):
-        duration = item.canonical_duration or 1800.0
-        if cumulative + duration > offset:
-            start_item_idx = idx
-            break
-        cumulative += duration
+    index = clock.timeline_index(timeline)
+    start_item_idx = index.locate(offset)
+    cumulative = index.start_of(start_item_idx)
 
     programmes: list[ClockProgramme] = []
     now_dt = datetime.fromtimestamp(now_epoch, tz=timezone.utc).replace(tzinfo=None) if now is None else now
@@ -7,6 +7,7 @@ Ported from StreamTV with all bug fixes preserved.
 Components:
 - ChannelManager: ErsatzTV-style continuous background streaming
 - ChannelStream: Individual channel stream management
+- BroadcastRingBuffer: Shared per-channel ring with per-client cursors
 - MPEGTSStreamer: FFmpeg-based MPEG-TS generation
 - StreamManager: Unified stream source management
 - ErrorHandler: Error classification and recovery
@@ -17,6 +18,11 @@ Components:
 """
 
 from exstreamtv.streaming.channel_manager import ChannelManager, ChannelStream
+from exstreamtv.streaming.ring_buffer import (
+    BroadcastRingBuffer,
+    RingBufferOverrun,
+    RingCursor,
+)
 from exstreamtv.streaming.error_handler import (
     ErrorClassifier,
     ErrorHandler,
@@ -139,6 +145,9 @@ __all__ = [
     # Channel management
     "ChannelManager",
     "ChannelStream",
+    "BroadcastRingBuffer",
+    "RingBufferOverrun",
+    "RingCursor",
     # MPEG-TS streaming
     "CodecInfo",
     "MPEGTSStreamer",
@@ -11,18 +11,43 @@ Enhanced with Tunarr/dizqueTV integrations:
 """
 
 import asyncio
+import contextlib
 import logging
+import secrets
+import time
 from collections.abc import AsyncIterator, Callable
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from sqlalchemy.orm import Session
 
+from exstreamtv.monitoring.metrics import get_metrics_collector
+from exstreamtv.streaming.concat_encoder import (
+    ENCODER_MODE_PER_ITEM,
+    ENCODER_MODE_PERSISTENT,
+    PersistentChannelEncoder,
+    stream_signature,
+)
+from exstreamtv.streaming.hls_segmenter import LiveHLSSegmenter
+from exstreamtv.streaming.playout_timeline import PlayoutTimeline, load_playout_timeline
+from exstreamtv.streaming.position_store import PositionSnapshot, get_position_store
+from exstreamtv.streaming.ring_buffer import (
+    BroadcastRingBuffer,
+    RingBufferOverrun,
+    RingCursor,
+)
+from exstreamtv.streaming.ts_index import TSKeyframeIndex
+from exstreamtv.streaming.ts_splicer import TSSplicer
+
 # Issue 1.1: Global semaphore caps concurrent FFmpeg processes to prevent
 # resource exhaustion when many channels cycle through short items.
 MAX_CONCURRENT_FFMPEG = 20
 _ffmpeg_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FFMPEG)
 
+# Viewing time feeds SessionManager popularity; channel shard workers turn
+# this off because the front-end records the viewing of proxied clients.
+_record_viewing = True
+
 # Issue 7.3: Module-level task registry so fire-and-forget tasks are tracked
 # and can be inspected/cancelled during shutdown.
 _background_tasks: set[asyncio.Task] = set()
@@ -73,6 +98,38 @@ def _safe_import(module_path: str, name: str) -> Optional[Any]:
         logger.debug(f"Optional dependency {module_path}.{name} not available: {e}")
         return None
 
+# Pre-warm process budget base when no ProcessPoolManager is attached
+DEFAULT_PROCESS_CAPACITY = 150
+
+
+def _prewarm_config() -> Any:
+    """Channel pre-warm settings (defaults when config is unavailable)."""
+    from exstreamtv.config import ChannelsConfig
+
+    try:
+        from exstreamtv.config import get_config
+
+        return get_config().channels
+    except Exception as e:
+        logger.debug(f"Channels config unavailable, using pre-warm defaults: {e}")
+        return ChannelsConfig()
+
+
+def _cpu_percent_sampler() -> Callable[[], Optional[float]]:
+    """
+    Return a callable giving system CPU % since its previous call.
+
+    The first psutil sample is taken here so the first check is meaningful;
+    without psutil the callable always returns None (no CPU budget).
+    """
+    try:
+        import psutil
+    except ImportError:
+        return lambda: None
+    psutil.cpu_percent(interval=None)
+    return lambda: psutil.cpu_percent(interval=None)
+
+
 # Optional imports for new components (graceful fallback if not available)
 try:
     from exstreamtv.streaming.session_manager import (
@@ -121,6 +178,84 @@ except ImportError:
     logger.debug("Log collector not available")
 
 
+class _PrerolledItem:
+    """
+    Next playout item started ahead of the current item's EOF.
+
+    A background task resolves the item, probes it and starts its FFmpeg
+    (holding a global FFmpeg semaphore permit), pumping output into a small
+    bounded queue. Back-pressure pauses FFmpeg until the channel switches.
+    """
+
+    MAX_BUFFERED_CHUNKS = 32  # ~2MB of 64KB reads
+
+    def __init__(
+        self,
+        channel_stream: "ChannelStream",
+        index: int,
+        streamer: Any,
+        pool_key: int | str,
+    ):
+        self._channel_stream = channel_stream
+        self._index = index
+        self._streamer = streamer
+        self._pool_key = pool_key
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_BUFFERED_CHUNKS)
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._error: Exception | None = None
+        self.playout_item: Optional[dict[str, Any]] = None
+
+    def start(self) -> None:
+        self._task = _track_task(asyncio.create_task(self._run()))
+
+    async def _run(self) -> None:
+        cs = self._channel_stream
+        try:
+            self.playout_item = await cs._get_next_playout_item(self._index)
+            self._ready.set()
+            if not self.playout_item or not self.playout_item.get("media_url"):
+                self.playout_item = None
+                return
+            async with _ffmpeg_semaphore:
+                stream_iter = cs._open_item_stream(
+                    self._streamer, self.playout_item, self._pool_key
+                )
+                async for chunk in stream_iter:
+                    await self._queue.put(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._error = e
+            logger.warning(
+                f"Channel {cs.channel_number}: pre-roll of item {self._index} failed: {e}"
+            )
+        finally:
+            self._ready.set()
+        await self._queue.put(None)
+
+    async def wait_ready(self) -> Optional[dict[str, Any]]:
+        """Wait for item resolution; None if the item could not be pre-rolled."""
+        await self._ready.wait()
+        return self.playout_item
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yield buffered then live output of the pre-rolled FFmpeg."""
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                break
+            yield chunk
+        if self._error is not None:
+            raise self._error
+
+    async def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._task
+
+
 class ChannelStream:
     """
     Manages a continuous stream for a single channel (ErsatzTV-style).
@@ -132,11 +267,14 @@ class ChannelStream:
     - Seamless transitions between items
     """
 
-    # Buffer configuration
-    BUFFER_SIZE = 2 * 1024 * 1024  # 2MB buffer
+    # Buffer configuration — one shared ring per channel; clients read via cursors
+    BUFFER_SIZE = 4 * 1024 * 1024  # 4MB ring (~8s at 4 Mbps)
     CHUNK_SIZE = 64 * 1024  # 64KB read chunks
-    QUEUE_MAX_SIZE = 30  # Issue 8.1: Reduced from 50 to limit per-channel memory
-    SLOW_CLIENT_THRESHOLD = 8  # Issue 8.2: Reduced from 20 — disconnect slow clients faster
+    CLIENT_READ_MAX = 4 * CHUNK_SIZE  # Max bytes handed to a client per yield
+    # Issue 8.2: Disconnect clients whose cursor lags more than this fraction
+    # of the ring (before the writer overwrites their unread data).
+    SLOW_CLIENT_THRESHOLD = 0.75
+    MAX_CONCAT_FAILURES = 3  # Persistent encoder exits before falling back to per-item
 
     def __init__(
         self,
@@ -162,10 +300,36 @@ class ChannelStream:
         self.db_session_factory = db_session_factory
         
         # Stream state
-        self._broadcast_queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_MAX_SIZE)
         self._stream_task: asyncio.Task | None = None
-        self._client_queues: list[tuple[asyncio.Queue, list[int]]] = []
+        self._ring = BroadcastRingBuffer(
+            self.BUFFER_SIZE, slow_lag_ratio=self.SLOW_CLIENT_THRESHOLD
+        )
+        self._ts_index = TSKeyframeIndex()
+        self._hls: Optional[LiveHLSSegmenter] = None  # Created on first HLS request
+        self._slow_client_disconnects = 0
+        self._last_time_to_first_frame: float | None = None
+
+        # Gapless transitions: next item is pre-rolled before the current EOF
+        self._gapless_transitions = True
+        self._transition_lookahead = 8.0
+        self._prerolled: Optional[_PrerolledItem] = None
+        self._active_pool_key: int | str = channel_id
+        self._item_ended_at: float | None = None
+        self._last_transition_latency: float | None = None
+
+        # Persistent encoder mode: one FFmpeg per channel fed by an ffconcat loop
+        self._encoder_mode = ENCODER_MODE_PER_ITEM
+        self._concat_encoder: Optional[PersistentChannelEncoder] = None
+        self._concat_items: dict[int, dict[str, Any]] = {}
+        self._concat_seq = 0
+        self._concat_advance = False
+        self._concat_failures = 0
+        # Codecs of the running encoder's first item; a differing item ends it
+        self._concat_signature: Optional[tuple[str, Optional[str]]] = None
+        self._concat_entries = 0
+        self._concat_codec_break = False
         self._is_running = False
+        self._ready = asyncio.Event()  # Set once the current run publishes output
         self._lock = asyncio.Lock()
         self._client_count = 0
         
@@ -176,6 +340,8 @@ class ChannelStream:
         self._current_item_start_time: datetime | None = None
         self._timeline_lock = asyncio.Lock()
         self._seek_offset: float = 0.0  # Seek offset within current item (seconds)
+        self._timeline: Optional[PlayoutTimeline] = None  # Cached active playout
+        self._timeline_loads = 0
         
         # Auto-recovery state
         self._restart_count = 0
@@ -199,6 +365,18 @@ class ChannelStream:
         self._use_error_screens = HAS_ERROR_SCREENS
         self._use_ffmpeg_monitoring = HAS_FFMPEG_MONITOR
         
+        try:
+            from exstreamtv.config import get_config
+            streaming_config = get_config().streaming
+            self._gapless_transitions = streaming_config.gapless_transitions
+            self._transition_lookahead = streaming_config.transition_lookahead_seconds
+            self._encoder_mode = streaming_config.encoder_mode
+        except Exception as e:
+            logger.debug(f"Channel {channel_number}: streaming config unavailable: {e}")
+        self._splicer: Optional[TSSplicer] = (
+            TSSplicer() if self._gapless_transitions else None
+        )
+
         # Initialize throttler if available
         if HAS_THROTTLER:
             try:
@@ -231,6 +409,16 @@ class ChannelStream:
                 if not self._playout_start_time:
                     await self._load_or_initialize_position()
 
+            if self._ring.closed:
+                self._ring = BroadcastRingBuffer(
+                    self.BUFFER_SIZE, slow_lag_ratio=self.SLOW_CLIENT_THRESHOLD
+                )
+                self._ts_index = TSKeyframeIndex()
+                if self._splicer is not None:
+                    self._splicer = TSSplicer()
+                if self._hls is not None:
+                    self._hls.mark_discontinuity()
+            self._ready = asyncio.Event()
             self._is_running = True
             
             logger.info(
@@ -254,49 +442,23 @@ class ChannelStream:
 
     def _load_or_initialize_position_sync(self) -> None:
         """Synchronous DB work — always called via run_in_executor (Issue 6.1)."""
-        from exstreamtv.database.models import (
-            ChannelPlaybackPosition,
-            Playout,
-            PlayoutItem,
-            MediaItem,
-        )
+        from exstreamtv.database.models import ChannelPlaybackPosition
         from sqlalchemy import select
 
+        timeline = self._get_timeline_sync()
+        total_duration = timeline.total_duration if timeline else 0
+        item_count = len(timeline) if timeline else 0
+
         db = self.db_session_factory()
         try:
-            playout_stmt = select(Playout).where(
-                Playout.channel_id == self.channel_id,
-                Playout.is_active == True,
-            )
-            playout_result = db.execute(playout_stmt)
-            playout = playout_result.scalar_one_or_none()
-
-            total_duration = 0
-            item_count = 0
-            items: list = []
-
-            if playout:
-                items_stmt = (
-                    select(PlayoutItem, MediaItem)
-                    .outerjoin(MediaItem, PlayoutItem.media_item_id == MediaItem.id)
-                    .where(PlayoutItem.playout_id == playout.id)
-                    .order_by(PlayoutItem.start_time)
+            # A position recorded but not yet flushed is newer than the DB row
+            position = get_position_store().get(self.channel_id)
+            if position is None or not position.playout_start_time:
+                stmt = select(ChannelPlaybackPosition).where(
+                    ChannelPlaybackPosition.channel_id == self.channel_id
                 )
-                items_result = db.execute(items_stmt)
-                items = items_result.all()
-                item_count = len(items)
-
-                for playout_item, media_item in items:
-                    d = _duration_to_seconds(
-                        media_item.duration if media_item else None
-                    ) or _duration_to_seconds(playout_item.duration)
-                    total_duration += d if d else 1800
-
-            stmt = select(ChannelPlaybackPosition).where(
-                ChannelPlaybackPosition.channel_id == self.channel_id
-            )
-            result = db.execute(stmt)
-            position = result.scalar_one_or_none()
+                result = db.execute(stmt)
+                position = result.scalar_one_or_none()
 
             now = _utcnow()
 
@@ -307,34 +469,16 @@ class ChannelStream:
                     elapsed = (now - self._playout_start_time).total_seconds()
                     cycle_position = elapsed % total_duration
 
-                    current_time = 0
-                    calculated_index = 0
-                    for idx, (playout_item, media_item) in enumerate(items):
-                        item_duration = (
-                            _duration_to_seconds(
-                                media_item.duration if media_item else None
-                            )
-                            or _duration_to_seconds(playout_item.duration)
-                            or 1800
+                    calculated_index, raw_seek_offset = timeline.locate(cycle_position)
+                    item_duration = timeline[calculated_index].effective_duration
+                    max_seek = max(0, item_duration - 10) if item_duration > 10 else 0
+                    self._seek_offset = min(raw_seek_offset, max_seek)
+                    if raw_seek_offset > max_seek:
+                        logger.debug(
+                            f"Channel {self.channel_number}: Clamped seek "
+                            f"offset from {raw_seek_offset:.0f}s to "
+                            f"{self._seek_offset:.0f}s (duration: {item_duration}s)"
                         )
-                        if current_time + item_duration > cycle_position:
-                            calculated_index = idx
-                            raw_seek_offset = cycle_position - current_time
-                            max_seek = (
-                                max(0, item_duration - 10)
-                                if item_duration > 10
-                                else 0
-                            )
-                            self._seek_offset = min(raw_seek_offset, max_seek)
-                            if raw_seek_offset > max_seek:
-                                logger.debug(
-                                    f"Channel {self.channel_number}: Clamped seek "
-                                    f"offset from {raw_seek_offset:.0f}s to "
-                                    f"{self._seek_offset:.0f}s (duration: {item_duration}s)"
-                                )
-                            break
-                        current_time += item_duration
-                        calculated_index = idx + 1
 
                     if calculated_index >= item_count:
                         calculated_index = 0
@@ -414,8 +558,8 @@ class ChannelStream:
             # Save position for resume
             await self._save_position()
 
-            # Clear client queues
-            self._client_queues.clear()
+            # Wake and release all client cursors
+            self._ring.close()
             
             logger.info(
                 f"Stopped continuous stream for channel {self.channel_number} "
@@ -423,60 +567,34 @@ class ChannelStream:
             )
 
     async def _save_position(self) -> None:
-        """Save current playback position (non-blocking via thread pool)."""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._save_position_sync)
-
-    def _save_position_sync(self) -> None:
-        """Synchronous DB write — always called via run_in_executor."""
-        from exstreamtv.database.models import ChannelPlaybackPosition
-        from sqlalchemy import select
-
-        try:
-            db = self.db_session_factory()
-            try:
-                stmt = select(ChannelPlaybackPosition).where(
-                    ChannelPlaybackPosition.channel_id == self.channel_id
-                )
-                result = db.execute(stmt)
-                position = result.scalar_one_or_none()
-
-                now = _utcnow()
+        """
+        Record the current playback position in the write-behind store.
 
-                if position:
-                    position.current_index = self._current_item_index
-                    position.last_item_index = self._current_item_index
-                    position.last_played_at = now
-                    position.current_item_start_time = self._current_item_start_time
-                    position.playout_start_time = self._playout_start_time
-                    position.elapsed_seconds_in_item = (
-                        (now - _ensure_utc(self._current_item_start_time)).total_seconds()
-                        if self._current_item_start_time else 0
-                    )
-                else:
-                    position = ChannelPlaybackPosition(
-                        channel_id=self.channel_id,
-                        current_index=self._current_item_index,
-                        last_item_index=self._current_item_index,
-                        last_played_at=now,
-                        playout_start_time=self._playout_start_time,
-                    )
-                    db.add(position)
-                db.commit()
+        The store batches DB writes across channels; when its flush loop is
+        not running (ChannelManager not started) the position is written
+        through immediately.
+        """
+        store = get_position_store()
+        store.record(self._position_snapshot())
+        if not store.is_running:
+            await store.flush(self.db_session_factory)
 
-                logger.debug(
-                    f"Saved position for channel {self.channel_number}: "
-                    f"index {self._current_item_index}"
-                )
-            except Exception as e:
-                db.rollback()
-                logger.error(
-                    f"Error saving position for channel {self.channel_number}: {e}"
-                )
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Error saving position for channel {self.channel_id}: {e}")
+    def _position_snapshot(self) -> PositionSnapshot:
+        now = _utcnow()
+        elapsed = 0
+        if self._current_item_start_time:
+            elapsed = max(
+                0, int((now - _ensure_utc(self._current_item_start_time)).total_seconds())
+            )
+        return PositionSnapshot(
+            channel_id=self.channel_id,
+            channel_number=str(self.channel_number),
+            current_index=self._current_item_index,
+            playout_start_time=self._playout_start_time,
+            current_item_start_time=self._current_item_start_time,
+            last_played_at=now,
+            elapsed_seconds_in_item=elapsed,
+        )
 
     async def _get_current_position(self) -> dict[str, Any]:
         """Get current playback position."""
@@ -504,12 +622,16 @@ class ChannelStream:
         if not self._is_running:
             await self.start()
         
-        # Issue 8.1: Reduced from 100 to 50 — with 50 channels × 10 clients
-        # the max in-flight memory drops from ~3.2GB to ~1.6GB.
-        client_queue: asyncio.Queue = asyncio.Queue(maxsize=50)
-        slow_count: list[int] = [0]
+        # Issue 8.1: Clients share the channel ring and only hold a cursor,
+        # so per-client memory is constant regardless of client count.
+        ring = self._ring
+        ts_index = self._ts_index
+        join_time = time.monotonic()
+        preamble, cursor = self._open_client_cursor(ring, ts_index)
+        join_position = cursor.position
+        keyframe_aligned = bool(preamble)
+        first_frame_pending = True
         async with self._lock:
-            self._client_queues.append((client_queue, slow_count))
             self._client_count += 1
             self._last_client_activity = _utcnow()
 
@@ -523,21 +645,49 @@ class ChannelStream:
         max_consecutive_timeouts = 10  # After 10 timeouts (5 min), give up
 
         try:
-            while self._is_running:
+            # Instant join: cached PAT/PMT, then ring data from the last keyframe
+            if preamble:
+                yield preamble
+
+            while self._is_running or ring.lag(cursor) > 0:
+                # Issue 8.2: Slow client detection by cursor lag
+                if ring.is_lagging(cursor):
+                    self._slow_client_disconnects += 1
+                    logger.warning(
+                        f"Channel {self.channel_number}: Disconnecting slow client "
+                        f"(lagging {ring.lag(cursor)} bytes behind live edge)"
+                    )
+                    break
+
                 try:
-                    # Get data from client queue with timeout
-                    chunk = await asyncio.wait_for(
-                        client_queue.get(),
-                        timeout=30.0,
+                    chunk = ring.read(cursor, self.CLIENT_READ_MAX)
+                except RingBufferOverrun as e:
+                    self._slow_client_disconnects += 1
+                    logger.warning(
+                        f"Channel {self.channel_number}: Disconnecting slow client ({e})"
                     )
-                    
-                    if chunk is None:
-                        # End of stream signal
-                        break
-                    
+                    break
+
+                if chunk:
                     # Reset timeout counter on successful data
                     consecutive_timeouts = 0
+                    if first_frame_pending and (
+                        keyframe_aligned
+                        or self._passed_keyframe(ts_index, cursor, join_position)
+                    ):
+                        first_frame_pending = False
+                        self._record_time_to_first_frame(
+                            time.monotonic() - join_time, keyframe_aligned
+                        )
                     yield chunk
+                    continue
+
+                if ring.closed:
+                    # End of stream signal
+                    break
+
+                try:
+                    await asyncio.wait_for(ring.wait(cursor), timeout=30.0)
                     
                 except asyncio.TimeoutError:
                     consecutive_timeouts += 1
@@ -574,15 +724,60 @@ class ChannelStream:
             
         finally:
             async with self._lock:
-                self._client_queues = [
-                    (q, sc) for q, sc in self._client_queues if q is not client_queue
-                ]
                 self._client_count -= 1
+            if HAS_SESSION_MANAGER and _record_viewing:
+                get_session_manager().record_viewing(
+                    self.channel_id, time.monotonic() - join_time
+                )
             logger.debug(
                 f"Client left channel {self.channel_number}, "
                 f"remaining clients: {self._client_count}"
             )
 
+    def _open_client_cursor(
+        self, ring: BroadcastRingBuffer, ts_index: TSKeyframeIndex
+    ) -> tuple[bytes, RingCursor]:
+        """
+        Pick the join point for a new client.
+
+        Returns the cached PAT+PMT preamble and a cursor at the most recent
+        keyframe when that keyframe is still in the ring and close enough to
+        the live edge; otherwise an empty preamble and a live-edge cursor.
+        """
+        rap_offset = ts_index.last_rap_offset
+        preamble = ts_index.psi_preamble
+        if (
+            preamble
+            and rap_offset is not None
+            and rap_offset >= ring.tail
+            and ring.head - rap_offset < ring.slow_lag_bytes
+        ):
+            return preamble, ring.open_cursor(rap_offset)
+        return b"", ring.open_cursor()
+
+    @staticmethod
+    def _passed_keyframe(
+        ts_index: TSKeyframeIndex, cursor: RingCursor, join_position: int
+    ) -> bool:
+        """True once a live-edge client has been sent a keyframe after joining."""
+        rap_offset = ts_index.last_rap_offset
+        return (
+            rap_offset is not None
+            and rap_offset >= join_position
+            and cursor.position > rap_offset
+        )
+
+    def _record_time_to_first_frame(self, seconds: float, keyframe_aligned: bool) -> None:
+        """Record how long a joining client waited for its first decodable frame."""
+        self._last_time_to_first_frame = seconds
+        get_metrics_collector().observe_time_to_first_frame(
+            self.channel_id, seconds, keyframe_aligned
+        )
+        logger.debug(
+            f"Channel {self.channel_number}: time-to-first-frame {seconds * 1000:.0f}ms "
+            f"({'keyframe join' if keyframe_aligned else 'live edge'})"
+        )
+
     async def _resolve_media_url(self, media_item: Any) -> str:
         """
         Resolve a media item to a streamable URL using MediaURLResolver.
@@ -610,18 +805,32 @@ class ChannelStream:
                 return media_item.path
             raise
 
-    async def _get_next_playout_item(self) -> Optional[dict[str, Any]]:
+    async def _get_next_playout_item(
+        self, index: Optional[int] = None
+    ) -> Optional[dict[str, Any]]:
         """
         Get the next item to play from the schedule.
 
         Issue 6.2 fix: DB queries run in thread pool via run_in_executor,
         matching the pattern at line 393 (_save_position_sync).
 
+        Args:
+            index: Explicit playout position to look up (used for look-ahead).
+                Defaults to the current item; only the current item consumes
+                the pending seek offset.
+
         Returns:
             Dictionary with media_url and metadata, or None if no items available.
         """
-        loop = asyncio.get_event_loop()
-        raw = await loop.run_in_executor(None, self._get_next_playout_item_sync)
+        timeline = self._timeline
+        if timeline is not None and timeline.is_current():
+            # Cached timeline: O(1) lookup, no DB round-trip
+            raw = self._get_next_playout_item_sync(index)
+        else:
+            loop = asyncio.get_event_loop()
+            raw = await loop.run_in_executor(
+                None, self._get_next_playout_item_sync, index
+            )
         if raw is None:
             return None
 
@@ -631,73 +840,71 @@ class ChannelStream:
             raw["media_url"] = await self._resolve_media_url(media_item_obj)
         return raw
 
-    def _get_next_playout_item_sync(self) -> Optional[dict[str, Any]]:
-        """Synchronous DB work — always called via run_in_executor (Issue 6.2)."""
-        from exstreamtv.database.models import Playout, PlayoutItem, MediaItem
-        from sqlalchemy import select
-
+    def _get_timeline_sync(self) -> Optional[PlayoutTimeline]:
+        """Return the cached playout timeline, reloading it if invalidated."""
+        timeline = self._timeline
+        if timeline is not None and timeline.is_current():
+            return timeline
         db = self.db_session_factory()
         try:
-            playout_stmt = select(Playout).where(
-                Playout.channel_id == self.channel_id,
-                Playout.is_active == True,
-            )
-            playout_result = db.execute(playout_stmt)
-            playout = playout_result.scalar_one_or_none()
-
-            if not playout:
-                logger.debug(f"No active playout for channel {self.channel_id}")
-                return None
-
-            items_stmt = (
-                select(PlayoutItem, MediaItem)
-                .outerjoin(MediaItem, PlayoutItem.media_item_id == MediaItem.id)
-                .where(PlayoutItem.playout_id == playout.id)
-                .order_by(PlayoutItem.start_time)
-            )
-            items_result = db.execute(items_stmt)
-            items = items_result.all()
+            timeline = load_playout_timeline(db, self.channel_id)
+        finally:
+            db.close()
+        self._timeline = timeline
+        self._timeline_loads += 1
+        if timeline is None:
+            logger.debug(f"No active playout for channel {self.channel_id}")
+        return timeline
+
+    def _get_next_playout_item_sync(
+        self, index: Optional[int] = None
+    ) -> Optional[dict[str, Any]]:
+        """
+        Resolve a playout position against the cached timeline.
 
-            if not items:
-                logger.debug(
-                    f"No playout items for channel {self.channel_id}, "
-                    f"playout {playout.id}"
-                )
+        Only touches the DB when the timeline is missing or invalidated, so
+        callers run it via run_in_executor in that case (Issue 6.2).
+        """
+        try:
+            timeline = self._get_timeline_sync()
+            if not timeline:
+                if timeline is not None:
+                    logger.debug(
+                        f"No playout items for channel {self.channel_id}, "
+                        f"playout {timeline.playout_id}"
+                    )
                 return None
 
-            if self._current_item_index >= len(items):
-                self._current_item_index = 0
+            if index is not None:
+                position = index % len(timeline)
+            else:
+                if self._current_item_index >= len(timeline):
+                    self._current_item_index = 0
+                position = self._current_item_index
 
-            playout_item, media_item = items[self._current_item_index]
+            entry = timeline[position]
+            title = entry.title
+            duration = entry.duration
+            source = entry.source
+            media_item = timeline.media_item(entry)
 
-            if media_item:
+            if media_item is not None:
                 # Pass the ORM object back so the async caller can resolve it.
-                title = media_item.title
-                duration = _duration_to_seconds(media_item.duration)
-                source = media_item.source
-                media_id = media_item.id
-                # Detach enough info for the log line
-                stream_url_preview = f"(pending resolution for {title})"
                 result_dict: dict[str, Any] = {
                     "_media_item_obj": media_item,
                     "media_url": "",  # placeholder — filled by async caller
                     "title": title,
                     "duration": duration,
                     "source": source,
-                    "media_id": media_id,
+                    "media_id": entry.media_item_id,
                 }
             else:
-                stream_url = playout_item.source_url
-                title = playout_item.title
-                duration = _duration_to_seconds(playout_item.duration)
-                source = "url"
-                media_id = None
                 result_dict = {
-                    "media_url": stream_url,
+                    "media_url": entry.source_url,
                     "title": title,
                     "duration": duration,
                     "source": source,
-                    "media_id": media_id,
+                    "media_id": None,
                 }
 
             url_for_detect = result_dict.get("media_url", "") or ""
@@ -710,8 +917,10 @@ class ChannelStream:
             elif source in ("plex",):
                 source_type = "plex"
 
-            seek_offset = self._seek_offset
-            self._seek_offset = 0.0
+            seek_offset = 0.0
+            if index is None:
+                seek_offset = self._seek_offset
+                self._seek_offset = 0.0
             if duration and seek_offset > 0:
                 max_seek = max(0, duration - 10)
                 if seek_offset >= duration:
@@ -732,7 +941,7 @@ class ChannelStream:
             result_dict.update(
                 {
                     "source_type": source_type,
-                    "position": self._current_item_index,
+                    "position": position,
                     "expires_at": None,
                     "seek_offset": seek_offset,
                 }
@@ -742,8 +951,6 @@ class ChannelStream:
         except Exception as e:
             logger.error(f"Error getting next playout item: {e}")
             return None
-        finally:
-            db.close()
 
     async def _run_continuous_stream(self) -> None:
         """
@@ -793,9 +1000,45 @@ class ChannelStream:
         update_channel_metric: Any = None,
     ) -> None:
         """Inner streaming loop."""
-        while self._is_running:
-            # Get next playout item from schedule
-            playout_item = await self._get_next_playout_item()
+        try:
+            while self._is_running and self._encoder_mode == ENCODER_MODE_PERSISTENT:
+                if self._seek_offset <= 0:
+                    await self._stream_persistent(watchdog, update_channel_metric)
+                    if not self._is_running or self._encoder_mode != ENCODER_MODE_PERSISTENT:
+                        break
+                # Resuming mid-item, or the encoder exited: play one item
+                # per-item, then hand over to the encoder at the item boundary.
+                await self._stream_items(
+                    streamer, watchdog, update_channel_metric, max_items=1
+                )
+            await self._stream_items(streamer, watchdog, update_channel_metric)
+        finally:
+            await self._cancel_preroll()
+            if self._concat_encoder is not None:
+                await self._concat_encoder.stop()
+
+    async def _stream_items(
+        self,
+        streamer: Any,
+        watchdog: Any,
+        update_channel_metric: Any = None,
+        max_items: Optional[int] = None,
+    ) -> None:
+        played = 0
+        while self._is_running and (max_items is None or played < max_items):
+            played += 1
+            # Gapless path: the next item was resolved and started ahead of EOF
+            prerolled = self._prerolled
+            self._prerolled = None
+            playout_item = await prerolled.wait_ready() if prerolled else None
+            if playout_item is not None:
+                self._current_item_index = playout_item["position"]
+            else:
+                if prerolled is not None:
+                    await prerolled.cancel()
+                    prerolled = None
+                # Get next playout item from schedule
+                playout_item = await self._get_next_playout_item()
             
             if playout_item is None:
                 # Try to get filler content
@@ -810,6 +1053,7 @@ class ChannelStream:
                         f"No content for channel {self.channel_number}, "
                         f"sending keep-alive and waiting..."
                     )
+                    self._item_ended_at = None
                     if self._use_error_screens:
                         try:
                             await self._broadcast_error_screen(
@@ -827,11 +1071,9 @@ class ChannelStream:
             
             logger.info(
                 f"Channel {self.channel_number} playing: {playout_item.get('title')}"
+                + (" (pre-rolled)" if prerolled else "")
             )
             
-            # Get seek offset from playout item (ErsatzTV-style)
-            seek_offset = playout_item.get("seek_offset", 0.0)
-
             # Update current item tracking (EPG uses this for guide alignment)
             self._current_item_start_time = _utcnow()
 
@@ -843,71 +1085,293 @@ class ChannelStream:
             
             # Stream the item — gated by global semaphore (Issue 1.1)
             try:
-                media_url = playout_item.get("media_url")
-                if not media_url:
-                    logger.warning(
-                        f"Channel {self.channel_number}: No media_url for item "
-                        f"{playout_item.get('title')}"
+                if prerolled is not None:
+                    # Semaphore permit is held by the pre-roll pump task
+                    await self._publish_item(
+                        prerolled.chunks(), playout_item, streamer,
+                        watchdog, update_channel_metric, prerolled=True,
+                        allow_preroll=max_items is None,
                     )
-                    self._current_item_index += 1
-                    await asyncio.sleep(0.1)
-                    continue
-
-                from exstreamtv.streaming.mpegts_streamer import StreamSource
-
-                source_type_str = playout_item.get("source_type", "unknown")
-                try:
-                    stream_source = StreamSource(source_type_str)
-                except ValueError:
-                    stream_source = StreamSource.UNKNOWN
-
-                # Issue 1.1: Acquire semaphore before spawning FFmpeg so at
-                # most MAX_CONCURRENT_FFMPEG processes run simultaneously.
-                async with _ffmpeg_semaphore:
-                    if self._process_pool_manager:
-                        stream_iter = streamer.stream_via_pool(
-                            media_url,
-                            self.channel_id,
-                            self._process_pool_manager,
-                            seek_offset=seek_offset,
+                else:
+                    media_url = playout_item.get("media_url")
+                    if not media_url:
+                        logger.warning(
+                            f"Channel {self.channel_number}: No media_url for item "
+                            f"{playout_item.get('title')}"
                         )
-                    else:
-                        stream_iter = streamer.stream(
-                            media_url,
-                            source=stream_source,
-                            seek_offset=seek_offset,
+                        self._current_item_index += 1
+                        await asyncio.sleep(0.1)
+                        continue
+
+                    # Issue 1.1: Acquire semaphore before spawning FFmpeg so at
+                    # most MAX_CONCURRENT_FFMPEG processes run simultaneously.
+                    async with _ffmpeg_semaphore:
+                        self._active_pool_key = self.channel_id
+                        stream_iter = self._open_item_stream(
+                            streamer, playout_item, self._active_pool_key
+                        )
+                        await self._publish_item(
+                            stream_iter, playout_item, streamer,
+                            watchdog, update_channel_metric, prerolled=False,
+                            allow_preroll=max_items is None,
                         )
-                    async for chunk in stream_iter:
-                        self._last_output_time = _utcnow()
-                        self._bytes_streamed += len(chunk)
-                        if update_channel_metric:
-                            update_channel_metric(
-                                self.channel_id,
-                                "last_output_time",
-                                self._last_output_time,
-                            )
-                        if watchdog:
-                            watchdog.report_output(
-                                str(self.channel_id),
-                                bytes_count=len(chunk),
-                            )
-                        await self._broadcast_chunk(chunk)
-                        if not self._is_running:
-                            break
             except Exception as e:
                 logger.error(
                     f"Error streaming item on channel {self.channel_number}: {e}"
                 )
                 self._consecutive_failures += 1
+                await self._cancel_preroll()
                 await asyncio.sleep(1.0)
             
+            self._item_ended_at = time.monotonic()
+
             # Advance to next item
             self._current_item_index += 1
             
             # Save position after EVERY item to ensure resume works correctly
             # This ensures EPG matches actual playback position and restart resumes properly
             await self._save_position()
-    
+
+    async def _stream_persistent(self, watchdog: Any, update_channel_metric: Any) -> None:
+        """Broadcast the output of the channel's persistent concat encoder."""
+        if self._concat_encoder is None:
+            self._concat_encoder = PersistentChannelEncoder(self.channel_id)
+        self._concat_advance = False
+        self._concat_signature = None
+        self._concat_entries = 0
+        self._concat_codec_break = False
+        started = False
+        try:
+            async with _ffmpeg_semaphore:
+                async for chunk in self._concat_encoder.stream():
+                    if not started:
+                        started = True
+                        self._consecutive_failures = 0
+                        if self._splicer is not None:
+                            self._splicer.begin_segment()
+                        elif self._hls is not None:
+                            self._hls.mark_discontinuity()
+                    self._last_output_time = _utcnow()
+                    self._bytes_streamed += len(chunk)
+                    if update_channel_metric:
+                        update_channel_metric(
+                            self.channel_id, "last_output_time", self._last_output_time
+                        )
+                    if watchdog:
+                        watchdog.report_output(str(self.channel_id), bytes_count=len(chunk))
+                    if self._splicer is not None:
+                        chunk = self._splicer.process(chunk)
+                    if chunk:
+                        await self._broadcast_chunk(chunk)
+                    if not self._is_running:
+                        break
+        except Exception as e:
+            logger.error(f"Persistent encoder error on channel {self.channel_number}: {e}")
+
+        if not self._is_running:
+            return
+        if self._concat_codec_break:
+            # Ended on purpose before an item with different codecs; the
+            # caller plays that item per-item and starts a fresh encoder
+            self._concat_codec_break = False
+            return
+        # Encoder exited (empty schedule, unreadable item, FFmpeg failure).
+        # The caller plays one item per-item so the channel keeps output;
+        # give up on persistent mode for this channel after repeated failures.
+        self._concat_failures += 1
+        self._consecutive_failures += 1
+        if self._concat_failures >= self.MAX_CONCAT_FAILURES:
+            logger.warning(
+                f"Channel {self.channel_number}: persistent encoder failed "
+                f"{self._concat_failures} times, falling back to per-item mode"
+            )
+            self._encoder_mode = ENCODER_MODE_PER_ITEM
+
+    async def next_concat_entry(self) -> Optional[tuple[int, dict[str, Any]]]:
+        """
+        Advance the playout to the next item for the persistent encoder.
+
+        Called by the concat feed endpoint each time FFmpeg opens an entry.
+        Returns (sequence number, playout item), or None when nothing can play
+        in this encoder. An item whose codecs differ from the encoder's first
+        item (or that cannot be probed) ends the encoder instead.
+        """
+        if self._concat_codec_break:
+            return None
+        if self._concat_advance:
+            self._current_item_index += 1
+        self._concat_advance = True
+        playout_item = await self._get_next_playout_item()
+        if playout_item is None:
+            playout_item = await self._get_filler_item()
+        if playout_item is None or not playout_item.get("media_url"):
+            return None
+        signature = await stream_signature(playout_item["media_url"])
+        if signature is None or (self._concat_entries and signature != self._concat_signature):
+            # Unprobeable items, even as the first entry, are played per-item
+            reason = (
+                "cannot be probed"
+                if signature is None
+                else f"has codecs {signature}, encoder has {self._concat_signature}"
+            )
+            logger.info(
+                f"Channel {self.channel_number}: {playout_item.get('title')} {reason}; "
+                f"restarting the persistent encoder"
+            )
+            self._concat_codec_break = True
+            if self._concat_encoder is not None:
+                self._concat_encoder.finish()
+            return None
+        if self._concat_entries == 0:
+            # The first entry sets the encoder's stream layout
+            self._concat_signature = signature
+        self._concat_entries += 1
+        self._concat_seq += 1
+        self._concat_items[self._concat_seq] = playout_item
+        self._concat_items.pop(self._concat_seq - 2, None)
+        self._concat_failures = 0
+        logger.info(
+            f"Channel {self.channel_number} playing: {playout_item.get('title')} (persistent encoder)"
+        )
+        self._current_item_start_time = _utcnow()
+        await self._save_position()
+        return self._concat_seq, playout_item
+
+    def get_concat_item(self, seq: int) -> Optional[dict[str, Any]]:
+        """Playout item handed out as concat entry ``seq`` (current or previous)."""
+        return self._concat_items.get(seq)
+
+    def concat_feed_token_valid(self, token: Optional[str]) -> bool:
+        """Whether a feed request carries the running encoder's token."""
+        encoder = self._concat_encoder
+        if encoder is None or not token:
+            return False
+        return secrets.compare_digest(token, encoder.feed_token)
+
+    def _open_item_stream(
+        self, streamer: Any, playout_item: dict[str, Any], pool_key: int | str
+    ) -> AsyncIterator[bytes]:
+        """Start FFmpeg for a playout item and return its chunk iterator."""
+        from exstreamtv.streaming.mpegts_streamer import StreamSource
+
+        media_url = playout_item.get("media_url")
+        seek_offset = playout_item.get("seek_offset", 0.0)
+        try:
+            stream_source = StreamSource(playout_item.get("source_type", "unknown"))
+        except ValueError:
+            stream_source = StreamSource.UNKNOWN
+
+        if self._process_pool_manager:
+            return streamer.stream_via_pool(
+                media_url,
+                pool_key,
+                self._process_pool_manager,
+                seek_offset=seek_offset,
+            )
+        return streamer.stream(
+            media_url,
+            source=stream_source,
+            seek_offset=seek_offset,
+        )
+
+    async def _publish_item(
+        self,
+        stream_iter: AsyncIterator[bytes],
+        playout_item: dict[str, Any],
+        streamer: Any,
+        watchdog: Any,
+        update_channel_metric: Any,
+        prerolled: bool,
+        allow_preroll: bool = True,
+    ) -> None:
+        """Broadcast one item's chunks; start the next item's pre-roll near the end."""
+        item_started: float | None = None
+        remaining = _duration_to_seconds(playout_item.get("duration")) - float(
+            playout_item.get("seek_offset", 0.0) or 0.0
+        )
+        # Items shorter than the look-ahead window pre-roll immediately
+        preroll_at = (
+            max(0.0, remaining - self._transition_lookahead)
+            if allow_preroll and self._gapless_transitions and remaining > 0
+            else None
+        )
+
+        async for chunk in stream_iter:
+            now = time.monotonic()
+            if item_started is None:
+                item_started = now
+                self._on_item_output_started(now, prerolled)
+                if self._splicer is not None:
+                    self._splicer.begin_segment()
+                elif self._hls is not None:
+                    self._hls.mark_discontinuity()
+
+            self._last_output_time = _utcnow()
+            self._bytes_streamed += len(chunk)
+            if update_channel_metric:
+                update_channel_metric(
+                    self.channel_id,
+                    "last_output_time",
+                    self._last_output_time,
+                )
+            if watchdog:
+                watchdog.report_output(
+                    str(self.channel_id),
+                    bytes_count=len(chunk),
+                )
+            if self._splicer is not None:
+                chunk = self._splicer.process(chunk)
+            if chunk:
+                await self._broadcast_chunk(chunk)
+            if not self._is_running:
+                break
+
+            if (
+                preroll_at is not None
+                and self._prerolled is None
+                and now - item_started >= preroll_at
+            ):
+                self._start_preroll(streamer)
+
+    def _on_item_output_started(self, now: float, prerolled: bool) -> None:
+        """Record the programme-boundary gap once the new item produces output."""
+        if self._item_ended_at is None:
+            return
+        latency = now - self._item_ended_at
+        self._item_ended_at = None
+        self._last_transition_latency = latency
+        get_metrics_collector().observe_transition_latency(
+            self.channel_id, latency, prerolled
+        )
+        logger.debug(
+            f"Channel {self.channel_number}: item transition took "
+            f"{latency * 1000:.0f}ms ({'pre-rolled' if prerolled else 'cold start'})"
+        )
+
+    def _start_preroll(self, streamer: Any) -> None:
+        """Resolve, probe and start the next item in the background."""
+        pool_key = (
+            f"{self.channel_id}:alt"
+            if self._active_pool_key == self.channel_id
+            else self.channel_id
+        )
+        self._active_pool_key = pool_key
+        self._prerolled = _PrerolledItem(
+            self, self._current_item_index + 1, streamer, pool_key
+        )
+        self._prerolled.start()
+        logger.debug(
+            f"Channel {self.channel_number}: pre-rolling item "
+            f"{self._current_item_index + 1} ({self._transition_lookahead:.0f}s before EOF)"
+        )
+
+    async def _cancel_preroll(self) -> None:
+        """Stop a pending pre-roll (and its FFmpeg) if one is running."""
+        prerolled = self._prerolled
+        self._prerolled = None
+        if prerolled is not None:
+            await prerolled.cancel()
+
     async def _auto_restart(self) -> None:
         """Restart channel after failure with exponential backoff.
 
@@ -1102,35 +1566,56 @@ class ChannelStream:
             await self._send_to_clients(chunk)
     
     async def _send_to_clients(self, chunk: bytes) -> None:
-        """Send chunk to all connected client queues. Disconnect slow clients after threshold."""
-        slow_to_remove: list[asyncio.Queue] = []
-        async with self._lock:
-            if self._client_queues:
-                logger.debug(
-                    f"Channel {self.channel_number}: Broadcasting {len(chunk)} bytes to {len(self._client_queues)} clients"
+        """
+        Publish chunk to the shared channel ring.
+
+        A single copy serves every client; readers pick it up through their
+        own cursors and slow readers are detected on the read side by lag.
+        The TS index tracks PAT/PMT and keyframe offsets for instant joins;
+        the HLS segmenter (when an HLS client has asked for one) cuts the
+        same bytes into live segments.
+        """
+        self._ring.write(chunk)
+        self._ts_index.feed(chunk)
+        if self._hls is not None:
+            self._hls.feed(chunk)
+        if not self._ready.is_set():
+            self._ready.set()
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait until the running stream has published its first output."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def get_hls_segmenter(self) -> LiveHLSSegmenter:
+        """
+        Return the channel's live HLS segmenter, creating it on first use.
+
+        HLS clients hold no ring cursor, so each request counts as client
+        activity for idle eviction.
+        """
+        self._last_client_activity = _utcnow()
+        if self._hls is None:
+            hls = LiveHLSSegmenter()
+            try:
+                from exstreamtv.config import get_config
+
+                hls_config = get_config().streaming.hls
+                hls = LiveHLSSegmenter(
+                    target_duration=hls_config.segment_duration,
+                    window=hls_config.playlist_size,
+                    part_duration=(
+                        hls_config.part_duration if hls_config.low_latency else None
+                    ),
                 )
-            for queue, slow_count in self._client_queues:
-                try:
-                    queue.put_nowait(chunk)
-                    slow_count[0] = 0
-                except asyncio.QueueFull:
-                    slow_count[0] += 1
-                    if slow_count[0] >= self.SLOW_CLIENT_THRESHOLD:
-                        logger.warning(
-                            f"Channel {self.channel_number}: Disconnecting slow client "
-                            f"(queue full {slow_count[0]} times)"
-                        )
-                        slow_to_remove.append(queue)
-            if slow_to_remove:
-                for queue in slow_to_remove:
-                    try:
-                        queue.put_nowait(None)
-                    except asyncio.QueueFull:
-                        pass
-                self._client_queues = [
-                    (q, sc) for q, sc in self._client_queues if q not in slow_to_remove
-                ]
-                self._client_count -= len(slow_to_remove)
+            except Exception as e:
+                logger.debug(f"Channel {self.channel_number}: HLS config unavailable: {e}")
+            self._hls = hls
+            logger.info(f"Channel {self.channel_number}: live HLS segmenter attached")
+        return self._hls
     
     async def _report_to_ai_systems(
         self,
@@ -1178,12 +1663,7 @@ class ChannelStream:
 
     async def _broadcast_end(self) -> None:
         """Signal end of stream to all clients."""
-        async with self._lock:
-            for queue, _ in self._client_queues:
-                try:
-                    queue.put_nowait(None)
-                except asyncio.QueueFull:
-                    pass
+        self._ring.close()
 
     @property
     def is_running(self) -> bool:
@@ -1209,9 +1689,6 @@ class ChannelManager:
     # Issue 2.2: Idle channels are stopped after this many seconds with 0 clients.
     IDLE_CHANNEL_TIMEOUT = 600  # 10 minutes
 
-    # Issue 2.3: Stagger prewarm starts to avoid thundering herd.
-    PREWARM_INTERVAL_SECONDS = 0.5
-
     def __init__(
         self,
         db_session_factory: Callable[[], Session],
@@ -1230,6 +1707,7 @@ class ChannelManager:
         self._lock = asyncio.Lock()
         self._is_running = False
         self._idle_cleanup_task: asyncio.Task | None = None
+        self._prewarm_report: dict[int, dict[str, Any]] = {}
 
     async def start(self) -> None:
         """Start the channel manager (lazy startup - channels start on first request)."""
@@ -1239,6 +1717,8 @@ class ChannelManager:
 
             self._is_running = True
 
+            await get_position_store().start(self.db_session_factory)
+
             # Issue 2.2: Start background idle-channel eviction loop
             self._idle_cleanup_task = _track_task(
                 asyncio.create_task(self._idle_channel_cleanup_loop())
@@ -1288,88 +1768,230 @@ class ChannelManager:
                 logger.error(f"Error evicting idle channel {channel_id}: {e}")
 
     async def prewarm_channels(
-        self, channel_ids: list[int] | None = None
+        self,
+        channel_ids: list[int] | None = None,
+        popularity: dict[int, float] | None = None,
     ) -> dict[int, bool]:
         """
         Pre-warm channels by starting them before first client request.
 
-        Issue 2.3 fix: Stagger channel starts by PREWARM_INTERVAL_SECONDS
-        to prevent a thundering herd of FFmpeg process spawns at startup.
+        Channels are started most-watched first (decayed viewership from the
+        SessionManager history, database order as tie-break) with bounded
+        concurrency instead of one at a time: up to ``prewarm_concurrency``
+        channels (0 = a quarter of the process budget, at most 16) are
+        starting at once, and the next one is scheduled as soon as one
+        publishes its first output. Scheduling stops once pre-warmed
+        channels hold ``prewarm_process_budget`` of the ProcessPoolManager
+        capacity or system CPU exceeds ``prewarm_cpu_budget_percent``; the
+        remaining channels start on first request as before.
+
+        Per-channel rank, popularity, result and time-to-ready are kept in
+        get_prewarm_report().
 
         Args:
             channel_ids: Optional list of channel IDs to pre-warm.
                         If None, pre-warms all enabled channels.
+            popularity: Channel scores to order by instead of the local
+                        SessionManager history (shard workers get the
+                        front-end's).
 
         Returns:
-            Dictionary mapping channel_id to success status.
+            Dictionary mapping channel_id to readiness for every channel
+            that was scheduled.
         """
-        from exstreamtv.database.models import Channel
-        from sqlalchemy import select
-
         results: dict[int, bool] = {}
+        self._prewarm_report = {}
 
-        db = self.db_session_factory()
+        loop = asyncio.get_running_loop()
         try:
-            if channel_ids:
-                stmt = select(Channel).where(
-                    Channel.id.in_(channel_ids), Channel.enabled == True
-                )
-            else:
-                stmt = select(Channel).where(Channel.enabled == True)
+            channels = await loop.run_in_executor(
+                None, self._load_prewarm_channels_sync, channel_ids
+            )
+        except Exception as e:
+            logger.error(f"Error during channel pre-warming: {e}")
+            return results
+
+        if not channels:
+            logger.info("No enabled channels found to pre-warm")
+            return results
+
+        if popularity is None:
+            popularity = {}
+            if HAS_SESSION_MANAGER:
+                popularity = get_session_manager().get_channel_popularity()
+        # Stable sort: unwatched channels keep database order
+        channels.sort(key=lambda c: -popularity.get(c[0], 0.0))
+
+        settings = _prewarm_config()
+        capacity = self._process_capacity()
+        process_budget = max(1, int(capacity * settings.prewarm_process_budget))
+        concurrency = settings.prewarm_concurrency or max(
+            1, min(16, process_budget // 4)
+        )
+        concurrency = min(concurrency, process_budget)
+        cpu_budget = settings.prewarm_cpu_budget_percent
+        timeout = settings.prewarm_ready_timeout_seconds
 
-            result = db.execute(stmt)
-            channels = result.scalars().all()
+        logger.info(
+            f"Pre-warming up to {len(channels)} channels "
+            f"(concurrency {concurrency}, process budget {process_budget}/{capacity}, "
+            f"CPU budget {cpu_budget:g}%)"
+        )
 
-            if not channels:
-                logger.info("No enabled channels found to pre-warm")
-                return results
+        cpu_percent = _cpu_percent_sampler()
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks: list[asyncio.Task] = []
+        started = time.monotonic()
+        stopped_reason: Optional[str] = None
 
-            logger.info(f"Pre-warming {len(channels)} channels...")
+        for rank, (channel_id, number, name) in enumerate(channels, start=1):
+            await semaphore.acquire()
 
-            for idx, channel in enumerate(channels):
-                try:
-                    channel_stream = await self.get_channel_stream(
-                        channel_id=channel.id,
-                        channel_number=channel.number,
-                        channel_name=channel.name,
-                    )
+            active = await self._active_process_count()
+            if active >= process_budget:
+                stopped_reason = f"process budget reached ({active}/{process_budget})"
+            else:
+                cpu = cpu_percent()
+                if cpu is not None and cpu > cpu_budget:
+                    stopped_reason = f"CPU budget exceeded ({cpu:.0f}% > {cpu_budget:g}%)"
+            if stopped_reason:
+                semaphore.release()
+                for skipped_rank, (skipped_id, _, _) in enumerate(
+                    channels[rank - 1:], start=rank
+                ):
+                    self._prewarm_report[skipped_id] = {
+                        "rank": skipped_rank,
+                        "popularity": popularity.get(skipped_id, 0.0),
+                        "result": "skipped",
+                        "time_to_ready_seconds": None,
+                    }
+                    get_metrics_collector().observe_prewarm(skipped_id, None, "skipped")
+                break
 
-                    if not channel_stream.is_running:
-                        await channel_stream.start()
-                        logger.info(
-                            f"Pre-warmed channel {channel.number} ({channel.name})"
-                        )
-                        # Issue 2.3: Stagger starts to avoid thundering herd
-                        if idx < len(channels) - 1:
-                            await asyncio.sleep(self.PREWARM_INTERVAL_SECONDS)
-                    else:
-                        logger.debug(
-                            f"Channel {channel.number} already running, "
-                            f"skipping pre-warm"
-                        )
+            self._prewarm_report[channel_id] = {
+                "rank": rank,
+                "popularity": popularity.get(channel_id, 0.0),
+                "result": "starting",
+                "time_to_ready_seconds": None,
+            }
+            tasks.append(
+                asyncio.create_task(
+                    self._prewarm_one(channel_id, number, name, timeout, semaphore)
+                )
+            )
 
-                    results[channel.id] = True
+        for task in tasks:
+            channel_id, ready = await task
+            results[channel_id] = ready
 
-                except Exception as e:
-                    logger.error(
-                        f"Failed to pre-warm channel {channel.number} "
-                        f"({channel.name}): {e}"
-                    )
-                    results[channel.id] = False
+        ready_count = sum(1 for v in results.values() if v)
+        summary = (
+            f"Pre-warming complete in {time.monotonic() - started:.1f}s: "
+            f"{ready_count}/{len(results)} scheduled channels ready"
+        )
+        if stopped_reason:
+            summary += f", {len(channels) - len(results)} deferred ({stopped_reason})"
+        logger.info(summary)
 
-            success_count = sum(1 for v in results.values() if v)
-            fail_count = len(results) - success_count
-            logger.info(
-                f"Pre-warming complete: {success_count} succeeded, "
-                f"{fail_count} failed"
-            )
+        return results
 
+    async def _prewarm_one(
+        self,
+        channel_id: int,
+        channel_number: int | str,
+        channel_name: str,
+        timeout: float,
+        semaphore: asyncio.Semaphore,
+    ) -> tuple[int, bool]:
+        """Start one channel and wait for its first output; frees its slot when done."""
+        entry = self._prewarm_report[channel_id]
+        began = time.monotonic()
+        ready = False
+        try:
+            channel_stream = await self.get_channel_stream(
+                channel_id=channel_id,
+                channel_number=channel_number,
+                channel_name=channel_name,
+            )
+            if channel_stream.is_running:
+                logger.debug(
+                    f"Channel {channel_number} already running, skipping pre-warm"
+                )
+                entry["result"] = "running"
+                return channel_id, True
+
+            await channel_stream.start()
+            ready = await channel_stream.wait_ready(timeout)
+            elapsed = time.monotonic() - began
+            if ready:
+                entry["result"] = "ready"
+                entry["time_to_ready_seconds"] = round(elapsed, 3)
+                logger.info(
+                    f"Pre-warmed channel {channel_number} ({channel_name}) "
+                    f"in {elapsed:.2f}s"
+                )
+                get_metrics_collector().observe_prewarm(channel_id, elapsed, "ready")
+            else:
+                entry["result"] = "timeout"
+                logger.warning(
+                    f"Channel {channel_number} ({channel_name}) produced no output "
+                    f"within {timeout:g}s of pre-warm start"
+                )
+                get_metrics_collector().observe_prewarm(channel_id, None, "timeout")
         except Exception as e:
-            logger.error(f"Error during channel pre-warming: {e}")
+            entry["result"] = "failed"
+            logger.error(
+                f"Failed to pre-warm channel {channel_number} ({channel_name}): {e}"
+            )
+            get_metrics_collector().observe_prewarm(channel_id, None, "failed")
+        finally:
+            semaphore.release()
+        return channel_id, ready
+
+    def _load_prewarm_channels_sync(
+        self, channel_ids: list[int] | None
+    ) -> list[tuple[int, int | str, str]]:
+        """Load (id, number, name) of the enabled channels to pre-warm."""
+        from exstreamtv.database.models import Channel
+        from sqlalchemy import select
+
+        db = self.db_session_factory()
+        try:
+            stmt = select(Channel.id, Channel.number, Channel.name).where(
+                Channel.enabled == True
+            )
+            if channel_ids:
+                stmt = stmt.where(Channel.id.in_(channel_ids))
+            return [tuple(row) for row in db.execute(stmt.order_by(Channel.id))]
         finally:
             db.close()
 
-        return results
+    def _process_capacity(self) -> int:
+        """FFmpeg process capacity of the pool (fallback when running without one)."""
+        if self._process_pool_manager is not None:
+            capacity = getattr(self._process_pool_manager, "max_processes", None)
+            if isinstance(capacity, int) and capacity > 0:
+                return capacity
+        return DEFAULT_PROCESS_CAPACITY
+
+    async def _active_process_count(self) -> int:
+        """
+        FFmpeg processes in use, counting channels whose process is still spawning.
+
+        Pool registration lags ChannelStream.start(), so running channels are
+        counted too and the larger number wins.
+        """
+        running = sum(1 for stream in self._channels.values() if stream.is_running)
+        if self._process_pool_manager is not None:
+            try:
+                return max(running, await self._process_pool_manager.get_active_count())
+            except Exception as e:
+                logger.debug(f"Process pool active count unavailable: {e}")
+        return running
+
+    def get_prewarm_report(self) -> dict[int, dict[str, Any]]:
+        """Per-channel outcome of the last pre-warm run, keyed by channel ID."""
+        return dict(self._prewarm_report)
 
     async def stop(self) -> None:
         """Stop all channels and the manager."""
@@ -1395,6 +2017,9 @@ class ChannelManager:
                     logger.error(f"Error stopping channel {channel_id}: {e}")
 
             self._channels.clear()
+
+            # Write positions recorded since the last flush
+            await get_position_store().stop()
             logger.info("Channel manager stopped")
 
     async def get_channel_stream(
@@ -1461,6 +2086,11 @@ class ChannelManager:
                 await self._channels[channel_id].stop()
                 del self._channels[channel_id]
 
+    async def release_channel(self, channel_id: int) -> Optional[ChannelStream]:
+        """Remove a channel and return its stream for the caller to stop (shard workers)."""
+        async with self._lock:
+            return self._channels.pop(channel_id, None)
+
     def _channel_has_streamable_content(self, channel_id: int) -> bool:
         """
         Check if a channel has any streamable content (active playout with items or filler).
@@ -1519,6 +2149,37 @@ class ChannelManager:
         finally:
             db.close()
 
+    def get_running_stream(self, channel_id: int) -> Optional[ChannelStream]:
+        """Return the ChannelStream for a channel if it is currently running."""
+        stream = self._channels.get(channel_id)
+        return stream if stream is not None and stream.is_running else None
+
+    def get_running_stream_by_number(self, channel_number: int | str) -> Optional[ChannelStream]:
+        """Return the running ChannelStream with this channel number, if any."""
+        wanted = str(channel_number)
+        for stream in self._channels.values():
+            if stream.is_running and str(stream.channel_number) == wanted:
+                return stream
+        return None
+
+    async def get_current_position(self, channel_id: int) -> Optional[dict[str, Any]]:
+        """
+        Live playback position of a running channel, or None if it is not running.
+
+        Adds ``media_item_id`` of the current item when the playout timeline
+        is loaded.
+        """
+        stream = self.get_running_stream(channel_id)
+        if stream is None:
+            return None
+        position = await stream._get_current_position()
+        timeline = stream._timeline
+        index = position["item_index"]
+        position["media_item_id"] = (
+            timeline[index].media_item_id if timeline and 0 <= index < len(timeline) else None
+        )
+        return position
+
     def get_active_channels(self) -> list[int]:
         """Get list of active channel IDs."""
         return [
@@ -1538,4 +2199,12 @@ class ChannelManager:
             "clients": stream.client_count,
             "channel_number": stream.channel_number,
             "channel_name": stream.channel_name,
+            "buffer_bytes": stream._ring.capacity,
+            "slow_client_disconnects": stream._slow_client_disconnects,
+            "time_to_first_frame_seconds": stream._last_time_to_first_frame,
+            "transition_latency_seconds": stream._last_transition_latency,
+            "encoder_mode": stream._encoder_mode,
+            "timeline_items": len(stream._timeline) if stream._timeline else 0,
+            "timeline_loads": stream._timeline_loads,
+            "hls": stream._hls.get_stats() if stream._hls else None,
         }
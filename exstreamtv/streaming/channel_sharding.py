@@ -0,0 +1,753 @@
+"""
+Channel sharding across worker processes.
+
+By default every ChannelStream lives on the main event loop, next to the
+HTTP handlers: chunk fan-out, throttling, TS indexing and position
+bookkeeping for all channels share one core while FFmpeg uses the rest.
+
+With ``streaming.sharding.workers: N`` the main process starts N worker
+processes and ChannelStream ownership is partitioned by channel id
+(``channel_id % N``). Each worker runs its own ChannelManager, process-pool
+share and position store on its own event loop and serves its channels on a
+Unix socket. The main (front-end) process keeps the HTTP server; its
+ShardedChannelManager hands out RemoteChannelStream proxies, so
+``/auto/v{n}`` and ``/iptv/channel/{n}.ts`` stream from the owning worker
+without changes to the route handlers.
+
+Wire protocol (one connection per request): the front-end sends one JSON
+line ``{"op": ..., ...}``. RPC ops answer with one JSON line; ``stream``
+answers ``{"ok": true}`` with the first chunk, followed by raw MPEG-TS until
+either side closes (or ``{"error": ...}`` if the stream fails before data).
+
+Caches in the workers (PlayoutTimeline, BroadcastScheduleAuthority, the
+position store) are invalidated by hooks that only fire in the process that
+wrote: API writes happen in the front-end. The front-end therefore listens
+for timeline version bumps and position forgets and forwards them to the
+owning worker (all workers for global bumps), coalesced over
+INVALIDATION_DELAY. Now-playing reads go through get_current_position(),
+which asks the owning worker.
+
+Routing uses a local socket rather than passing the accepted client fd to
+the worker: the HTTP connection belongs to uvicorn and its response framing,
+so the front-end still copies the bytes once, but each copy is a single
+socket read per chunk; fan-out, ring cursors and per-client bookkeeping run
+in the workers.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Front-end socket read size for proxied streams
+PROXY_READ_SIZE = 256 * 1024
+# Seconds to wait for a worker to answer its first ping
+WORKER_START_TIMEOUT = 30.0
+# Seconds between worker liveness checks
+SUPERVISOR_INTERVAL = 5.0
+# Default timeout for RPC ops (prewarm has none)
+RPC_TIMEOUT = 30.0
+# Seconds to coalesce timeline bumps and position forgets before forwarding
+INVALIDATION_DELAY = 0.1
+# Position fields sent over the wire as ISO 8601
+POSITION_TIME_FIELDS = ("playout_start_time", "current_item_start_time")
+
+try:
+    from exstreamtv.streaming.session_manager import get_session_manager
+
+    HAS_SESSION_MANAGER = True
+except ImportError:
+    HAS_SESSION_MANAGER = False
+
+
+class ShardWorkerError(Exception):
+    """A channel worker is unreachable or reported an error."""
+
+
+def shard_for(channel_id: int, workers: int) -> int:
+    """Index of the worker owning a channel."""
+    return channel_id % workers
+
+
+async def build_worker_channel_manager(index: int, workers: int) -> Any:
+    """
+    Default worker-side manager: a ChannelManager with 1/N of the FFmpeg budget.
+
+    Runs in the worker process. The persistent encoder's ffconcat feed is
+    fetched from the HTTP server, which only sees front-end state, so shards
+    always stream per item. Viewing is recorded by the front-end, which
+    also sends the popularity that orders pre-warming.
+    """
+    from exstreamtv.config import get_config
+    from exstreamtv.database import get_sync_session_factory
+    from exstreamtv.streaming import channel_manager
+    from exstreamtv.streaming.concat_encoder import ENCODER_MODE_PER_ITEM
+    from exstreamtv.streaming.process_pool_manager import (
+        ProcessPoolManager,
+        _compute_max_processes,
+    )
+
+    config = get_config()
+    if config.streaming.encoder_mode != ENCODER_MODE_PER_ITEM:
+        logger.warning(
+            f"Shard {index}: encoder_mode {config.streaming.encoder_mode!r} is not "
+            f"supported with channel sharding, using {ENCODER_MODE_PER_ITEM!r}"
+        )
+        config.streaming.encoder_mode = ENCODER_MODE_PER_ITEM
+
+    # RemoteChannelStream records these clients' viewing in the front-end
+    channel_manager._record_viewing = False
+    pool = ProcessPoolManager(
+        config, max_processes=max(1, _compute_max_processes(config) // workers)
+    )
+    await pool.start()
+    channel_manager._ffmpeg_semaphore = asyncio.Semaphore(
+        max(1, channel_manager.MAX_CONCURRENT_FFMPEG // workers)
+    )
+    manager = channel_manager.ChannelManager(
+        db_session_factory=get_sync_session_factory(),
+        process_pool_manager=pool,
+    )
+    await manager.start()
+    return manager
+
+
+class _ShardWorker:
+    """Serves one shard's channels on a Unix socket (runs in the worker process)."""
+
+    def __init__(
+        self,
+        index: int,
+        workers: int,
+        socket_path: str,
+        manager_factory: Callable[[int, int], Awaitable[Any]],
+    ):
+        self.index = index
+        self.workers = workers
+        self.socket_path = socket_path
+        self.manager_factory = manager_factory
+        self.manager: Any = None
+        self._stop = asyncio.Event()
+        self._clients = 0
+        self._bytes_out = 0
+
+    async def serve(self) -> None:
+        self.manager = await self.manager_factory(self.index, self.workers)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stop.set)
+        logger.info(f"Channel shard {self.index}/{self.workers} serving on {self.socket_path}")
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            await self.manager.stop()
+            pool = getattr(self.manager, "_process_pool_manager", None)
+            if pool is not None:
+                await pool.stop()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = json.loads(await reader.readline())
+            op = request.pop("op")
+            if op == "stream":
+                await self._stream(writer, **request)
+                return
+            handler = getattr(self, f"_op_{op}", None)
+            if handler is None:
+                reply = {"error": f"unknown op {op!r}"}
+            else:
+                reply = await handler(**request)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        except Exception as e:
+            logger.error(f"Shard {self.index} request failed: {e}")
+            reply = {"error": str(e)}
+        try:
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(
+        self,
+        writer: asyncio.StreamWriter,
+        channel_id: int,
+        channel_number: int | str,
+        channel_name: str,
+    ) -> None:
+        """Relay one client's view of a channel until the front-end disconnects."""
+        self._clients += 1
+        streaming = False
+        try:
+            stream = await self.manager.get_channel_stream(
+                channel_id=channel_id,
+                channel_number=channel_number,
+                channel_name=channel_name,
+            )
+            async with contextlib.aclosing(stream.get_stream()) as chunks:
+                async for chunk in chunks:
+                    if not streaming:
+                        # Acknowledge on first data so start-up errors reach the caller
+                        writer.write(b'{"ok": true}\n')
+                        streaming = True
+                    writer.write(chunk)
+                    await writer.drain()
+                    self._bytes_out += len(chunk)
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.error(f"Shard {self.index}: stream for channel {channel_number} failed: {e}")
+            if not streaming:
+                with contextlib.suppress(ConnectionError):
+                    writer.write(json.dumps({"error": str(e)}).encode() + b"\n")
+        finally:
+            self._clients -= 1
+            writer.close()
+
+    async def _op_ping(self) -> dict[str, Any]:
+        return {"ok": True, "pid": os.getpid()}
+
+    async def _op_running(self, channel_id: int) -> dict[str, Any]:
+        return {"running": channel_id in self.manager.get_active_channels()}
+
+    async def _op_start_channel(
+        self, channel_id: int, channel_number: int | str, channel_name: str
+    ) -> dict[str, Any]:
+        stream = await self.manager.get_channel_stream(channel_id, channel_number, channel_name)
+        await stream.start()
+        return {"ok": True}
+
+    async def _op_stop_channel(self, channel_id: int) -> dict[str, Any]:
+        stream = await self.manager.release_channel(channel_id)
+        if stream is not None:
+            await stream.stop()
+        return {"ok": True}
+
+    async def _op_invalidate(self, channel_ids: list[int] | None) -> dict[str, Any]:
+        """Bump timeline versions forwarded by the front-end (None = all channels)."""
+        from exstreamtv.streaming.playout_timeline import bump_timeline_version
+
+        if channel_ids is None:
+            bump_timeline_version()
+        else:
+            for channel_id in channel_ids:
+                bump_timeline_version(channel_id)
+        return {"ok": True}
+
+    async def _op_forget_positions(self, channel_ids: list[int]) -> dict[str, Any]:
+        """Drop positions the front-end forgot (channel deleted or reset)."""
+        from exstreamtv.streaming.position_store import get_position_store
+
+        store = get_position_store()
+        for channel_id in channel_ids:
+            store.forget(channel_id)
+        return {"ok": True}
+
+    async def _op_position(self, channel_id: int) -> dict[str, Any]:
+        position = await self.manager.get_current_position(channel_id)
+        if position is not None:
+            position = {
+                key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in position.items()
+            }
+        return {"position": position}
+
+    async def _op_prewarm(
+        self, channel_ids: list[int], popularity: dict[str, float]
+    ) -> dict[str, Any]:
+        results = await self.manager.prewarm_channels(
+            channel_ids, popularity={int(k): v for k, v in popularity.items()}
+        )
+        return {"results": {str(k): v for k, v in results.items()}}
+
+    async def _op_stats(self) -> dict[str, Any]:
+        from exstreamtv.streaming.playout_timeline import timeline_generation
+
+        return {
+            "worker": self.index,
+            "pid": os.getpid(),
+            "clients": self._clients,
+            "bytes_out": self._bytes_out,
+            "active_channels": self.manager.get_active_channels(),
+            "timeline_generation": timeline_generation(),
+        }
+
+
+def _worker_main(
+    index: int,
+    workers: int,
+    socket_path: str,
+    manager_factory: Callable[[int, int], Awaitable[Any]],
+    log_level: int,
+) -> None:
+    """Worker process entry point."""
+    logging.basicConfig(
+        level=log_level,
+        format=f"%(asctime)s [shard {index}] %(levelname)s %(name)s: %(message)s",
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_ShardWorker(index, workers, socket_path, manager_factory).serve())
+
+
+class RemoteChannelStream:
+    """
+    Front-end proxy for a ChannelStream owned by a worker.
+
+    Implements the part of the ChannelStream interface the streaming
+    routes use: ``is_running``, ``start()``, ``stop()`` and ``get_stream()``.
+    """
+
+    def __init__(
+        self,
+        manager: "ShardedChannelManager",
+        channel_id: int,
+        channel_number: int | str,
+        channel_name: str,
+    ):
+        self._manager = manager
+        self.channel_id = channel_id
+        self.channel_number = channel_number
+        self.channel_name = channel_name
+        self.worker = manager.owner_of(channel_id)
+        self._is_running = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._is_running
+
+    def _args(self) -> dict[str, Any]:
+        return {
+            "channel_id": self.channel_id,
+            "channel_number": self.channel_number,
+            "channel_name": self.channel_name,
+        }
+
+    async def start(self) -> None:
+        await self._manager._request(self.worker, "start_channel", **self._args())
+        self._is_running = True
+
+    async def stop(self) -> None:
+        await self._manager._request(self.worker, "stop_channel", channel_id=self.channel_id)
+        self._is_running = False
+
+    async def get_stream(self) -> AsyncIterator[bytes]:
+        """Stream the channel from its worker (the worker starts it if needed)."""
+        reader, writer = await self._manager._open(self.worker)
+        join_time = time.monotonic()
+        try:
+            writer.write(json.dumps({"op": "stream", **self._args()}).encode() + b"\n")
+            await writer.drain()
+            status = json.loads(await reader.readline() or b'{"error": "worker closed"}')
+            if "error" in status:
+                raise ShardWorkerError(
+                    f"Shard {self.worker} cannot stream channel {self.channel_number}: "
+                    f"{status['error']}"
+                )
+            self._is_running = True
+            while chunk := await reader.read(PROXY_READ_SIZE):
+                yield chunk
+        finally:
+            writer.close()
+            if HAS_SESSION_MANAGER:
+                get_session_manager().record_viewing(
+                    self.channel_id, time.monotonic() - join_time
+                )
+
+
+class _WorkerHandle:
+    def __init__(self, index: int, socket_path: str):
+        self.index = index
+        self.socket_path = socket_path
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.restarts = 0
+
+
+class ShardedChannelManager:
+    """
+    Front-end channel manager that routes channels to worker processes.
+
+    Drop-in for ChannelManager on the streaming paths. Streams live in the
+    workers, so there are no in-process ChannelStreams: ``_channels`` is
+    always empty and ``get_running_stream*`` return None, which makes the
+    live HLS and persistent-encoder routes fall back to their non-shared
+    behaviour. ``get_current_position()`` asks the owning worker.
+
+    While running it forwards front-end timeline version bumps and position
+    forgets to the workers, whose caches would otherwise never see API
+    writes.
+    """
+
+    is_sharded = True
+
+    def __init__(
+        self,
+        db_session_factory: Callable[[], Any],
+        workers: int,
+        socket_dir: str | None = None,
+        manager_factory: Callable[[int, int], Awaitable[Any]] = build_worker_channel_manager,
+    ):
+        if workers < 1:
+            raise ValueError("ShardedChannelManager needs at least one worker")
+        self.db_session_factory = db_session_factory
+        self.workers = workers
+        self._socket_dir = socket_dir
+        self._owns_socket_dir = False
+        self._manager_factory = manager_factory
+        self._ctx = multiprocessing.get_context("spawn")
+        self._handles: list[_WorkerHandle] = []
+        self._channels: dict[int, Any] = {}
+        self._is_running = False
+        self._supervisor_task: asyncio.Task | None = None
+
+        # Invalidations waiting to be forwarded, per worker; None = all channels
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending_lock = threading.Lock()
+        self._pending_bumps: dict[int, set[int | None]] = {}
+        self._pending_forgets: dict[int, set[int]] = {}
+        self._forward_scheduled = False
+        self._forward_tasks: set[asyncio.Task] = set()
+        self._invalidations_forwarded = 0
+        self._forward_errors = 0
+
+    def owner_of(self, channel_id: int) -> int:
+        """Worker index owning a channel."""
+        return shard_for(channel_id, self.workers)
+
+    async def start(self) -> None:
+        """Spawn the workers and wait until each one answers."""
+        if self._is_running:
+            return
+        if not self._socket_dir:
+            self._socket_dir = tempfile.mkdtemp(prefix="exstreamtv-shards-")
+            self._owns_socket_dir = True
+        else:
+            Path(self._socket_dir).mkdir(parents=True, exist_ok=True)
+        self._handles = [
+            _WorkerHandle(i, os.path.join(self._socket_dir, f"shard-{i}.sock"))
+            for i in range(self.workers)
+        ]
+        for handle in self._handles:
+            self._spawn(handle)
+        await asyncio.gather(*(self._wait_ready(h) for h in self._handles))
+        self._is_running = True
+        self._supervisor_task = asyncio.create_task(self._supervise())
+
+        from exstreamtv.streaming.playout_timeline import add_version_listener
+        from exstreamtv.streaming.position_store import get_position_store
+
+        self._loop = asyncio.get_running_loop()
+        add_version_listener(self._on_timeline_bump)
+        get_position_store().add_forget_listener(self._on_position_forget)
+        logger.info(f"Channel manager started with {self.workers} channel shards")
+
+    def _spawn(self, handle: _WorkerHandle) -> None:
+        handle.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                handle.index,
+                self.workers,
+                handle.socket_path,
+                self._manager_factory,
+                logging.getLogger().getEffectiveLevel(),
+            ),
+            name=f"exstreamtv-shard-{handle.index}",
+            daemon=True,
+        )
+        handle.process.start()
+
+    async def _wait_ready(self, handle: _WorkerHandle) -> None:
+        deadline = time.monotonic() + WORKER_START_TIMEOUT
+        while True:
+            try:
+                await self._request(handle.index, "ping", timeout=1.0)
+                return
+            except (ShardWorkerError, OSError, asyncio.TimeoutError):
+                if not handle.process.is_alive():
+                    raise ShardWorkerError(
+                        f"Shard {handle.index} exited with code {handle.process.exitcode}"
+                    ) from None
+                if time.monotonic() > deadline:
+                    raise ShardWorkerError(f"Shard {handle.index} did not start") from None
+                await asyncio.sleep(0.1)
+
+    async def _supervise(self) -> None:
+        """Respawn workers that died; their clients reconnect to the new one."""
+        while self._is_running:
+            try:
+                await asyncio.sleep(SUPERVISOR_INTERVAL)
+                for handle in self._handles:
+                    if self._is_running and not handle.process.is_alive():
+                        logger.error(
+                            f"Channel shard {handle.index} exited "
+                            f"(code {handle.process.exitcode}), restarting"
+                        )
+                        handle.restarts += 1
+                        self._spawn(handle)
+                        await self._wait_ready(handle)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Channel shard supervisor error: {e}")
+
+    async def stop(self) -> None:
+        """Stop all workers (each stops its channels and flushes positions)."""
+        if not self._is_running:
+            return
+        self._is_running = False
+        from exstreamtv.streaming.playout_timeline import remove_version_listener
+        from exstreamtv.streaming.position_store import get_position_store
+
+        remove_version_listener(self._on_timeline_bump)
+        get_position_store().remove_forget_listener(self._on_position_forget)
+        if self._forward_tasks:
+            # Deliver queued invalidations (e.g. a final delete) before the workers stop
+            await asyncio.gather(*self._forward_tasks, return_exceptions=True)
+        if self._supervisor_task:
+            self._supervisor_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._supervisor_task
+        loop = asyncio.get_running_loop()
+        for handle in self._handles:
+            if handle.process.is_alive():
+                handle.process.terminate()
+        for handle in self._handles:
+            await loop.run_in_executor(None, handle.process.join, 15)
+            if handle.process.is_alive():
+                handle.process.kill()
+        if self._owns_socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+        logger.info("Channel shards stopped")
+
+    def _on_timeline_bump(self, channel_id: int | None) -> None:
+        """Version listener: queue the bump for the owning worker (any thread)."""
+        workers = range(self.workers) if channel_id is None else (self.owner_of(channel_id),)
+        with self._pending_lock:
+            for worker in workers:
+                self._pending_bumps.setdefault(worker, set()).add(channel_id)
+        self._schedule_forward()
+
+    def _on_position_forget(self, channel_id: int) -> None:
+        """Forget listener: the owning worker's store would write the position back."""
+        with self._pending_lock:
+            self._pending_forgets.setdefault(self.owner_of(channel_id), set()).add(channel_id)
+        self._schedule_forward()
+
+    def _schedule_forward(self) -> None:
+        with self._pending_lock:
+            if self._forward_scheduled or self._loop is None:
+                return
+            self._forward_scheduled = True
+        try:
+            self._loop.call_soon_threadsafe(self._start_forward)
+        except RuntimeError:
+            # Event loop closed during shutdown
+            self._forward_scheduled = False
+
+    def _start_forward(self) -> None:
+        task = asyncio.create_task(self._forward_invalidations())
+        self._forward_tasks.add(task)
+        task.add_done_callback(self._forward_tasks.discard)
+
+    async def _forward_invalidations(self) -> None:
+        """Send the queued bumps and forgets, one request per worker and kind."""
+        await asyncio.sleep(INVALIDATION_DELAY)
+        with self._pending_lock:
+            bumps, self._pending_bumps = self._pending_bumps, {}
+            forgets, self._pending_forgets = self._pending_forgets, {}
+            self._forward_scheduled = False
+
+        requests = [
+            self._request(
+                worker,
+                "invalidate",
+                timeout=5.0,
+                channel_ids=None if None in channels else sorted(channels),
+            )
+            for worker, channels in bumps.items()
+        ]
+        requests += [
+            self._request(worker, "forget_positions", timeout=5.0, channel_ids=sorted(channels))
+            for worker, channels in forgets.items()
+        ]
+        for reply in await asyncio.gather(*requests, return_exceptions=True):
+            if isinstance(reply, BaseException):
+                # A restarted worker starts with empty caches anyway
+                self._forward_errors += 1
+                logger.warning(f"Could not forward invalidation to a channel shard: {reply}")
+            else:
+                self._invalidations_forwarded += 1
+
+    async def _open(self, worker: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            return await asyncio.open_unix_connection(self._handles[worker].socket_path)
+        except OSError as e:
+            raise ShardWorkerError(f"Shard {worker} unreachable: {e}") from e
+
+    async def _request(
+        self, worker: int, op: str, timeout: float | None = RPC_TIMEOUT, **args: Any
+    ) -> dict[str, Any]:
+        """Send one RPC op to a worker and return its JSON reply."""
+        reader, writer = await self._open(worker)
+        try:
+            writer.write(json.dumps({"op": op, **args}).encode() + b"\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), timeout)
+        finally:
+            writer.close()
+        if not line:
+            raise ShardWorkerError(f"Shard {worker} closed the connection during {op}")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ShardWorkerError(f"Shard {worker} {op} failed: {reply['error']}")
+        return reply
+
+    async def get_channel_stream(
+        self,
+        channel_id: int,
+        channel_number: int | str,
+        channel_name: str,
+    ) -> RemoteChannelStream:
+        """
+        Proxy for the channel's stream on its owning worker.
+
+        ``is_running`` reflects the worker's state at lookup, so callers
+        that start a channel only when it is not running (the TS routes,
+        StreamService) do not restart or mis-report a live channel.
+        """
+        stream = RemoteChannelStream(self, channel_id, channel_number, channel_name)
+        try:
+            reply = await self._request(
+                stream.worker, "running", timeout=5.0, channel_id=channel_id
+            )
+            stream._is_running = bool(reply["running"])
+        except (ShardWorkerError, OSError, asyncio.TimeoutError) as e:
+            # An unreachable worker is not running the channel
+            logger.debug(f"Shard {stream.worker}: running state of channel {channel_id}: {e}")
+        return stream
+
+    async def start_channel(
+        self,
+        channel_id: int,
+        channel_number: int | str,
+        channel_name: str,
+    ) -> RemoteChannelStream:
+        stream = await self.get_channel_stream(channel_id, channel_number, channel_name)
+        await stream.start()
+        return stream
+
+    async def stop_channel(self, channel_id: int) -> None:
+        await self._request(self.owner_of(channel_id), "stop_channel", channel_id=channel_id)
+
+    async def get_current_position(self, channel_id: int) -> dict[str, Any] | None:
+        """Live playback position from the owning worker, or None if not running."""
+        reply = await self._request(
+            self.owner_of(channel_id), "position", timeout=5.0, channel_id=channel_id
+        )
+        position = reply["position"]
+        if position is not None:
+            for key in POSITION_TIME_FIELDS:
+                if position.get(key):
+                    position[key] = datetime.fromisoformat(position[key])
+        return position
+
+    async def prewarm_channels(
+        self, channel_ids: list[int] | None = None
+    ) -> dict[int, bool]:
+        """
+        Pre-warm channels on their workers.
+
+        Viewership is tracked in the front-end, so its popularity scores
+        are sent along and each worker pre-warms its share most-watched
+        first within its own process budget.
+        """
+        from sqlalchemy import select
+
+        from exstreamtv.database.models import Channel
+
+        def load_ids() -> list[int]:
+            db = self.db_session_factory()
+            try:
+                stmt = select(Channel.id).where(Channel.enabled.is_(True))
+                if channel_ids:
+                    stmt = stmt.where(Channel.id.in_(channel_ids))
+                return list(db.execute(stmt.order_by(Channel.id)).scalars())
+            finally:
+                db.close()
+
+        ids = await asyncio.get_running_loop().run_in_executor(None, load_ids)
+        popularity = get_session_manager().get_channel_popularity() if HAS_SESSION_MANAGER else {}
+
+        shares: dict[int, list[int]] = {}
+        for cid in ids:
+            shares.setdefault(self.owner_of(cid), []).append(cid)
+        replies = await asyncio.gather(
+            *(
+                self._request(
+                    worker,
+                    "prewarm",
+                    timeout=None,
+                    channel_ids=share,
+                    popularity={str(cid): popularity.get(cid, 0.0) for cid in share},
+                )
+                for worker, share in shares.items()
+            ),
+            return_exceptions=True,
+        )
+
+        results: dict[int, bool] = {}
+        for worker, reply in zip(shares, replies, strict=True):
+            if isinstance(reply, BaseException):
+                logger.error(f"Pre-warm on shard {worker} failed: {reply}")
+                continue
+            results.update({int(k): v for k, v in reply["results"].items()})
+        return results
+
+    def get_running_stream(self, channel_id: int) -> None:
+        """Streams live in the workers; there is no local ChannelStream."""
+        return None
+
+    def get_running_stream_by_number(self, channel_number: int | str) -> None:
+        """Streams live in the workers; there is no local ChannelStream."""
+        return None
+
+    async def get_worker_stats(self) -> list[dict[str, Any]]:
+        """Per-worker stats (clients, bytes relayed, active channels)."""
+        stats = []
+        for handle in self._handles:
+            try:
+                stats.append(await self._request(handle.index, "stats", timeout=5.0))
+            except (ShardWorkerError, OSError, asyncio.TimeoutError) as e:
+                stats.append({"worker": handle.index, "error": str(e)})
+        return stats
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self._is_running,
+            "socket_dir": self._socket_dir,
+            "restarts": [h.restarts for h in self._handles],
+            "alive": [bool(h.process and h.process.is_alive()) for h in self._handles],
+            "invalidations_forwarded": self._invalidations_forwarded,
+            "forward_errors": self._forward_errors,
+        }
@@ -0,0 +1,286 @@
+"""
+Persistent per-channel FFmpeg encoder fed by an ffconcat playlist.
+
+The default ("per_item") streaming mode spawns ffprobe + FFmpeg (and yt-dlp
+for scripted sources) for every playout item. On channels with short items
+(music videos, bumpers) the spawn and encoder start-up cost dominates CPU.
+
+In "persistent" mode each channel keeps one long-lived FFmpeg. Its input is
+an ffconcat script that loops forever (-stream_loop -1) over two entries
+pointing back at this server:
+
+    ffconcat version 1.0
+    file 'http://127.0.0.1:8411/iptv/concat/{channel_id}/next'
+    file 'http://127.0.0.1:8411/iptv/concat/{channel_id}/next'
+
+Every time FFmpeg opens an entry, the channel's playout loop advances to the
+next item and the endpoint redirects to its media (a local file served with
+Range support, or the remote URL). FFmpeg decodes each item, normalizes it
+to a fixed resolution/frame rate/audio layout and encodes one continuous
+MPEG-TS output, so timestamps never restart between items.
+
+The feed endpoints only answer loopback clients carrying the encoder's
+random ``feed_token``, so nothing else on the network can advance a
+channel or make the server open media.
+
+The concat demuxer keeps the stream layout of the first entry, so an
+encoder only plays items whose codecs match (stream_signature()). An item
+that differs, or cannot be probed, ends the encoder gracefully; the
+channel plays it per-item and starts a fresh encoder after it.
+"""
+
+import asyncio
+import contextlib
+import logging
+import secrets
+import shlex
+import signal
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from exstreamtv.config import get_config
+
+logger = logging.getLogger(__name__)
+
+ENCODER_MODE_PER_ITEM = "per_item"
+ENCODER_MODE_PERSISTENT = "persistent"
+
+CONCAT_PROTOCOL_WHITELIST = "file,http,https,tcp,tls,crypto"
+
+
+def build_concat_script(entry_url: str, entries: int = 2) -> str:
+    """Return an ffconcat script listing the same feed URL ``entries`` times."""
+    quoted = entry_url.replace("'", "'\\''")
+    lines = ["ffconcat version 1.0"]
+    lines.extend(f"file '{quoted}'" for _ in range(entries))
+    return "\n".join(lines) + "\n"
+
+
+def concat_feed_base_url(channel_id: int | str) -> str:
+    """Loopback URL prefix of the concat feed endpoints for a channel."""
+    port = get_config().server.port
+    return f"http://127.0.0.1:{port}/iptv/concat/{channel_id}"
+
+
+def concat_feed_query(feed_token: str) -> str:
+    """Query string carrying the encoder's feed token (and the API access token)."""
+    query = f"?feed_token={feed_token}"
+    security = get_config().security
+    if security.api_key_required and security.access_token:
+        query += f"&access_token={security.access_token}"
+    return query
+
+
+async def stream_signature(media_url: str) -> tuple[str, str | None] | None:
+    """
+    (video codec, audio codec or None) of an item, from the probe cache.
+
+    None when the item cannot be probed (scripted sources, probe errors).
+    """
+    from exstreamtv.ffmpeg.probe_service import ProbeError, get_probe_service
+    from exstreamtv.streaming.mpegts_streamer import _is_script_field
+
+    if _is_script_field(media_url):
+        return None
+    try:
+        data = await get_probe_service().probe(media_url.removeprefix("file://"), timeout=15)
+    except ProbeError as e:
+        logger.debug(f"Cannot probe concat item {media_url[:80]}: {e}")
+        return None
+    codecs: dict[str, str | None] = {"video": None, "audio": None}
+    for stream in data.get("streams", []):
+        kind = stream.get("codec_type")
+        if kind in codecs and codecs[kind] is None:
+            codecs[kind] = stream.get("codec_name")
+    if codecs["video"] is None:
+        return None
+    return codecs["video"], codecs["audio"]
+
+
+class PersistentChannelEncoder:
+    """
+    One long-lived FFmpeg process producing a channel's MPEG-TS output.
+
+    The encoder always transcodes (items differ in codec and resolution), so
+    per-item stream copy is not available; the saving is one spawn per
+    channel instead of one ffprobe + FFmpeg per item.
+    """
+
+    def __init__(
+        self,
+        channel_id: int | str,
+        script_path: Path | None = None,
+        ffmpeg_path: str | None = None,
+    ):
+        config = get_config()
+        self.channel_id = channel_id
+        self._ffmpeg_path = ffmpeg_path or config.ffmpeg.path
+        self._script_path = script_path
+        self._owns_script = script_path is None
+        self._process: asyncio.subprocess.Process | None = None
+        self._spawn_count = 0
+        # Required on every feed request; only this encoder's FFmpeg knows it
+        self.feed_token = secrets.token_urlsafe(16)
+
+    @property
+    def spawn_count(self) -> int:
+        """Number of FFmpeg processes started by this encoder."""
+        return self._spawn_count
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    def build_command(self, script_path: Path) -> list[str]:
+        """Build the FFmpeg command for a concat script."""
+        config = get_config()
+        defaults = config.ffmpeg.defaults
+        width, _, height = defaults.resolution.partition("x")
+        vf = (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+            f"setsar=1,fps={defaults.framerate},format=yuv420p"
+        )
+        cmd = [
+            self._ffmpeg_path,
+            "-loglevel", config.ffmpeg.log_level,
+            "-nostdin",
+            "-fflags", "+genpts+discardcorrupt+igndts",
+            "-re",
+            "-f", "concat",
+            "-safe", "0",
+            "-protocol_whitelist", CONCAT_PROTOCOL_WHITELIST,
+            "-stream_loop", "-1",
+            "-i", str(script_path),
+            "-map", "0:v:0",
+            "-map", "0:a:0?",
+        ]
+        if config.ffmpeg.threads > 0:
+            cmd.extend(["-threads", str(config.ffmpeg.threads)])
+        cmd.extend([
+            "-vf", vf,
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-b:v", defaults.video_bitrate,
+            "-maxrate", defaults.video_bitrate,
+            "-bufsize", "12M",
+            "-profile:v", "high",
+            "-level", "4.1",
+            "-g", str(defaults.framerate * 2),
+            "-bsf:v", "dump_extra",
+            "-af", "aresample=async=1:min_hard_comp=0.100000:first_pts=0",
+            "-c:a", "aac",
+            "-b:a", defaults.audio_bitrate,
+            "-ar", "48000",
+            "-ac", "2",
+            "-vsync", "cfr",
+            "-f", "mpegts",
+            "-muxrate", "4M",
+            "-pcr_period", "20",
+            "-flush_packets", "1",
+            "-max_interleave_delta", "0",
+        ])
+        if config.ffmpeg.extra_flags:
+            try:
+                cmd.extend(shlex.split(config.ffmpeg.extra_flags))
+            except ValueError as e:
+                logger.warning(f"Failed to parse extra_flags '{config.ffmpeg.extra_flags}': {e}")
+        cmd.append("-")
+        return cmd
+
+    def _write_script(self) -> Path:
+        if self._script_path is None:
+            handle = tempfile.NamedTemporaryFile(
+                mode="w",
+                prefix=f"exstreamtv-concat-{self.channel_id}-",
+                suffix=".ffconcat",
+                delete=False,
+            )
+            with handle:
+                handle.write(
+                    build_concat_script(
+                        f"{concat_feed_base_url(self.channel_id)}/next"
+                        f"{concat_feed_query(self.feed_token)}"
+                    )
+                )
+            self._script_path = Path(handle.name)
+        return self._script_path
+
+    async def stream(self, buffer_size: int = 65536) -> AsyncIterator[bytes]:
+        """Spawn the encoder and yield its output until it exits."""
+        from exstreamtv.streaming.ffmpeg_process_manager import get_ffmpeg_process_manager
+
+        script_path = self._write_script()
+        cmd = self.build_command(script_path)
+        logger.info(f"Persistent encoder for channel {self.channel_id}: {' '.join(cmd)}")
+        process = await get_ffmpeg_process_manager().spawn(
+            *cmd,
+            tag=f"concat:{self.channel_id}",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._process = process
+        self._spawn_count += 1
+
+        stderr_tail: list[bytes] = []
+
+        async def _drain_stderr() -> None:
+            if process.stderr:
+                with contextlib.suppress(ConnectionResetError, BrokenPipeError):
+                    while True:
+                        data = await process.stderr.read(8192)
+                        if not data:
+                            break
+                        stderr_tail.append(data)
+                        del stderr_tail[:-8]
+
+        drain_task = asyncio.create_task(_drain_stderr())
+        try:
+            while True:
+                chunk = await process.stdout.read(buffer_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            drain_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await drain_task
+            await self.stop()
+            if process.returncode:
+                stderr = b"".join(stderr_tail).decode("utf-8", errors="replace")
+                logger.warning(
+                    f"Persistent encoder for channel {self.channel_id} exited "
+                    f"with {process.returncode}: {stderr[-500:]}"
+                )
+
+    def finish(self) -> None:
+        """Ask FFmpeg to flush what it has encoded and exit (SIGINT)."""
+        if self.is_running:
+            with contextlib.suppress(ProcessLookupError):
+                self._process.send_signal(signal.SIGINT)
+
+    async def stop(self) -> None:
+        """Terminate the encoder process and remove its concat script."""
+        process = self._process
+        self._process = None
+        if process is not None and process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        if self._owns_script and self._script_path is not None:
+            with contextlib.suppress(OSError):
+                self._script_path.unlink()
+            self._script_path = None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get encoder statistics."""
+        return {
+            "running": self.is_running,
+            "pid": self._process.pid if self.is_running else None,
+            "spawn_count": self._spawn_count,
+        }
@@ -123,6 +123,12 @@ class FFmpegProcessManager:
             except OSError:
                 pass
 
+        try:
+            from exstreamtv.monitoring.metrics import get_metrics_collector
+            get_metrics_collector().inc_ffmpeg_spawn(str(tag).split(":", 1)[0] or "other")
+        except Exception:
+            pass
+
         managed = ManagedProcess(process=process, pgid=pgid, tag=str(tag))
         async with self._registry_lock:
             self._registry[process.pid] = managed
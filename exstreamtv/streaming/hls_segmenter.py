@@ -0,0 +1,442 @@
+"""
+Live HLS packager fed by a ChannelStream broadcast.
+
+The channel's MPEG-TS output (the same bytes the ring buffer fans out to TS
+clients) is cut into keyframe-aligned segments held in a bounded in-memory
+window. Every HLS client of the channel reads the same segments and the same
+rendered playlist, so HLS viewers cost no extra FFmpeg process.
+
+- Segments start at a random-access point on the video PID and are prefixed
+  with the cached PAT + PMT so each one decodes on its own
+- Durations come from video DTS (continuous across items when TSSplicer or
+  the persistent encoder is active); timestamp jumps start a new segment
+  tagged EXT-X-DISCONTINUITY
+- Optional LL-HLS: segments are also split into partial segments
+  (EXT-X-PART), with blocking playlist reload (_HLS_msn/_HLS_part) and
+  EXT-X-PRELOAD-HINT for the next part
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from exstreamtv.streaming.ts_index import (
+    NULL_PID,
+    PAT_PID,
+    TS_PACKET_SIZE,
+    TS_SYNC_BYTE,
+    parse_pat,
+    parse_pmt_video_pid,
+)
+from exstreamtv.streaming.ts_splicer import TIMESTAMP_MODULO, _read_timestamp
+
+logger = logging.getLogger(__name__)
+
+# A DTS step larger than this (or backwards) is treated as a discontinuity
+MAX_DTS_STEP = 5 * 90000
+
+# Completed segments kept beyond the playlist window for clients that are
+# still fetching the oldest listed segments
+EXTRA_SEGMENTS = 2
+
+# LL-HLS: parts are advertised for this many of the newest complete segments
+PART_SEGMENTS = 3
+
+
+def _pes_decode_timestamp(packet: memoryview | bytes, payload: int) -> int | None:
+    """DTS (or PTS when no DTS) of a PES header starting at ``payload``."""
+    if payload + 14 > TS_PACKET_SIZE:
+        return None
+    if packet[payload] != 0 or packet[payload + 1] != 0 or packet[payload + 2] != 1:
+        return None
+    flags = packet[payload + 7] >> 6
+    if flags == 0x3 and payload + 19 <= TS_PACKET_SIZE:
+        return _read_timestamp(packet, payload + 14)
+    if flags & 0x2:
+        return _read_timestamp(packet, payload + 9)
+    return None
+
+
+class HLSPart:
+    """A partial segment: a byte range of its parent segment."""
+
+    __slots__ = ("start", "end", "duration", "independent")
+
+    def __init__(self, start: int, end: int, duration: float, independent: bool):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.independent = independent
+
+
+class HLSSegment:
+    """One media segment (complete once ``duration`` is set)."""
+
+    __slots__ = ("sequence", "data", "duration", "discontinuity", "program_date_time", "parts")
+
+    def __init__(self, sequence: int, discontinuity: bool, preamble: bytes):
+        self.sequence = sequence
+        self.data: bytearray | bytes = bytearray(preamble)
+        self.duration: float | None = None
+        self.discontinuity = discontinuity
+        self.program_date_time = datetime.now(timezone.utc)
+        self.parts: list[HLSPart] = []
+
+
+class LiveHLSSegmenter:
+    """
+    Keyframe-aligned segmenter over a live MPEG-TS byte stream.
+
+    ``feed()`` is called with every chunk the channel publishes; chunks need
+    not be packet-aligned. Playlist and segment accessors are cheap and safe
+    to call from any number of request handlers.
+    """
+
+    def __init__(
+        self,
+        target_duration: float = 6.0,
+        window: int = 5,
+        part_duration: float | None = None,
+    ):
+        self.target_duration = target_duration
+        self.window = window
+        self.part_duration = part_duration
+
+        self._pending = bytearray()
+        self._pat_packet: bytes | None = None
+        self._pmt_pids: set[int] = set()
+        self._pmt_packet: bytes | None = None
+        self._video_pid: int | None = None
+
+        self._segments: deque[HLSSegment] = deque()
+        self._current: HLSSegment | None = None
+        self._next_sequence = 0
+        self._dropped_discontinuities = 0
+        self._discontinuity_pending = False
+
+        # Media clock (seconds) advanced by video DTS deltas
+        self._media_time = 0.0
+        self._last_dts: int | None = None
+        self._last_step = 0.0
+        self._segment_started_at = 0.0
+        self._part_started_at = 0.0
+        self._part_start = 0
+        self._part_independent = True
+
+        self._version = 0
+        self._changed = asyncio.Event()
+        self._playlist_cache: dict[tuple[str, str], tuple[int, str]] = {}
+
+        self._bytes_in = 0
+        self._segments_cut = 0
+        self._parts_cut = 0
+        self._discontinuities = 0
+        self._playlist_renders = 0
+        self._playlist_requests = 0
+        self._created_at = time.monotonic()
+
+    @property
+    def low_latency(self) -> bool:
+        return bool(self.part_duration)
+
+    @property
+    def media_sequence(self) -> int:
+        """Sequence number of the first segment in the playlist window."""
+        listed = self._listed_segments()
+        return listed[0].sequence if listed else self._next_sequence
+
+    # -- ingest ---------------------------------------------------------------
+
+    def feed(self, data: bytes) -> None:
+        """Consume the next bytes of the channel's transport stream."""
+        self._bytes_in += len(data)
+        pending = self._pending
+        pending += data
+        end = len(pending)
+        pos = 0
+        view = memoryview(pending)
+        try:
+            while end - pos >= TS_PACKET_SIZE:
+                if pending[pos] != TS_SYNC_BYTE:
+                    nxt = pending.find(TS_SYNC_BYTE, pos + 1)
+                    pos = end if nxt < 0 else nxt
+                    continue
+                self._handle_packet(view[pos:pos + TS_PACKET_SIZE])
+                pos += TS_PACKET_SIZE
+        finally:
+            view.release()
+        del pending[:pos]
+
+    def mark_discontinuity(self) -> None:
+        """Timestamps restart (new item without splicing, or stream restart)."""
+        self._pending.clear()
+        self._last_dts = None
+        if self._current is not None:
+            self._discontinuity_pending = True
+
+    def _handle_packet(self, packet: memoryview) -> None:
+        b1 = packet[1]
+        pid = ((b1 & 0x1F) << 8) | packet[2]
+        if pid == NULL_PID:
+            return
+        pusi = b1 & 0x40
+        if pid == PAT_PID:
+            if pusi:
+                pmt_pids = parse_pat(bytes(packet))
+                if pmt_pids:
+                    self._pat_packet = bytes(packet)
+                    if set(pmt_pids) != self._pmt_pids:
+                        self._pmt_pids = set(pmt_pids)
+                        self._pmt_packet = None
+                        self._video_pid = None
+        elif pid in self._pmt_pids:
+            if pusi:
+                video_pid = parse_pmt_video_pid(bytes(packet))
+                if video_pid is not None:
+                    self._pmt_packet = bytes(packet)
+                    self._video_pid = video_pid
+        elif pid == self._video_pid:
+            afc = (packet[3] >> 4) & 0x3
+            rap = bool(afc & 0x2 and packet[4] > 0 and packet[5] & 0x40)
+            if pusi and afc & 0x1:
+                payload = 4 + (1 + packet[4] if afc & 0x2 else 0)
+                dts = _pes_decode_timestamp(packet, payload)
+                if dts is not None:
+                    self._advance_clock(dts)
+            current = self._current
+            if rap and (
+                current is None
+                or self._discontinuity_pending
+                or self._media_time - self._segment_started_at >= self.target_duration
+            ):
+                self._cut_segment()
+            elif (
+                current is not None
+                and pusi
+                and self.part_duration
+                # Cut before this frame if including it would overrun PART-TARGET
+                and self._media_time - self._part_started_at + self._last_step
+                > self.part_duration
+            ):
+                self._cut_part(next_independent=rap)
+
+        if self._current is not None:
+            self._current.data += packet
+
+    def _advance_clock(self, dts: int) -> None:
+        last = self._last_dts
+        self._last_dts = dts
+        if last is None:
+            return
+        step = (dts - last) % TIMESTAMP_MODULO
+        if step > MAX_DTS_STEP:
+            self._discontinuity_pending = True
+            return
+        self._last_step = step / 90000
+        self._media_time += self._last_step
+
+    def _cut_part(self, next_independent: bool) -> None:
+        current = self._current
+        end = len(current.data)
+        if end > self._part_start:
+            current.parts.append(
+                HLSPart(
+                    self._part_start,
+                    end,
+                    self._media_time - self._part_started_at,
+                    self._part_independent,
+                )
+            )
+            self._parts_cut += 1
+            self._signal()
+        self._part_start = end
+        self._part_started_at = self._media_time
+        self._part_independent = next_independent
+
+    def _cut_segment(self) -> None:
+        previous = self._current
+        if previous is not None:
+            if self.part_duration:
+                self._cut_part(next_independent=True)
+            previous.duration = max(self._media_time - self._segment_started_at, 0.001)
+            previous.data = bytes(previous.data)
+            self._segments.append(previous)
+            self._segments_cut += 1
+            while len(self._segments) > self.window + EXTRA_SEGMENTS:
+                if self._segments.popleft().discontinuity:
+                    self._dropped_discontinuities += 1
+
+        discontinuity = self._discontinuity_pending and previous is not None
+        if discontinuity:
+            self._discontinuities += 1
+        self._discontinuity_pending = False
+        preamble = (
+            self._pat_packet + self._pmt_packet
+            if self._pat_packet and self._pmt_packet
+            else b""
+        )
+        self._current = HLSSegment(self._next_sequence, discontinuity, preamble)
+        self._next_sequence += 1
+        self._segment_started_at = self._media_time
+        self._part_started_at = self._media_time
+        self._part_start = 0
+        self._part_independent = True
+        self._signal()
+
+    def _signal(self) -> None:
+        self._version += 1
+        changed = self._changed
+        self._changed = asyncio.Event()
+        changed.set()
+
+    # -- serving --------------------------------------------------------------
+
+    def _listed_segments(self) -> list[HLSSegment]:
+        segments = list(self._segments)
+        return segments[-self.window:] if self.window else segments
+
+    def _is_available(self, sequence: int, part: int | None) -> bool:
+        last_complete = self._segments[-1].sequence if self._segments else -1
+        if sequence <= last_complete:
+            return True
+        current = self._current
+        if part is None or current is None:
+            return False
+        if sequence < current.sequence:
+            return True
+        return sequence == current.sequence and len(current.parts) > part
+
+    async def wait_for(
+        self, sequence: int, part: int | None = None, timeout: float = 10.0
+    ) -> bool:
+        """Wait until a segment (or a part of it) is available."""
+        deadline = time.monotonic() + timeout
+        while not self._is_available(sequence, part):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait for the first complete segment."""
+        first = self._segments[0].sequence if self._segments else 0
+        return await self.wait_for(first, timeout=timeout)
+
+    def get_segment(self, sequence: int) -> bytes | None:
+        """Bytes of a complete segment still in memory."""
+        for segment in reversed(self._segments):
+            if segment.sequence == sequence:
+                return segment.data
+            if segment.sequence < sequence:
+                break
+        return None
+
+    def get_part(self, sequence: int, part: int) -> bytes | None:
+        """Bytes of a partial segment (of a complete or in-progress segment)."""
+        candidates = [self._current] if self._current is not None else []
+        candidates.extend(reversed(self._segments))
+        for segment in candidates:
+            if segment.sequence == sequence:
+                if 0 <= part < len(segment.parts):
+                    p = segment.parts[part]
+                    return bytes(segment.data[p.start:p.end])
+                return None
+        return None
+
+    def render_playlist(self, uri_prefix: str = "", query: str = "") -> str:
+        """
+        Render the live media playlist.
+
+        The text is cached per (prefix, query) until the next segment or
+        part is cut, so concurrent clients share one rendering.
+        """
+        self._playlist_requests += 1
+        key = (uri_prefix, query)
+        cached = self._playlist_cache.get(key)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        listed = self._listed_segments()
+        durations = [s.duration for s in listed]
+        target = math.ceil(max([self.target_duration, *durations]))
+        dropped = self._dropped_discontinuities + sum(
+            1 for s in self._segments if s.discontinuity and listed and s.sequence < listed[0].sequence
+        )
+
+        lines = [
+            "#EXTM3U",
+            f"#EXT-X-VERSION:{9 if self.low_latency else 6}",
+            f"#EXT-X-TARGETDURATION:{target}",
+        ]
+        if self.low_latency:
+            lines.append(
+                "#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,"
+                f"PART-HOLD-BACK={3 * self.part_duration:.3f}"
+            )
+            lines.append(f"#EXT-X-PART-INF:PART-TARGET={self.part_duration:.3f}")
+        lines.append(f"#EXT-X-MEDIA-SEQUENCE:{self.media_sequence}")
+        lines.append(f"#EXT-X-DISCONTINUITY-SEQUENCE:{dropped}")
+
+        with_parts = len(listed) - (PART_SEGMENTS if self.low_latency else len(listed))
+        for i, segment in enumerate(listed):
+            self._render_segment_head(lines, segment)
+            if i >= with_parts:
+                self._render_parts(lines, segment, uri_prefix, query)
+            lines.append(f"#EXTINF:{segment.duration:.3f},")
+            lines.append(f"{uri_prefix}{segment.sequence}.ts{query}")
+
+        current = self._current
+        if self.low_latency and current is not None and listed:
+            self._render_segment_head(lines, current)
+            self._render_parts(lines, current, uri_prefix, query)
+            lines.append(
+                f'#EXT-X-PRELOAD-HINT:TYPE=PART,'
+                f'URI="{uri_prefix}{current.sequence}.{len(current.parts)}.ts{query}"'
+            )
+
+        text = "\n".join(lines) + "\n"
+        self._playlist_cache[key] = (self._version, text)
+        self._playlist_renders += 1
+        return text
+
+    @staticmethod
+    def _render_segment_head(lines: list[str], segment: HLSSegment) -> None:
+        if segment.discontinuity:
+            lines.append("#EXT-X-DISCONTINUITY")
+        lines.append(
+            "#EXT-X-PROGRAM-DATE-TIME:"
+            + segment.program_date_time.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        )
+
+    @staticmethod
+    def _render_parts(lines: list[str], segment: HLSSegment, uri_prefix: str, query: str) -> None:
+        for index, part in enumerate(segment.parts):
+            independent = ",INDEPENDENT=YES" if part.independent else ""
+            lines.append(
+                f'#EXT-X-PART:DURATION={part.duration:.3f},'
+                f'URI="{uri_prefix}{segment.sequence}.{index}.ts{query}"{independent}'
+            )
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get segmenter statistics."""
+        return {
+            "low_latency": self.low_latency,
+            "media_sequence": self.media_sequence,
+            "segments": len(self._segments),
+            "segments_cut": self._segments_cut,
+            "parts_cut": self._parts_cut,
+            "discontinuities": self._discontinuities,
+            "window_bytes": sum(len(s.data) for s in self._segments),
+            "bytes_in": self._bytes_in,
+            "playlist_requests": self._playlist_requests,
+            "playlist_renders": self._playlist_renders,
+            "uptime_seconds": time.monotonic() - self._created_at,
+        }
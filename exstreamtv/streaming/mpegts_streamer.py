@@ -26,19 +26,13 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Optional
 
-from cachetools import TTLCache
-
 from exstreamtv.config import get_config
+from exstreamtv.ffmpeg.probe_service import get_probe_service
 from exstreamtv.streaming.error_handler import ErrorHandler as _EH
 
 logger = logging.getLogger(__name__)
 _error_handler = _EH(max_retries=3, backoff_base=1.0)
 
-# Issue 1.4: Cache ffprobe results by URL. Identical URLs return identical
-# codec info, so re-probing on every schedule rotation is pure waste.
-# maxsize=1000 URLs, ttl=3600s (1 hour).
-_probe_cache: TTLCache = TTLCache(maxsize=1000, ttl=3600)
-
 # Issues 9.2/10.1: Cap concurrent VideoToolbox encoder sessions.
 # When the cap is reached, new streams wait rather than silently falling
 # back to software encoding via -allow_sw 1 (which cascades CPU load).
@@ -148,37 +142,14 @@ class MPEGTSStreamer:
         Returns:
             CodecInfo with detected codecs.
         """
-        # Issue 1.4: Return cached probe result for identical URLs
-        cached = _probe_cache.get(input_url)
-        if cached is not None:
-            logger.debug(f"probe_stream: cache hit for {input_url[:80]}")
-            return cached
-
         try:
-            cmd = [
-                self._ffprobe_path,
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                "-show_streams",
-                input_url,
-            ]
-            
-            # Issue 1.2: Route ffprobe through central process manager
-            from exstreamtv.streaming.ffmpeg_process_manager import get_ffmpeg_process_manager
-            _fpm = get_ffmpeg_process_manager()
-            result = await _fpm.spawn(
-                *cmd,
-                tag=f"ffprobe:{input_url[:60]}",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+            # Issue 1.4: Shared persistent probe cache (single ffprobe run per
+            # input across call sites and restarts); Issue 1.2: runs through
+            # the central process manager.
+            data = await get_probe_service().probe(
+                input_url, timeout=30, ffprobe_path=self._ffprobe_path
             )
             
-            stdout, _ = await asyncio.wait_for(result.communicate(), timeout=30)
-            
-            import json
-            data = json.loads(stdout.decode("utf-8", errors="replace"))
-            
             info = CodecInfo()
             
             # Extract duration from format metadata
@@ -222,9 +193,6 @@ class MPEGTSStreamer:
                 f"Probed stream: video={info.video_codec}, audio={info.audio_codec}, "
                 f"duration={info.duration:.1f}s, copy_video={info.can_copy_video}, copy_audio={info.can_copy_audio}"
             )
-            
-            # Issue 1.4: Store in cache for subsequent calls
-            _probe_cache[input_url] = info
             return info
             
         except Exception as e:
@@ -28,6 +28,34 @@ def _get_session_factory():
     return get_sync_session
 
 
+def _journal_row(
+    channel_id: int,
+    *,
+    current_index: int,
+    item_id: Optional[int],
+    accumulated_valid_play_time: float,
+    retry_count: int,
+    bytes_sent: int,
+    last_known_state: str,
+    last_exit_classification: Optional[str],
+    last_stderr_snippet: Optional[str],
+):
+    from exstreamtv.database.models.playout_journal import PlayoutJournal
+
+    return PlayoutJournal(
+        channel_id=channel_id,
+        current_index=current_index,
+        item_id=item_id,
+        accumulated_valid_play_time=accumulated_valid_play_time,
+        retry_count=retry_count,
+        bytes_sent=bytes_sent,
+        last_known_state=last_known_state,
+        last_exit_classification=last_exit_classification,
+        last_stderr_snippet=last_stderr_snippet[:500] if last_stderr_snippet else None,
+        journal_updated_at=datetime.utcnow(),
+    )
+
+
 async def write_journal_async(
     channel_id: int,
     *,
@@ -41,15 +69,18 @@ async def write_journal_async(
     last_stderr_snippet: Optional[str] = None,
 ) -> None:
     """
-    Write journal entry (async). Uses sync session in executor to avoid blocking.
+    Write journal entry (async).
+
+    Goes through the DB write queue when it is running (batched with other
+    small writes); otherwise uses a sync session in an executor.
     """
     import asyncio
-    from exstreamtv.database.models.playout_journal import PlayoutJournal
+    from exstreamtv.database.write_queue import WriteQueueClosed, get_write_queue
 
-    def _write(db_session_factory) -> None:
-        with db_session_factory() as session:
-            row = PlayoutJournal(
-                channel_id=channel_id,
+    def _add(session: Session) -> None:
+        session.add(
+            _journal_row(
+                channel_id,
                 current_index=current_index,
                 item_id=item_id,
                 accumulated_valid_play_time=accumulated_valid_play_time,
@@ -57,19 +88,26 @@ async def write_journal_async(
                 bytes_sent=bytes_sent,
                 last_known_state=last_known_state,
                 last_exit_classification=last_exit_classification,
-                last_stderr_snippet=last_stderr_snippet[:500] if last_stderr_snippet else None,
-                journal_updated_at=datetime.utcnow(),
+                last_stderr_snippet=last_stderr_snippet,
             )
-            session.add(row)
+        )
+
+    def _write(db_session_factory) -> None:
+        with db_session_factory() as session:
+            _add(session)
             session.commit()
-            logger.debug(
-                f"Journal written ch={channel_id} idx={current_index} "
-                f"state={last_known_state} exit={last_exit_classification}"
-            )
 
-    session_factory = _get_session_factory()
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, lambda: _write(session_factory))
+    queue = get_write_queue()
+    try:
+        await queue.submit_async(_add, label=f"journal ch={channel_id}")
+    except WriteQueueClosed:
+        session_factory = _get_session_factory()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, lambda: _write(session_factory))
+    logger.debug(
+        f"Journal written ch={channel_id} idx={current_index} "
+        f"state={last_known_state} exit={last_exit_classification}"
+    )
 
 
 def write_journal_sync(
@@ -85,30 +123,37 @@ def write_journal_sync(
     last_exit_classification: Optional[str] = None,
     last_stderr_snippet: Optional[str] = None,
 ) -> None:
-    """Write journal entry (sync). Telemetry only — index never used for schedule."""
-    from exstreamtv.database.models.playout_journal import PlayoutJournal
+    """
+    Write journal entry (sync). Telemetry only — index never used for schedule.
 
-    session = db_session_factory()
+    With the DB write queue running the row is queued and this returns at
+    once (failures are logged by the queue); otherwise it is committed here.
+    """
+    from exstreamtv.database.write_queue import WriteQueueClosed, get_write_queue
+
+    row = _journal_row(
+        channel_id,
+        current_index=current_index,
+        item_id=item_id,
+        accumulated_valid_play_time=accumulated_valid_play_time,
+        retry_count=retry_count,
+        bytes_sent=bytes_sent,
+        last_known_state=last_known_state,
+        last_exit_classification=last_exit_classification,
+        last_stderr_snippet=last_stderr_snippet,
+    )
     try:
-        row = PlayoutJournal(
-            channel_id=channel_id,
-            current_index=current_index,
-            item_id=item_id,
-            accumulated_valid_play_time=accumulated_valid_play_time,
-            retry_count=retry_count,
-            bytes_sent=bytes_sent,
-            last_known_state=last_known_state,
-            last_exit_classification=last_exit_classification,
-            last_stderr_snippet=last_stderr_snippet[:500] if last_stderr_snippet else None,
-            journal_updated_at=datetime.utcnow(),
-        )
-        session.add(row)
-        session.commit()
-        logger.debug(
-            f"Journal written ch={channel_id} state={last_known_state} exit={last_exit_classification}"
-        )
-    finally:
-        session.close()
+        get_write_queue().submit(lambda session: session.add(row), label=f"journal ch={channel_id}")
+    except WriteQueueClosed:
+        session = db_session_factory()
+        try:
+            session.add(row)
+            session.commit()
+        finally:
+            session.close()
+    logger.debug(
+        f"Journal written ch={channel_id} state={last_known_state} exit={last_exit_classification}"
+    )
 
 
 def write_journal_telemetry(
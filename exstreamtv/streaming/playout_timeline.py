@@ -0,0 +1,360 @@
+"""
+In-memory playout timeline cache for ChannelStream.
+
+ChannelStream used to load every PlayoutItem (joined with MediaItem) of the
+active playout each time it advanced to the next programme. PlayoutTimeline
+is a compact snapshot of that ordered list, loaded once per channel, so an
+advance is an O(1) index into memory with no DB round-trip.
+
+Invalidation is version based. Each channel has a timeline version held in
+this module; a cached timeline is stale once the version moves on. Versions
+are bumped:
+- Automatically, by SQLAlchemy session hooks, when a transaction that
+  flushed Playout, PlayoutItem, ProgramSchedule or ProgramScheduleItem
+  rows, or ran a bulk DELETE/UPDATE on them, commits (not at flush time,
+  so other connections never cache pre-commit rows under a new version)
+- By StreamEventBus events (schedule.applied, channel.updated,
+  source.updated), wired up in main.py
+- By a YAMLWatcher on the schedules directory (watch_schedule_files())
+- Explicitly via bump_timeline_version()
+
+Version listeners (add_version_listener()) see every bump; the channel
+shard front-end uses one to forward bumps to its worker processes.
+
+The same versions gate BroadcastScheduleAuthority's clock timelines and the
+XMLTV fragment cache.
+"""
+
+import bisect
+import contextlib
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Fallback duration for items without one (matches ChannelStream resume logic)
+DEFAULT_ITEM_DURATION = 1800
+
+_version_lock = threading.Lock()
+_global_version = 0
+_channel_versions: dict[int, int] = {}
+# Bumped with every version change, for caches that span all channels
+_generation = 0
+_playout_channels: dict[int, int] = {}
+_version_listeners: list[Callable[[int | None], None]] = []
+
+
+def timeline_version(channel_id: int) -> tuple[int, int]:
+    """Current timeline version for a channel (global, per-channel)."""
+    return _global_version, _channel_versions.get(channel_id, 0)
+
+
+def timeline_generation() -> int:
+    """Counter that changes whenever any channel's timeline version does."""
+    return _generation
+
+
+def bump_timeline_version(channel_id: int | None = None) -> None:
+    """Invalidate cached timelines for one channel, or all channels when None."""
+    global _global_version, _generation
+    with _version_lock:
+        _generation += 1
+        if channel_id is None:
+            _global_version += 1
+        else:
+            _channel_versions[channel_id] = _channel_versions.get(channel_id, 0) + 1
+    for listener in list(_version_listeners):
+        try:
+            listener(channel_id)
+        except Exception as e:
+            logger.warning(f"Timeline version listener failed: {e}")
+
+
+def add_version_listener(listener: Callable[[int | None], None]) -> None:
+    """
+    Call listener(channel_id) after every version bump (None = all channels).
+
+    Listeners run on the thread that bumped the version, which may be a
+    worker thread of a sync session.
+    """
+    _version_listeners.append(listener)
+
+
+def remove_version_listener(listener: Callable[[int | None], None]) -> None:
+    with contextlib.suppress(ValueError):
+        _version_listeners.remove(listener)
+
+
+def _channel_for_playout(playout_id: int | None) -> int | None:
+    return _playout_channels.get(playout_id) if playout_id is not None else None
+
+
+TIMELINE_INVALIDATING_EVENTS = ("schedule.applied", "channel.updated", "source.updated")
+
+
+def subscribe_timeline_invalidation(event_bus: Any) -> None:
+    """Bump timeline versions on StreamEventBus schedule/channel/source events."""
+
+    async def _on_change(channel_id: Any = None, **_: Any) -> None:
+        try:
+            bump_timeline_version(int(channel_id) if channel_id is not None else None)
+        except (TypeError, ValueError):
+            bump_timeline_version()
+
+    for name in TIMELINE_INVALIDATING_EVENTS:
+        event_bus.subscribe(name, _on_change)
+
+
+_schedule_watcher: Any | None = None
+
+
+def _on_schedule_file_changed(file_path: Path, event_type: str) -> None:
+    # File names map to channel numbers, not ids; schedule edits are rare
+    logger.debug(f"Schedule file {event_type}: {file_path}; bumping timeline versions")
+    bump_timeline_version()
+
+
+def watch_schedule_files(directory: Path | None = None) -> Any | None:
+    """
+    Bump every timeline version when a schedule YAML file changes.
+
+    Returns the running YAMLWatcher, or None when watchdog is not installed
+    or the directory does not exist.
+    """
+    global _schedule_watcher
+    from exstreamtv.scheduling.parser import SCHEDULES_DIR
+
+    directory = directory or SCHEDULES_DIR
+    if not directory.is_dir():
+        return None
+    try:
+        from exstreamtv.validation.yaml_watcher import YAMLWatcher
+
+        watcher = YAMLWatcher([directory], _on_schedule_file_changed)
+    except ImportError:
+        logger.info("watchdog not installed; schedule YAML edits are detected by mtime")
+        return None
+    try:
+        watcher.start()
+    except Exception as e:
+        logger.warning(f"Schedule file watcher failed to start: {e}")
+        return None
+    _schedule_watcher = watcher
+    return watcher
+
+
+def schedule_files_watched() -> bool:
+    """True while watch_schedule_files() keeps versions current for YAML edits."""
+    return _schedule_watcher is not None and _schedule_watcher.is_running()
+
+
+# session.info key for channel ids (None = all) to bump once the transaction commits
+_PENDING_BUMPS = "exstreamtv_pending_timeline_bumps"
+
+
+def _defer_bump(session: Session, channel_id: int | None) -> None:
+    # Bumping before commit would let another connection cache the old rows as current
+    session.info.setdefault(_PENDING_BUMPS, set()).add(channel_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_flush(session: Session, flush_context: Any) -> None:
+    from exstreamtv.database.models import (
+        Playout,
+        PlayoutItem,
+        ProgramSchedule,
+        ProgramScheduleItem,
+    )
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Playout):
+            if obj.channel_id is not None:
+                _playout_channels[obj.id] = obj.channel_id
+            _defer_bump(session, obj.channel_id)
+        elif isinstance(obj, PlayoutItem):
+            _defer_bump(session, _channel_for_playout(obj.playout_id))
+        elif isinstance(obj, (ProgramSchedule, ProgramScheduleItem)):
+            # A schedule can back any number of playouts
+            _defer_bump(session, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state: Any) -> None:
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    from exstreamtv.database.models import (
+        Playout,
+        PlayoutItem,
+        ProgramSchedule,
+        ProgramScheduleItem,
+    )
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (
+        Playout,
+        PlayoutItem,
+        ProgramSchedule,
+        ProgramScheduleItem,
+    ):
+        _defer_bump(orm_execute_state.session, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_BUMPS, None)
+    if not pending:
+        return
+    if None in pending:
+        bump_timeline_version()
+        return
+    for channel_id in pending:
+        bump_timeline_version(channel_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_BUMPS, None)
+
+
+@dataclass(frozen=True, slots=True)
+class TimelineEntry:
+    """One playout item, reduced to what streaming needs."""
+
+    playout_item_id: int
+    media_item_id: int | None
+    title: str
+    duration: int  # seconds; 0 when unknown
+    source: str
+    source_url: str | None
+
+    @property
+    def effective_duration(self) -> int:
+        return self.duration or DEFAULT_ITEM_DURATION
+
+
+class PlayoutTimeline:
+    """
+    Immutable, ordered snapshot of a channel's active playout.
+
+    Media items are kept once per distinct id (detached from their session)
+    so URL resolvers can still be handed the ORM object.
+    """
+
+    def __init__(
+        self,
+        channel_id: int,
+        playout_id: int,
+        version: tuple[int, int],
+        entries: list[TimelineEntry],
+        media_items: dict[int, Any],
+    ):
+        self.channel_id = channel_id
+        self.playout_id = playout_id
+        self.version = version
+        self._entries = entries
+        self._media_items = media_items
+        # _offsets[i] = start of entry i within one cycle (seconds)
+        self._offsets: list[int] = []
+        total = 0
+        for entry in entries:
+            self._offsets.append(total)
+            total += entry.effective_duration
+        self.total_duration = total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index: int) -> TimelineEntry:
+        return self._entries[index]
+
+    def is_current(self) -> bool:
+        """True while no invalidation happened since this snapshot was loaded."""
+        return self.version == timeline_version(self.channel_id)
+
+    def media_item(self, entry: TimelineEntry) -> Any | None:
+        """Detached MediaItem for an entry, if it references one."""
+        if entry.media_item_id is None:
+            return None
+        return self._media_items.get(entry.media_item_id)
+
+    def locate(self, cycle_position: float) -> tuple[int, float]:
+        """Return (index, offset into that item) for a position within one cycle."""
+        if not self._entries:
+            return 0, 0.0
+        index = bisect.bisect_right(self._offsets, cycle_position) - 1
+        index = min(max(index, 0), len(self._entries) - 1)
+        return index, cycle_position - self._offsets[index]
+
+
+def load_playout_timeline(db: Session, channel_id: int) -> PlayoutTimeline | None:
+    """Load the active playout of a channel into a PlayoutTimeline (None if absent)."""
+    from exstreamtv.database.models import MediaItem, Playout, PlayoutItem
+
+    # Capture the version first so a write racing the load invalidates it.
+    version = timeline_version(channel_id)
+    playout = db.execute(
+        select(Playout).where(
+            Playout.channel_id == channel_id,
+            Playout.is_active == True,  # noqa: E712
+        )
+    ).scalar_one_or_none()
+    if playout is None:
+        return None
+    _playout_channels[playout.id] = channel_id
+
+    rows = db.execute(
+        select(PlayoutItem, MediaItem)
+        .outerjoin(MediaItem, PlayoutItem.media_item_id == MediaItem.id)
+        .where(PlayoutItem.playout_id == playout.id)
+        .order_by(PlayoutItem.start_time)
+    ).all()
+
+    # Local helper avoids importing channel_manager (circular import).
+    def _seconds(value: Any) -> int:
+        if value is None:
+            return 0
+        if hasattr(value, "total_seconds"):
+            return int(value.total_seconds())
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return 0
+
+    entries: list[TimelineEntry] = []
+    media_items: dict[int, Any] = {}
+    for playout_item, media_item in rows:
+        if media_item is not None:
+            media_items.setdefault(media_item.id, media_item)
+            entries.append(
+                TimelineEntry(
+                    playout_item_id=playout_item.id,
+                    media_item_id=media_item.id,
+                    title=media_item.title,
+                    duration=_seconds(media_item.duration) or _seconds(playout_item.duration),
+                    source=media_item.source,
+                    source_url=None,
+                )
+            )
+        else:
+            entries.append(
+                TimelineEntry(
+                    playout_item_id=playout_item.id,
+                    media_item_id=None,
+                    title=playout_item.title,
+                    duration=_seconds(playout_item.duration),
+                    source="url",
+                    source_url=playout_item.source_url,
+                )
+            )
+    logger.debug(
+        f"Loaded playout timeline for channel {channel_id}: {len(entries)} items, "
+        f"{len(media_items)} distinct media"
+    )
+    return PlayoutTimeline(channel_id, playout.id, version, entries, media_items)
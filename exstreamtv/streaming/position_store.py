@@ -0,0 +1,320 @@
+"""
+Write-behind store for channel playback positions.
+
+ChannelStream records its position when an item starts and after every
+advance. Writing each of those straight to channel_playback_positions meant
+a SELECT plus an UPDATE/INSERT and a commit per call, so hundreds of
+channels on SQLite produced a constant trickle of tiny write transactions
+competing with everything else.
+
+PlaybackPositionStore keeps the latest position per channel in memory
+(readable immediately by the EPG/IPTV code) and flushes changed channels to
+the database in one batched transaction every
+``streaming.position_flush_interval_seconds``, and once more on shutdown.
+That interval is the durability window: a crash loses at most that much
+position history, which resume recomputes from ``playout_start_time``
+anyway.
+
+``forget()`` (channel deleted or its position reset) also wins against a
+flush already in flight: the batch skips the channel and deletes its row,
+and a channel forgotten after the batch was checked is deleted by the
+next flush. Forget listeners (add_forget_listener()) see every forget; the
+channel shard front-end uses one to forward it to the owning worker's store.
+"""
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from exstreamtv.database.write_queue import get_write_queue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class PositionSnapshot:
+    """
+    Latest playback position of a channel.
+
+    Attribute names match ChannelPlaybackPosition so readers can use a
+    snapshot wherever they previously used the ORM row.
+    """
+
+    channel_id: int
+    channel_number: str
+    current_index: int
+    playout_start_time: datetime | None
+    current_item_start_time: datetime | None
+    last_played_at: datetime
+    elapsed_seconds_in_item: int = 0
+
+    @property
+    def last_item_index(self) -> int:
+        return self.current_index
+
+
+class PlaybackPositionStore:
+    """
+    In-memory position registry with batched write-behind to the database.
+
+    ``record()`` is cheap and never touches the database. ``flush()`` writes
+    every channel recorded since the last flush as one transaction: a single
+    SELECT ... IN for the existing rows, then an update or insert per
+    channel and one commit.
+    """
+
+    def __init__(self, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._positions: dict[int, PositionSnapshot] = {}
+        self._dirty: set[int] = set()
+        # channel_id -> forget sequence; rows still to be kept out of the database
+        self._forgotten: dict[int, int] = {}
+        self._forget_seq = 0
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._session_factory: Callable[[], Session] | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._forget_listeners: list[Callable[[int], None]] = []
+
+        self._records = 0
+        self._flushes = 0
+        self._rows_written = 0
+        self._flush_errors = 0
+        self._last_flush_seconds: float | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._flush_task is not None and not self._flush_task.done()
+
+    def get(self, channel_id: int) -> PositionSnapshot | None:
+        """Latest recorded position of a channel (None if never recorded)."""
+        return self._positions.get(channel_id)
+
+    def record(self, snapshot: PositionSnapshot) -> None:
+        """Replace the channel's position; it is written on the next flush."""
+        with self._lock:
+            self._positions[snapshot.channel_id] = snapshot
+            self._dirty.add(snapshot.channel_id)
+            self._forgotten.pop(snapshot.channel_id, None)
+            self._records += 1
+        if self.flush_interval <= 0 and self._wake is not None:
+            self._wake.set()
+
+    def forget(self, channel_id: int) -> None:
+        """
+        Drop a channel's position (e.g. after the channel is deleted or reset).
+
+        A flush in progress will not write it back; the next flush deletes
+        any row it raced in.
+        """
+        with self._lock:
+            self._positions.pop(channel_id, None)
+            self._dirty.discard(channel_id)
+            self._forget_seq += 1
+            self._forgotten[channel_id] = self._forget_seq
+        for listener in list(self._forget_listeners):
+            try:
+                listener(channel_id)
+            except Exception as e:
+                logger.warning(f"Position forget listener failed: {e}")
+
+    def add_forget_listener(self, listener: Callable[[int], None]) -> None:
+        """Call listener(channel_id) after every forget()."""
+        self._forget_listeners.append(listener)
+
+    def remove_forget_listener(self, listener: Callable[[int], None]) -> None:
+        with contextlib.suppress(ValueError):
+            self._forget_listeners.remove(listener)
+
+    async def start(self, session_factory: Callable[[], Session]) -> None:
+        """Start the background flush loop."""
+        self._session_factory = session_factory
+        if self.is_running:
+            return
+        self._wake = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(
+            f"Playback position store started (flush every {self.flush_interval:g}s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write any pending positions."""
+        task = self._flush_task
+        self._flush_task = None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._wake = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        wake = self._wake
+        while True:
+            try:
+                if self.flush_interval > 0:
+                    await asyncio.sleep(self.flush_interval)
+                else:
+                    await wake.wait()
+                    wake.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Playback position flush loop error: {e}")
+
+    async def flush(
+        self, session_factory: Callable[[], Session] | None = None
+    ) -> int:
+        """
+        Write pending positions in one transaction; returns rows written.
+
+        Goes through the DB write queue when it is running, else runs in a
+        worker thread. On failure the batch stays pending and is retried on
+        the next flush.
+        """
+        factory = session_factory or self._session_factory
+        if factory is None:
+            return 0
+        async with self._flush_lock:
+            with self._lock:
+                if not self._dirty and not self._forgotten:
+                    return 0
+                batch = [self._positions[cid] for cid in self._dirty]
+                self._dirty.clear()
+                forgotten = dict(self._forgotten)
+            queue = get_write_queue()
+            try:
+                if queue.is_running and session_factory is None:
+                    # Joins the write queue's next batch instead of its own commit
+                    started = time.perf_counter()
+                    await queue.submit_async(
+                        lambda db: self._upsert_batch(db, batch), label="playback positions"
+                    )
+                    self._flushed(len(batch), time.perf_counter() - started)
+                else:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self._write_batch_sync, factory, batch)
+                with self._lock:
+                    # Deleted by this flush, unless forgotten again meanwhile
+                    for cid, seq in forgotten.items():
+                        if self._forgotten.get(cid) == seq:
+                            del self._forgotten[cid]
+            except Exception as e:
+                with self._lock:
+                    self._dirty.update(
+                        s.channel_id for s in batch if s.channel_id in self._positions
+                    )
+                self._flush_errors += 1
+                logger.error(f"Error flushing {len(batch)} playback positions: {e}")
+                return 0
+            return len(batch)
+
+    def _write_batch_sync(
+        self, session_factory: Callable[[], Session], batch: list[PositionSnapshot]
+    ) -> None:
+        """Upsert a batch of positions in a single transaction."""
+        started = time.perf_counter()
+        db = session_factory()
+        try:
+            self._upsert_batch(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self._flushed(len(batch), time.perf_counter() - started)
+
+    def _upsert_batch(self, db: Session, batch: list[PositionSnapshot]) -> None:
+        """
+        Update or insert each position; one SELECT ... IN for existing rows.
+
+        Channels forgotten since the batch was taken are skipped and their
+        rows deleted.
+        """
+        from exstreamtv.database.models import ChannelPlaybackPosition
+
+        with self._lock:
+            forgotten = set(self._forgotten)
+        if forgotten:
+            batch = [s for s in batch if s.channel_id not in forgotten]
+            db.execute(
+                delete(ChannelPlaybackPosition).where(
+                    ChannelPlaybackPosition.channel_id.in_(forgotten)
+                )
+            )
+        if not batch:
+            return
+        existing = {
+            row.channel_id: row
+            for row in db.execute(
+                select(ChannelPlaybackPosition).where(
+                    ChannelPlaybackPosition.channel_id.in_([s.channel_id for s in batch])
+                )
+            ).scalars()
+        }
+        for snapshot in batch:
+            row = existing.get(snapshot.channel_id)
+            if row is None:
+                row = ChannelPlaybackPosition(
+                    channel_id=snapshot.channel_id,
+                    channel_number=snapshot.channel_number,
+                )
+                db.add(row)
+            row.current_index = snapshot.current_index
+            row.last_item_index = snapshot.current_index
+            row.last_played_at = snapshot.last_played_at
+            row.current_item_start_time = snapshot.current_item_start_time
+            row.playout_start_time = snapshot.playout_start_time
+            row.elapsed_seconds_in_item = snapshot.elapsed_seconds_in_item
+
+    def _flushed(self, rows: int, seconds: float) -> None:
+        self._flushes += 1
+        self._rows_written += rows
+        self._last_flush_seconds = seconds
+        logger.debug(f"Flushed {rows} playback positions")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get store statistics."""
+        return {
+            "running": self.is_running,
+            "flush_interval_seconds": self.flush_interval,
+            "channels": len(self._positions),
+            "pending": len(self._dirty),
+            "records": self._records,
+            "flushes": self._flushes,
+            "rows_written": self._rows_written,
+            "flush_errors": self._flush_errors,
+            "last_flush_seconds": self._last_flush_seconds,
+        }
+
+
+_position_store: PlaybackPositionStore | None = None
+
+
+def get_position_store() -> PlaybackPositionStore:
+    """Get the process-wide playback position store."""
+    global _position_store
+    if _position_store is None:
+        interval = DEFAULT_FLUSH_INTERVAL
+        try:
+            from exstreamtv.config import get_config
+
+            interval = get_config().streaming.position_flush_interval_seconds
+        except Exception as e:
+            logger.debug(f"Streaming config unavailable, using default flush interval: {e}")
+        _position_store = PlaybackPositionStore(flush_interval=interval)
+    return _position_store
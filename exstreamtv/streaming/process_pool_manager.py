@@ -136,9 +136,12 @@ class ProcessPoolManager:
     release_process() when done. Implements guards and rate limiting.
     """
 
-    def __init__(self, config: Optional[Any] = None):
+    def __init__(self, config: Optional[Any] = None, max_processes: Optional[int] = None):
         self._config = config
-        self._max_processes = _compute_max_processes(config or _default_config())
+        # max_processes overrides the computed limit (e.g. a channel shard's share)
+        self._max_processes = max_processes or _compute_max_processes(
+            config or _default_config()
+        )
         self._spawn_semaphore = asyncio.Semaphore(self._max_processes)
         self._registry: Dict[int | str, ProcessRegistryEntry] = {}
         self._registry_lock = asyncio.Lock()
@@ -162,6 +165,11 @@ class ProcessPoolManager:
         self._spawn_rejected_capacity = 0
         self._spawn_timeout_total = 0
 
+    @property
+    def max_processes(self) -> int:
+        """Maximum concurrent FFmpeg processes (config, memory and FD bound)."""
+        return self._max_processes
+
     async def start(self) -> None:
         """Start the process pool manager (e.g. zombie check task)."""
         self._zombie_task = asyncio.create_task(self._zombie_check_loop())
@@ -280,7 +288,7 @@ class ProcessPoolManager:
                 manager = get_ffmpeg_process_manager()
                 process = await manager.spawn(
                     *ffmpeg_cmd,
-                    tag=str(channel_id),
+                    tag=f"pool:{channel_id}",
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE,
                 )
@@ -0,0 +1,179 @@
+"""
+Shared per-channel ring buffer for MPEG-TS fan-out.
+
+Replaces the per-client ``asyncio.Queue`` copies in ChannelStream with a
+single fixed-capacity ``bytearray`` per channel. Every client reads through
+its own cursor (an absolute byte offset into the stream), so:
+
+- Memory is O(channels), not O(channels x clients)
+- A write is a single memcpy plus one wake-up, regardless of client count
+- Slow clients are detected by how far their cursor lags behind the head
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class RingBufferOverrun(Exception):
+    """Raised when a cursor's data has already been overwritten by the writer."""
+
+    def __init__(self, lag_bytes: int, capacity: int):
+        self.lag_bytes = lag_bytes
+        self.capacity = capacity
+        super().__init__(
+            f"Cursor lags {lag_bytes} bytes behind head (capacity {capacity})"
+        )
+
+
+@dataclass
+class RingCursor:
+    """Read position of a single client (absolute byte offset into the stream)."""
+
+    position: int
+    bytes_read: int = 0
+
+
+class BroadcastRingBuffer:
+    """
+    Single-writer, multi-reader byte ring for one channel.
+
+    Positions are absolute (monotonically increasing) byte offsets; the byte at
+    offset ``p`` lives at ``buffer[p % capacity]``. Data for offset ``p`` is
+    valid while ``head - p <= capacity``.
+
+    Not thread-safe: the writer and all readers must run on the same event loop.
+    """
+
+    def __init__(self, capacity: int, slow_lag_ratio: float = 0.75):
+        """
+        Initialize ring buffer.
+
+        Args:
+            capacity: Ring size in bytes.
+            slow_lag_ratio: Fraction of capacity a cursor may lag behind the
+                head before it is considered a slow client.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.slow_lag_bytes = int(capacity * slow_lag_ratio)
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._head = 0
+        self._closed = False
+        self._data_event = asyncio.Event()
+        self._writes = 0
+
+    @property
+    def head(self) -> int:
+        """Absolute offset one past the last byte written."""
+        return self._head
+
+    @property
+    def tail(self) -> int:
+        """Oldest absolute offset still held in the ring."""
+        return max(0, self._head - self.capacity)
+
+    @property
+    def closed(self) -> bool:
+        """True once the writer has signalled end of stream."""
+        return self._closed
+
+    def write(self, data: bytes) -> None:
+        """Append data at the head and wake waiting readers."""
+        size = len(data)
+        if size == 0 or self._closed:
+            return
+
+        src = memoryview(data)
+        # Only the last `capacity` bytes of an oversized write can survive.
+        if size > self.capacity:
+            src = src[size - self.capacity:]
+            self._head += size - self.capacity
+
+        start = self._head % self.capacity
+        first = min(len(src), self.capacity - start)
+        self._view[start:start + first] = src[:first]
+        if first < len(src):
+            self._view[0:len(src) - first] = src[first:]
+
+        self._head += len(src)
+        self._writes += 1
+        self._notify()
+
+    def close(self) -> None:
+        """Signal end of stream; readers drain what is left and then stop."""
+        self._closed = True
+        self._notify()
+
+    def _notify(self) -> None:
+        event = self._data_event
+        self._data_event = asyncio.Event()
+        event.set()
+
+    def open_cursor(self, position: int | None = None) -> RingCursor:
+        """
+        Create a cursor for a new reader.
+
+        Args:
+            position: Absolute start offset. Defaults to the current head
+                (live edge). Clamped to the data still held in the ring.
+        """
+        if position is None:
+            position = self._head
+        position = min(max(position, self.tail), self._head)
+        return RingCursor(position=position)
+
+    def lag(self, cursor: RingCursor) -> int:
+        """Bytes between the cursor and the head."""
+        return self._head - cursor.position
+
+    def is_lagging(self, cursor: RingCursor) -> bool:
+        """True if the cursor has fallen behind the slow-client threshold."""
+        return self.lag(cursor) > self.slow_lag_bytes
+
+    def read(self, cursor: RingCursor, max_bytes: int) -> bytes:
+        """
+        Copy up to ``max_bytes`` available bytes and advance the cursor.
+
+        Returns:
+            Bytes read (empty if the cursor is at the head).
+
+        Raises:
+            RingBufferOverrun: If the cursor's data has been overwritten.
+        """
+        lag = self._head - cursor.position
+        if lag <= 0:
+            return b""
+        if lag > self.capacity:
+            raise RingBufferOverrun(lag, self.capacity)
+
+        size = min(lag, max_bytes)
+        start = cursor.position % self.capacity
+        first = min(size, self.capacity - start)
+        if first == size:
+            out = bytes(self._view[start:start + size])
+        else:
+            out = bytes(self._view[start:]) + bytes(self._view[:size - first])
+
+        cursor.position += size
+        cursor.bytes_read += size
+        return out
+
+    async def wait(self, cursor: RingCursor) -> None:
+        """Wait until data is available for the cursor or the ring is closed."""
+        while cursor.position >= self._head and not self._closed:
+            await self._data_event.wait()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get ring buffer statistics."""
+        return {
+            "capacity": self.capacity,
+            "head": self._head,
+            "writes": self._writes,
+            "closed": self._closed,
+        }
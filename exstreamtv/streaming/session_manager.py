@@ -7,16 +7,21 @@ Ported from Tunarr's SessionManager with enhancements:
 - Health monitoring with error counting
 - Restart tracking with limits
 - Idle session cleanup
+- Per-channel viewership history (decayed watch time, persisted to disk)
+  used to order channel pre-warming
 
 This provides centralized session management for all streaming
 connections, enabling better resource management and diagnostics.
 """
 
 import asyncio
+import json
 import logging
-from dataclasses import dataclass, field
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+from pathlib import Path
 from typing import Any, Callable, Optional
 from uuid import uuid4
 
@@ -239,6 +244,23 @@ class ChannelSessionStats:
     avg_session_duration: float = 0.0
 
 
+@dataclass
+class ChannelViewership:
+    """Decayed watch time of a channel, used to rank channels by popularity."""
+
+    channel_id: int
+    watch_seconds: float = 0.0  # decayed to updated_at
+    sessions: int = 0
+    last_viewed: float = 0.0  # epoch seconds
+    updated_at: float = 0.0  # epoch seconds
+
+    def score(self, now: float, half_life: float) -> float:
+        """Watch seconds decayed to ``now``."""
+        if half_life <= 0 or now <= self.updated_at:
+            return self.watch_seconds
+        return self.watch_seconds * 0.5 ** ((now - self.updated_at) / half_life)
+
+
 class SessionManager:
     """
     Manages all stream sessions across channels.
@@ -266,12 +288,15 @@ class SessionManager:
     DEFAULT_MAX_SESSIONS_PER_CHANNEL = 50
     DEFAULT_IDLE_CHECK_INTERVAL = 60  # seconds
     DEFAULT_IDLE_TIMEOUT = 300  # 5 minutes
+    DEFAULT_VIEWERSHIP_HALF_LIFE = 7 * 24 * 3600  # 1 week
     
     def __init__(
         self,
         max_sessions_per_channel: int = DEFAULT_MAX_SESSIONS_PER_CHANNEL,
         idle_check_interval: float = DEFAULT_IDLE_CHECK_INTERVAL,
         idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+        history_file: Optional[Path] = None,
+        viewership_half_life: float = DEFAULT_VIEWERSHIP_HALF_LIFE,
     ):
         """
         Initialize session manager.
@@ -280,6 +305,8 @@ class SessionManager:
             max_sessions_per_channel: Maximum concurrent sessions per channel
             idle_check_interval: Seconds between idle checks
             idle_timeout: Seconds before session is considered idle
+            history_file: JSON file persisting viewership history (None: memory only)
+            viewership_half_life: Seconds for recorded watch time to decay by half
         """
         self._sessions: dict[str, StreamSession] = {}
         self._channel_sessions: dict[int, set[str]] = {}  # channel_id -> session_ids
@@ -292,6 +319,12 @@ class SessionManager:
         self._idle_check_interval = idle_check_interval
         self._idle_timeout = idle_timeout
         
+        # Viewership history (survives sessions; persisted to history_file)
+        self._history_file = history_file
+        self._viewership_half_life = viewership_half_life
+        self._viewership: dict[int, ChannelViewership] = {}
+        self._viewership_dirty = False
+        
         # Callbacks
         self._on_session_created: list[Callable] = []
         self._on_session_ended: list[Callable] = []
@@ -313,6 +346,7 @@ class SessionManager:
             return
         
         self._running = True
+        self.load_viewership()
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
         
         logger.info("SessionManager started")
@@ -339,6 +373,7 @@ class SessionManager:
             self._sessions.clear()
             self._channel_sessions.clear()
         
+        self.save_viewership()
         logger.info("SessionManager stopped")
     
     async def create_session(
@@ -437,6 +472,7 @@ class SessionManager:
                 return None
             
             session.disconnect(reason)
+            self.record_viewing(session.channel_id, session.duration_seconds)
             
             # Remove from tracking
             del self._sessions[session_id]
@@ -567,12 +603,64 @@ class SessionManager:
         
         return session.record_restart()
     
+    def record_viewing(self, channel_id: int, seconds: float) -> None:
+        """Add a finished viewing (any client type) to the channel's history."""
+        if seconds <= 0:
+            return
+        now = time.time()
+        entry = self._viewership.get(channel_id)
+        if entry is None:
+            entry = self._viewership[channel_id] = ChannelViewership(channel_id)
+        entry.watch_seconds = entry.score(now, self._viewership_half_life) + seconds
+        entry.sessions += 1
+        entry.last_viewed = now
+        entry.updated_at = now
+        self._viewership_dirty = True
+
+    def get_channel_popularity(self) -> dict[int, float]:
+        """Decayed watch seconds per channel (higher = watched more recently/longer)."""
+        now = time.time()
+        return {
+            channel_id: entry.score(now, self._viewership_half_life)
+            for channel_id, entry in self._viewership.items()
+        }
+
+    def load_viewership(self) -> None:
+        """Load viewership history from the history file, if configured."""
+        if self._history_file is None or not self._history_file.exists():
+            return
+        try:
+            data = json.loads(self._history_file.read_text())
+            self._viewership = {
+                int(item["channel_id"]): ChannelViewership(**item)
+                for item in data.get("channels", [])
+            }
+            logger.debug(f"Loaded viewership history for {len(self._viewership)} channels")
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable viewership history {self._history_file}: {e}")
+
+    def save_viewership(self) -> None:
+        """Write viewership history to the history file if it changed."""
+        if self._history_file is None or not self._viewership_dirty:
+            return
+        try:
+            self._history_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._history_file.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps({"channels": [asdict(v) for v in self._viewership.values()]})
+            )
+            tmp.replace(self._history_file)
+            self._viewership_dirty = False
+        except OSError as e:
+            logger.warning(f"Failed to save viewership history: {e}")
+    
     async def _cleanup_loop(self) -> None:
         """Background loop to cleanup idle sessions."""
         while self._running:
             try:
                 await asyncio.sleep(self._idle_check_interval)
                 await self._cleanup_idle_sessions()
+                self.save_viewership()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -595,6 +683,7 @@ class SessionManager:
             
             for session in idle_sessions:
                 logger.debug(f"Cleaning up idle session {session.session_id[:8]}...")
+                self.record_viewing(session.channel_id, session.duration_seconds)
                 
                 # Remove from tracking
                 del self._sessions[session.session_id]
@@ -638,6 +727,7 @@ class SessionManager:
             "total_errors_recorded": self._total_errors_recorded,
             "max_sessions_per_channel": self._max_sessions_per_channel,
             "idle_timeout": self._idle_timeout,
+            "channels_with_viewership": len(self._viewership),
         }
     
     def get_all_sessions(self) -> list[StreamSession]:
@@ -664,10 +754,14 @@ def get_session_manager() -> SessionManager:
 async def init_session_manager(
     max_sessions_per_channel: int = SessionManager.DEFAULT_MAX_SESSIONS_PER_CHANNEL,
     idle_timeout: int = SessionManager.DEFAULT_IDLE_TIMEOUT,
+    history_file: Optional[Path] = None,
+    viewership_half_life: float = SessionManager.DEFAULT_VIEWERSHIP_HALF_LIFE,
 ) -> SessionManager:
     """Initialize and start the global session manager."""
     manager = get_session_manager()
     manager._max_sessions_per_channel = max_sessions_per_channel
     manager._idle_timeout = idle_timeout
+    manager._history_file = history_file
+    manager._viewership_half_life = viewership_half_life
     await manager.start()
     return manager
@@ -0,0 +1,176 @@
+"""
+Lightweight MPEG-TS index for keyframe-aligned client joins.
+
+Watches the bytes ChannelStream publishes into its ring buffer and keeps:
+- The latest PAT and PMT packets
+- The absolute byte offset of the most recent random-access point (IDR),
+  taken from the adaptation-field random_access_indicator on the video PID
+
+A late client can then be handed PAT + PMT followed by ring data starting at
+the last keyframe, so players (Plex) can decode immediately instead of
+waiting for the next PAT/PMT and IDR.
+"""
+
+import logging
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+TS_PACKET_SIZE = 188
+TS_SYNC_BYTE = 0x47
+PAT_PID = 0x0000
+NULL_PID = 0x1FFF
+
+# PMT stream_type values carrying video (MPEG-1/2, MPEG-4 Part 2, H.264, HEVC, VC-1)
+VIDEO_STREAM_TYPES = frozenset({0x01, 0x02, 0x10, 0x1B, 0x24, 0xEA})
+
+
+def _section_payload(packet: bytes) -> bytes | None:
+    """Return the PSI section bytes of a PUSI packet (after the pointer field)."""
+    if not packet[1] & 0x40:
+        return None
+    afc = (packet[3] >> 4) & 0x3
+    pos = 4
+    if afc & 0x2:
+        pos += 1 + packet[4]
+    if not afc & 0x1 or pos >= TS_PACKET_SIZE:
+        return None
+    pos += 1 + packet[pos]  # pointer_field
+    if pos + 3 > TS_PACKET_SIZE:
+        return None
+    return packet[pos:]
+
+
+def parse_pat(packet: bytes) -> list[int]:
+    """Return the PMT PIDs announced by a single-packet PAT."""
+    section = _section_payload(packet)
+    if not section or section[0] != 0x00:
+        return []
+    section_length = ((section[1] & 0x0F) << 8) | section[2]
+    end = min(3 + section_length - 4, len(section))  # exclude CRC32
+    pids = []
+    for i in range(8, end - 3, 4):
+        program_number = (section[i] << 8) | section[i + 1]
+        pid = ((section[i + 2] & 0x1F) << 8) | section[i + 3]
+        if program_number != 0:
+            pids.append(pid)
+    return pids
+
+
+def parse_pmt_video_pid(packet: bytes) -> int | None:
+    """Return the first video elementary PID announced by a single-packet PMT."""
+    section = _section_payload(packet)
+    if not section or section[0] != 0x02:
+        return None
+    section_length = ((section[1] & 0x0F) << 8) | section[2]
+    end = min(3 + section_length - 4, len(section))
+    program_info_length = ((section[10] & 0x0F) << 8) | section[11]
+    i = 12 + program_info_length
+    while i + 5 <= end:
+        stream_type = section[i]
+        pid = ((section[i + 1] & 0x1F) << 8) | section[i + 2]
+        es_info_length = ((section[i + 3] & 0x0F) << 8) | section[i + 4]
+        if stream_type in VIDEO_STREAM_TYPES:
+            return pid
+        i += 5 + es_info_length
+    return None
+
+
+class TSKeyframeIndex:
+    """
+    Incremental PAT/PMT and random-access-point index over a TS byte stream.
+
+    Offsets are absolute byte positions in the same coordinate space as
+    BroadcastRingBuffer (both start at 0 and see the same bytes in order).
+    Chunks need not be packet-aligned; partial packets are carried over.
+    """
+
+    def __init__(self) -> None:
+        self._pending = bytearray()
+        self._pending_offset = 0
+        self._pat_packet: bytes | None = None
+        self._pmt_pids: set[int] = set()
+        self._pmt_packet: bytes | None = None
+        self._video_pid: int | None = None
+        self._last_rap_offset: int | None = None
+        self._last_rap_time: float | None = None
+        self._rap_count = 0
+        self._resyncs = 0
+
+    @property
+    def last_rap_offset(self) -> int | None:
+        """Absolute offset of the most recent random-access packet."""
+        return self._last_rap_offset
+
+    @property
+    def psi_preamble(self) -> bytes:
+        """Cached PAT + PMT packets, or empty if not yet seen."""
+        if self._pat_packet is None or self._pmt_packet is None:
+            return b""
+        return self._pat_packet + self._pmt_packet
+
+    def feed(self, data: bytes) -> None:
+        """Index the next bytes of the stream."""
+        pending = self._pending
+        pending += data
+        pos = 0
+        end = len(pending)
+        while end - pos >= TS_PACKET_SIZE:
+            if pending[pos] != TS_SYNC_BYTE:
+                nxt = pending.find(TS_SYNC_BYTE, pos + 1)
+                self._resyncs += 1
+                if nxt < 0:
+                    pos = end
+                    break
+                pos = nxt
+                continue
+            self._inspect(pending, pos, self._pending_offset + pos)
+            pos += TS_PACKET_SIZE
+        del pending[:pos]
+        self._pending_offset += pos
+
+    def _inspect(self, buf: bytearray, pos: int, offset: int) -> None:
+        b1 = buf[pos + 1]
+        pid = ((b1 & 0x1F) << 8) | buf[pos + 2]
+        if pid == NULL_PID:
+            return
+        if pid == PAT_PID:
+            if b1 & 0x40:
+                packet = bytes(buf[pos:pos + TS_PACKET_SIZE])
+                pmt_pids = parse_pat(packet)
+                if pmt_pids:
+                    self._pat_packet = packet
+                    if set(pmt_pids) != self._pmt_pids:
+                        self._pmt_pids = set(pmt_pids)
+                        self._pmt_packet = None
+                        self._video_pid = None
+            return
+        if pid in self._pmt_pids:
+            if b1 & 0x40:
+                packet = bytes(buf[pos:pos + TS_PACKET_SIZE])
+                video_pid = parse_pmt_video_pid(packet)
+                if video_pid is not None:
+                    self._pmt_packet = packet
+                    self._video_pid = video_pid
+            return
+        if pid != self._video_pid:
+            return
+        # Adaptation field present, non-empty, random_access_indicator set
+        if buf[pos + 3] & 0x20 and buf[pos + 4] > 0 and buf[pos + 5] & 0x40:
+            self._last_rap_offset = offset
+            self._last_rap_time = time.monotonic()
+            self._rap_count += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get index statistics."""
+        return {
+            "has_psi": bool(self.psi_preamble),
+            "video_pid": self._video_pid,
+            "last_rap_offset": self._last_rap_offset,
+            "rap_age_seconds": (
+                time.monotonic() - self._last_rap_time if self._last_rap_time else None
+            ),
+            "rap_count": self._rap_count,
+            "resyncs": self._resyncs,
+        }
@@ -0,0 +1,226 @@
+"""
+MPEG-TS splicer for gapless item transitions.
+
+Every playout item is produced by its own FFmpeg process, so each item's
+output restarts continuity counters at 0 and timestamps at the muxer's
+initial delay. When ChannelStream switches from one item to the next
+without a gap, players would see CC errors and a timestamp jump backwards.
+
+TSSplicer rewrites packets on the way into the channel ring so the
+broadcast looks like one continuous transport stream:
+- Continuity counters continue per PID across segments
+- PCR, PTS and DTS are shifted by a per-segment offset so they keep
+  advancing from where the previous segment stopped (past the highest
+  PTS of any stream, since B-frames reach the wire out of display order)
+- A truncated packet left at the end of a segment, and bytes skipped to
+  regain sync, are dropped, never sent
+"""
+
+import logging
+from typing import Any
+
+from exstreamtv.streaming.ts_index import NULL_PID, TS_PACKET_SIZE, TS_SYNC_BYTE
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_MODULO = 1 << 33  # PTS/DTS/PCR base are 33-bit, 90 kHz
+
+# Spacing inserted between the last timestamp of one segment and the first
+# of the next (one frame at 29.97 fps, in 90 kHz ticks).
+SEGMENT_GAP_TICKS = 3003
+
+# PES stream_ids without the optional PES header (no PTS/DTS fields)
+_NO_PES_HEADER_IDS = frozenset({0xBC, 0xBE, 0xBF, 0xF0, 0xF1, 0xF2, 0xF8, 0xFF})
+
+
+def _read_timestamp(buf: bytearray, pos: int) -> int:
+    return (
+        ((buf[pos] >> 1) & 0x07) << 30
+        | buf[pos + 1] << 22
+        | (buf[pos + 2] >> 1) << 15
+        | buf[pos + 3] << 7
+        | buf[pos + 4] >> 1
+    )
+
+
+def _write_timestamp(buf: bytearray, pos: int, value: int) -> None:
+    prefix = buf[pos] & 0xF0
+    buf[pos] = prefix | ((value >> 29) & 0x0E) | 0x01
+    buf[pos + 1] = (value >> 22) & 0xFF
+    buf[pos + 2] = ((value >> 14) & 0xFE) | 0x01
+    buf[pos + 3] = (value >> 7) & 0xFF
+    buf[pos + 4] = ((value << 1) & 0xFE) | 0x01
+
+
+def _is_after(value: int, other: int) -> bool:
+    """Whether a 33-bit timestamp is later than another (wrap-around aware)."""
+    return 0 < (value - other) % TIMESTAMP_MODULO < TIMESTAMP_MODULO // 2
+
+
+def _latest(values: Any) -> int | None:
+    latest: int | None = None
+    for value in values:
+        if latest is None or _is_after(value, latest):
+            latest = value
+    return latest
+
+
+def _read_pcr_base(buf: bytearray, pos: int) -> int:
+    return (
+        buf[pos] << 25
+        | buf[pos + 1] << 17
+        | buf[pos + 2] << 9
+        | buf[pos + 3] << 1
+        | buf[pos + 4] >> 7
+    )
+
+
+def _write_pcr_base(buf: bytearray, pos: int, value: int) -> None:
+    buf[pos] = (value >> 25) & 0xFF
+    buf[pos + 1] = (value >> 17) & 0xFF
+    buf[pos + 2] = (value >> 9) & 0xFF
+    buf[pos + 3] = (value >> 1) & 0xFF
+    buf[pos + 4] = ((value & 0x01) << 7) | (buf[pos + 4] & 0x7F)
+
+
+class TSSplicer:
+    """
+    Stateful continuity-counter and timestamp rewriter for a channel.
+
+    Call ``begin_segment()`` before feeding the first bytes of each new
+    item; ``process()`` returns the rewritten, packet-aligned bytes.
+    """
+
+    def __init__(self, gap_ticks: int = SEGMENT_GAP_TICKS):
+        self._gap_ticks = gap_ticks
+        self._pending = bytearray()
+        self._segment_index = 0
+        self._offset: int | None = 0
+        self._cc_delta: dict[int, int] = {}
+        self._last_cc: dict[int, int] = {}
+        self._last_pcr: int | None = None
+        # Highest PTS emitted per PID this segment (not the last one: B-frames
+        # go backwards), and the highest of all when the segment ended
+        self._max_pts: dict[int, int] = {}
+        self._end_pts: int | None = None
+        self._segments_spliced = 0
+        self._partial_bytes_dropped = 0
+        self._resync_bytes_dropped = 0
+
+    def begin_segment(self) -> None:
+        """
+        Start a new segment (next item's FFmpeg output).
+
+        Any trailing partial packet of the previous segment is dropped: a
+        truncated packet would corrupt the stream for players.
+        """
+        if self._pending:
+            self._partial_bytes_dropped += len(self._pending)
+            logger.debug(f"Dropping {len(self._pending)}-byte partial TS packet at splice")
+            self._pending.clear()
+        self._segment_index += 1
+        if self._max_pts:
+            self._end_pts = _latest(self._max_pts.values())
+            self._max_pts.clear()
+        if self._last_pcr is not None or self._end_pts is not None:
+            self._offset = None  # resolved from the segment's first timestamp
+            self._segments_spliced += 1
+        self._cc_delta.clear()
+
+    def process(self, data: bytes) -> bytes:
+        """Rewrite a chunk; returns only complete packets."""
+        buf = self._pending
+        buf += data
+        end = len(buf)
+        pos = 0
+        out = bytearray()
+        while end - pos >= TS_PACKET_SIZE:
+            if buf[pos] != TS_SYNC_BYTE:
+                # Resync: the bytes up to the next sync byte are never sent
+                nxt = buf.find(TS_SYNC_BYTE, pos + 1)
+                nxt = end if nxt < 0 else nxt
+                self._resync_bytes_dropped += nxt - pos
+                pos = nxt
+                continue
+            self._rewrite_packet(buf, pos)
+            out += buf[pos : pos + TS_PACKET_SIZE]
+            pos += TS_PACKET_SIZE
+        del buf[:pos]
+        return bytes(out)
+
+    def _resolve_offset(self, first_value: int, is_pcr: bool) -> int:
+        last = self._last_pcr if is_pcr else self._end_pts
+        if last is None:
+            last = self._end_pts if is_pcr else self._last_pcr
+        if last is None:
+            return 0
+        return (last + self._gap_ticks - first_value) % TIMESTAMP_MODULO
+
+    def _rewrite_packet(self, buf: bytearray, pos: int) -> None:
+        b1 = buf[pos + 1]
+        pid = ((b1 & 0x1F) << 8) | buf[pos + 2]
+        if pid == NULL_PID:
+            return
+        b3 = buf[pos + 3]
+        afc = (b3 >> 4) & 0x3
+
+        # Continuity counter: continue from the last emitted value per PID
+        cc = b3 & 0x0F
+        delta = self._cc_delta.get(pid)
+        if delta is None:
+            last = self._last_cc.get(pid)
+            delta = 0 if last is None else ((last + 1 - cc) & 0x0F if afc & 0x1 else (last - cc) & 0x0F)
+            self._cc_delta[pid] = delta
+        new_cc = (cc + delta) & 0x0F
+        if delta:
+            buf[pos + 3] = (b3 & 0xF0) | new_cc
+        self._last_cc[pid] = new_cc
+
+        payload = pos + 4
+        if afc & 0x2:
+            af_len = buf[pos + 4]
+            payload += 1 + af_len
+            if af_len > 0 and buf[pos + 5] & 0x10:
+                pcr_pos = pos + 6
+                pcr = _read_pcr_base(buf, pcr_pos)
+                if self._offset is None:
+                    self._offset = self._resolve_offset(pcr, is_pcr=True)
+                if self._offset:
+                    pcr = (pcr + self._offset) % TIMESTAMP_MODULO
+                    _write_pcr_base(buf, pcr_pos, pcr)
+                self._last_pcr = pcr
+
+        if not (b1 & 0x40 and afc & 0x1) or payload + 14 > pos + TS_PACKET_SIZE:
+            return
+        if buf[payload] != 0 or buf[payload + 1] != 0 or buf[payload + 2] != 1:
+            return
+        if buf[payload + 3] in _NO_PES_HEADER_IDS:
+            return
+        flags = buf[payload + 7] >> 6
+        if not flags & 0x2:
+            return
+        pts_pos = payload + 9
+        pts = _read_timestamp(buf, pts_pos)
+        if self._offset is None:
+            self._offset = self._resolve_offset(pts, is_pcr=False)
+        if self._offset:
+            pts = (pts + self._offset) % TIMESTAMP_MODULO
+            _write_timestamp(buf, pts_pos, pts)
+            if flags == 0x3 and payload + 19 <= pos + TS_PACKET_SIZE:
+                dts_pos = payload + 14
+                dts = (_read_timestamp(buf, dts_pos) + self._offset) % TIMESTAMP_MODULO
+                _write_timestamp(buf, dts_pos, dts)
+        highest = self._max_pts.get(pid)
+        if highest is None or _is_after(pts, highest):
+            self._max_pts[pid] = pts
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get splicer statistics."""
+        return {
+            "segment_index": self._segment_index,
+            "segments_spliced": self._segments_spliced,
+            "timestamp_offset": self._offset,
+            "pids": len(self._last_cc),
+            "partial_bytes_dropped": self._partial_bytes_dropped,
+            "resync_bytes_dropped": self._resync_bytes_dropped,
+        }
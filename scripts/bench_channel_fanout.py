@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: ChannelStream client fan-out.
+
+Compares the shared per-channel ring buffer (BroadcastRingBuffer + cursors)
+against the legacy per-client asyncio.Queue copy fan-out, pushing 64KB
+MPEG-TS-sized chunks to 1, 10 and 100 clients on one event loop.
+
+Usage:
+    python scripts/bench_channel_fanout.py [--chunks 2000] [--clients 1 10 100]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exstreamtv.streaming.ring_buffer import BroadcastRingBuffer  # noqa: E402
+
+CHUNK_SIZE = 64 * 1024
+RING_SIZE = 4 * 1024 * 1024
+LEGACY_QUEUE_SIZE = 50
+
+
+async def _bench_ring(num_clients: int, num_chunks: int) -> dict:
+    ring = BroadcastRingBuffer(RING_SIZE)
+    chunk = bytes(CHUNK_SIZE)
+    received = [0] * num_clients
+
+    async def reader(idx: int) -> None:
+        cursor = ring.open_cursor()
+        while True:
+            data = ring.read(cursor, 4 * CHUNK_SIZE)
+            if data:
+                received[idx] += len(data)
+                continue
+            if ring.closed:
+                return
+            await ring.wait(cursor)
+
+    readers = [asyncio.create_task(reader(i)) for i in range(num_clients)]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for _ in range(num_chunks):
+        ring.write(chunk)
+        # Yield so readers keep up, as ChannelStream does between FFmpeg reads.
+        await asyncio.sleep(0)
+    ring.close()
+    await asyncio.gather(*readers)
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed_s": elapsed,
+        "delivered_bytes": sum(received),
+        "buffer_bytes": RING_SIZE,
+    }
+
+
+async def _bench_legacy_queues(num_clients: int, num_chunks: int) -> dict:
+    lock = asyncio.Lock()
+    queues: list[asyncio.Queue] = [
+        asyncio.Queue(maxsize=LEGACY_QUEUE_SIZE) for _ in range(num_clients)
+    ]
+    received = [0] * num_clients
+    peak_queued = 0
+
+    async def reader(idx: int) -> None:
+        q = queues[idx]
+        while True:
+            item = await q.get()
+            if item is None:
+                return
+            received[idx] += len(item)
+
+    readers = [asyncio.create_task(reader(i)) for i in range(num_clients)]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for _ in range(num_chunks):
+        # Legacy path: a fresh chunk object per FFmpeg read, put on every queue.
+        chunk = bytes(CHUNK_SIZE)
+        async with lock:
+            for q in queues:
+                try:
+                    q.put_nowait(chunk)
+                except asyncio.QueueFull:
+                    pass
+        peak_queued = max(peak_queued, sum(q.qsize() for q in queues))
+        await asyncio.sleep(0)
+    for q in queues:
+        await q.put(None)
+    await asyncio.gather(*readers)
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed_s": elapsed,
+        "delivered_bytes": sum(received),
+        # Worst case every client queue is full of distinct chunk refs.
+        "buffer_bytes": num_clients * LEGACY_QUEUE_SIZE * CHUNK_SIZE,
+        "peak_queued_chunks": peak_queued,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="ChannelStream fan-out micro-benchmark")
+    ap.add_argument("--chunks", type=int, default=2000, help="Chunks written per run")
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    results = []
+    print(f"{'mode':<8} {'clients':>7} {'MB/s in':>10} {'MB/s out':>10} {'max buffer MB':>14}")
+    for n in args.clients:
+        for mode, fn in (("ring", _bench_ring), ("queues", _bench_legacy_queues)):
+            r = asyncio.run(fn(n, args.chunks))
+            mb_in = args.chunks * CHUNK_SIZE / r["elapsed_s"] / 1e6
+            mb_out = r["delivered_bytes"] / r["elapsed_s"] / 1e6
+            print(
+                f"{mode:<8} {n:>7} {mb_in:>10.1f} {mb_out:>10.1f} "
+                f"{r['buffer_bytes'] / 1e6:>14.1f}"
+            )
+            results.append({"mode": mode, "clients": n, **r})
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
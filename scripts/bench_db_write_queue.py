@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: small background writes, one commit each vs. the DB write queue.
+
+Seeds a temporary SQLite database and has concurrent threads append
+playout journal rows (the shape of a telemetry write) for a fixed time:
+
+- ``direct``: every write opens a session and commits on its own
+- ``queued``: every write is submitted to WriteQueue without waiting
+  (fire-and-forget, like the journal), with at most ``--inflight``
+  unfinished writes per thread
+
+Reports writes/sec, commits/sec, "database is locked" errors and
+submit-to-commit latency.
+
+Usage:
+    python scripts/bench_db_write_queue.py [--threads 16] [--seconds 5]
+        [--inflight 32] [--max-batch 100] [--max-delay-ms 50]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from exstreamtv.database.models.base import Base  # noqa: E402
+from exstreamtv.database.models.playout_journal import PlayoutJournal  # noqa: E402
+from exstreamtv.database.write_queue import WriteQueue  # noqa: E402
+
+
+def _factory(url: str):
+    # A pool of connections, like several components with their own sessions
+    engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 5})
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=FULL")
+        cursor.close()
+
+    return engine, sessionmaker(engine, expire_on_commit=False)
+
+
+def _row(channel_id: int) -> PlayoutJournal:
+    return PlayoutJournal(
+        channel_id=channel_id,
+        current_index=0,
+        bytes_sent=188 * 7,
+        last_known_state="streaming",
+        journal_updated_at=datetime.utcnow(),
+    )
+
+
+def _pct_ms(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+def _run_mode(mode: str, url: str, args: argparse.Namespace) -> dict:
+    engine, factory = _factory(url)
+    queue = None
+    if mode == "queued":
+        queue = WriteQueue(max_batch=args.max_batch, max_delay=args.max_delay_ms / 1000)
+        queue.start(factory)
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def direct(channel_id: int, local: list[float]) -> None:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                with factory() as session:
+                    session.add(_row(channel_id))
+                    session.commit()
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - t0)
+
+    def queued(channel_id: int, local: list[float]) -> None:
+        inflight: deque = deque()
+
+        def done(future, t0: float) -> None:
+            if future.exception() is None:
+                local.append(time.perf_counter() - t0)
+
+        while time.perf_counter() < deadline:
+            if len(inflight) >= args.inflight:
+                inflight.popleft().result()
+            t0 = time.perf_counter()
+            future = queue.submit(lambda s: s.add(_row(channel_id)))
+            future.add_done_callback(lambda f, t0=t0: done(f, t0))
+            inflight.append(future)
+        for future in inflight:
+            future.result()
+
+    def worker(channel_id: int) -> None:
+        local: list[float] = []
+        (queued if queue is not None else direct)(channel_id, local)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n + 1,)) for n in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    commits = len(latencies)
+    if queue is not None:
+        queue.stop()
+        commits = queue.get_stats()["commits"]
+    engine.dispose()
+    return {
+        "writes_per_sec": len(latencies) / args.seconds,
+        "commits_per_sec": commits / args.seconds,
+        "locked_errors": errors[0],
+        "p50_ms": _pct_ms(latencies, 50),
+        "p95_ms": _pct_ms(latencies, 95),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="DB write queue benchmark")
+    ap.add_argument("--threads", type=int, default=16, help="Concurrent writers")
+    ap.add_argument("--seconds", type=float, default=5.0, help="Duration per mode")
+    ap.add_argument("--inflight", type=int, default=32, help="Unfinished writes per thread")
+    ap.add_argument("--max-batch", type=int, default=100)
+    ap.add_argument("--max-delay-ms", type=float, default=50.0)
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+        for mode in ("direct", "queued"):
+            results[mode] = _run_mode(mode, url, args)
+
+    print(f"{args.threads} writer threads, {args.seconds:.0f}s per mode, synchronous=FULL")
+    print(f"{'mode':>7} {'writes/s':>9} {'commits/s':>10} {'locked':>7} {'p50':>9} {'p95':>9}")
+    for mode, r in results.items():
+        print(
+            f"{mode:>7} {r['writes_per_sec']:>9.0f} {r['commits_per_sec']:>10.0f} "
+            f"{r['locked_errors']:>7} {r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
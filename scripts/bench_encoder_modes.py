@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-item FFmpeg vs persistent concat encoder.
+
+Generates N short test clips with FFmpeg (lavfi testsrc + sine), then plays
+them back-to-back in both streaming modes without -re (as fast as possible)
+and reports FFmpeg/ffprobe spawns and child CPU seconds, normalised per hour
+of content:
+
+- per_item:   MPEGTSStreamer.stream() per clip (ffprobe + FFmpeg per item)
+- persistent: one PersistentChannelEncoder command over a static ffconcat
+              list of the same clips
+
+Requires ffmpeg/ffprobe on PATH.
+
+Usage:
+    python scripts/bench_encoder_modes.py [--items 30] [--item-seconds 20] [--source-codec mpeg4]
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exstreamtv.monitoring.metrics import get_metrics_collector  # noqa: E402
+from exstreamtv.streaming.concat_encoder import PersistentChannelEncoder  # noqa: E402
+from exstreamtv.streaming.ffmpeg_process_manager import get_ffmpeg_process_manager  # noqa: E402
+from exstreamtv.streaming.mpegts_streamer import MPEGTSStreamer  # noqa: E402
+
+
+def _child_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _total_spawns() -> int:
+    return sum(get_metrics_collector().ffmpeg_spawn_total.values())
+
+
+async def _make_clips(workdir: Path, count: int, seconds: int, codec: str) -> list[Path]:
+    vcodec = ["-c:v", "libx264", "-preset", "ultrafast"] if codec == "h264" else ["-c:v", "mpeg4"]
+    clips = []
+    for i in range(count):
+        out = workdir / f"clip{i:03d}.mp4"
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-loglevel", "error", "-y",
+            "-f", "lavfi", "-i", f"testsrc=size=1280x720:rate=30:duration={seconds}",
+            "-f", "lavfi", "-i", f"sine=frequency={440 + i}:duration={seconds}",
+            *vcodec, "-c:a", "aac", "-shortest", str(out),
+        )
+        await proc.wait()
+        clips.append(out)
+    return clips
+
+
+async def _bench_per_item(clips: list[Path]) -> dict:
+    # Clips are freshly written, so every probe is a cache miss
+    streamer = MPEGTSStreamer()
+    spawns, cpu, start = _total_spawns(), _child_cpu_seconds(), time.perf_counter()
+    out_bytes = 0
+    for clip in clips:
+        async for chunk in streamer.stream(str(clip)):
+            out_bytes += len(chunk)
+    return {
+        "elapsed_s": time.perf_counter() - start,
+        "spawns": _total_spawns() - spawns,
+        "cpu_s": _child_cpu_seconds() - cpu,
+        "out_bytes": out_bytes,
+    }
+
+
+async def _bench_persistent(clips: list[Path], workdir: Path) -> dict:
+    script = workdir / "bench.ffconcat"
+    script.write_text(
+        "ffconcat version 1.0\n" + "".join(f"file '{c}'\n" for c in clips)
+    )
+    encoder = PersistentChannelEncoder("bench", script_path=script)
+    cmd = encoder.build_command(script)
+    # Benchmark at full speed over a finite list: drop pacing and looping.
+    cmd.remove("-re")
+    loop_at = cmd.index("-stream_loop")
+    del cmd[loop_at:loop_at + 2]
+
+    spawns, cpu, start = _total_spawns(), _child_cpu_seconds(), time.perf_counter()
+    process = await get_ffmpeg_process_manager().spawn(
+        *cmd,
+        tag="concat:bench",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    out_bytes = 0
+    while True:
+        chunk = await process.stdout.read(65536)
+        if not chunk:
+            break
+        out_bytes += len(chunk)
+    await process.wait()
+    return {
+        "elapsed_s": time.perf_counter() - start,
+        "spawns": _total_spawns() - spawns,
+        "cpu_s": _child_cpu_seconds() - cpu,
+        "out_bytes": out_bytes,
+    }
+
+
+async def _run(args: argparse.Namespace) -> list[dict]:
+    with tempfile.TemporaryDirectory(prefix="exstreamtv-bench-") as tmp:
+        workdir = Path(tmp)
+        clips = await _make_clips(workdir, args.items, args.item_seconds, args.source_codec)
+        content_hours = args.items * args.item_seconds / 3600
+        results = []
+        for mode in ("per_item", "persistent"):
+            if mode == "per_item":
+                r = await _bench_per_item(clips)
+            else:
+                r = await _bench_persistent(clips, workdir)
+            r.update(
+                mode=mode,
+                spawns_per_hour=r["spawns"] / content_hours,
+                cpu_s_per_hour=r["cpu_s"] / content_hours,
+            )
+            results.append(r)
+        return results
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Per-item vs persistent encoder benchmark")
+    ap.add_argument("--items", type=int, default=30, help="Number of playout items")
+    ap.add_argument("--item-seconds", type=int, default=20, help="Duration of each item")
+    ap.add_argument(
+        "--source-codec",
+        choices=("h264", "mpeg4"),
+        default="mpeg4",
+        help="h264 sources allow per-item stream copy; mpeg4 forces transcoding",
+    )
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+        print("ffmpeg and ffprobe are required on PATH", file=sys.stderr)
+        return 1
+
+    results = asyncio.run(_run(args))
+    print(f"{'mode':<11} {'spawns':>7} {'spawns/h':>9} {'CPU s':>8} {'CPU s/h':>9} {'wall s':>7}")
+    for r in results:
+        print(
+            f"{r['mode']:<11} {r['spawns']:>7} {r['spawns_per_hour']:>9.0f} "
+            f"{r['cpu_s']:>8.1f} {r['cpu_s_per_hour']:>9.1f} {r['elapsed_s']:>7.1f}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
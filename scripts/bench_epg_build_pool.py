@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: EPG channel builds in a worker thread vs. a process pool.
+
+Builds synthetic EpgChannelJobs (schedule items as DTOs, the shape the
+guide endpoint hands to EpgBuildPool) and times one full build per mode:
+
+- ``thread``: ``build_workers: 0``, everything in one worker thread
+- ``pool-N``: a spawned ProcessPoolExecutor with N workers (the first,
+  untimed build starts the workers)
+
+Speedup is bounded by the number of cores; on a single core the pool only
+adds pickling overhead.
+
+Usage:
+    python scripts/bench_epg_build_pool.py [--channels 200] [--items 200]
+        [--workers 2 4] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exstreamtv.api.epg_build_pool import (  # noqa: E402
+    EpgBuildPool,
+    EpgChannelDTO,
+    EpgChannelJob,
+    EpgMediaDTO,
+)
+from exstreamtv.api.timeline_builder import PlaybackAnchor  # noqa: E402
+from exstreamtv.constants import EPG_MAX_PROGRAMMES_PER_CHANNEL  # noqa: E402
+
+
+def _jobs(channels: int, items: int) -> list[EpgChannelJob]:
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    media = [EpgMediaDTO(id=i, title=f"Episode {i}", duration=600 + i % 7 * 300) for i in range(items)]
+    return [
+        EpgChannelJob(
+            channel=EpgChannelDTO(id=n, number=str(n), name=f"Bench {n}"),
+            items=[{"media_item": m, "custom_title": None} for m in media],
+            anchor=PlaybackAnchor(playout_start_time=now, last_item_index=n % items),
+            now=now,
+            end_time=now + timedelta(days=2),
+            base_url="http://localhost:8411",
+            max_programmes=EPG_MAX_PROGRAMMES_PER_CHANNEL,
+        )
+        for n in range(1, channels + 1)
+    ]
+
+
+async def _time(pool: EpgBuildPool, jobs: list[EpgChannelJob], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        results = await pool.build(jobs)
+        best = min(best, time.perf_counter() - t0)
+        assert len(results) == len(jobs) and not any(r.errors for r in results)
+    return best
+
+
+async def _run(args: argparse.Namespace) -> list[dict]:
+    jobs = _jobs(args.channels, args.items)
+    baseline = await _time(EpgBuildPool(workers=0), jobs, args.repeat)
+    results = [{"mode": "thread", "seconds": baseline}]
+    for workers in args.workers:
+        pool = EpgBuildPool(workers=workers, min_channels=1)
+        try:
+            await pool.build(jobs[:workers])  # spawn workers outside the timing
+            seconds = await _time(pool, jobs, args.repeat)
+        finally:
+            pool.shutdown()
+        results.append({"mode": f"pool-{workers}", "seconds": seconds})
+    return results
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="EPG build pool benchmark")
+    ap.add_argument("--channels", type=int, default=200)
+    ap.add_argument("--items", type=int, default=200, help="Schedule items per channel")
+    ap.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is kept)")
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    results = asyncio.run(_run(args))
+    baseline = results[0]["seconds"]
+    print(f"{args.channels} channels x {args.items} items, {os.cpu_count()} CPUs")
+    print(f"{'mode':>8} {'ms':>9} {'speedup':>8}")
+    for r in results:
+        print(f"{r['mode']:>8} {r['seconds'] * 1000:>9.1f} {baseline / r['seconds']:>7.2f}x")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: EPG data loading, per-channel queries vs. EpgDataLoader.
+
+Seeds a temporary SQLite database with N channels, each with a playback
+position, an active playout and its items, then loads the TimelineBuilder
+inputs two ways:
+
+- ``per-channel``: the old N+1 shape, one position, one playout and one
+  items query per channel (EpgDataLoader over a single channel at a time)
+- ``bulk``: one EpgDataLoader call for all channels
+
+Query counts are taken from the engine's ``before_cursor_execute`` hook.
+
+Usage:
+    python scripts/bench_epg_bulk_load.py [--channels 50 200 500] [--items 48]
+        [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from exstreamtv.api.epg_loader import load_epg_data  # noqa: E402
+from exstreamtv.database.models import (  # noqa: E402
+    Channel,
+    ChannelPlaybackPosition,
+    MediaItem,
+    Playout,
+    PlayoutItem,
+)
+from exstreamtv.database.models.base import Base  # noqa: E402
+
+
+async def _seed(session_factory, channels: int, items: int) -> None:
+    start = datetime(2026, 1, 1)
+    async with session_factory() as db:
+        media = [MediaItem(title=f"Episode {i}", duration=1800) for i in range(items)]
+        db.add_all(media)
+        await db.flush()
+        for n in range(1, channels + 1):
+            channel = Channel(number=str(n), name=f"Bench {n}")
+            db.add(channel)
+            await db.flush()
+            playout = Playout(channel_id=channel.id, is_active=True)
+            db.add(playout)
+            db.add(ChannelPlaybackPosition(channel_id=channel.id, channel_number=str(n)))
+            await db.flush()
+            for i, mi in enumerate(media):
+                st = start + timedelta(minutes=30 * i)
+                db.add(
+                    PlayoutItem(
+                        playout_id=playout.id,
+                        media_item_id=mi.id,
+                        start_time=st,
+                        finish_time=st + timedelta(minutes=30),
+                        title=mi.title,
+                    )
+                )
+        await db.commit()
+
+
+async def _run(channels: int, items: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        await _seed(session_factory, channels, items)
+
+        queries = [0]
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _count(*_args, **_kwargs):
+            queries[0] += 1
+
+        results = {}
+        for mode in ("per-channel", "bulk"):
+            best = float("inf")
+            for _ in range(repeat):
+                async with session_factory() as db:
+                    chans = (await db.execute(select(Channel))).scalars().all()
+                    queries[0] = 0
+                    t0 = time.perf_counter()
+                    if mode == "bulk":
+                        data = await load_epg_data(db, chans)
+                        loaded = sum(len(data.schedule_items(c.id)) for c in chans)
+                    else:
+                        loaded = 0
+                        for c in chans:
+                            data = await load_epg_data(db, [c])
+                            loaded += len(data.schedule_items(c.id))
+                    best = min(best, time.perf_counter() - t0)
+                    assert loaded == channels * items
+            results[mode] = {"queries": queries[0], "seconds": best}
+        await engine.dispose()
+    return {"channels": channels, "items_per_channel": items, **results}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="EPG bulk loader benchmark")
+    ap.add_argument("--channels", type=int, nargs="+", default=[50, 200, 500])
+    ap.add_argument("--items", type=int, default=48, help="Playout items per channel")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is kept)")
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    print(
+        f"{'channels':>8} {'per-channel q':>14} {'per-channel ms':>15} "
+        f"{'bulk q':>7} {'bulk ms':>8} {'speedup':>8}"
+    )
+    results = []
+    for n in args.channels:
+        r = asyncio.run(_run(n, args.items, args.repeat))
+        per, bulk = r["per-channel"], r["bulk"]
+        print(
+            f"{n:>8} {per['queries']:>14} {per['seconds'] * 1000:>15.1f} "
+            f"{bulk['queries']:>7} {bulk['seconds'] * 1000:>8.1f} "
+            f"{per['seconds'] / bulk['seconds']:>7.1f}x"
+        )
+        results.append(r)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
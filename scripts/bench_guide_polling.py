@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: requests/sec for repeated guide polling (gzip-accepting client).
+
+Builds a synthetic XMLTV document with XMLTVGenerator and serves it four
+ways from an in-process FastAPI app (httpx ASGITransport, no sockets):
+
+- ``per-request``: gzip + MD5 ETag computed on every response (what
+  CompressionMiddleware / ETagMiddleware did for cached bodies)
+- ``streaming``: the cached text streamed through incremental gzip
+- ``precompressed``: EncodedBody, stored gzip variant + build-time ETag
+- ``conditional``: EncodedBody with If-None-Match, answered with 304
+
+Usage:
+    python scripts/bench_guide_polling.py [--channels 200] [--programmes 48]
+        [--requests 40]
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request, Response  # noqa: E402
+
+from exstreamtv.api.timeline_builder import TimelineProgramme  # noqa: E402
+from exstreamtv.api.xmltv_generator import XMLTVGenerator  # noqa: E402
+from exstreamtv.api.xmltv_stream import (  # noqa: E402
+    iter_text_chunks,
+    xmltv_streaming_response,
+)
+from exstreamtv.patterns.cache.encoded_body import EncodedBody  # noqa: E402
+
+MEDIA_TYPE = "text/xml; charset=utf-8"
+
+
+def _guide(channels: int, programmes: int) -> str:
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    chans = [
+        type("Ch", (), {"id": n, "number": str(n), "name": f"Channel {n}", "logo_path": None})()
+        for n in range(1, channels + 1)
+    ]
+    progs = {
+        ch.id: [
+            TimelineProgramme(
+                start_time=start + timedelta(minutes=30 * i),
+                stop_time=start + timedelta(minutes=30 * (i + 1)),
+                media_item=None,
+                playout_item={},
+                title=f"Episode {i} of show {ch.id}",
+                index=i,
+            )
+            for i in range(programmes)
+        ]
+        for ch in chans
+    }
+    return XMLTVGenerator().generate(chans, progs, base_url="http://localhost:8411")
+
+
+def _app(doc: str, encoded: EncodedBody) -> FastAPI:
+    app = FastAPI()
+    raw = doc.encode("utf-8")
+
+    @app.get("/per-request")
+    async def per_request():
+        body = gzip.compress(raw, compresslevel=6)
+        etag = f'"{hashlib.md5(raw).hexdigest()}"'
+        return Response(
+            content=body,
+            media_type=MEDIA_TYPE,
+            headers={"Content-Encoding": "gzip", "ETag": etag, "Vary": "Accept-Encoding"},
+        )
+
+    @app.get("/streaming")
+    async def streaming(request: Request):
+        return xmltv_streaming_response(iter_text_chunks(doc), request, media_type=MEDIA_TYPE)
+
+    @app.get("/precompressed")
+    @app.get("/conditional")
+    async def precompressed(request: Request):
+        return encoded.response(request, MEDIA_TYPE)
+
+    return app
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    doc = _guide(args.channels, args.programmes)
+    t0 = time.perf_counter()
+    encoded = EncodedBody.build(doc)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    results = {
+        "document_bytes": len(encoded.raw),
+        "encoded_sizes": encoded.sizes(),
+        "encode_once_ms": build_ms,
+        "modes": {},
+    }
+    transport = httpx.ASGITransport(app=_app(doc, encoded))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in ("per-request", "streaming", "precompressed", "conditional"):
+            headers = {"Accept-Encoding": "gzip"}
+            if mode == "conditional":
+                headers["If-None-Match"] = encoded.etag("gzip")
+            await client.get(f"/{mode}", headers=headers)  # warm-up
+            t0 = time.perf_counter()
+            for _ in range(args.requests):
+                r = await client.get(f"/{mode}", headers=headers)
+                assert r.status_code == (304 if mode == "conditional" else 200)
+            elapsed = time.perf_counter() - t0
+            results["modes"][mode] = {
+                "requests_per_sec": args.requests / elapsed,
+                "ms_per_request": elapsed * 1000 / args.requests,
+            }
+    return results
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Guide polling throughput benchmark")
+    ap.add_argument("--channels", type=int, default=200)
+    ap.add_argument("--programmes", type=int, default=48, help="Programmes per channel")
+    ap.add_argument("--requests", type=int, default=40, help="Requests per mode")
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    results = asyncio.run(_run(args))
+    sizes = ", ".join(f"{k}={v / 1024:.0f} KB" for k, v in results["encoded_sizes"].items())
+    print(f"guide: {args.channels} channels x {args.programmes} programmes ({sizes})")
+    print(f"one-time encode + hash: {results['encode_once_ms']:.0f} ms")
+    print(f"{'mode':>14} {'req/s':>9} {'ms/req':>8}")
+    for mode, r in results["modes"].items():
+        print(f"{mode:>14} {r['requests_per_sec']:>9.1f} {r['ms_per_request']:>8.2f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
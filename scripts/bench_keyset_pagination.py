@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: OFFSET vs. keyset (cursor) pages of the media listing.
+
+Seeds a temporary SQLite database with synthetic media items and reads
+one page of ``GET /api/media`` (sorted by title, 50 items) at increasing
+depths, the way the endpoint builds it:
+
+- ``offset``: ORDER BY title, id LIMIT 51 OFFSET depth * 50
+- ``cursor``: the same order, resuming after the previous page's last
+  (title, id) with Keyset.after()
+
+Also times the COUNT(*) the first page runs for the total; later cursor
+pages reuse it (see exstreamtv/api/pagination.py).
+
+Usage:
+    python scripts/bench_keyset_pagination.py [--rows 250000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from exstreamtv.api.pagination import Keyset  # noqa: E402
+from exstreamtv.database.models.base import Base  # noqa: E402
+from exstreamtv.database.models.media import MediaItem  # noqa: E402
+
+PAGE = 50
+DEPTHS = (0, 10, 100, 1000, 4000)
+
+
+def _pct_ms(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+def _populate(engine, count: int) -> None:
+    rng = random.Random(42)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    with engine.begin() as conn:
+        for start in range(0, count, 5000):
+            conn.execute(
+                insert(MediaItem.__table__),
+                [
+                    {
+                        "source": "local",
+                        "url": f"file:///media/{n}.mkv",
+                        "title": "".join(rng.choices(letters, k=12)).title(),
+                        "year": rng.randint(1950, 2026),
+                    }
+                    for n in range(start, min(start + 5000, count))
+                ],
+            )
+
+
+def _time(session: Session, stmt, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        session.scalars(stmt).all()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Keyset pagination benchmark")
+    ap.add_argument("--rows", type=int, default=250_000, help="Synthetic media items")
+    ap.add_argument("--repeat", type=int, default=5, help="Runs per page")
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    keyset = Keyset(MediaItem.title, MediaItem.id)
+    listing = keyset.order(select(MediaItem))
+    results: dict = {"rows": args.rows, "pages": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        _populate(engine, args.rows)
+
+        with Session(engine) as session:
+            count = _time(session, select(func.count(MediaItem.id)), args.repeat)
+            results["count_p50_ms"] = _pct_ms(count, 50)
+            for depth in DEPTHS:
+                offset = depth * PAGE
+                if offset >= args.rows:
+                    break
+                by_offset = listing.offset(offset).limit(PAGE + 1)
+                by_cursor = listing.limit(PAGE + 1)
+                if offset:
+                    # Last row of the previous page, as its next_cursor holds it
+                    last = session.execute(
+                        keyset.order(select(MediaItem.title, MediaItem.id))
+                        .offset(offset - 1)
+                        .limit(1)
+                    ).one()
+                    by_cursor = by_cursor.where(keyset.after([last.title, last.id]))
+                offset_ms = _time(session, by_offset, args.repeat)
+                cursor_ms = _time(session, by_cursor, args.repeat)
+                results["pages"][depth + 1] = {
+                    "offset_p50_ms": _pct_ms(offset_ms, 50),
+                    "cursor_p50_ms": _pct_ms(cursor_ms, 50),
+                }
+        engine.dispose()
+
+    print(
+        f"{args.rows} media items, {PAGE} per page sorted by title; "
+        f"COUNT(*) {results['count_p50_ms']:.1f}ms"
+    )
+    print(f"{'page':>6} {'offset p50':>11} {'cursor p50':>11}")
+    for page, r in results["pages"].items():
+        print(f"{page:>6} {r['offset_p50_ms']:>9.2f}ms {r['cursor_p50_ms']:>9.2f}ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark: media search, ILIKE scan vs. the FTS5 index.
+
+Builds a temporary SQLite database of synthetic media items (titles,
+show titles, descriptions and genres drawn from a Zipf-weighted
+vocabulary of 5000 words) and
+runs each query the way ``GET /api/media?search=...&paginated=true``
+does - a first page of 50 plus the total count:
+
+- ``ilike``: the previous ``ILIKE '%term%'`` filter, ordered by title
+- ``fts5``: apply_search() against media_items_fts, ordered by bm25
+
+Reports the index build time, the database size before and after, and
+per-query latency for both paths.
+
+Usage:
+    python scripts/bench_media_search.py [--rows 250000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from exstreamtv.database.media_search import (  # noqa: E402
+    apply_search,
+    install_media_search,
+    like_condition,
+)
+from exstreamtv.database.models.base import Base  # noqa: E402
+from exstreamtv.database.models.media import MediaItem  # noqa: E402
+
+WORDS = (
+    "night city river star space ghost king queen house fire winter summer "
+    "road dark light blue red golden silent lost last first secret island "
+    "mountain ocean storm shadow garden empire crown station signal harbor "
+    "valley desert forest machine dream heart wolf hunter doctor detective"
+).split()
+SYLLABLES = "ka lo mi ra ten vor sel an dru pe qua nix bel tor ey".split()
+GENRES = ["Drama", "Comedy", "Sci-Fi", "Documentary", "Thriller", "Animation", "Western"]
+PAGE = 50
+
+
+def _pct_ms(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+def _vocabulary(rng: random.Random) -> tuple[list[str], list[float]]:
+    """WORDS plus generated words, Zipf-weighted like natural text."""
+    words = list(WORDS)
+    while len(words) < 5000:
+        word = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        if word not in words:
+            words.append(word)
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+
+def _queries(words: list[str]) -> list[str]:
+    """Common, prefix, mid-frequency, rare, multi-word, genre and missing terms."""
+    return [
+        "star",
+        "winter garden",
+        "detec",
+        words[300],
+        words[3000],
+        f"{words[100]} {words[1000]}",
+        "documentary",
+        "zzz",
+    ]
+
+
+def _rows(count: int, rng: random.Random, words: list[str], weights: list[float]):
+    def text(k: int) -> str:
+        return " ".join(rng.choices(words, weights, k=k))
+
+    for n in range(count):
+        yield {
+            "source": "local",
+            "url": f"file:///media/{n}.mkv",
+            "media_type": "episode" if n % 3 else "movie",
+            "title": f"{text(rng.randint(1, 4)).title()} {n}",
+            "show_title": text(2).title() if n % 3 else None,
+            "description": text(rng.randint(12, 40)),
+            "genres": json.dumps(rng.sample(GENRES, k=2)),
+        }
+
+
+def _populate(engine, count: int, words: list[str], weights: list[float]) -> None:
+    rng = random.Random(42)
+    batch: list[dict] = []
+    with engine.begin() as conn:
+        for row in _rows(count, rng, words, weights):
+            batch.append(row)
+            if len(batch) == 5000:
+                conn.execute(insert(MediaItem.__table__), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(MediaItem.__table__), batch)
+
+
+def _ilike_page(session: Session, query: str) -> tuple[int, int]:
+    condition = like_condition(query)
+    page = session.scalars(
+        select(MediaItem.id).where(condition).order_by(MediaItem.title).limit(PAGE)
+    ).all()
+    total = session.scalar(select(func.count(MediaItem.id)).where(condition))
+    return len(page), total
+
+
+def _fts_page(session: Session, query: str) -> tuple[int, int]:
+    engine = session.get_bind()
+    page = session.scalars(
+        apply_search(select(MediaItem.id), query, engine).order_by(MediaItem.id).limit(PAGE)
+    ).all()
+    count = select(func.count(MediaItem.id)).select_from(MediaItem)
+    total = session.scalar(apply_search(count, query, engine, ranked=False))
+    return len(page), total
+
+
+def _time(fn, session: Session, query: str, repeat: int) -> tuple[list[float], int]:
+    samples = []
+    total = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _, total = fn(session, query)
+        samples.append(time.perf_counter() - t0)
+    return samples, total
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Media search benchmark")
+    ap.add_argument("--rows", type=int, default=250_000, help="Synthetic media items")
+    ap.add_argument("--repeat", type=int, default=5, help="Runs per query and path")
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    results: dict = {"rows": args.rows, "queries": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/bench.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+
+        words, weights = _vocabulary(random.Random(7))
+        t0 = time.perf_counter()
+        _populate(engine, args.rows, words, weights)
+        results["populate_seconds"] = time.perf_counter() - t0
+        results["db_mb_before"] = os.path.getsize(path) / 1e6
+
+        t0 = time.perf_counter()
+        with engine.begin() as conn:
+            install_media_search(conn)
+        results["index_build_seconds"] = time.perf_counter() - t0
+        results["db_mb_after"] = os.path.getsize(path) / 1e6
+
+        with Session(engine) as session:
+            for query in _queries(words):
+                ilike, ilike_total = _time(_ilike_page, session, query, args.repeat)
+                fts, fts_total = _time(_fts_page, session, query, args.repeat)
+                results["queries"][query] = {
+                    "ilike_matches": ilike_total,
+                    "fts5_matches": fts_total,
+                    "ilike_p50_ms": _pct_ms(ilike, 50),
+                    "fts5_p50_ms": _pct_ms(fts, 50),
+                    "ilike_max_ms": max(ilike) * 1000,
+                    "fts5_max_ms": max(fts) * 1000,
+                }
+        engine.dispose()
+
+    print(
+        f"{args.rows} media items; FTS5 index built in {results['index_build_seconds']:.1f}s, "
+        f"database {results['db_mb_before']:.0f}MB -> {results['db_mb_after']:.0f}MB"
+    )
+    print(
+        f"{'query':>20} {'ilike hits':>10} {'fts5 hits':>10} "
+        f"{'ilike p50':>10} {'fts5 p50':>10} {'speedup':>8}"
+    )
+    for query, r in results["queries"].items():
+        speedup = r["ilike_p50_ms"] / max(r["fts5_p50_ms"], 1e-6)
+        print(
+            f"{query:>20} {r['ilike_matches']:>10} {r['fts5_matches']:>10} "
+            f"{r['ilike_p50_ms']:>8.1f}ms {r['fts5_p50_ms']:>8.1f}ms {speedup:>7.1f}x"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
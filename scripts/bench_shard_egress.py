@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark: aggregate egress vs. channel shard worker count.
+
+Runs synthetic channels (no FFmpeg) whose streams do ChannelStream's
+per-chunk work: one write into a BroadcastRingBuffer plus TSKeyframeIndex
+feed per chunk, and a ring-cursor read per client. Clients consume as fast
+as they can for a fixed time.
+
+- ``workers=0``: every channel on the benchmark's own event loop, clients
+  iterate the streams directly (the unsharded ChannelManager layout).
+- ``workers=N``: ShardedChannelManager with N worker processes; clients
+  read through RemoteChannelStream, i.e. the same proxy path the HTTP
+  routes use.
+
+Usage:
+    python scripts/bench_shard_egress.py [--workers 0 1 2 4] [--channels 16]
+        [--clients 4] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exstreamtv.streaming.channel_sharding import ShardedChannelManager  # noqa: E402
+from exstreamtv.streaming.ring_buffer import (  # noqa: E402
+    BroadcastRingBuffer,
+    RingBufferOverrun,
+)
+from exstreamtv.streaming.ts_index import TS_PACKET_SIZE, TSKeyframeIndex  # noqa: E402
+
+CHUNK_SIZE = 348 * TS_PACKET_SIZE  # ~64KB of MPEG-TS packets
+RING_SIZE = 4 * 1024 * 1024
+CLIENT_READ_MAX = 4 * CHUNK_SIZE
+
+
+def _ts_chunk() -> bytes:
+    packet = bytes([0x47, 0x01, 0x00, 0x10]).ljust(TS_PACKET_SIZE, b"\xff")
+    return packet * (CHUNK_SIZE // TS_PACKET_SIZE)
+
+
+class SyntheticChannelStream:
+    """Produces TS chunks as fast as its slowest client reads them."""
+
+    def __init__(self, channel_id: int):
+        self.channel_id = channel_id
+        self._ring = BroadcastRingBuffer(RING_SIZE)
+        self._ts_index = TSKeyframeIndex()
+        self._cursors: dict[int, object] = {}
+        self._producer: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._producer is not None
+
+    async def start(self) -> None:
+        if self._producer is None:
+            self._producer = asyncio.create_task(self._produce())
+
+    async def stop(self) -> None:
+        if self._producer is not None:
+            self._producer.cancel()
+            self._producer = None
+        self._ring.close()
+
+    async def _produce(self) -> None:
+        chunk = _ts_chunk()
+        while True:
+            # Backpressure: never lap the slowest client
+            if self._cursors and max(self._ring.lag(c) for c in self._cursors.values()) > RING_SIZE // 2:
+                await asyncio.sleep(0.0005)
+                continue
+            self._ring.write(chunk)
+            self._ts_index.feed(chunk)
+            await asyncio.sleep(0)
+
+    async def get_stream(self):
+        await self.start()
+        cursor = self._ring.open_cursor()
+        self._cursors[id(cursor)] = cursor
+        try:
+            while not self._ring.closed:
+                try:
+                    data = self._ring.read(cursor, CLIENT_READ_MAX)
+                except RingBufferOverrun:
+                    return
+                if data:
+                    yield data
+                else:
+                    await self._ring.wait(cursor)
+        finally:
+            del self._cursors[id(cursor)]
+
+
+class SyntheticChannelManager:
+    """The subset of ChannelManager used by the shard workers."""
+
+    def __init__(self) -> None:
+        self._channels: dict[int, SyntheticChannelStream] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        for stream in self._channels.values():
+            await stream.stop()
+
+    async def get_channel_stream(self, channel_id, channel_number, channel_name):
+        if channel_id not in self._channels:
+            self._channels[channel_id] = SyntheticChannelStream(channel_id)
+        return self._channels[channel_id]
+
+    def get_active_channels(self) -> list[int]:
+        return [cid for cid, s in self._channels.items() if s.is_running]
+
+
+async def synthetic_manager(index: int, workers: int) -> SyntheticChannelManager:
+    return SyntheticChannelManager()
+
+
+async def _consume(manager, channel_id: int, deadline: float, received: list, slot: int) -> None:
+    stream = await manager.get_channel_stream(channel_id, channel_id, f"Bench {channel_id}")
+    chunks = stream.get_stream()
+    try:
+        async for data in chunks:
+            received[slot] += len(data)
+            if time.perf_counter() >= deadline:
+                break
+    finally:
+        await chunks.aclose()
+
+
+async def _run(workers: int, channels: int, clients: int, seconds: float) -> dict:
+    if workers == 0:
+        manager = SyntheticChannelManager()
+    else:
+        manager = ShardedChannelManager(
+            db_session_factory=None, workers=workers, manager_factory=synthetic_manager
+        )
+    await manager.start()
+    try:
+        received = [0] * (channels * clients)
+        cpu_start = os.times()
+        start = time.perf_counter()
+        deadline = start + seconds
+        await asyncio.gather(
+            *(
+                _consume(manager, ch + 1, deadline, received, ch * clients + c)
+                for ch in range(channels)
+                for c in range(clients)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        cpu_end = os.times()
+    finally:
+        await manager.stop()
+    return {
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "egress_bytes": sum(received),
+        "front_end_cpu_s": (cpu_end.user + cpu_end.system) - (cpu_start.user + cpu_start.system),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Channel shard egress scaling benchmark")
+    ap.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    ap.add_argument("--channels", type=int, default=16)
+    ap.add_argument("--clients", type=int, default=4, help="Clients per channel")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.channels} channels x {args.clients} clients")
+    print(f"{'workers':>7} {'egress MB/s':>12} {'vs 1 worker':>12} {'front-end CPU %':>16}")
+    results = []
+    baseline = None
+    for n in args.workers:
+        r = asyncio.run(_run(n, args.channels, args.clients, args.seconds))
+        mbps = r["egress_bytes"] / r["elapsed_s"] / 1e6
+        if n == 1:
+            baseline = mbps
+        scale = f"{mbps / baseline:.2f}x" if baseline and n >= 1 else "-"
+        cpu_pct = 100 * r["front_end_cpu_s"] / r["elapsed_s"]
+        print(f"{n:>7} {mbps:>12.1f} {scale:>12} {cpu_pct:>16.0f}")
+        results.append({**r, "egress_mb_s": mbps})
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
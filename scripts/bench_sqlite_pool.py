@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mixed read/write throughput, StaticPool vs. read/write split.
+
+Seeds a temporary SQLite database (channels, playouts, items) and runs
+concurrent async workers for a fixed time against two pool setups:
+
+- ``static``: one shared aiosqlite connection (StaticPool), the default
+- ``read_write``: query_only reader connections plus one serialized
+  writer (database.sqlite_pool: read_write)
+
+Each operation is its own session. Reads load one channel's playout items
+(the EPG / ChannelStream lookup shape) or the channel list (lineup.json);
+writes update a playback position and commit.
+
+Usage:
+    python scripts/bench_sqlite_pool.py [--channels 200] [--items 48]
+        [--workers 16] [--seconds 5] [--write-ratio 0.1] [--readers 4]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_epg_bulk_load import _seed  # noqa: E402
+from sqlalchemy import event, select, update  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from exstreamtv.database.models import (  # noqa: E402
+    Channel,
+    ChannelPlaybackPosition,
+    Playout,
+    PlayoutItem,
+)
+from exstreamtv.database.models.base import Base  # noqa: E402
+from exstreamtv.database.sqlite_pool import (  # noqa: E402
+    create_read_write_engines,
+    read_write_session_kwargs,
+)
+
+
+def _static_engine(url: str):
+    engine = create_async_engine(
+        url, poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine, None
+
+
+def _pct_ms(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+async def _read(session: AsyncSession, channels: int, rng: random.Random) -> None:
+    if rng.random() < 0.2:
+        (await session.execute(select(Channel).where(Channel.enabled.is_(True)))).scalars().all()
+        return
+    channel_id = rng.randint(1, channels)
+    stmt = (
+        select(PlayoutItem)
+        .join(Playout, Playout.id == PlayoutItem.playout_id)
+        .where(Playout.channel_id == channel_id, Playout.is_active.is_(True))
+        .order_by(PlayoutItem.start_time)
+    )
+    (await session.execute(stmt)).scalars().all()
+
+
+async def _write(session: AsyncSession, channels: int, rng: random.Random) -> None:
+    await session.execute(
+        update(ChannelPlaybackPosition)
+        .where(ChannelPlaybackPosition.channel_id == rng.randint(1, channels))
+        .values(last_played_at=datetime.utcnow())
+    )
+    await session.commit()
+
+
+async def _worker(factory, args, deadline: float, seed: int, lat: dict) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        kind = "write" if rng.random() < args.write_ratio else "read"
+        t0 = time.perf_counter()
+        async with factory() as session:
+            if kind == "write":
+                await _write(session, args.channels, rng)
+            else:
+                await _read(session, args.channels, rng)
+        lat[kind].append(time.perf_counter() - t0)
+
+
+async def _run_mode(mode: str, url: str, args: argparse.Namespace) -> dict:
+    if mode == "static":
+        writer, reader = _static_engine(url)
+        factory = async_sessionmaker(writer, class_=AsyncSession, expire_on_commit=False)
+    else:
+        writer, reader = create_read_write_engines(url, read_connections=args.readers)
+        factory = async_sessionmaker(
+            writer,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            **read_write_session_kwargs(writer, reader),
+        )
+    lat: dict[str, list[float]] = {"read": [], "write": []}
+    try:
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(_worker(factory, args, deadline, n, lat) for n in range(args.workers))
+        )
+    finally:
+        await writer.dispose()
+        if reader is not None:
+            await reader.dispose()
+
+    ops = len(lat["read"]) + len(lat["write"])
+    return {
+        "ops_per_sec": ops / args.seconds,
+        "reads_per_sec": len(lat["read"]) / args.seconds,
+        "writes_per_sec": len(lat["write"]) / args.seconds,
+        "read_p50_ms": _pct_ms(lat["read"], 50),
+        "read_p95_ms": _pct_ms(lat["read"], 95),
+        "write_p50_ms": _pct_ms(lat["write"], 50),
+        "write_p95_ms": _pct_ms(lat["write"], 95),
+    }
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            await conn.run_sync(Base.metadata.create_all)
+        await _seed(async_sessionmaker(engine, expire_on_commit=False), args.channels, args.items)
+        await engine.dispose()
+        for mode in ("static", "read_write"):
+            results[mode] = await _run_mode(mode, url, args)
+    return results
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="SQLite pool mixed read/write benchmark")
+    ap.add_argument("--channels", type=int, default=200)
+    ap.add_argument("--items", type=int, default=48, help="Playout items per channel")
+    ap.add_argument("--workers", type=int, default=16, help="Concurrent sessions")
+    ap.add_argument("--seconds", type=float, default=5.0, help="Duration per mode")
+    ap.add_argument("--write-ratio", type=float, default=0.1)
+    ap.add_argument("--readers", type=int, default=4, help="Reader connections (read_write)")
+    ap.add_argument("--json", type=Path, help="Write results JSON to file")
+    args = ap.parse_args()
+
+    results = asyncio.run(_run(args))
+    print(
+        f"{args.channels} channels x {args.items} items, {args.workers} workers, "
+        f"{args.write_ratio:.0%} writes, {args.seconds:.0f}s per mode"
+    )
+    print(
+        f"{'mode':>11} {'ops/s':>8} {'reads/s':>8} {'writes/s':>8} "
+        f"{'read p50':>9} {'read p95':>9} {'write p50':>9} {'write p95':>9}"
+    )
+    for mode, r in results.items():
+        print(
+            f"{mode:>11} {r['ops_per_sec']:>8.0f} {r['reads_per_sec']:>8.0f} "
+            f"{r['writes_per_sec']:>8.0f} {r['read_p50_ms']:>7.1f}ms {r['read_p95_ms']:>7.1f}ms "
+            f"{r['write_p50_ms']:>7.1f}ms {r['write_p95_ms']:>7.1f}ms"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Tests for event-driven timeline versions in BroadcastScheduleAuthority.
+"""
+
+import os
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from exstreamtv.database.models.schedule import ProgramSchedule
+from exstreamtv.scheduling.authority import BroadcastScheduleAuthority
+from exstreamtv.scheduling.canonical_timeline import CanonicalTimelineItem
+from exstreamtv.scheduling.clock import ChannelClock
+from exstreamtv.streaming import playout_timeline
+from exstreamtv.streaming.playout_timeline import bump_timeline_version, timeline_version
+
+TIMELINE = [CanonicalTimelineItem(canonical_duration=600, title=f"Item {i}") for i in range(3)]
+
+
+def _no_db():
+    raise AssertionError("cache hit must not open a DB session")
+
+
+def _authority_with(channel_id: int) -> BroadcastScheduleAuthority:
+    auth = BroadcastScheduleAuthority(_no_db)
+    auth._store_timeline(channel_id, TIMELINE, timeline_version(channel_id))
+    auth._clocks[channel_id] = ChannelClock(channel_id, datetime.now(tz=timezone.utc), 1800)
+    return auth
+
+
+@pytest.mark.unit
+def test_cache_hits_skip_validation_until_version_bump() -> None:
+    auth = _authority_with(901)
+    for _ in range(3):
+        assert auth.get_timeline(901) is TIMELINE
+    assert auth.get_timeline_index(901).total == 1800
+    assert auth.get_stats()["validations_skipped"] == 4
+
+    bump_timeline_version(902)
+    assert auth.get_timeline(901) is TIMELINE
+
+    bump_timeline_version(901)
+    assert auth.get_timeline(901) == []
+    assert auth.get_clock(901) is None
+    assert auth.get_stats()["version_invalidations"] == 1
+
+
+@pytest.mark.unit
+def test_schedule_writes_bump_every_timeline(db: Session) -> None:
+    auth = _authority_with(903)
+    db.add(ProgramSchedule(name="Weeknights"))
+    db.commit()
+    assert auth.get_timeline(903) == []
+
+
+@pytest.mark.unit
+def test_schedule_file_changes_invalidate(tmp_path) -> None:
+    schedule = tmp_path / "channel_904.yml"
+    schedule.write_text("name: test\n")
+
+    auth = _authority_with(904)
+    auth._schedule_files[904] = (schedule, schedule.stat().st_mtime)
+    assert auth.get_timeline(904) is TIMELINE
+
+    # Without a watcher, the source file's mtime is checked
+    mtime = schedule.stat().st_mtime + 5
+    os.utime(schedule, (mtime, mtime))
+    assert auth.get_timeline(904) == []
+
+    # The watcher callback bumps every version instead
+    auth = _authority_with(904)
+    playout_timeline._on_schedule_file_changed(schedule, "modified")
+    assert auth.get_timeline(904) == []
+
+
+@pytest.mark.unit
+def test_source_hash_catches_changes_made_elsewhere(
+    db: Session, engine, tmp_path, monkeypatch
+) -> None:
+    """Writes from another process and new schedule files are caught by the periodic check."""
+    from sqlalchemy.orm import sessionmaker
+
+    from exstreamtv.database.models import Channel, Playout
+    from exstreamtv.scheduling import authority as authority_module
+
+    channel = Channel(number="905", name="Elsewhere")
+    db.add(channel)
+    db.flush()
+    playout = Playout(channel_id=channel.id, is_active=True)
+    db.add(playout)
+    db.commit()
+    monkeypatch.setattr(
+        authority_module.ScheduleParser,
+        "find_schedule_file",
+        staticmethod(lambda number: tmp_path / f"channel_{number}.yml"),
+    )
+
+    auth = BroadcastScheduleAuthority(sessionmaker(bind=engine), source_check_seconds=0)
+    version = timeline_version(channel.id)
+    auth._store_timeline(channel.id, TIMELINE, version, auth._source_hash(channel.id))
+    assert auth.get_timeline(channel.id) is TIMELINE
+    # A hit that ran the source query is a check, not a skipped validation
+    stats = auth.get_stats()
+    assert (stats["source_checks"], stats["validations_skipped"]) == (1, 0)
+
+    # Another process updates the playout: no version bump reaches this one
+    monkeypatch.setattr(playout_timeline, "bump_timeline_version", lambda channel_id=None: None)
+    db.execute(
+        Playout.__table__.update()
+        .where(Playout.id == playout.id)
+        .values(updated_at=datetime(2030, 1, 1))
+    )
+    db.commit()
+    assert timeline_version(channel.id) == version
+    assert auth.get_timeline(channel.id) == []
+
+    # A schedule YAML appearing for a database-built timeline
+    auth._store_timeline(channel.id, TIMELINE, version, auth._source_hash(channel.id))
+    (tmp_path / "channel_905.yml").write_text("name: test\n")
+    assert auth.get_timeline(channel.id) == []
+
+    # Checks are rate limited
+    auth.source_check_seconds = 3600
+    auth._store_timeline(channel.id, TIMELINE, version, auth._source_hash(channel.id))
+    (tmp_path / "channel_905.yml").unlink()
+    assert auth.get_timeline(channel.id) is TIMELINE
+    stats = auth.get_stats()
+    assert (stats["source_checks"], stats["validations_skipped"]) == (3, 1)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_load_hashes_sources_off_the_event_loop(monkeypatch) -> None:
+    from exstreamtv.scheduling import authority as authority_module
+
+    loop_thread = threading.get_ident()
+    hashed_on = []
+
+    async def build(*args, **kwargs):
+        return TIMELINE
+
+    auth = BroadcastScheduleAuthority(_no_db)
+    monkeypatch.setattr(auth, "_source_hash", lambda cid: hashed_on.append(threading.get_ident()))
+    monkeypatch.setattr(auth, "_get_channel_number", lambda cid: "906")
+    monkeypatch.setattr(
+        authority_module.ScheduleParser, "find_schedule_file", staticmethod(lambda number: None)
+    )
+    monkeypatch.setattr(authority_module, "build_from_playout", build)
+
+    assert await auth.load_timeline_async(906) is TIMELINE
+    assert hashed_on and hashed_on[0] != loop_thread
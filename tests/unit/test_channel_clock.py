@@ -0,0 +1,97 @@
+"""
+Tests for ChannelClock resolution over the prefix-sum TimelineIndex.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from exstreamtv.scheduling.canonical_timeline import CanonicalTimelineItem
+from exstreamtv.scheduling.clock import ChannelClock, TimelineIndex
+from exstreamtv.scheduling.xmltv_from_clock import build_programmes_from_clock
+
+ANCHOR = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _timeline(durations: list[float | None]) -> list[CanonicalTimelineItem]:
+    return [
+        CanonicalTimelineItem(
+            media_item=None,
+            playout_item=None,
+            canonical_duration=duration,
+            title=f"Item {i}",
+        )
+        for i, duration in enumerate(durations)
+    ]
+
+
+def _linear_resolve(timeline, offset: float) -> tuple[int, float]:
+    """The original linear walk, kept as the reference."""
+    cumulative = 0.0
+    for idx, item in enumerate(timeline):
+        duration = item.canonical_duration or 1800.0
+        if cumulative + duration > offset:
+            return idx, max(0.0, min(offset - cumulative, max(0, duration - 10)))
+        cumulative += duration
+    duration = timeline[-1].canonical_duration or 1800.0
+    return len(timeline) - 1, max(0.0, duration - 10)
+
+
+@pytest.mark.unit
+def test_bisect_resolution_matches_linear_walk() -> None:
+    rng = random.Random(7)
+    timeline = _timeline([rng.choice([None, 0, 22.5, 600, 1320, 2700]) for _ in range(300)])
+    index = TimelineIndex(timeline)
+    assert index.total == sum(t.canonical_duration or 1800.0 for t in timeline)
+
+    clock = ChannelClock(1, ANCHOR, index.total, timeline_index=index)
+    probes = [0.0, index.ends[0], index.ends[-2], index.total - 0.001]
+    probes += [rng.uniform(0, index.total) for _ in range(500)]
+    for offset in probes:
+        resolved = clock.resolve_item_and_seek(timeline, now=ANCHOR + timedelta(seconds=offset))
+        expected_idx, expected_seek = _linear_resolve(timeline, resolved.offset_into_cycle)
+        assert resolved.item_index == expected_idx
+        assert resolved.item is timeline[expected_idx]
+        assert resolved.seek_seconds == pytest.approx(expected_seek)
+
+    # The clock reuses the authority's index rather than rebuilding it
+    assert clock.timeline_index(timeline) is index
+    assert clock.timeline_index(list(timeline)) is not index
+    assert clock.resolve_item_and_seek([], now=ANCHOR) is None
+
+
+@pytest.mark.unit
+def test_item_at_and_items_between_wrap_cycles() -> None:
+    timeline = _timeline([600, 1200, None])  # 10 + 20 + 30 min cycle
+    clock = ChannelClock(1, ANCHOR, TimelineIndex(timeline).total)
+
+    now = ANCHOR + timedelta(hours=5, minutes=15)  # 5 cycles in, 15 min into Item 1
+    slot = clock.item_at(timeline, now)
+    assert slot.item.title == "Item 1"
+    assert slot.start_time == ANCHOR + timedelta(hours=5, minutes=10)
+    assert slot.stop_time == ANCHOR + timedelta(hours=5, minutes=30)
+    # Boundaries belong to the item that starts there
+    assert clock.item_at(timeline, ANCHOR + timedelta(hours=5, minutes=30)).item.title == "Item 2"
+
+    slots = clock.items_between(timeline, now, now + timedelta(hours=1))
+    assert [s.item.title for s in slots] == ["Item 1", "Item 2", "Item 0", "Item 1"]
+    assert [s.item_index for s in slots] == [1, 2, 0, 1]
+    for prev, nxt in zip(slots, slots[1:], strict=False):
+        assert prev.stop_epoch == nxt.start_epoch
+    assert slots[-1].start_time < now + timedelta(hours=1) <= slots[-1].stop_time
+    assert len(clock.items_between(timeline, now, now + timedelta(days=1), max_items=3)) == 3
+
+    # Before the anchor the cycle runs backwards in time too
+    assert clock.item_at(timeline, ANCHOR - timedelta(minutes=1)).item.title == "Item 2"
+
+
+@pytest.mark.unit
+def test_clock_guide_starts_at_item_on_air() -> None:
+    timeline = _timeline([600, 1200, None])
+    clock = ChannelClock(1, ANCHOR, TimelineIndex(timeline).total)
+    now = ANCHOR + timedelta(minutes=75)  # 15 min into the second cycle's Item 1
+    programmes = build_programmes_from_clock(clock, timeline, now=now, duration_hours=1.0)
+    assert [p.title for p in programmes] == ["Item 1", "Item 2", "Item 0", "Item 1"]
+    assert programmes[0].start_time == now
+    assert programmes[1].start_time == ANCHOR + timedelta(minutes=90)
@@ -0,0 +1,195 @@
+"""
+Tests for channel sharding across worker processes.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from exstreamtv.streaming.channel_sharding import (
+    INVALIDATION_DELAY,
+    ShardedChannelManager,
+    ShardWorkerError,
+    shard_for,
+)
+from exstreamtv.streaming.playout_timeline import bump_timeline_version
+from exstreamtv.streaming.position_store import PositionSnapshot, get_position_store
+
+START = datetime(2026, 10, 16, 6, 0, tzinfo=timezone.utc)
+
+
+class _EchoStream:
+    """Yields a few chunks naming the worker process that serves it."""
+
+    def __init__(self, channel_id: int, worker: int):
+        self.channel_id = channel_id
+        self.worker = worker
+        self.is_running = False
+
+    async def start(self) -> None:
+        self.is_running = True
+
+    async def stop(self) -> None:
+        self.is_running = False
+
+    async def get_stream(self):
+        if self.channel_id == 99:
+            raise RuntimeError("no playout")
+        self.is_running = True
+        get_position_store().record(
+            PositionSnapshot(
+                channel_id=self.channel_id,
+                channel_number=str(self.channel_id),
+                current_index=2,
+                playout_start_time=START,
+                current_item_start_time=None,
+                last_played_at=START,
+            )
+        )
+        for i in range(3):
+            yield f"ch{self.channel_id}@w{self.worker}:{i};".encode()
+
+
+class _EchoManager:
+    def __init__(self, worker: int):
+        self.worker = worker
+        self.streams: dict[int, _EchoStream] = {}
+
+    async def stop(self) -> None:
+        pass
+
+    async def get_channel_stream(self, channel_id, channel_number, channel_name):
+        return self.streams.setdefault(channel_id, _EchoStream(channel_id, self.worker))
+
+    async def release_channel(self, channel_id: int):
+        return self.streams.pop(channel_id, None)
+
+    async def get_current_position(self, channel_id: int):
+        # The worker's own position store, to show forgets reach it
+        position = get_position_store().get(channel_id)
+        if position is None:
+            return None
+        return {
+            "item_index": position.current_index,
+            "playout_start_time": position.playout_start_time,
+            "current_item_start_time": None,
+        }
+
+    def get_active_channels(self) -> list[int]:
+        return sorted(cid for cid, s in self.streams.items() if s.is_running)
+
+
+async def _echo_manager(index: int, workers: int) -> _EchoManager:
+    return _EchoManager(index)
+
+
+async def _collect(manager: ShardedChannelManager, channel_id: int) -> bytes:
+    stream = await manager.get_channel_stream(channel_id, channel_id, f"Ch {channel_id}")
+    return b"".join([chunk async for chunk in stream.get_stream()])
+
+
+@pytest.mark.unit
+def test_channels_partition_by_id() -> None:
+    assert [shard_for(cid, 3) for cid in range(1, 7)] == [1, 2, 0, 1, 2, 0]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_streams_are_served_by_the_owning_worker(tmp_path) -> None:
+    """Remote streams relay the owning worker's bytes; errors surface to the caller."""
+    manager = ShardedChannelManager(
+        db_session_factory=None,
+        workers=2,
+        socket_dir=str(tmp_path),
+        manager_factory=_echo_manager,
+    )
+    await manager.start()
+    try:
+        assert await _collect(manager, 3) == b"ch3@w1:0;ch3@w1:1;ch3@w1:2;"
+        assert await _collect(manager, 4) == b"ch4@w0:0;ch4@w0:1;ch4@w0:2;"
+
+        stats = await manager.get_worker_stats()
+        assert [s["active_channels"] for s in stats] == [[4], [3]]
+        assert len({s["pid"] for s in stats} | {os.getpid()}) == 3
+
+        remote = await manager.get_channel_stream(3, 3, "Ch 3")
+        await remote.stop()
+        stats = await manager.get_worker_stats()
+        assert stats[1]["active_channels"] == []
+
+        with pytest.raises(ShardWorkerError, match="no playout"):
+            await _collect(manager, 99)
+        assert manager.get_running_stream(4) is None
+    finally:
+        await manager.stop()
+    assert manager.get_stats()["alive"] == [False, False]
+    assert not list(tmp_path.glob("*.sock"))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_new_proxy_sees_channel_running_on_worker(tmp_path) -> None:
+    """A fresh proxy reports the worker's running state, not a default of False."""
+    manager = ShardedChannelManager(
+        db_session_factory=None,
+        workers=2,
+        socket_dir=str(tmp_path),
+        manager_factory=_echo_manager,
+    )
+    await manager.start()
+    try:
+        first = await manager.get_channel_stream(3, 3, "Ch 3")
+        assert not first.is_running
+        await first.start()
+
+        looked_up = await manager.get_channel_stream(3, 3, "Ch 3")
+        assert looked_up is not first and looked_up.is_running
+        assert not (await manager.get_channel_stream(5, 5, "Ch 5")).is_running
+
+        await looked_up.stop()
+        assert not (await manager.get_channel_stream(3, 3, "Ch 3")).is_running
+    finally:
+        await manager.stop()
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_front_end_invalidations_reach_the_owning_worker(tmp_path) -> None:
+    """Timeline bumps and position forgets from API writes are forwarded to the workers."""
+    manager = ShardedChannelManager(
+        db_session_factory=None,
+        workers=2,
+        socket_dir=str(tmp_path),
+        manager_factory=_echo_manager,
+    )
+    await manager.start()
+    try:
+        assert await manager.get_current_position(3) is None
+        await _collect(manager, 3)
+        position = await manager.get_current_position(3)
+        assert position["item_index"] == 2 and position["playout_start_time"] == START
+
+        async def generations() -> list[int]:
+            return [s["timeline_generation"] for s in await manager.get_worker_stats()]
+
+        before = await generations()
+        bump_timeline_version(3)  # shard 1 only
+        await asyncio.sleep(INVALIDATION_DELAY * 5)
+        after_channel = await generations()
+        assert after_channel == [before[0], before[1] + 1]
+        bump_timeline_version()  # every shard
+        await asyncio.sleep(INVALIDATION_DELAY * 5)
+        assert await generations() == [after_channel[0] + 1, after_channel[1] + 1]
+
+        # delete_channel / reset_playback_position forget in the front-end store
+        get_position_store().forget(3)
+        await asyncio.sleep(INVALIDATION_DELAY * 5)
+        assert await manager.get_current_position(3) is None
+        assert manager.get_stats()["forward_errors"] == 0
+    finally:
+        await manager.stop()
+
+    # Listeners are removed with the manager
+    bump_timeline_version(3)
+    assert not manager._pending_bumps
@@ -0,0 +1,217 @@
+"""
+Tests for the persistent per-channel concat encoder mode.
+"""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from exstreamtv.streaming.concat_encoder import (
+    ENCODER_MODE_PER_ITEM,
+    ENCODER_MODE_PERSISTENT,
+    PersistentChannelEncoder,
+    build_concat_script,
+)
+
+
+def test_concat_script_repeats_feed_entry() -> None:
+    """The script loops over the same feed URL; quotes are escaped."""
+    script = build_concat_script("http://127.0.0.1:8411/iptv/concat/3/next")
+    assert script.splitlines() == [
+        "ffconcat version 1.0",
+        "file 'http://127.0.0.1:8411/iptv/concat/3/next'",
+        "file 'http://127.0.0.1:8411/iptv/concat/3/next'",
+    ]
+    assert "'\\''" in build_concat_script("/tmp/it's.mp4", entries=1)
+
+
+def test_encoder_command_loops_concat_and_normalizes_output() -> None:
+    """One looping concat input, fixed-format transcode, MPEG-TS to stdout."""
+    cmd = PersistentChannelEncoder(3).build_command(Path("/tmp/x.ffconcat"))
+    joined = " ".join(cmd)
+    assert "-f concat -safe 0" in joined
+    assert "-stream_loop -1 -i /tmp/x.ffconcat" in joined
+    assert "-c:v libx264" in joined and "-c:a aac" in joined
+    assert "scale=" in joined and "pad=" in joined
+    assert cmd[-3:] == ["-max_interleave_delta", "0", "-"]
+
+
+def _channel_stream():
+    from exstreamtv.streaming.channel_manager import ChannelStream
+
+    stream = ChannelStream(
+        channel_id=3,
+        channel_number=3,
+        channel_name="Test",
+        db_session_factory=MagicMock(),
+    )
+
+    async def save_position():
+        return None
+
+    stream._save_position = save_position
+    return stream
+
+
+@pytest.fixture
+def signatures(monkeypatch):
+    """media_url -> (video, audio) codecs reported by stream_signature."""
+    from exstreamtv.streaming import channel_manager
+
+    known: dict = {}
+
+    async def signature(media_url):
+        return known.get(media_url, ("h264", "aac"))
+
+    monkeypatch.setattr(channel_manager, "stream_signature", signature)
+    return known
+
+
+@pytest.mark.asyncio
+async def test_concat_entries_advance_playout(signatures) -> None:
+    """Each feed request advances the item index after the first."""
+    stream = _channel_stream()
+    seen: list[int] = []
+
+    async def next_item(index=None):
+        seen.append(stream._current_item_index)
+        return {"title": "T", "media_url": "/media/a.mp4", "position": 0}
+
+    stream._get_next_playout_item = next_item
+    stream._current_item_index = 4
+
+    first = await stream.next_concat_entry()
+    second = await stream.next_concat_entry()
+    assert first[0] == 1 and second[0] == 2
+    assert seen == [4, 5]
+    assert stream.get_concat_item(1) is not None
+    await stream.next_concat_entry()
+    assert stream.get_concat_item(1) is None
+
+
+@pytest.mark.asyncio
+async def test_persistent_mode_falls_back_after_repeated_failures() -> None:
+    """An encoder that keeps exiting without output reverts the channel to per-item."""
+    stream = _channel_stream()
+    stream._is_running = True
+    stream._encoder_mode = ENCODER_MODE_PERSISTENT
+
+    class FailingEncoder:
+        async def stream(self):
+            return
+            yield b""
+
+        async def stop(self):
+            return None
+
+    stream._concat_encoder = FailingEncoder()
+    for _ in range(stream.MAX_CONCAT_FAILURES):
+        await stream._stream_persistent(None, None)
+    assert stream._encoder_mode == ENCODER_MODE_PER_ITEM
+
+
+@pytest.mark.asyncio
+async def test_codec_change_ends_encoder_without_counting_a_failure(signatures) -> None:
+    """An item with other codecs is left for per-item playback and a fresh encoder."""
+    stream = _channel_stream()
+    stream._is_running = True
+    stream._encoder_mode = ENCODER_MODE_PERSISTENT
+    signatures["/media/b.mkv"] = ("hevc", "ac3")
+    urls = ["/media/a.mp4", "/media/b.mkv"]
+
+    async def next_item(index=None):
+        return {"title": "T", "media_url": urls[min(stream._current_item_index, 1)]}
+
+    stream._get_next_playout_item = next_item
+    finished: list[bool] = []
+
+    class Encoder:
+        feed_token = "secret"
+
+        def finish(self):
+            finished.append(True)
+
+        async def stream(self):
+            assert (await stream.next_concat_entry())[1]["media_url"] == "/media/a.mp4"
+            assert await stream.next_concat_entry() is None
+            # FFmpeg may retry the entry; it stays refused until the restart
+            assert await stream.next_concat_entry() is None
+            yield b""
+
+        async def stop(self):
+            return None
+
+    stream._concat_encoder = Encoder()
+    await stream._stream_persistent(None, None)
+    assert finished and stream._current_item_index == 1
+    assert stream._concat_failures == 0 and not stream._concat_codec_break
+    assert stream.concat_feed_token_valid("secret")
+    assert not stream.concat_feed_token_valid("guess")
+
+
+@pytest.mark.asyncio
+async def test_unprobeable_first_item_is_left_for_per_item_playback(signatures) -> None:
+    """A first entry without a codec signature never becomes the encoder's baseline."""
+    stream = _channel_stream()
+    stream._is_running = True
+    stream._encoder_mode = ENCODER_MODE_PERSISTENT
+    signatures["/media/broken.avi"] = None
+
+    async def next_item(index=None):
+        return {"title": "T", "media_url": "/media/broken.avi"}
+
+    stream._get_next_playout_item = next_item
+    finished: list[bool] = []
+
+    class Encoder:
+        def finish(self):
+            finished.append(True)
+
+        async def stream(self):
+            assert await stream.next_concat_entry() is None
+            yield b""
+
+        async def stop(self):
+            return None
+
+    stream._concat_encoder = Encoder()
+    await stream._stream_persistent(None, None)
+    assert finished and stream._current_item_index == 0
+    assert stream._concat_signature is None and stream._concat_entries == 0
+    assert stream._concat_failures == 0
+
+
+def _from_client(app, host: str):
+    """Wrap an ASGI app so requests appear to come from ``host``."""
+
+    async def asgi(scope, receive, send):
+        await app({**scope, "client": (host, 5000)}, receive, send)
+
+    return asgi
+
+
+def test_concat_feed_is_loopback_and_token_only(tmp_path) -> None:
+    """LAN clients and requests without the encoder's token cannot use the feed."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from exstreamtv.api.iptv import router
+
+    stream = _channel_stream()
+    stream._concat_encoder = PersistentChannelEncoder(3)
+    media = tmp_path / "clip.ts"
+    media.write_bytes(b"\x47" * 188)
+    stream._concat_items[7] = {"media_url": str(media)}
+    app = FastAPI()
+    app.include_router(router)
+    app.state.channel_manager = MagicMock(get_running_stream=lambda channel_id: stream)
+    path = "/iptv/concat/3/item/7"
+    token = stream._concat_encoder.feed_token
+
+    lan = TestClient(_from_client(app, "192.168.1.20"))
+    assert lan.get(path, params={"feed_token": token}).status_code == 403
+    local = TestClient(_from_client(app, "127.0.0.1"))
+    assert local.get(path).status_code == 403
+    assert local.get(path, params={"feed_token": "guess"}).status_code == 403
+    assert local.get(path, params={"feed_token": token}).content == media.read_bytes()
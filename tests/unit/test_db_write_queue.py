@@ -0,0 +1,111 @@
+"""
+Tests for the batched single-writer DB write queue.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from exstreamtv.database.models.base import Base
+from exstreamtv.database.models.channel import Channel
+from exstreamtv.database.write_queue import WriteQueue, WriteQueueClosed
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/tv.db", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def _add_channel(number: str):
+    def write(session):
+        session.add(Channel(number=number, name=f"Channel {number}"))
+        session.flush()
+        return number
+
+    return write
+
+
+def _count(session_factory) -> int:
+    with session_factory() as session:
+        return session.scalar(select(func.count(Channel.id)))
+
+
+@pytest.mark.unit
+def test_intents_from_many_threads_share_commits(session_factory) -> None:
+    queue = WriteQueue(max_batch=50, max_delay=0.2)
+    with pytest.raises(WriteQueueClosed):
+        queue.submit(_add_channel("0"))
+    queue.start(session_factory)
+    futures = []
+    lock = threading.Lock()
+
+    def producer(base: int) -> None:
+        for n in range(10):
+            future = queue.submit(_add_channel(str(base + n)))
+            with lock:
+                futures.append(future)
+
+    try:
+        threads = [threading.Thread(target=producer, args=(i * 100,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        values = {f.result(timeout=5) for f in futures}
+    finally:
+        queue.stop()
+
+    assert len(values) == 40
+    assert _count(session_factory) == 40
+    stats = queue.get_stats()
+    assert stats["intents"] == 40 and stats["intent_errors"] == 0
+    # Grouped: far fewer commits than intents
+    assert stats["commits"] < 10
+    assert stats["avg_batch_size"] > 4
+    assert stats["queue_depth"] == 0 and not stats["running"]
+
+
+@pytest.mark.unit
+def test_failing_intent_only_fails_its_own_future(session_factory) -> None:
+    queue = WriteQueue(max_batch=10, max_delay=0.2)
+    queue.start(session_factory)
+    try:
+        first = queue.submit(_add_channel("1"))
+        duplicate = queue.submit(_add_channel("1"))  # channels.number is unique
+        third = queue.submit(_add_channel("3"))
+        assert first.result(timeout=5) == "1"
+        with pytest.raises(IntegrityError):
+            duplicate.result(timeout=5)
+        assert third.result(timeout=5) == "3"
+    finally:
+        queue.stop()
+
+    with session_factory() as session:
+        assert sorted(session.scalars(select(Channel.number))) == ["1", "3"]
+    stats = queue.get_stats()
+    assert stats["commits"] == 1 and stats["intent_errors"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_submit_async_and_stop_drains(session_factory) -> None:
+    queue = WriteQueue(max_batch=100, max_delay=0.05)
+    queue.start(session_factory)
+    assert await queue.submit_async(_add_channel("7")) == "7"
+
+    # Intents still queued when stop() is called are applied first
+    pending = [queue.submit(_add_channel(str(n))) for n in range(10, 15)]
+    await asyncio.to_thread(queue.stop)
+    assert all(f.done() and f.exception() is None for f in pending)
+    assert _count(session_factory) == 6
+    with pytest.raises(WriteQueueClosed):
+        await queue.submit_async(_add_channel("8"))
@@ -0,0 +1,101 @@
+"""
+Tests for precompressed response bodies (EncodedBody) on the XMLTV and M3U caches.
+"""
+
+import asyncio
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from exstreamtv.patterns.cache.encoded_body import (
+    EncodedBody,
+    available_encodings,
+    negotiate_encoding,
+)
+from exstreamtv.patterns.cache.xmltv_cache import LazyXmltvCache
+
+XML = '<?xml version="1.0"?>\n<tv>' + "<programme/>" * 500 + "</tv>\n"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+        ("*, gzip;q=0", None),
+        ("deflate;q=1, gzip;q=0.5", "gzip"),
+    ],
+)
+def test_negotiate_encoding(header, expected) -> None:
+    assert negotiate_encoding(header, {"gzip": b""}) == expected
+
+
+@pytest.mark.unit
+def test_negotiate_prefers_higher_q_then_server_order() -> None:
+    stored = {"gzip": b"", "br": b"", "zstd": b""}
+    assert negotiate_encoding("gzip, br, zstd", stored) == "zstd"
+    assert negotiate_encoding("gzip, br;q=0.9", stored) == "gzip"
+    assert negotiate_encoding("br, zstd;q=0", stored) == "br"
+
+
+@pytest.mark.unit
+def test_encoded_body_is_built_once_and_served_by_lookup() -> None:
+    body = EncodedBody.build(XML)
+    assert set(body.variants) == set(available_encodings())
+    assert gzip.decompress(body.variants["gzip"]).decode() == XML
+    # Stable output: the same document always gets the same ETags
+    assert EncodedBody.build(XML) == body
+
+    app = FastAPI()
+
+    @app.get("/guide")
+    async def guide(request: Request):
+        return body.response(request, "text/xml; charset=utf-8", {"Cache-Control": "max-age=60"})
+
+    client = TestClient(app)
+    plain = client.get("/guide", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert plain.text == XML
+    assert plain.headers["etag"] == body.etag()
+    assert "content-encoding" not in plain.headers
+
+    zipped = client.get("/guide", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"] == body.etag("gzip") != body.etag()
+    assert zipped.headers["vary"] == "Accept-Encoding"
+    assert zipped.text == XML
+
+    # Any representation's ETag revalidates the document
+    for etag in (body.etag(), body.etag("gzip"), f"W/{body.etag()}", "*"):
+        cached = client.get("/guide", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == body.etag("gzip")
+    assert client.get("/guide", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_xmltv_cache_encodes_off_loop_and_drops_variants_on_invalidate() -> None:
+    async def builder(base_url: str) -> str:
+        return XML
+
+    cache = LazyXmltvCache(ttl_seconds=60, builder=builder)
+    await cache.refresh("http://tv.local")
+    assert cache.encoded("http://tv.local") is not None
+    assert cache.encoded("http://tv.local").raw == XML.encode()
+
+    cache.store("<tv/>", base_url="http://tv.local")
+    assert cache.encoded("http://tv.local") is None
+    await asyncio.gather(*cache._encode_tasks)
+    assert cache.encoded("http://tv.local").raw == b"<tv/>"
+
+    cache.invalidate()
+    assert cache.encoded("http://tv.local") is None
+    await cache.stop()
@@ -0,0 +1,146 @@
+"""
+Tests for the multi-core EPG build (DTO jobs, thread and process pool modes).
+"""
+
+import pickle
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from exstreamtv.api import iptv
+from exstreamtv.api.epg_build_pool import (
+    EpgBuildPool,
+    EpgChannelDTO,
+    EpgChannelJob,
+    EpgMediaDTO,
+    build_channel_epg,
+    item_dtos,
+)
+from exstreamtv.api.epg_loader import EpgBulkData
+from exstreamtv.api.timeline_builder import PlaybackAnchor, TimelineProgramme
+from exstreamtv.api.xmltv_generator import XMLTVGenerator
+from exstreamtv.database.models import MediaItem
+from exstreamtv.database.models.base import Base
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+BASE = "http://tv.local:8411"
+
+
+def _job(cid: int, items: int = 6) -> EpgChannelJob:
+    return EpgChannelJob(
+        channel=EpgChannelDTO(id=cid, number=str(cid), name=f"Channel {cid}", logo_path="/logo.png"),
+        items=[
+            {
+                "media_item": EpgMediaDTO(id=i, title=f"Show {i}", duration=1800),
+                "custom_title": "Override" if i == 0 else None,
+            }
+            for i in range(items)
+        ],
+        anchor=PlaybackAnchor(playout_start_time=NOW, last_item_index=0),
+        now=NOW,
+        end_time=NOW + timedelta(hours=24),
+        base_url=BASE,
+        max_programmes=20,
+    )
+
+
+@pytest.mark.unit
+def test_channel_build_matches_generator_output() -> None:
+    job = _job(1)
+    result = build_channel_epg(pickle.loads(pickle.dumps(job)))
+
+    assert not result.errors
+    assert len(result.programmes) == 20
+    assert result.programmes[0] == (NOW, NOW + timedelta(minutes=30), "Override")
+    assert result.first_stop == NOW + timedelta(minutes=30)
+
+    progs = [
+        TimelineProgramme(start_time=start, stop_time=stop, media_item=None, playout_item={}, title=title)
+        for start, stop, title in result.programmes
+    ]
+    gen = XMLTVGenerator()
+    assembled = gen.assemble([result.channel_xml], [result.programmes_xml])
+    assert assembled == gen.generate([job.channel], {1: progs}, base_url=BASE)
+
+
+@pytest.mark.unit
+def test_invalid_programmes_are_reported_not_raised() -> None:
+    job = _job(1)
+    job.now = datetime(1969, 12, 31, 23, 0, tzinfo=timezone.utc)
+    job.anchor = PlaybackAnchor(playout_start_time=job.now, last_item_index=0)
+    result = build_channel_epg(job)
+    assert result.errors
+    assert result.programmes_xml == ""
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_process_pool_results_match_thread_build() -> None:
+    jobs = [_job(cid, items=3 + cid % 4) for cid in range(1, 12)]
+    inline = await EpgBuildPool(workers=0).build(jobs)
+    pool = EpgBuildPool(workers=2, min_channels=1)
+    try:
+        pooled = await pool.build(jobs)
+    finally:
+        pool.shutdown()
+
+    assert [r.channel_id for r in pooled] == list(range(1, 12))
+    assert [(r.channel_xml, r.programmes_xml, r.programmes) for r in pooled] == [
+        (r.channel_xml, r.programmes_xml, r.programmes) for r in inline
+    ]
+    assert pool.get_stats()["pooled_builds"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_item_dtos_never_lazy_load() -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add(MediaItem(title="Pilot", duration=1200))
+        await db.commit()
+    async with session_factory() as db:
+        media = (await db.execute(select(MediaItem))).scalars().one()
+        # MediaItem.files is unloaded; touching it here would raise MissingGreenlet
+        (item,) = item_dtos([{"media_item": media, "custom_title": None}])
+    await engine.dispose()
+
+    assert item["media_item"] == EpgMediaDTO(id=media.id, title="Pilot", duration=1200)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_schedule_files_expand_in_parallel(monkeypatch) -> None:
+    """File-scheduled channels run ScheduleEngine concurrently, not one after another."""
+    channels = [SimpleNamespace(id=cid, number=str(cid), name=f"Ch {cid}") for cid in range(1, 5)]
+    # Every expansion waits for all the others; a serial build times out here
+    barrier = threading.Barrier(len(channels), timeout=5)
+    expanded = []
+
+    def expand(channel_id: int, schedule_file: Path) -> list:
+        barrier.wait()
+        expanded.append(channel_id)
+        return [{"media_item": EpgMediaDTO(id=channel_id, title="Show", duration=1800)}]
+
+    async def load(db, channels, include_items=True) -> EpgBulkData:
+        return EpgBulkData(
+            schedule_files={str(ch.number): Path(f"{ch.number}.yml") for ch in channels}
+        )
+
+    monkeypatch.setattr(iptv, "_run_schedule_engine_sync", expand)
+    monkeypatch.setattr(iptv, "load_epg_data", load)
+    monkeypatch.setattr(iptv, "get_epg_build_pool", lambda: EpgBuildPool(workers=len(channels)))
+
+    rebuilt = await iptv.rebuild_channel_fragments(
+        channels, None, NOW, NOW + timedelta(hours=6), BASE, validate=False
+    )
+    assert sorted(expanded) == [1, 2, 3, 4]
+    assert list(rebuilt) == [1, 2, 3, 4]
+    assert EpgBuildPool(workers=3).expansion_concurrency == 3
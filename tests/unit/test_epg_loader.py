@@ -0,0 +1,94 @@
+"""
+Tests for the bulk EPG data loader.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from exstreamtv.api.epg_loader import load_epg_data
+from exstreamtv.database.models import (
+    Channel,
+    ChannelPlaybackPosition,
+    MediaItem,
+    Playout,
+    PlayoutItem,
+)
+from exstreamtv.database.models.base import Base
+
+
+async def _seed(db, channels: int) -> None:
+    media = [MediaItem(title=f"Episode {i}", duration=1800) for i in range(3)]
+    db.add_all(media)
+    await db.flush()
+    start = datetime(2026, 1, 1)
+    for n in range(1, channels + 1):
+        channel = Channel(number=str(n), name=f"Ch {n}")
+        db.add(channel)
+        await db.flush()
+        # Channel 2 has no active playout; odd channels have a saved position
+        playout = Playout(channel_id=channel.id, is_active=n != 2)
+        db.add(playout)
+        if n % 2:
+            db.add(
+                ChannelPlaybackPosition(
+                    channel_id=channel.id, channel_number=str(n), last_item_index=n
+                )
+            )
+        await db.flush()
+        for i, mi in enumerate(media[: n % 3 + 1]):
+            st = start + timedelta(minutes=30 * i)
+            db.add(
+                PlayoutItem(
+                    playout_id=playout.id,
+                    media_item_id=mi.id,
+                    start_time=st,
+                    finish_time=st + timedelta(minutes=30),
+                    title=f"{mi.title} on {n}",
+                )
+            )
+    await db.commit()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_bulk_load_matches_per_channel_in_constant_queries(tmp_path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/epg.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    queries = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a, **k: queries.append(1))
+    try:
+        async with session_factory() as db:
+            await _seed(db, 12)
+            channels = (await db.execute(select(Channel).order_by(Channel.id))).scalars().all()
+
+            queries.clear()
+            bulk = await load_epg_data(db, channels)
+            assert len(queries) == 3 == bulk.query_count
+
+            for channel in channels:
+                single = await load_epg_data(db, [channel])
+                assert bulk.position(channel.id) is single.position(channel.id)
+                assert [i["custom_title"] for i in bulk.schedule_items(channel.id)] == [
+                    i["custom_title"] for i in single.schedule_items(channel.id)
+                ]
+
+            assert bulk.schedule_items(2) == []
+            assert bulk.position(2) is None
+            assert bulk.position(3).last_item_index == 3
+            assert [i["custom_title"] for i in bulk.schedule_items(5)] == [
+                "Episode 0 on 5",
+                "Episode 1 on 5",
+                "Episode 2 on 5",
+            ]
+
+            queries.clear()
+            positions_only = await load_epg_data(db, channels, include_items=False)
+            assert len(queries) == 1
+            assert positions_only.items == {}
+    finally:
+        await engine.dispose()
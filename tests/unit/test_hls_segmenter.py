@@ -0,0 +1,110 @@
+"""
+Tests for the live HLS segmenter fed by the channel broadcast.
+"""
+
+import asyncio
+
+import pytest
+
+from exstreamtv.streaming.hls_segmenter import LiveHLSSegmenter
+from exstreamtv.streaming.ts_index import TS_PACKET_SIZE
+from exstreamtv.streaming.ts_splicer import _write_timestamp
+
+PMT_PID = 0x1000
+VIDEO_PID = 0x0100
+FRAME_TICKS = 3003  # 29.97 fps
+GOP = 30
+
+
+def _packet(pid: int, payload: bytes = b"", pusi: bool = False, rai: bool = False) -> bytes:
+    header = bytes([0x47, (0x40 if pusi else 0) | (pid >> 8), pid & 0xFF])
+    if rai:
+        body = bytes([0x30, 1, 0x40]) + payload
+    else:
+        body = bytes([0x10]) + payload
+    return (header + body).ljust(TS_PACKET_SIZE, b"\xff")[:TS_PACKET_SIZE]
+
+
+def _pat() -> bytes:
+    section = bytes([0x00, 0xB0, 13, 0, 1, 0xC1, 0, 0, 0, 1, 0xE0 | (PMT_PID >> 8), PMT_PID & 0xFF])
+    return _packet(0, b"\x00" + section + b"\x00\x00\x00\x00", pusi=True)
+
+
+def _pmt() -> bytes:
+    es = bytes([0x1B, 0xE0 | (VIDEO_PID >> 8), VIDEO_PID & 0xFF, 0xF0, 0])
+    section = bytes([0x02, 0xB0, 9 + len(es) + 4, 0, 1, 0xC1, 0, 0, 0xE1, 0x00, 0xF0, 0]) + es
+    return _packet(PMT_PID, b"\x00" + section + b"\x00\x00\x00\x00", pusi=True)
+
+
+def _frames(start_pts: int, count: int, first_frame: int = 0) -> bytes:
+    """Video frames (one PES packet + one continuation each), keyframe every GOP."""
+    out = bytearray()
+    for i in range(count):
+        pes = bytearray([0, 0, 1, 0xE0, 0, 0, 0x80, 0x80, 5, 0x20, 0, 0, 0, 0])
+        _write_timestamp(pes, 9, start_pts + i * FRAME_TICKS)
+        keyframe = (first_frame + i) % GOP == 0
+        out += _packet(VIDEO_PID, bytes(pes), pusi=True, rai=keyframe)
+        out += _packet(VIDEO_PID)
+    return bytes(out)
+
+
+def test_segments_are_keyframe_aligned_and_windowed() -> None:
+    """Segments start on keyframes with PSI, and the playlist slides over a bounded window."""
+    seg = LiveHLSSegmenter(target_duration=2.0, window=3)
+    stream = _pat() + _pmt() + _frames(90000, 8 * GOP)
+    # Unaligned chunks, as published by the channel
+    for pos in range(0, len(stream), 1000):
+        seg.feed(stream[pos:pos + 1000])
+
+    stats = seg.get_stats()
+    assert stats["segments_cut"] == 3  # the 4th (frames 180-239) is still open
+    first = seg.get_segment(0)
+    assert first[:TS_PACKET_SIZE] == _pat()
+    assert first[TS_PACKET_SIZE:2 * TS_PACKET_SIZE] == _pmt()
+    assert first[2 * TS_PACKET_SIZE + 5] & 0x40  # starts at the random-access point
+
+    playlist = seg.render_playlist("7/hls/", "?access_token=x")
+    assert "#EXT-X-TARGETDURATION:3" in playlist
+    assert "#EXT-X-MEDIA-SEQUENCE:0" in playlist
+    assert playlist.count("#EXTINF:2.002,") == 3
+    assert "7/hls/2.ts?access_token=x" in playlist
+    assert "#EXT-X-ENDLIST" not in playlist
+    # Shared rendering until the next cut
+    assert seg.render_playlist("7/hls/", "?access_token=x") is playlist
+
+    seg.feed(_frames(90000 + 8 * GOP * FRAME_TICKS, 6 * GOP, first_frame=8 * GOP))
+    playlist = seg.render_playlist("7/hls/", "?access_token=x")
+    assert "#EXT-X-MEDIA-SEQUENCE:3" in playlist
+    assert seg.get_segment(0) is None  # evicted beyond window + extra
+    assert seg.get_segment(1) is not None
+
+
+@pytest.mark.asyncio
+async def test_low_latency_parts_blocking_reload_and_discontinuity() -> None:
+    """LL-HLS parts are advertised, waiters wake on new parts, timestamp resets are flagged."""
+    seg = LiveHLSSegmenter(target_duration=2.0, window=3, part_duration=0.5)
+    seg.feed(_pat() + _pmt() + _frames(0, 2 * GOP + 1))
+
+    playlist = seg.render_playlist()
+    assert "#EXT-X-VERSION:9" in playlist
+    assert "#EXT-X-PART-INF:PART-TARGET=0.500" in playlist
+    assert "CAN-BLOCK-RELOAD=YES" in playlist
+    # 14 frames per part keeps every part within PART-TARGET
+    assert '#EXT-X-PART:DURATION=0.467,URI="0.0.ts",INDEPENDENT=YES' in playlist
+    assert '#EXT-X-PART:DURATION=0.467,URI="0.1.ts"\n' in playlist
+    assert '#EXT-X-PRELOAD-HINT:TYPE=PART,URI="1.0.ts"' in playlist
+    assert seg.get_part(0, 0) == seg.get_segment(0)[:len(seg.get_part(0, 0))]
+
+    waiter = asyncio.create_task(seg.wait_for(1, 0, timeout=5))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    seg.feed(_frames((2 * GOP + 1) * FRAME_TICKS, 20, first_frame=2 * GOP + 1))
+    assert await waiter
+    assert seg.get_part(1, 0) is not None
+
+    # Next item restarts timestamps without splicing
+    seg.mark_discontinuity()
+    seg.feed(_frames(0, 2 * GOP))
+    playlist = seg.render_playlist()
+    assert playlist.count("#EXT-X-DISCONTINUITY\n") == 1
+    assert seg.get_stats()["discontinuities"] == 1
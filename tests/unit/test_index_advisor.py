@@ -0,0 +1,110 @@
+"""
+Tests for the query indexes and the development-mode index advisor.
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from exstreamtv.database.index_advisor import (
+    IndexAdvisor,
+    IndexAdvisorMiddleware,
+    parse_plan,
+)
+from exstreamtv.database.models.base import Base
+from exstreamtv.database.models.media import MediaItem
+from exstreamtv.database.models.playout import Playout, PlayoutItem
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_parse_plan_finds_full_scans() -> None:
+    scans, temp_btree = parse_plan(
+        [
+            "SCAN media_items",
+            "SEARCH playout_items USING INDEX ix_playout_items_playout_id_start_time "
+            "(playout_id=?)",
+            "SCAN TABLE channels AS c",
+            "SCAN playouts USING COVERING INDEX ix_playouts_channel_id_is_active",
+            "USE TEMP B-TREE FOR ORDER BY",
+        ]
+    )
+    assert scans == ["media_items", "channels"]
+    assert temp_btree
+    assert parse_plan(["SCAN CONSTANT ROW"]) == ([], False)
+
+
+@pytest.mark.unit
+def test_hot_queries_use_composite_indexes(engine) -> None:
+    advisor = IndexAdvisor(slow_ms=0)
+    advisor.install(engine)
+    try:
+        with Session(engine) as session:
+            session.execute(
+                select(PlayoutItem)
+                .join(Playout, Playout.id == PlayoutItem.playout_id)
+                .where(Playout.channel_id == 1, Playout.is_active.is_(True))
+                .where(PlayoutItem.start_time >= datetime(2026, 1, 1))
+                .order_by(PlayoutItem.start_time)
+            ).all()
+            session.execute(
+                select(MediaItem).where(MediaItem.library_id == 3).order_by(MediaItem.title)
+            ).all()
+            session.execute(select(MediaItem).where(MediaItem.genres.like("%drama%"))).all()
+    finally:
+        advisor.uninstall()
+
+    report = advisor.get_report()
+    statements = report["endpoints"]["background"]["statements"]
+    by_table = {s["statement"].split("FROM ")[1].split()[0]: s for s in statements}
+    assert by_table["playout_items"]["full_scans"] == []
+    assert any("ix_playouts_channel_id_is_active" in d for d in by_table["playout_items"]["plan"])
+    assert report["endpoints"]["background"]["full_scans"] == {"media_items": 1}
+    library = [s for s in statements if "WHERE media_items.library_id" in s["statement"]][0]
+    assert not library["temp_btree"]
+    assert any("ix_media_items_library_id_title" in d for d in library["plan"])
+
+
+@pytest.mark.unit
+def test_full_scans_are_reported_per_route(engine) -> None:
+    advisor = IndexAdvisor(slow_ms=0)
+    advisor.install(engine)
+    app = FastAPI()
+    app.add_middleware(IndexAdvisorMiddleware)
+
+    @app.get("/media/{genre}")
+    def by_genre(genre: str) -> int:
+        with Session(engine) as session:
+            rows = session.execute(
+                select(MediaItem).where(MediaItem.genres.like(f"%{genre}%"))
+            ).all()
+        return len(rows)
+
+    try:
+        client = TestClient(app)
+        assert client.get("/media/drama").json() == 0
+        assert client.get("/media/comedy").json() == 0
+    finally:
+        advisor.uninstall()
+
+    report = advisor.get_report()
+    assert list(report["endpoints"]) == ["GET /media/{genre}"]
+    endpoint = report["endpoints"]["GET /media/{genre}"]
+    assert endpoint["full_scans"] == {"media_items": 2}
+    assert endpoint["statements"][0]["count"] == 2
+    advisor.reset()
+    assert advisor.get_report()["endpoints"] == {}
@@ -0,0 +1,171 @@
+"""
+Tests for keyset (cursor) pagination of listing endpoints.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from exstreamtv.api.collections import router as collections_router
+from exstreamtv.api.media import router as media_router
+from exstreamtv.api.pagination import Keyset, decode_cursor, encode_cursor
+from exstreamtv.api.playouts import router as playouts_router
+from exstreamtv.database import get_db
+from exstreamtv.database.index_advisor import parse_plan
+from exstreamtv.database.models.base import Base
+from exstreamtv.database.models.channel import Channel
+from exstreamtv.database.models.media import MediaItem
+from exstreamtv.database.models.playlist import Playlist, PlaylistItem
+from exstreamtv.database.models.playout import Playout, PlayoutItem
+
+START = datetime(2026, 10, 16, 6, 0)
+
+
+@pytest.fixture
+def database(tmp_path):
+    url = f"{tmp_path}/tv.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # Repeated titles and NULL years exercise the id tie-breaker
+        for n in range(23):
+            session.add(
+                MediaItem(
+                    source="local",
+                    url=f"file:///media/{n}.mkv",
+                    title=f"Title {n % 5}",
+                    year=None if n % 4 == 0 else 1990 + n % 7,
+                )
+            )
+        channel = Channel(number="1", name="One")
+        playlist = Playlist(name="Collection")
+        session.add_all([channel, playlist])
+        session.flush()
+        playout = Playout(channel_id=channel.id)
+        session.add(playout)
+        session.flush()
+        for n in range(17):
+            # Pairs of items share a start time
+            start = START + timedelta(minutes=30 * (n // 2))
+            session.add(
+                PlayoutItem(
+                    playout_id=playout.id,
+                    title=f"Slot {n}",
+                    start_time=start,
+                    finish_time=start + timedelta(minutes=30),
+                )
+            )
+            session.add(
+                PlaylistItem(playlist_id=playlist.id, title=f"Clip {n}", position=n // 3)
+            )
+        session.commit()
+        ids = (playout.id, playlist.id)
+    yield engine, url, ids
+    engine.dispose()
+
+
+@pytest.fixture
+def client(database):
+    _, url, _ = database
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}", poolclass=NullPool)
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    for router in (media_router, playouts_router, collections_router):
+        app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield client
+
+
+def _walk(client: TestClient, path: str, params: dict) -> list[dict]:
+    """Every page of a listing by following next_cursor."""
+    pages = [client.get(path, params=params).json()]
+    while pages[-1]["next_cursor"]:
+        cursor = pages[-1]["next_cursor"]
+        pages.append(client.get(path, params={**params, "cursor": cursor}).json())
+    return pages
+
+
+@pytest.mark.unit
+def test_cursor_is_bound_to_its_listing() -> None:
+    cursor = encode_cursor("media:title:asc", k=["Title 3", 42])
+    assert decode_cursor(cursor, "media:title:asc")["k"] == ["Title 3", 42]
+    for bad, scope in [(cursor, "media:year:desc"), ("not-a-cursor!", "media:title:asc")]:
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(bad, scope)
+        assert exc.value.status_code == 400
+
+    keyset = Keyset(MediaItem.year, MediaItem.id, descending=True)
+    with pytest.raises(HTTPException):
+        keyset.after(["1999"])  # missing id
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sort_by,sort_order", [("title", "asc"), ("year", "desc")])
+def test_media_cursor_pages_cover_listing_once(database, client, sort_by, sort_order) -> None:
+    engine, _, _ = database
+    params = {"sort_by": sort_by, "sort_order": sort_order, "limit": 4, "paginated": True}
+    pages = _walk(client, "/api/media", params)
+
+    ids = [item["id"] for page in pages for item in page["items"]]
+    with Session(engine) as session:
+        items = session.scalars(select(MediaItem)).all()
+    if sort_by == "title":
+        expected = sorted(items, key=lambda m: (m.title, m.id))
+    else:
+        # NULL years last, ties newest id first
+        expected = sorted(items, key=lambda m: (m.year is None, -(m.year or 0), -m.id))
+    assert ids == [m.id for m in expected]
+    assert len(pages) == 6 and not pages[-1]["has_more"]
+    assert [p["total"] for p in pages] == [23] * 6
+    assert not pages[0]["total_estimated"] and pages[1]["total_estimated"]
+
+    # The old offset parameters still work and agree with the cursor pages
+    page_3 = client.get("/api/media", params={**params, "skip": 8}).json()
+    assert [m["id"] for m in page_3["items"]] == ids[8:12]
+    assert client.get("/api/media", params={**params, "cursor": "bogus"}).status_code == 400
+    empty = client.get("/api/media", params={**params, "limit": 0}).json()
+    assert empty["items"] == [] and empty["next_cursor"] is None and empty["total"] == 23
+
+
+@pytest.mark.unit
+def test_playout_and_collection_items_page_by_cursor(database, client) -> None:
+    engine, _, (playout_id, collection_id) = database
+    for path, key in [
+        (f"/api/playouts/{playout_id}/items", "start_time"),
+        (f"/api/collections/{collection_id}/items", "position"),
+    ]:
+        pages = _walk(client, path, {"limit": 5})
+        items = [item for page in pages for item in page["items"]]
+        assert len(items) == 17 and len({item["id"] for item in items}) == 17
+        assert items == sorted(items, key=lambda item: (item[key], item["id"]))
+        assert pages[0]["total"] == 17 and pages[-1]["has_more"] is False
+        legacy = client.get(path, params={"limit": 5, "offset": 10}).json()
+        assert legacy["items"] == items[10:15]
+
+    # A deep page is an index seek, not a scan and sort
+    keyset = Keyset(PlayoutItem.start_time, PlayoutItem.id)
+    stmt = keyset.order(select(PlayoutItem).where(PlayoutItem.playout_id == playout_id))
+    stmt = stmt.where(keyset.after([(START + timedelta(hours=3)).isoformat(), 99])).limit(5)
+    compiled = stmt.compile(engine)
+    with engine.connect() as conn:
+        plan = [
+            row[-1]
+            for row in conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {compiled}",
+                tuple(str(compiled.params[name]) for name in compiled.positiontup),
+            )
+        ]
+    assert parse_plan(plan) == ([], False)
+    assert any("ix_playout_items_playout_id_start_time" in detail for detail in plan)
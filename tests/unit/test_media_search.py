@@ -0,0 +1,169 @@
+"""
+Tests for FTS5-backed media search.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, StaticPool
+
+from exstreamtv.api.media import router as media_router
+from exstreamtv.database import get_db
+from exstreamtv.database.media_search import apply_search, install_media_search, search_backend
+from exstreamtv.database.models.base import Base
+from exstreamtv.database.models.media import MediaItem
+
+ITEMS = [
+    ("The Space Between", None, "A quiet drama about neighbours", '["Drama"]'),
+    ("Space Patrol", "Space Patrol", "Cadets patrol the outer rim", '["Sci-Fi"]'),
+    ("Harbour Lights", None, "Fishermen find a wreck drifting in space", '["Mystery"]'),
+    ("Spacey Business", None, "An office comedy", '["Comedy"]'),
+]
+
+
+def _add_items(session: Session) -> None:
+    for n, (title, show_title, description, genres) in enumerate(ITEMS):
+        session.add(
+            MediaItem(
+                source="local",
+                url=f"file:///media/{n}.mkv",
+                title=title,
+                show_title=show_title,
+                description=description,
+                genres=genres,
+            )
+        )
+    # bm25 needs the matches to be a minority to give them any weight
+    for n in range(20):
+        session.add(
+            MediaItem(source="local", url=f"file:///media/other{n}.mkv", title=f"Other {n}")
+        )
+    session.commit()
+
+
+def _search(engine, query: str, **kw) -> list[str]:
+    with Session(engine) as session:
+        return list(session.scalars(apply_search(select(MediaItem.title), query, engine, **kw)))
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_index_is_built_and_kept_in_sync_by_triggers(engine) -> None:
+    with Session(engine) as session:
+        _add_items(session)
+    assert search_backend(engine) == "like"
+
+    # Existing rows are indexed when the table is first created
+    with engine.begin() as conn:
+        assert install_media_search(conn)
+    assert search_backend(engine) == "fts5"
+    assert sorted(_search(engine, "patrol", ranked=False)) == ["Space Patrol"]
+
+    with Session(engine) as session:
+        session.add(MediaItem(source="local", url="file:///media/x.mkv", title="Patrol Boat"))
+        item = session.scalar(select(MediaItem).where(MediaItem.title == "Space Patrol"))
+        item.title = item.show_title = "Rim Runners"
+        item.description = "Cadets on the outer rim"
+        session.delete(
+            session.scalar(select(MediaItem).where(MediaItem.title == "Spacey Business"))
+        )
+        session.commit()
+    assert _search(engine, "patrol") == ["Patrol Boat"]
+    assert _search(engine, "rim") == ["Rim Runners"]
+    assert _search(engine, "comedy") == []
+
+    # Re-running at startup keeps the existing index
+    with engine.begin() as conn:
+        assert install_media_search(conn)
+    assert _search(engine, "patrol") == ["Patrol Boat"]
+
+
+@pytest.mark.unit
+def test_search_is_ranked_prefix_match(engine) -> None:
+    with Session(engine) as session:
+        _add_items(session)
+    with engine.begin() as conn:
+        install_media_search(conn)
+
+    # Whole-word title hits first, then prefix hits, then a description hit
+    assert _search(engine, "space") == [
+        "Space Patrol",
+        "The Space Between",
+        "Spacey Business",
+        "Harbour Lights",
+    ]
+    assert _search(engine, "spac")[-1] == "Harbour Lights"
+    # Every token must match, in any column: genres are indexed too
+    assert _search(engine, "space drama") == ["The Space Between"]
+    assert _search(engine, "sci") == ["Space Patrol"]
+    with Session(engine) as session:
+        count = select(func.count(MediaItem.id)).select_from(MediaItem)
+        assert session.scalar(apply_search(count, "space", engine, ranked=False)) == 4
+
+
+@pytest.mark.unit
+def test_media_endpoint_orders_search_by_relevance(tmp_path) -> None:
+    sync_engine = create_engine(f"sqlite:///{tmp_path}/tv.db")
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        _add_items(session)
+    sync_engine.dispose()
+
+    # NullPool: the install below and TestClient run on different event loops
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/tv.db", poolclass=NullPool
+    )
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(media_router, prefix="/api")
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    def titles(response) -> list[str]:
+        assert response.status_code == 200
+        body = response.json()
+        return [m["title"] for m in (body["items"] if "items" in body else body)]
+
+    # Without the FTS table: unranked substring fallback
+    assert titles(client.get("/api/media/search", params={"q": "ace p"})) == ["Space Patrol"]
+
+    async def install():
+        async with async_engine.begin() as conn:
+            await conn.run_sync(install_media_search)
+
+    asyncio.run(install())
+    with client:
+        assert titles(client.get("/api/media/search", params={"q": "space"}))[0] == (
+            "Space Patrol"
+        )
+        page = client.get(
+            "/api/media", params={"search": "space", "paginated": True, "limit": 2}
+        ).json()
+        assert [m["title"] for m in page["items"]] == ["Space Patrol", "The Space Between"]
+        assert page["total"] == 4 and page["has_more"]
+        by_title = client.get("/api/media", params={"search": "space", "sort_by": "title"})
+        assert titles(by_title) == [
+            "Harbour Lights",
+            "Space Patrol",
+            "Spacey Business",
+            "The Space Between",
+        ]
@@ -0,0 +1,144 @@
+"""
+Tests for the in-memory playout timeline cache used by ChannelStream.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from exstreamtv.database.models.channel import Channel
+from exstreamtv.database.models.playout import Playout, PlayoutItem
+from exstreamtv.streaming.playout_timeline import (
+    bump_timeline_version,
+    load_playout_timeline,
+)
+
+
+def _seed(db: Session, count: int = 3) -> Channel:
+    channel = Channel(number=77, name="Timeline")
+    db.add(channel)
+    db.commit()
+    playout = Playout(channel_id=channel.id, is_active=True)
+    db.add(playout)
+    db.commit()
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        st = start + timedelta(minutes=30 * i)
+        db.add(
+            PlayoutItem(
+                playout_id=playout.id,
+                start_time=st,
+                finish_time=st + timedelta(minutes=30),
+                title=f"Program {i}",
+                source_url=f"http://example.com/{i}.mp4",
+            )
+        )
+    db.commit()
+    return channel
+
+
+@pytest.mark.unit
+def test_locate_uses_cumulative_durations(db: Session) -> None:
+    """A cycle position maps to the item and offset within it."""
+    channel = _seed(db)
+    timeline = load_playout_timeline(db, channel.id)
+    assert len(timeline) == 3
+    assert timeline.total_duration == 3 * 1800
+    assert timeline.locate(0) == (0, 0)
+    assert timeline.locate(1800) == (1, 0)
+    assert timeline.locate(4000) == (2, 400)
+
+
+@pytest.mark.unit
+def test_channel_stream_advances_from_cache_until_playout_changes(db: Session, engine) -> None:
+    """Advances reuse the cached timeline; a PlayoutItem write invalidates it."""
+    from exstreamtv.streaming.channel_manager import ChannelStream
+
+    channel = _seed(db)
+    stream = ChannelStream(
+        channel_id=channel.id,
+        channel_number=channel.number,
+        channel_name=channel.name,
+        db_session_factory=sessionmaker(bind=engine),
+    )
+
+    titles = []
+    for _ in range(4):
+        item = stream._get_next_playout_item_sync()
+        titles.append(item["title"])
+        stream._current_item_index += 1
+    assert titles == ["Program 0", "Program 1", "Program 2", "Program 0"]
+    assert stream._timeline_loads == 1
+
+    playout_id = stream._timeline.playout_id
+    st = datetime(2026, 1, 2)
+    db.add(
+        PlayoutItem(
+            playout_id=playout_id,
+            start_time=st,
+            finish_time=st + timedelta(minutes=30),
+            title="Program 3",
+        )
+    )
+    db.commit()
+    assert not stream._timeline.is_current()
+
+    stream._current_item_index = 3
+    assert stream._get_next_playout_item_sync()["title"] == "Program 3"
+    assert stream._timeline_loads == 2
+
+    bump_timeline_version(channel.id)
+    stream._get_next_playout_item_sync()
+    assert stream._timeline_loads == 3
+
+
+@pytest.mark.unit
+def test_versions_bump_on_commit_not_flush(tmp_path) -> None:
+    """A reader on another connection between flush and commit cannot cache stale rows as current."""
+    from sqlalchemy import create_engine
+
+    from exstreamtv.database.models.base import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'timeline.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as seed:
+        channel = _seed(seed, count=1)
+        channel_id = channel.id
+        playout_id = seed.scalars(select(Playout.id)).one()
+    # Loaded once, so the playout's channel is known to the flush hook
+    with factory() as reader:
+        assert len(load_playout_timeline(reader, channel_id)) == 1
+
+    writer = factory()
+    st = datetime(2026, 1, 2)
+    writer.add(
+        PlayoutItem(
+            playout_id=playout_id,
+            start_time=st,
+            finish_time=st + timedelta(minutes=30),
+            title="Uncommitted",
+        )
+    )
+    writer.flush()
+    with factory() as reader:
+        timeline = load_playout_timeline(reader, channel_id)
+    assert len(timeline) == 1
+    assert timeline.is_current()
+
+    writer.commit()
+    writer.close()
+    assert not timeline.is_current()
+    with factory() as reader:
+        timeline = load_playout_timeline(reader, channel_id)
+    assert len(timeline) == 2
+
+    # A rolled-back write leaves versions alone
+    writer = factory()
+    writer.query(PlayoutItem).filter(PlayoutItem.playout_id == playout_id).delete()
+    writer.rollback()
+    writer.close()
+    assert timeline.is_current()
+    engine.dispose()
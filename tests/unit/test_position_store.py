@@ -0,0 +1,129 @@
+"""
+Tests for the write-behind playback position store.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from exstreamtv.database.models.channel import Channel, ChannelPlaybackPosition
+from exstreamtv.streaming.position_store import PlaybackPositionStore, PositionSnapshot
+
+
+def _snapshot(channel: Channel, index: int) -> PositionSnapshot:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return PositionSnapshot(
+        channel_id=channel.id,
+        channel_number=str(channel.number),
+        current_index=index,
+        playout_start_time=now,
+        current_item_start_time=now,
+        last_played_at=now,
+    )
+
+
+def _seed_channels(db: Session, count: int) -> list[Channel]:
+    channels = [Channel(number=100 + i, name=f"Pos {i}") for i in range(count)]
+    db.add_all(channels)
+    db.commit()
+    return channels
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_flush_coalesces_updates_into_one_batch(db: Session, engine) -> None:
+    """Repeated records per channel become one row write per channel per flush."""
+    channels = _seed_channels(db, 3)
+    store = PlaybackPositionStore(flush_interval=60)
+    factory = sessionmaker(bind=engine)
+
+    for index in range(5):
+        for channel in channels:
+            store.record(_snapshot(channel, index))
+    assert store.get(channels[0].id).last_item_index == 4
+    assert db.execute(select(ChannelPlaybackPosition)).first() is None
+
+    assert await store.flush(factory) == 3
+    assert await store.flush(factory) == 0
+    stats = store.get_stats()
+    assert stats["flushes"] == 1
+    assert stats["rows_written"] == 3
+
+    store.record(_snapshot(channels[1], 7))
+    assert await store.flush(factory) == 1
+
+    db.expire_all()
+    rows = {
+        row.channel_id: row
+        for row in db.execute(select(ChannelPlaybackPosition)).scalars()
+    }
+    assert {cid: row.current_index for cid, row in rows.items()} == {
+        channels[0].id: 4,
+        channels[1].id: 7,
+        channels[2].id: 4,
+    }
+    assert rows[channels[2].id].channel_number == str(channels[2].number)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_running_store_defers_writes_until_stop(db: Session, engine, monkeypatch) -> None:
+    """ChannelStream records into a running store; stop() writes the pending batch."""
+    from exstreamtv.streaming import channel_manager
+    from exstreamtv.streaming.channel_manager import ChannelStream
+
+    (channel,) = _seed_channels(db, 1)
+    factory = sessionmaker(bind=engine)
+    store = PlaybackPositionStore(flush_interval=60)
+    monkeypatch.setattr(channel_manager, "get_position_store", lambda: store)
+
+    stream = ChannelStream(
+        channel_id=channel.id,
+        channel_number=channel.number,
+        channel_name=channel.name,
+        db_session_factory=factory,
+    )
+    await store.start(factory)
+    stream._current_item_index = 2
+    await stream._save_position()
+    stream._current_item_index = 3
+    await stream._save_position()
+
+    assert store.get(channel.id).current_index == 3
+    assert db.execute(select(ChannelPlaybackPosition)).first() is None
+
+    await store.stop()
+    db.expire_all()
+    row = db.execute(select(ChannelPlaybackPosition)).scalar_one()
+    assert row.current_index == 3
+    assert store.get_stats()["flushes"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_forget_during_flush_keeps_position_out_of_database(db: Session, engine) -> None:
+    """A channel forgotten while its batch is in flight is not written back."""
+    kept, reset = _seed_channels(db, 2)
+    store = PlaybackPositionStore(flush_interval=60)
+    sessions = sessionmaker(bind=engine)
+
+    def factory():
+        # The reset lands after the batch was taken, before it is written
+        store.forget(reset.id)
+        return sessions()
+
+    store.record(_snapshot(kept, 1))
+    store.record(_snapshot(reset, 1))
+    await store.flush(factory)
+    db.expire_all()
+    rows = db.execute(select(ChannelPlaybackPosition.channel_id)).scalars().all()
+    assert rows == [kept.id]
+
+    # A row written before the forget is removed by the next flush
+    store.forget(kept.id)
+    await store.flush(sessions)
+    db.expire_all()
+    assert db.execute(select(ChannelPlaybackPosition)).first() is None
+    assert store.get_stats()["pending"] == 0 and not store._forgotten
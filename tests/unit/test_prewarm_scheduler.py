@@ -0,0 +1,157 @@
+"""
+Tests for popularity-ordered, budgeted channel pre-warming.
+"""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from exstreamtv.config import ChannelsConfig
+from exstreamtv.database.models.channel import Channel
+from exstreamtv.streaming import channel_manager
+from exstreamtv.streaming.channel_manager import ChannelManager
+from exstreamtv.streaming.session_manager import SessionManager
+
+
+class _FakeStream:
+    """Stands in for ChannelStream: becomes ready after a short delay."""
+
+    starts: list[int] = []
+    never_ready: set[int] = set()
+    starting = 0
+    max_starting = 0
+
+    def __init__(self, channel_id, **kwargs):
+        self.channel_id = channel_id
+        self.is_running = False
+
+    async def start(self) -> None:
+        self.is_running = True
+        _FakeStream.starts.append(self.channel_id)
+
+    async def wait_ready(self, timeout: float) -> bool:
+        _FakeStream.starting += 1
+        _FakeStream.max_starting = max(_FakeStream.max_starting, _FakeStream.starting)
+        await asyncio.sleep(0.01)
+        _FakeStream.starting -= 1
+        return self.channel_id not in _FakeStream.never_ready
+
+
+class _FakePool:
+    def __init__(self, max_processes: int):
+        self.max_processes = max_processes
+
+    async def get_active_count(self) -> int:
+        return 0
+
+
+@pytest.fixture
+def fake_streams(monkeypatch):
+    _FakeStream.starts = []
+    _FakeStream.never_ready = set()
+    _FakeStream.starting = 0
+    _FakeStream.max_starting = 0
+    monkeypatch.setattr(channel_manager, "ChannelStream", _FakeStream)
+    return _FakeStream
+
+
+def _setup(db: Session, engine, monkeypatch, count: int, **settings) -> list[Channel]:
+    channels = [Channel(number=200 + i, name=f"Warm {i}") for i in range(count)]
+    db.add_all(channels)
+    db.commit()
+    settings.setdefault("prewarm_cpu_budget_percent", 100)
+    monkeypatch.setattr(
+        channel_manager, "_prewarm_config", lambda: ChannelsConfig(**settings)
+    )
+    sessions = SessionManager()
+    monkeypatch.setattr(channel_manager, "get_session_manager", lambda: sessions)
+    return channels
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_prewarm_orders_by_viewership_with_bounded_concurrency(
+    db: Session, engine, monkeypatch, fake_streams
+) -> None:
+    """Most-watched channels start first, never more than the concurrency at once."""
+    channels = _setup(db, engine, monkeypatch, 8, prewarm_concurrency=3)
+    popular = channel_manager.get_session_manager()
+    popular.record_viewing(channels[5].id, 3600)
+    popular.record_viewing(channels[2].id, 60)
+    fake_streams.never_ready = {channels[7].id}
+
+    manager = ChannelManager(sessionmaker(bind=engine), _FakePool(max_processes=100))
+    results = await manager.prewarm_channels()
+
+    assert fake_streams.starts[:2] == [channels[5].id, channels[2].id]
+    rest = [c.id for c in channels if c.id not in (channels[5].id, channels[2].id)]
+    assert fake_streams.starts[2:] == rest
+    assert fake_streams.max_starting == 3
+    assert len(results) == 8
+
+    report = manager.get_prewarm_report()
+    assert report[channels[5].id]["rank"] == 1
+    assert report[channels[5].id]["popularity"] > report[channels[2].id]["popularity"]
+    assert report[channels[0].id]["result"] == "ready"
+    assert report[channels[0].id]["time_to_ready_seconds"] is not None
+    assert results[channels[7].id] is False
+    assert report[channels[7].id]["result"] == "timeout"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_prewarm_stops_at_process_budget(
+    db: Session, engine, monkeypatch, fake_streams
+) -> None:
+    """Channels beyond the process budget are deferred to on-demand start."""
+    channels = _setup(db, engine, monkeypatch, 6, prewarm_process_budget=0.5)
+
+    manager = ChannelManager(sessionmaker(bind=engine), _FakePool(max_processes=8))
+    results = await manager.prewarm_channels()
+
+    assert len(results) == 4
+    assert fake_streams.max_starting == 1  # 4 // 4
+    report = manager.get_prewarm_report()
+    assert [report[c.id]["result"] for c in channels[4:]] == ["skipped", "skipped"]
+    assert report[channels[5].id]["rank"] == 6
+
+
+@pytest.mark.unit
+def test_viewership_history_decays_and_persists(tmp_path) -> None:
+    """Watch time halves per half-life and round-trips through the history file."""
+    history = tmp_path / "viewership.json"
+    sessions = SessionManager(history_file=history, viewership_half_life=3600)
+    sessions.record_viewing(1, 100)
+    sessions.record_viewing(2, 50)
+    sessions._viewership[1].updated_at -= 3600
+
+    popularity = sessions.get_channel_popularity()
+    assert popularity[1] == pytest.approx(50, rel=1e-3)
+    assert popularity[2] == pytest.approx(50, rel=1e-3)
+
+    sessions.save_viewership()
+    restored = SessionManager(history_file=history, viewership_half_life=3600)
+    restored.load_viewership()
+    assert restored.get_channel_popularity()[1] == pytest.approx(50, rel=1e-3)
+    assert restored._viewership[2].sessions == 1
+    assert restored._viewership[2].last_viewed <= time.time()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_prewarm_uses_popularity_sent_by_shard_front_end(
+    db: Session, engine, monkeypatch, fake_streams
+) -> None:
+    """Shard workers order by the front-end's scores, not their own (empty) history."""
+    channels = _setup(db, engine, monkeypatch, 4)
+    channel_manager.get_session_manager().record_viewing(channels[0].id, 3600)
+
+    manager = ChannelManager(sessionmaker(bind=engine), _FakePool(max_processes=100))
+    await manager.prewarm_channels(
+        [c.id for c in channels], popularity={channels[3].id: 10.0, channels[1].id: 5.0}
+    )
+
+    assert fake_streams.starts[:2] == [channels[3].id, channels[1].id]
+    assert fake_streams.starts[2:] == [channels[0].id, channels[2].id]
@@ -0,0 +1,137 @@
+"""
+Tests for the shared persistent ffprobe cache.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from exstreamtv.ffmpeg.probe_service import (
+    ProbeError,
+    ProbeService,
+    normalize_url,
+    probe_cache_key,
+)
+
+PROBE = {
+    "format": {"duration": "12.5"},
+    "streams": [{"codec_type": "video", "codec_name": "h264", "width": 1280, "height": 720}],
+}
+
+
+def _counting_runner(service: ProbeService, calls: list, delay: float = 0.01):
+    async def run(source, timeout, ffprobe_path):
+        calls.append(source)
+        await asyncio.sleep(delay)
+        if "broken" in source:
+            raise ProbeError("FFprobe failed: invalid data")
+        return PROBE
+
+    service._run = run
+
+
+@pytest.mark.unit
+def test_keys_follow_file_identity_and_normalized_urls(tmp_path) -> None:
+    media = tmp_path / "a.mp4"
+    media.write_bytes(b"x" * 10)
+    key, remote = probe_cache_key(media)
+    assert not remote
+    assert probe_cache_key(f"file://{media}")[0] == key
+
+    os.utime(media, ns=(1, 1))
+    assert probe_cache_key(media)[0] != key
+    assert probe_cache_key(tmp_path / "missing.mp4") is None
+
+    assert normalize_url("HTTPS://Archive.ORG:443/dl/a.mp4?b=2&a=1#t=5") == (
+        "https://archive.org/dl/a.mp4?a=1&b=2"
+    )
+    assert probe_cache_key("http://plex:32400/x?X-Plex-Token=one") == probe_cache_key(
+        "http://plex:32400/x?X-Plex-Token=two"
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_probes_share_one_run_and_survive_restart(tmp_path) -> None:
+    store = tmp_path / "probe.db"
+    media = tmp_path / "clip.mp4"
+    media.write_bytes(b"\x00" * 100)
+
+    calls: list = []
+    service = ProbeService(store_path=store)
+    _counting_runner(service, calls)
+    results = await asyncio.gather(*(service.probe(media) for _ in range(5)))
+    assert all(r == PROBE for r in results)
+    assert len(calls) == 1
+    assert service.get_stats()["coalesced"] == 4
+
+    with pytest.raises(ProbeError):
+        await service.probe("http://example.com/broken.mp4")
+    assert service.get_cached("http://example.com/broken.mp4") is None
+    service.close()
+
+    # "Restart": a new service reads the persisted result without probing
+    restarted = ProbeService(store_path=store)
+    calls.clear()
+    _counting_runner(restarted, calls)
+    assert await restarted.probe(str(media)) == PROBE
+    assert calls == []
+    assert restarted.get_stats()["disk_hits"] == 1
+
+    # A changed file is probed again
+    media.write_bytes(b"\x00" * 200)
+    await restarted.probe(media)
+    assert len(calls) == 1
+    restarted.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_remote_entries_expire_after_ttl(tmp_path) -> None:
+    calls: list = []
+    service = ProbeService(store_path=None, remote_ttl=0)
+    _counting_runner(service, calls, delay=0)
+    await service.probe("https://example.com/live.m3u8")
+    await service.probe("https://example.com/live.m3u8")
+    assert len(calls) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_local_keys_are_computed_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    import threading
+
+    from exstreamtv.ffmpeg import probe_service
+
+    media = tmp_path / "clip.mp4"
+    media.write_bytes(b"\x00" * 10)
+    threads: list = []
+    real_key = probe_service.probe_cache_key
+
+    def key(source):
+        threads.append(threading.current_thread())
+        return real_key(source)
+
+    monkeypatch.setattr(probe_service, "probe_cache_key", key)
+    service = ProbeService(store_path=None)
+    _counting_runner(service, [], delay=0)
+    assert await service.probe(media) == PROBE
+    assert await service.probe(media) == PROBE
+    assert threads and threading.main_thread() not in threads
+
+
+@pytest.mark.unit
+def test_put_honors_per_entry_ttl(tmp_path) -> None:
+    store = tmp_path / "probe.db"
+    media = tmp_path / "a.mp4"
+    media.write_bytes(b"x")
+    service = ProbeService(store_path=store)
+    assert service.put(media, PROBE, ttl=0)
+    assert service.get_cached(media) is None
+    assert service.put(media, PROBE, ttl=3600)
+    service.close()
+
+    restarted = ProbeService(store_path=store)
+    assert restarted.get_cached(media) == PROBE
+    restarted.close()
@@ -0,0 +1,84 @@
+"""
+Tests for the per-channel programme interval index behind /api/guide.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from exstreamtv.patterns.cache.programme_index import EMPTY_INDEX, ProgrammeIndex
+from exstreamtv.patterns.cache.xmltv_fragments import XmltvFragmentCache
+
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _index(count: int = 6, minutes: int = 30) -> ProgrammeIndex:
+    step = timedelta(minutes=minutes)
+    # Deliberately unsorted input
+    return ProgrammeIndex.from_programmes(
+        (T0 + step * i, T0 + step * (i + 1), f"Show {i}") for i in reversed(range(count))
+    )
+
+
+def _ts(minutes: float) -> float:
+    return (T0 + timedelta(minutes=minutes)).timestamp()
+
+
+def _titles(rows: list[dict]) -> list[str]:
+    return [row["title"] for row in rows]
+
+
+@pytest.mark.unit
+def test_window_returns_overlapping_programmes() -> None:
+    index = _index()
+    assert len(index) == 6
+
+    assert _titles(index.window(_ts(0), _ts(60))) == ["Show 0", "Show 1"]
+    # A programme ending exactly at the window start is not included,
+    # one starting exactly at the window end is not either
+    assert _titles(index.window(_ts(30), _ts(90))) == ["Show 1", "Show 2"]
+    # Partial overlap on both edges
+    assert _titles(index.window(_ts(45), _ts(75))) == ["Show 1", "Show 2"]
+    assert _titles(index.window(_ts(-600), _ts(600))) == [f"Show {i}" for i in range(6)]
+    assert index.window(_ts(180), _ts(240)) == []
+    assert index.window(_ts(-60), _ts(0)) == []
+    assert EMPTY_INDEX.window(_ts(0), _ts(60)) == []
+
+    first = index.window(_ts(0), _ts(1))[0]
+    assert first == {
+        "start": T0.isoformat(),
+        "stop": (T0 + timedelta(minutes=30)).isoformat(),
+        "title": "Show 0",
+    }
+
+
+@pytest.mark.unit
+def test_at_finds_programme_on_air() -> None:
+    index = _index()
+    assert index.at(_ts(0))["title"] == "Show 0"
+    assert index.at(_ts(29.9))["title"] == "Show 0"
+    assert index.at(_ts(30))["title"] == "Show 1"
+    assert index.at(_ts(-1)) is None
+    assert index.at(_ts(180)) is None
+    assert EMPTY_INDEX.at(_ts(0)) is None
+
+
+@pytest.mark.unit
+def test_fragment_cache_keeps_index_and_ignores_base_url_for_guide_reads() -> None:
+    cache = XmltvFragmentCache()
+    index = _index()
+    now = T0 + timedelta(minutes=5)
+    cache.put(
+        1,
+        "<channel/>",
+        "<programme/>",
+        "http://tv.local",
+        first_programme_stop=T0 + timedelta(hours=3),
+        now=now,
+        programmes=index,
+    )
+
+    assert cache.get(1, "http://elsewhere", now) is None
+    assert cache.get(1, None, now).programmes is index
+    # Expired fragments are rebuilt for guide reads too
+    assert cache.get(1, None, T0 + timedelta(hours=3)) is None
@@ -8,6 +8,7 @@ Validates:
 - XMLTVValidationError from EPG build returns 503 with Retry-After.
 - Config: episode_num_required, plex_xmltv_mismatch_ratio_threshold.
 - Production path uses validate=True.
+- Programmes validated in the emit pass, without re-parsing the document.
 """
 
 from datetime import datetime
@@ -273,3 +274,58 @@ def test_build_epg_uses_validate_true() -> None:
 
     source = inspect.getsource(iptv._build_epg_via_timeline_builder)
     assert "validate=True" in source
+
+
+# ==================== Single-pass validation ====================
+
+
+def _prog(start_h: int, stop_h: int, title: str = "Show"):
+    from exstreamtv.api.timeline_builder import TimelineProgramme
+
+    return TimelineProgramme(
+        start_time=datetime(2025, 1, 1, start_h),
+        stop_time=datetime(2025, 1, 1, stop_h),
+        media_item=None,
+        playout_item=None,
+        title=title,
+        index=start_h,
+    )
+
+
+def test_validation_runs_on_programmes_without_reparsing(monkeypatch) -> None:
+    """Invariants are checked while emitting; the document is never parsed back."""
+    from exstreamtv.api import xmltv_generator
+    from exstreamtv.api.xmltv_generator import XMLTVGenerator, XMLTVValidationError
+
+    def _no_parse(*args: object, **kwargs: object) -> None:
+        raise AssertionError("generated XMLTV must not be re-parsed")
+
+    monkeypatch.setattr(xmltv_generator.ET, "fromstring", _no_parse)
+    channels = [MagicMock(id=1, number="1"), MagicMock(id=2, number="2")]
+    channels[0].name, channels[1].name = "One", "Two"
+    gen = XMLTVGenerator()
+
+    xml = gen.generate(channels, {1: [_prog(1, 2), _prog(2, 3)], 2: [_prog(1, 3)]})
+    assert xml.count("<programme ") == 3
+
+    with pytest.raises(XMLTVValidationError) as exc_info:
+        gen.generate(
+            channels,
+            {1: [_prog(1, 3), _prog(2, 4)], 2: [_prog(5, 4), _prog(6, 7, title="Item 7")]},
+        )
+    details = exc_info.value.details
+    assert any("Channel 1 overlap: programme 0" in d for d in details)
+    assert any("Channel 2 programme 0: start >= stop" in d for d in details)
+    assert any("Channel 2 programme 1: invalid title" in d for d in details)
+
+
+def test_bulk_parse_failures_are_flagged() -> None:
+    from exstreamtv.api.xmltv_generator import XMLTVGenerator, XMLTVValidationError
+
+    channel = MagicMock(id=1, number="1")
+    channel.name = "One"
+    broken = [_prog(h, h + 1) for h in range(10)]
+    broken[3].start_time = None
+    with pytest.raises(XMLTVValidationError) as exc_info:
+        XMLTVGenerator().programme_fragment(channel, broken, validate=True)
+    assert exc_info.value.details[0] == "BULK_FAILURE: 1/10 programmes failed parse"
@@ -0,0 +1,92 @@
+"""
+Tests for the SQLite read/write split pool (database.sqlite_pool: read_write).
+"""
+
+import pytest
+from sqlalchemy import exc, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from exstreamtv.database.models.base import Base
+from exstreamtv.database.models.channel import Channel
+from exstreamtv.database.sqlite_pool import (
+    create_read_write_engines,
+    read_write_session_kwargs,
+    use_read_write_split,
+)
+
+
+@pytest.mark.unit
+def test_split_only_applies_to_sqlite_files() -> None:
+    assert use_read_write_split("sqlite+aiosqlite:///./exstreamtv.db", "read_write")
+    assert not use_read_write_split("sqlite+aiosqlite:///./exstreamtv.db", "static")
+    assert not use_read_write_split("sqlite:///:memory:", "read_write")
+    assert not use_read_write_split("postgresql+asyncpg://db/tv", "read_write")
+
+
+@pytest.mark.unit
+def test_sync_session_reads_on_readers_until_it_writes(tmp_path) -> None:
+    writer, reader = create_read_write_engines(
+        f"sqlite:///{tmp_path}/tv.db", read_connections=2, is_async=False
+    )
+    Base.metadata.create_all(writer)
+    factory = sessionmaker(expire_on_commit=False, **read_write_session_kwargs(writer, reader))
+    try:
+        with factory() as session:
+            assert session.get_bind(clause=select(Channel)) is reader
+            assert session.scalar(select(func.count(Channel.id))) == 0
+
+            session.add(Channel(number="5", name="Five"))
+            session.flush()
+            # Uncommitted rows are visible: the rest of the transaction uses the writer
+            assert session.get_bind(clause=select(Channel)) is writer
+            assert session.scalar(select(func.count(Channel.id))) == 1
+            session.commit()
+
+            # A new transaction reads from the reader pool again
+            assert session.get_bind(clause=select(Channel)) is reader
+            assert session.scalar(select(Channel.name)) == "Five"
+            assert session.get_bind(clause=text("UPDATE channels SET name = 'x'")) is writer
+
+        # Reader connections cannot write
+        with reader.connect() as conn, pytest.raises(exc.OperationalError, match="readonly"):
+            conn.exec_driver_sql("UPDATE channels SET name = 'x'")
+        assert writer.pool.size() == 1
+    finally:
+        writer.dispose()
+        reader.dispose()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_async_writers_are_serialized(tmp_path) -> None:
+    writer, reader = create_read_write_engines(
+        f"sqlite+aiosqlite:///{tmp_path}/tv.db", read_connections=2, writer_timeout=0.2
+    )
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(
+        writer,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        **read_write_session_kwargs(writer, reader),
+    )
+    try:
+        async with factory() as first, factory() as second:
+            first.add(Channel(number="7", name="Seven"))
+            await first.flush()
+
+            # Readers keep working while the writer is held
+            assert await second.scalar(select(func.count(Channel.id))) == 0
+            # A second writer waits for the single writer connection
+            with pytest.raises(exc.TimeoutError):
+                await second.execute(update(Channel).values(name="Other"))
+            await second.rollback()
+
+            await first.commit()
+            await second.execute(update(Channel).values(name="Renamed"))
+            await second.commit()
+            assert await second.scalar(select(Channel.name)) == "Renamed"
+    finally:
+        await writer.dispose()
+        await reader.dispose()
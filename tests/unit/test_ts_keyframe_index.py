@@ -0,0 +1,108 @@
+"""
+Tests for the MPEG-TS keyframe index and keyframe-aligned client joins.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from exstreamtv.streaming.ts_index import (
+    TS_PACKET_SIZE,
+    TSKeyframeIndex,
+    parse_pat,
+    parse_pmt_video_pid,
+)
+
+PMT_PID = 0x1000
+VIDEO_PID = 0x0100
+AUDIO_PID = 0x0101
+
+
+def _packet(pid: int, payload: bytes = b"", pusi: bool = False, rai: bool = False) -> bytes:
+    header = bytes([0x47, (0x40 if pusi else 0) | (pid >> 8), pid & 0xFF])
+    if rai:
+        adaptation = bytes([1, 0x40])
+        body = bytes([0x30]) + adaptation + payload
+    else:
+        body = bytes([0x10]) + payload
+    return (header + body).ljust(TS_PACKET_SIZE, b"\xff")[:TS_PACKET_SIZE]
+
+
+def _pat() -> bytes:
+    # table_id, section_length=13, ts_id, version, section/last, program 1 -> PMT_PID, CRC
+    section = bytes([0x00, 0xB0, 13, 0, 1, 0xC1, 0, 0, 0, 1, 0xE0 | (PMT_PID >> 8), PMT_PID & 0xFF])
+    return _packet(0, b"\x00" + section + b"\x00\x00\x00\x00", pusi=True)
+
+
+def _pmt() -> bytes:
+    es = bytes([0x1B, 0xE0 | (VIDEO_PID >> 8), VIDEO_PID & 0xFF, 0xF0, 0])
+    es += bytes([0x0F, 0xE0 | (AUDIO_PID >> 8), AUDIO_PID & 0xFF, 0xF0, 0])
+    section_length = 9 + len(es) + 4
+    section = bytes([0x02, 0xB0, section_length, 0, 1, 0xC1, 0, 0, 0xE1, 0x00, 0xF0, 0]) + es
+    return _packet(PMT_PID, b"\x00" + section + b"\x00\x00\x00\x00", pusi=True)
+
+
+def test_parse_pat_and_pmt() -> None:
+    """PAT yields the PMT PID and PMT yields the H.264 video PID."""
+    assert parse_pat(_pat()) == [PMT_PID]
+    assert parse_pmt_video_pid(_pmt()) == VIDEO_PID
+
+
+def test_index_tracks_psi_and_last_keyframe_across_unaligned_chunks() -> None:
+    """Offsets are absolute even when chunks split packets."""
+    stream = (
+        _pat() + _pmt()
+        + _packet(VIDEO_PID, pusi=True, rai=True)
+        + _packet(AUDIO_PID)
+        + _packet(VIDEO_PID)
+        + _packet(VIDEO_PID, pusi=True, rai=True)
+    )
+    index = TSKeyframeIndex()
+    for i in range(0, len(stream), 100):
+        index.feed(stream[i:i + 100])
+
+    assert index.psi_preamble == _pat() + _pmt()
+    assert index.last_rap_offset == 5 * TS_PACKET_SIZE
+
+
+def test_index_ignores_rai_on_non_video_pid() -> None:
+    """Only the video PID marks random-access points."""
+    index = TSKeyframeIndex()
+    index.feed(_pat() + _pmt() + _packet(AUDIO_PID, rai=True))
+    assert index.last_rap_offset is None
+
+
+@pytest.mark.asyncio
+async def test_late_client_joins_at_last_keyframe_with_psi() -> None:
+    """A late client gets PAT+PMT, then data from the last keyframe onwards."""
+    from exstreamtv.streaming.channel_manager import ChannelStream
+
+    stream = ChannelStream(
+        channel_id=7,
+        channel_number=7,
+        channel_name="Test",
+        db_session_factory=MagicMock(),
+    )
+    stream._is_running = True
+
+    gop = _packet(VIDEO_PID, pusi=True, rai=True) + _packet(VIDEO_PID) * 3
+    await stream._send_to_clients(_pat() + _pmt() + gop)
+    await stream._send_to_clients(_packet(VIDEO_PID) * 2)
+
+    received: list[bytes] = []
+
+    async def client() -> None:
+        async for chunk in stream.get_stream():
+            received.append(chunk)
+
+    task = asyncio.create_task(client())
+    await asyncio.sleep(0)
+    stream._is_running = False
+    await stream._broadcast_end()
+    await task
+
+    data = b"".join(received)
+    assert data.startswith(_pat() + _pmt() + _packet(VIDEO_PID, pusi=True, rai=True))
+    assert len(data) == 2 * TS_PACKET_SIZE + len(gop) + 2 * TS_PACKET_SIZE
+    assert stream._last_time_to_first_frame is not None
@@ -0,0 +1,166 @@
+"""
+Tests for the MPEG-TS splicer and gapless item transitions.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from exstreamtv.streaming.ts_index import TS_PACKET_SIZE
+from exstreamtv.streaming.ts_splicer import (
+    SEGMENT_GAP_TICKS,
+    TSSplicer,
+    _read_pcr_base,
+    _read_timestamp,
+    _write_pcr_base,
+    _write_timestamp,
+)
+
+VIDEO_PID = 0x0100
+
+
+def _pes_packet(cc: int, pts: int, pcr: int | None = None) -> bytes:
+    header = bytearray([0x47, 0x40 | (VIDEO_PID >> 8), VIDEO_PID & 0xFF])
+    if pcr is not None:
+        header.append(0x30 | cc)
+        af = bytearray([7, 0x10, 0, 0, 0, 0, 0x7E, 0])
+        _write_pcr_base(af, 2, pcr)
+        header += af
+    else:
+        header.append(0x10 | cc)
+    pes = bytearray([0, 0, 1, 0xE0, 0, 0, 0x80, 0x80, 5, 0x20, 0, 0, 0, 0])
+    _write_timestamp(pes, 9, pts)
+    return bytes(header + pes).ljust(TS_PACKET_SIZE, b"\xff")
+
+
+def _segment(start_pts: int, count: int) -> bytes:
+    return b"".join(
+        _pes_packet(i & 0x0F, start_pts + i * 3003, pcr=start_pts + i * 3003 if i % 4 in (0, 3) else None)
+        for i in range(count)
+    )
+
+
+def _ccs_and_pts(data: bytes) -> tuple[list[int], list[int]]:
+    ccs, pts = [], []
+    for pos in range(0, len(data), TS_PACKET_SIZE):
+        pkt = bytearray(data[pos:pos + TS_PACKET_SIZE])
+        ccs.append(pkt[3] & 0x0F)
+        payload = 4 + (1 + pkt[4] if pkt[3] & 0x20 else 0)
+        pts.append(_read_timestamp(pkt, payload + 9))
+    return ccs, pts
+
+
+def test_timestamp_round_trip() -> None:
+    """33-bit PTS and PCR base survive write/read."""
+    buf = bytearray(6)
+    for value in (0, 1, 126000, (1 << 33) - 1):
+        _write_timestamp(buf, 0, value)
+        assert _read_timestamp(buf, 0) == value
+        _write_pcr_base(buf, 0, value)
+        assert _read_pcr_base(buf, 0) == value
+
+
+def test_splice_continues_cc_and_timestamps_across_segments() -> None:
+    """Second item's CC and PTS carry on from the first item."""
+    splicer = TSSplicer()
+    splicer.begin_segment()
+    first = splicer.process(_segment(126000, 20))
+    splicer.begin_segment()
+    second = splicer.process(_segment(126000, 5))
+
+    ccs, pts = _ccs_and_pts(first + second)
+    assert ccs == [i & 0x0F for i in range(25)]
+    last_first = 126000 + 19 * 3003
+    assert pts[20] == last_first + SEGMENT_GAP_TICKS
+    assert pts[20:] == [pts[20] + i * 3003 for i in range(5)]
+
+    pcr_pkt = bytearray(second[:TS_PACKET_SIZE])
+    assert _read_pcr_base(pcr_pkt, 6) == pts[20]
+    assert splicer.get_stats()["segments_spliced"] == 1
+
+
+def test_splice_carries_partial_packets() -> None:
+    """Unaligned chunks are re-assembled; only whole packets are emitted."""
+    splicer = TSSplicer()
+    splicer.begin_segment()
+    data = _segment(0, 3)
+    out = splicer.process(data[:200]) + splicer.process(data[200:])
+    assert out == data
+    assert splicer.process(b"\x47\x01") == b""
+    # A truncated packet at the splice is dropped, not sent
+    splicer.begin_segment()
+    assert len(splicer.process(data[:TS_PACKET_SIZE])) == TS_PACKET_SIZE
+    assert splicer.get_stats()["partial_bytes_dropped"] == 2
+
+
+def test_resync_drops_junk_between_packets() -> None:
+    """Bytes skipped to regain sync never reach the output."""
+    splicer = TSSplicer()
+    splicer.begin_segment()
+    data = _segment(0, 3)
+    junk = b"\x00\x11\x22" * 7
+    out = splicer.process(data[:TS_PACKET_SIZE] + junk + data[TS_PACKET_SIZE:])
+    assert out == data
+    assert all(out[pos] == 0x47 for pos in range(0, len(out), TS_PACKET_SIZE))
+    assert splicer.get_stats()["resync_bytes_dropped"] == len(junk)
+
+
+def test_splice_starts_after_highest_pts_with_b_frames_and_wrap() -> None:
+    """The next segment starts past the highest PTS sent, not the last one."""
+    near_wrap = (1 << 33) - 2 * 3003
+    # Decode order I P B B: the last packets carry lower PTS than the P frame
+    order = [0, 3, 1, 2]
+    first = b"".join(
+        _pes_packet(i, (near_wrap + n * 3003) % (1 << 33)) for i, n in enumerate(order)
+    )
+    splicer = TSSplicer()
+    splicer.begin_segment()
+    splicer.process(first)
+    splicer.begin_segment()
+    second = splicer.process(_segment(126000, 1))
+
+    highest = (near_wrap + 3 * 3003) % (1 << 33)  # wrapped past zero
+    assert _ccs_and_pts(second)[1] == [highest + SEGMENT_GAP_TICKS]
+
+
+@pytest.mark.asyncio
+async def test_channel_prerolls_next_item_before_eof() -> None:
+    """The next item is started ahead of EOF and the switch is recorded as pre-rolled."""
+    from exstreamtv.streaming.channel_manager import ChannelStream
+
+    stream = ChannelStream(
+        channel_id=9,
+        channel_number=9,
+        channel_name="Test",
+        db_session_factory=MagicMock(),
+    )
+    stream._is_running = True
+    stream._transition_lookahead = 5.0
+    items = [
+        {"title": "A", "media_url": "a", "duration": 5.0, "position": 0},
+        {"title": "B", "media_url": "b", "duration": 60, "position": 1},
+    ]
+    started: list[str] = []
+
+    async def next_item(index=None):
+        return items[1 if index else 0]
+
+    async def fake_stream(url, **kwargs):
+        started.append(url)
+        yield _segment(0, 2)
+        if url == "b":
+            stream._is_running = False
+
+    streamer = MagicMock()
+    streamer.stream = fake_stream
+    stream._get_next_playout_item = next_item
+    async def save_position():
+        return None
+
+    stream._save_position = save_position
+    await asyncio.wait_for(stream._stream_loop(streamer, None), timeout=5)
+
+    assert started == ["a", "b"]
+    assert stream._last_transition_latency is not None
+    assert stream._splicer.get_stats()["segments_spliced"] == 1
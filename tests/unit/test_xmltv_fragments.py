@@ -0,0 +1,107 @@
+"""
+Tests for the per-channel XMLTV fragment cache.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from exstreamtv.api.timeline_builder import TimelineProgramme
+from exstreamtv.api.xmltv_generator import XMLTVGenerator
+from exstreamtv.patterns.cache.xmltv_fragments import (
+    XmltvFragmentCache,
+    subscribe_xmltv_invalidation,
+)
+from exstreamtv.patterns.observer.event_bus import StreamEventBus
+from exstreamtv.streaming.playout_timeline import bump_timeline_version
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+BASE = "http://tv.local:8411"
+
+
+def _channel(cid: int) -> SimpleNamespace:
+    return SimpleNamespace(id=cid, number=str(cid), name=f"Channel {cid}", logo_path=None)
+
+
+def _programmes(count: int = 3) -> list[TimelineProgramme]:
+    return [
+        TimelineProgramme(
+            start_time=NOW + timedelta(minutes=30 * i),
+            stop_time=NOW + timedelta(minutes=30 * (i + 1)),
+            media_item=None,
+            playout_item=None,
+            title=f"Show {i}",
+            index=i,
+        )
+        for i in range(count)
+    ]
+
+
+def _put(cache: XmltvFragmentCache, gen: XMLTVGenerator, channel, progs) -> None:
+    cache.put(
+        channel.id,
+        gen.channel_fragment(channel, BASE),
+        gen.programme_fragment(channel, progs, validate=True),
+        BASE,
+        progs[0].stop_time if progs else None,
+        now=NOW,
+    )
+
+
+@pytest.mark.unit
+def test_assembled_fragments_match_full_generation() -> None:
+    gen = XMLTVGenerator()
+    channels = [_channel(1), _channel(2), _channel(3)]
+    progs = {1: _programmes(), 3: _programmes(2)}
+    cache = XmltvFragmentCache()
+    for ch in channels:
+        _put(cache, gen, ch, progs.get(ch.id, []))
+
+    parts = [cache.get(ch.id, BASE, now=NOW) for ch in channels]
+    assembled = gen.assemble([p.channel_xml for p in parts], [p.programmes_xml for p in parts])
+    assert assembled == gen.generate(channels, progs, base_url=BASE)
+
+
+@pytest.mark.unit
+def test_fragment_expires_when_window_rolls_or_timeline_changes() -> None:
+    gen = XMLTVGenerator()
+    cache = XmltvFragmentCache(max_age_seconds=3600)
+    _put(cache, gen, _channel(1), _programmes())
+    _put(cache, gen, _channel(2), [])
+
+    assert cache.get(1, BASE, now=NOW + timedelta(minutes=29)) is not None
+    # First programme ended: the guide window moved on
+    assert cache.get(1, BASE, now=NOW + timedelta(minutes=30)) is None
+    # Different request host means different icon URLs
+    assert cache.get(1, "http://other:8411", now=NOW) is None
+    # Empty channels fall back to the max age
+    assert cache.get(2, BASE, now=NOW + timedelta(minutes=59)) is not None
+    assert cache.get(2, BASE, now=NOW + timedelta(hours=1)) is None
+
+    bump_timeline_version(1)
+    assert cache.get(1, BASE, now=NOW) is None
+    assert cache.get(2, BASE, now=NOW) is not None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_events_invalidate_one_or_all_fragments() -> None:
+    gen = XMLTVGenerator()
+    cache = XmltvFragmentCache()
+    bus = StreamEventBus()
+    subscribe_xmltv_invalidation(bus, cache)
+    for cid in (1, 2, 3):
+        _put(cache, gen, _channel(cid), _programmes())
+
+    generation = cache.generation
+    await bus.emit("channel.updated", channel_id="2")
+    assert [cache.get(cid, BASE, now=NOW) is not None for cid in (1, 2, 3)] == [True, False, True]
+    assert cache.generation == generation + 1
+
+    await bus.emit("schedule.applied")
+    assert all(cache.get(cid, BASE, now=NOW) is None for cid in (1, 2, 3))
+
+    _put(cache, gen, _channel(1), _programmes())
+    await bus.emit("epg.updated")
+    assert cache.get(1, BASE, now=NOW) is None
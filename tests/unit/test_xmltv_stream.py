@@ -0,0 +1,187 @@
+"""
+Tests for streaming XMLTV responses with incremental gzip.
+"""
+
+import asyncio
+import gzip
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from exstreamtv.api.timeline_builder import TimelineProgramme
+from exstreamtv.api.xmltv_generator import XMLTVGenerator
+from exstreamtv.api.xmltv_stream import (
+    accepts_gzip,
+    iter_encoded,
+    iter_text_chunks,
+    xmltv_streaming_response,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _request(accept_encoding: str) -> SimpleNamespace:
+    return SimpleNamespace(headers={"accept-encoding": accept_encoding})
+
+
+def _guide(channels: int, programmes: int):
+    chans = [
+        SimpleNamespace(id=c, number=str(c), name=f"Channel {c}", logo_path=None)
+        for c in range(1, channels + 1)
+    ]
+    progs = {
+        c.id: [
+            TimelineProgramme(
+                start_time=NOW + timedelta(minutes=30 * i),
+                stop_time=NOW + timedelta(minutes=30 * (i + 1)),
+                media_item=None,
+                playout_item=None,
+                title=f"Show {c.id}-{i}",
+                index=i,
+            )
+            for i in range(programmes)
+        ]
+        for c in chans
+    }
+    return chans, progs
+
+
+async def _collect(stream) -> list[bytes]:
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.unit
+def test_accept_encoding_parsing() -> None:
+    assert accepts_gzip(_request("gzip, deflate, br"))
+    assert accepts_gzip(_request("br;q=1.0, gzip;q=0.5"))
+    assert accepts_gzip(_request("*"))
+    assert not accepts_gzip(_request("gzip;q=0"))
+    assert not accepts_gzip(_request("identity"))
+    assert not accepts_gzip(None)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_streamed_guide_matches_generate_in_bounded_chunks() -> None:
+    gen = XMLTVGenerator()
+    chans, progs = _guide(channels=60, programmes=48)
+    expected = gen.generate(chans, progs).encode()
+    assert len(expected) > 6 * 64 * 1024
+
+    plain = await _collect(iter_encoded(gen.iter_generate(chans, progs)))
+    assert b"".join(plain) == expected
+    # One channel block past the batch size at most
+    assert max(len(c) for c in plain) < 64 * 1024 + 16 * 1024
+    assert len(plain) >= 6
+
+    loop_thread = threading.get_ident()
+    compress_threads: set[int] = set()
+    real_to_thread = asyncio.to_thread
+
+    async def to_thread(fn, *args):
+        compress_threads.add(await real_to_thread(threading.get_ident))
+        return await real_to_thread(fn, *args)
+
+    with patch("exstreamtv.api.xmltv_stream.asyncio.to_thread", to_thread):
+        gzipped = await _collect(iter_encoded(gen.iter_generate(chans, progs), gzip=True))
+    assert gzip.decompress(b"".join(gzipped)) == expected
+    assert len(gzipped) > 1
+    # Compression runs in worker threads, never on the event loop
+    assert compress_threads and loop_thread not in compress_threads
+
+    text = expected.decode()
+    assert b"".join(await _collect(iter_encoded(iter_text_chunks(text), gzip=False))) == expected
+
+
+@pytest.mark.unit
+def test_streaming_response_headers_follow_accept_encoding() -> None:
+    response = xmltv_streaming_response(iter(["<tv/>"]), _request("gzip"))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in response.headers
+
+    response = xmltv_streaming_response(iter(["<tv/>"]), _request(""))
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_generator_is_advanced_off_the_event_loop() -> None:
+    loop_thread = threading.get_ident()
+    producer_threads: set[int] = set()
+
+    def pieces():
+        for i in range(2000):
+            producer_threads.add(threading.get_ident())
+            yield f"<programme n='{i}'/>\n" * 4
+
+    chunks = await _collect(iter_encoded(pieces(), gzip=True, chunk_size=16 * 1024))
+    assert len(chunks) > 1
+    assert gzip.decompress(b"".join(chunks)).count(b"<programme") == 8000
+    assert producer_threads and loop_thread not in producer_threads
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_async_pieces_are_batched_and_compressed() -> None:
+    async def pieces():
+        for i in range(2000):
+            await asyncio.sleep(0)
+            yield f"<programme n='{i}'/>\n"
+
+    expected = "".join(f"<programme n='{i}'/>\n" for i in range(2000)).encode()
+    plain = await _collect(iter_encoded(pieces(), chunk_size=4096))
+    assert b"".join(plain) == expected
+    assert len(plain) > 1
+    gzipped = await _collect(iter_encoded(pieces(), gzip=True, chunk_size=4096))
+    assert gzip.decompress(b"".join(gzipped)) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_legacy_guide_streams_while_it_is_generated(monkeypatch) -> None:
+    """The legacy path yields the document as it goes and caches it once complete."""
+    from contextlib import asynccontextmanager
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from exstreamtv.api import iptv
+    from exstreamtv.database.models import Channel
+    from exstreamtv.database.models.base import Base
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(Channel(number="12", name="Legacy", enabled=True))
+        await db.commit()
+
+    @asynccontextmanager
+    async def session():
+        async with factory() as db:
+            yield db
+
+    async def no_timeline(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(iptv, "_build_epg_via_timeline_builder", no_timeline)
+    monkeypatch.setattr(iptv, "get_session", session)
+    monkeypatch.setattr(iptv, "_xmltv_cache", None)
+    # The request's session is gone before a streamed body is sent
+    async with factory() as db:
+        pieces, media_type, _ = await iptv._generate_xmltv(db, "http://tv.local")
+
+    streamed = [await anext(pieces)]
+    assert streamed[0].startswith("<?xml")
+    assert iptv._xmltv_cache is None
+    streamed += [piece async for piece in pieces]
+    await engine.dispose()
+
+    document = "".join(streamed)
+    assert media_type.startswith("application/xml")
+    assert '<channel id="12">' in document and document.endswith("</tv>\n")
+    assert iptv._xmltv_cache == document
@@ -0,0 +1,205 @@
+"""
+Tests for LazyXmltvCache stale-while-revalidate, refresh-ahead and disk snapshot.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from exstreamtv.patterns.cache.xmltv_cache import LazyXmltvCache
+
+BASE = "http://tv.local:8411"
+
+
+class _Builder:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def __call__(self, base_url: str) -> str:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return f"<tv build={self.calls} base={base_url}/>"
+
+
+def _age(cache: LazyXmltvCache, seconds: float, base_url: str = BASE) -> None:
+    cache._documents[base_url].loaded_at = datetime.now(tz=timezone.utc) - timedelta(
+        seconds=seconds
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stale_document_is_served_while_one_refresh_runs() -> None:
+    builder = _Builder()
+    cache = LazyXmltvCache(ttl_seconds=60, builder=builder)
+    cache.store("<tv old/>", base_url=BASE)
+    assert cache.lookup(BASE) == ("<tv old/>", True)
+    assert cache.lookup("http://elsewhere") is None
+
+    _age(cache, 61)
+    assert cache.lookup(BASE) == ("<tv old/>", False)
+    tasks = {cache.refresh(BASE) for _ in range(5)}
+    assert len(tasks) == 1
+    # Still the last good guide until the rebuild finishes
+    assert cache.lookup(BASE) == ("<tv old/>", False)
+
+    builder.release.set()
+    await tasks.pop()
+    assert builder.calls == 1
+    assert cache.lookup(BASE) == (f"<tv build=1 base={BASE}/>", True)
+
+    # A failed rebuild keeps serving the last good document
+    builder.fail = True
+    _age(cache, 61)
+    await cache.refresh()
+    assert cache.lookup(BASE) == (f"<tv build=1 base={BASE}/>", False)
+    assert cache.get_stats()["refresh_failures"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_refresh_backs_off_before_rebuilding() -> None:
+    builder = _Builder()
+    builder.release.set()
+    builder.fail = True
+    cache = LazyXmltvCache(ttl_seconds=60, builder=builder)
+    cache.store("<tv old/>", base_url=BASE)
+    _age(cache, 61)
+    await cache.refresh(BASE)
+    assert builder.calls == 1
+
+    # Stale hits inside the retry window keep serving without rebuilding
+    for _ in range(3):
+        assert cache.lookup(BASE) == ("<tv old/>", False)
+        assert cache.refresh(BASE) is None
+    assert builder.calls == 1
+
+    builder.fail = False
+    cache._retry_at = datetime.now(tz=timezone.utc) - timedelta(seconds=1)
+    await cache.refresh(BASE)
+    assert builder.calls == 2
+    assert cache.lookup(BASE) == (f"<tv build=2 base={BASE}/>", True)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_version_change_and_invalidate() -> None:
+    version = [1]
+    builder = _Builder()
+    cache = LazyXmltvCache(ttl_seconds=60, builder=builder, version=lambda: version[0])
+    cache.store("<tv v1/>", base_url=BASE, version=1)
+    version[0] = 2
+    assert cache.lookup(BASE) == ("<tv v1/>", False)
+
+    # A build that was running when the cache was invalidated is dropped
+    stale_build = cache.refresh(BASE)
+    await asyncio.sleep(0)
+    cache.invalidate()
+    assert cache.lookup(BASE) is None
+    builder.release.set()
+    await asyncio.gather(stale_build, return_exceptions=True)
+    assert cache.lookup(BASE) is None
+
+    await cache.refresh()
+    assert cache.lookup(BASE) == (f"<tv build=2 base={BASE}/>", True)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_snapshot_survives_restart(tmp_path) -> None:
+    path = tmp_path / "xmltv_last_good.xml"
+    cache = LazyXmltvCache(ttl_seconds=60, snapshot_path=path)
+    streamed = list(cache.capture(iter(["<tv>", "<programme/>", "</tv>"]), BASE, version=3))
+    await cache.stop()
+    assert "".join(streamed) == path.read_text() == "<tv><programme/></tv>"
+
+    restarted = LazyXmltvCache(ttl_seconds=60, snapshot_path=path, version=lambda: 3)
+    assert restarted.load_snapshot()
+    # Served immediately, but stale until the first rebuild
+    assert restarted.lookup(BASE) == ("<tv><programme/></tv>", False)
+
+    path.write_text("<tv><trunc")
+    assert not LazyXmltvCache(snapshot_path=path).load_snapshot()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_capture_stores_on_the_loop() -> None:
+    """A document drained in a worker thread, or an async one, is stored once complete."""
+    import threading
+
+    cache = LazyXmltvCache(ttl_seconds=60)
+    store_threads: list[int] = []
+    real_store = cache.store
+
+    def store(*args, **kwargs):
+        store_threads.append(threading.get_ident())
+        return real_store(*args, **kwargs)
+
+    cache.store = store
+    captured = cache.capture(iter(["<tv>", "</tv>"]), BASE)
+    assert "".join(await asyncio.to_thread(list, captured)) == "<tv></tv>"
+    await asyncio.sleep(0)
+    assert store_threads == [threading.get_ident()]
+    assert cache.lookup(BASE) == ("<tv></tv>", True)
+
+    async def pieces():
+        yield "<tv>"
+        yield "<async/></tv>"
+
+    assert [p async for p in cache.capture(pieces(), BASE)] == ["<tv>", "<async/></tv>"]
+    assert cache.lookup(BASE) == ("<tv><async/></tv>", True)
+    await cache.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_refresh_ahead_rebuilds_before_expiry() -> None:
+    builder = _Builder()
+    builder.release.set()
+    cache = LazyXmltvCache(ttl_seconds=2, refresh_ahead_seconds=1.5, builder=builder)
+    cache.store("<tv old/>", base_url=BASE)
+    cache.start()
+    try:
+        for _ in range(30):
+            if builder.calls:
+                break
+            await asyncio.sleep(0.1)
+    finally:
+        await cache.stop()
+    assert builder.calls == 1
+    assert cache.lookup(BASE) == (f"<tv build=1 base={BASE}/>", True)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_documents_are_kept_per_base_url(tmp_path) -> None:
+    """Clients behind different addresses do not evict each other's guide."""
+    from exstreamtv.streaming.playout_timeline import bump_timeline_version, timeline_generation
+
+    path = tmp_path / "xmltv_last_good.xml"
+    lan = "http://192.168.1.5:8411"
+    cache = LazyXmltvCache(
+        ttl_seconds=60, snapshot_path=path, version=lambda: (0, timeline_generation())
+    )
+    cache.store("<tv local/>", base_url=BASE, version=cache.current_version())
+    cache.store("<tv lan/>", base_url=lan, version=cache.current_version())
+    assert cache.lookup(BASE) == ("<tv local/>", True)
+    assert cache.lookup(lan) == ("<tv lan/>", True)
+    await cache.stop()
+    # Only the primary (first) base_url is snapshotted
+    assert path.read_text() == "<tv local/>"
+
+    # A playout write leaves every document stale
+    bump_timeline_version(7)
+    assert cache.lookup(BASE)[1] is False and cache.lookup(lan)[1] is False
+
+    for n in range(5):
+        cache.store(f"<tv {n}/>", base_url=f"http://host{n}")
+    assert cache.get_stats()["documents"] == 4
+    assert cache.lookup(BASE) is not None and cache.lookup(lan) is None